@@ -1,19 +1,32 @@
+import hashlib
+import os
+import pickle
 import sqlalchemy
 import pymysql
 from getpass import getpass
+from pathlib import Path
 from networkx import Graph
 from sqlalchemy import create_engine
 from sqlalchemy import MetaData
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.engine.base import Engine
 from sqlalchemy.exc import OperationalError
+from sqlalchemy.exc import SQLAlchemyError
 from pdm_utils.functions import cartography
 from pdm_utils.functions import querying
 from pdm_utils.functions import mysqldb
 from pdm_utils.functions import parsing
 
+#GLOBAL VARIABLES
+SCHEMA_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME", "~/.cache"),
+                        "pdm_utils", "schema").expanduser()
+
+#Reflected schemas by (host, port, database), shared by all handlers.
+SCHEMA_CACHE = {}
+
 class AlchemyHandler:
-    def __init__(self, database=None, username=None, password=None):
+    def __init__(self, database=None, username=None, password=None,
+                                      cache_dir=SCHEMA_CACHE_DIR):
         self._database = database
         self._username = username
         self._password = password
@@ -22,6 +35,12 @@ class AlchemyHandler:
         self.metadata = None
         self.graph = None
         self.session = None
+
+        #Cached schema of the metadata, shared with other handlers.
+        self._schema = None
+
+        #Directory for reflected schemas, or None to only cache in memory.
+        self.cache_dir = cache_dir
             
         self.connected = False
         self.connected_database = False
@@ -198,6 +217,7 @@ class AlchemyHandler:
 
         self.metadata = None
         self.graph = None
+        self._schema = None
         
     def connect(self, ask_database=False, login_attempts=5):
         if ask_database:
@@ -245,6 +265,33 @@ class AlchemyHandler:
 
         return results
 
+    def stream(self, executable, chunk_size=1000, return_dict=True):
+        """Executes a query with a server-side cursor, yielding the
+        results in chunks so that they are never all held in memory.
+        :param executable: query to execute
+        :param chunk_size: number of rows fetched at a time
+        :param return_dict: indicates whether rows are converted to dicts
+        :return: generator of lists of rows
+        """
+        if self.engine is None:
+            self.build_engine()
+
+        with self.engine.connect() as connection:
+            proxy = connection.execution_options(stream_results=True).\
+                                                        execute(executable)
+            try:
+                while True:
+                    results = proxy.fetchmany(chunk_size)
+                    if not results:
+                        break
+
+                    if return_dict:
+                        results = [dict(result) for result in results]
+
+                    yield results
+            finally:
+                proxy.close()
+
     def scalar(self, executable):
         if self.engine is None:
             self.build_engine()
@@ -262,11 +309,109 @@ class AlchemyHandler:
         if not self.connected:
             self.build_engine()
         
-        self.metadata = MetaData(bind=self.engine)
-        self.metadata.reflect()
+        schema_key = self.get_schema_key()
+        schema = self.load_schema(schema_key)
+
+        #The metadata is not bound to the engine, since cached metadata
+        #is shared by handlers with different engines and credentials.
+        if schema is None:
+            metadata = MetaData()
+            metadata.reflect(bind=self.engine)
+
+            if schema_key is not None:
+                schema = {"version" : schema_key[1],
+                          "metadata" : metadata,
+                          "graph" : querying.build_graph(metadata)}
+                self.save_schema(schema_key, schema)
+        else:
+            metadata = schema["metadata"]
+
+        self.metadata = metadata
+        self._schema = schema
         
         return True
 
+    def get_schema_key(self):
+        """Identifies the cached schema of the connected database.
+        :return: ((host, port, database), schema version) tuple, or None
+                 if the schema version cannot be retrieved
+        """
+        if self.engine is None:
+            return None
+
+        try:
+            schema_version = self.engine.execute(
+                                "SELECT SchemaVersion FROM version").scalar()
+        except SQLAlchemyError:
+            return None
+
+        url = self.engine.url
+        database_key = (url.host, url.port, url.database)
+        version = (schema_version, sqlalchemy.__version__)
+        return (database_key, version)
+
+    def get_schema_path(self, database_key):
+        if self.cache_dir is None:
+            return None
+
+        digest = hashlib.sha1(repr(database_key).encode()).hexdigest()
+        return Path(self.cache_dir, f"{digest}.pickle")
+
+    def load_schema(self, schema_key):
+        """Retrieves a reflected schema from the memory or disk cache.
+        :param schema_key: key returned by get_schema_key()
+        :return: dictionary of schema version, metadata and graph, or
+                 None if no schema is cached for the schema version
+        """
+        if schema_key is None:
+            return None
+
+        database_key, version = schema_key
+
+        schema = SCHEMA_CACHE.get(database_key)
+        if schema is not None and schema["version"] == version:
+            return schema
+
+        schema_path = self.get_schema_path(database_key)
+        if schema_path is None or not schema_path.exists():
+            return None
+
+        try:
+            with schema_path.open("rb") as handle:
+                schema = pickle.load(handle)
+        except Exception:
+            return None
+
+        if schema["version"] != version:
+            return None
+
+        SCHEMA_CACHE[database_key] = schema
+        return schema
+
+    def save_schema(self, schema_key, schema):
+        """Stores a reflected schema in the memory and disk cache.
+        :param schema_key: key returned by get_schema_key()
+        :param schema: dictionary of schema version, metadata and graph
+        """
+        database_key = schema_key[0]
+        SCHEMA_CACHE[database_key] = schema
+
+        schema_path = self.get_schema_path(database_key)
+        if schema_path is None:
+            return
+
+        #Write to a temporary file so other processes never read a
+        #partially written schema.
+        temp_path = schema_path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            schema_path.parent.mkdir(parents=True, exist_ok=True)
+            with temp_path.open("wb") as handle:
+                pickle.dump(schema, handle)
+            temp_path.replace(schema_path)
+        except OSError:
+            if temp_path.exists():
+                temp_path.unlink()
+
     def translate_table(self, raw_table): 
         if not self.metadata:
             self.build_metadata()
@@ -295,7 +440,13 @@ class AlchemyHandler:
         if not self.metadata:
             self.build_metadata()
         
-        self.graph = querying.build_graph(self.metadata)
+        if self._schema is not None and \
+                            self._schema["metadata"] is self.metadata:
+            graph = self._schema["graph"]
+        else:
+            graph = querying.build_graph(self.metadata)
+
+        self.graph = graph
 
     #For when necessary
     #def build_session(self):
@@ -15,6 +15,19 @@ from collections import OrderedDict
 class Cds:
     """Class to hold data about a CDS feature."""
 
+    # Slots keep each instance small, since entire gene tables may be
+    # loaded at once. The nucleotide sequence and evaluation list
+    # are only created when they are first accessed.
+    __slots__ = (
+        "id", "name", "seqfeature", "start", "stop", "coordinate_format",
+        "orientation", "parts", "translation_table", "translation",
+        "translation_length", "_seq", "length", "genome_id", "genome_length",
+        "pham_id", "domain_status", "raw_description", "description",
+        "locus_tag", "_locus_tag_num", "gene", "raw_product", "raw_function",
+        "raw_note", "product", "function", "note", "_product_num",
+        "_function_num", "_note_num", "_evaluations", "type",
+        "_start_stop_orient_id", "_end_orient_id", "_start_end_id")
+
     def __init__(self):
 
         # The following attributes are common to any CDS.
@@ -29,7 +42,7 @@ class Cds:
         self.translation_table = 0
         self.translation = Seq("", IUPAC.protein) # Biopython amino acid Seq object.
         self.translation_length = 0
-        self.seq = Seq("", IUPAC.ambiguous_dna) # Biopython nucleotide Seq object.
+        self._seq = None # Biopython nucleotide Seq object, created lazily.
         self.length = 0
 
         # Information about the genome from which the feature is derived.
@@ -64,12 +77,33 @@ class Cds:
 
         # The following attributes are usefule for processing data
         # from various data sources.
-        self.evaluations = []
+        self._evaluations = None # List of evaluations, created lazily.
         self.type = ""
         self._start_stop_orient_id = ()
         self._end_orient_id = ()
         self._start_end_id = ()
 
+    @property
+    def seq(self):
+        """Biopython nucleotide Seq object."""
+        if self._seq is None:
+            self._seq = Seq("", IUPAC.ambiguous_dna)
+        return self._seq
+
+    @seq.setter
+    def seq(self, value):
+        self._seq = value
+
+    @property
+    def evaluations(self):
+        """List of evaluations about the feature data."""
+        if self._evaluations is None:
+            self._evaluations = []
+        return self._evaluations
+
+    @evaluations.setter
+    def evaluations(self, value):
+        self._evaluations = value
 
 
 
@@ -596,16 +630,22 @@ class Cds:
 
 
     def check_translation(self, eval_id=None, success="correct",
-                          fail="error", eval_def=None):
+                          fail="error", eval_def=None, translation=None):
         """Check that the current and expected translations match.
 
         :param eval_id: same as for check_attribute().
         :param success: same as for check_attribute().
         :param fail: same as for check_attribute().
         :param eval_def: same as for check_attribute().
+        :param translation:
+            Expected translation, if it has already been computed
+            (e.g. by translation.translate_cds_features()). If None,
+            the nucleotide sequence is translated with translate_seq().
+        :type translation: Seq
         """
 
-        translation = self.translate_seq()
+        if translation is None:
+            translation = self.translate_seq()
         exp_len = len(translation)
         result = f"The translation length ({self.translation_length}) "
         if self.translation_length < exp_len:
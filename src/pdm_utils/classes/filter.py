@@ -320,23 +320,39 @@ class Filter:
         return len(self._values)    
 
     def group(self, column): 
+        return self.nested_group([column])
+
+    def nested_group(self, columns):
         self.check()
 
-        if isinstance(column, str):
-            column = q.get_column(self.graph.graph["metadata"], column)
+        if not self.values:
+            return {}
 
-        elif isinstance(column, Column):
-            pass
-        else:
-            raise TypeError
+        group_columns = []
+        for column in columns:
+            if isinstance(column, str):
+                column = q.get_column(self.graph.graph["metadata"], column)
+            elif not isinstance(column, Column):
+                raise TypeError
 
-        groups = self.transpose(column)
+            group_columns.append(column)
+
+        # Retrieve every (group, ..., key) row at once and partition the
+        # rows in memory rather than querying once per group.
+        where_clause = (self.key.in_(self.values))
+        query = q.build_select(self.graph, group_columns + [self.key],
+                               where=[where_clause])
+
+        proxy = self.engine.execute(query)
+        results = proxy.fetchall()
 
         group_results = {}
-        for group in groups:
-            where_clause = (column == group) 
-            values = self.build_values(where=[where_clause])
-            group_results.update({group : values})
+        for result in results:
+            groups = group_results
+            for group in result[:-2]:
+                groups = groups.setdefault(group, {})
+
+            groups.setdefault(result[-2], []).append(result[-1])
 
         return group_results
 
@@ -9,11 +9,30 @@ from Bio.SeqUtils import GC
 
 from pdm_utils.classes import eval, cds, trna, source
 from pdm_utils.constants import constants
-from pdm_utils.functions import basic
+from pdm_utils.functions import basic, intervals
 
 class Genome:
     """Class to hold data about a phage genome."""
 
+    # Slots keep each instance small. The nucleotide sequence and
+    # evaluation list are only created when they are first accessed.
+    __slots__ = (
+        "nucleic_acid_type", "order", "family", "cluster", "subcluster", "id",
+        "name", "_seq", "_seq_hash", "length", "gc", "host_genus",
+        "accession", "lifestyle", "translation_table", "annotation_status",
+        "annotation_author", "retrieve_record", "date", "description",
+        "_description_name", "_description_host_genus", "source",
+        "_source_name", "_source_host_genus", "organism", "_organism_name",
+        "_organism_host_genus", "authors", "cds_features",
+        "_cds_features_tally", "_cds_start_end_ids", "_cds_end_orient_ids",
+        "_cds_descriptions_tally", "_cds_products_tally",
+        "_cds_functions_tally", "_cds_notes_tally",
+        "_cds_unique_start_end_ids", "_cds_duplicate_start_end_ids",
+        "_cds_unique_end_orient_ids", "_cds_duplicate_end_orient_ids",
+        "trna_features", "_trna_features_tally", "tmrna_features",
+        "_tmrna_features_tally", "source_features", "_source_features_tally",
+        "filename", "type", "_evaluations", "misc")
+
     def __init__(self):
 
         # The following attributes are common to any genome.
@@ -24,7 +43,8 @@ class Genome:
         self.subcluster = "" #A1, A2, etc.
         self.id = "" # Unique identifier. Case sensitive, no "_Draft".
         self.name = "" # Case sensitive and contains "_Draft".
-        self.seq = Seq("", IUPAC.ambiguous_dna) # Biopython Seq object
+        self._seq = None # Biopython Seq object, created lazily.
+        self._seq_hash = None # SHA-256 digest of the sequence, created lazily.
         self.length = 0 # Size of the nucleotide sequence
         self.gc = -1 # %GC content
         self.host_genus = ""
@@ -77,11 +97,45 @@ class Genome:
         self.filename = "" # The file name from which the data is derived
         self.type = "" # Identifier to describes how this genome is used
                        # (e.g. import, MySQL database, PhagesDB, etc.)
-        self.evaluations = [] # List of warnings and errors about the data
+        self._evaluations = None # List of warnings and errors about the data
         self.misc = None # Unstructured attribute to store misc. data not
                          # applicable to any of the other attributes and that
                          # may be used differently for downstream applications.
 
+    @property
+    def seq(self):
+        """Biopython nucleotide Seq object."""
+        if self._seq is None:
+            self._seq = Seq("", IUPAC.ambiguous_dna)
+        return self._seq
+
+    @seq.setter
+    def seq(self, value):
+        self._seq = value
+        self._seq_hash = None
+
+    @property
+    def seq_hash(self):
+        """SHA-256 digest of the nucleotide sequence.
+
+        The hash can be used to compare sequences to those stored in the
+        MySQL database without retrieving the sequences.
+        """
+        if self._seq_hash is None:
+            self._seq_hash = basic.get_seq_hash(self.seq)
+        return self._seq_hash
+
+    @property
+    def evaluations(self):
+        """List of warnings and errors about the data."""
+        if self._evaluations is None:
+            self._evaluations = []
+        return self._evaluations
+
+    @evaluations.setter
+    def evaluations(self, value):
+        self._evaluations = value
+
     def __str__(self):
         str_list = []
         if self.id != "":
@@ -739,6 +793,34 @@ class Genome:
         self.set_eval(eval_id, definition, result, status)
 
 
+    def check_seq_hash(self, check_set, expect=False, eval_id=None,
+                       success="correct", fail="error", eval_def=None):
+        """Check that the nucleotide sequence is valid using its hash.
+
+        :param check_set: Set of reference sequence hashes.
+        :type check_set: set
+        :param expect:
+            Indicates whether the sequence hash is expected to be present
+            in the check set.
+        :type expect: bool
+        :param eval_id: same as for check_attribute().
+        :param success: same as for check_attribute().
+        :param fail: same as for check_attribute().
+        :param eval_def: same as for check_attribute().
+        """
+        seq_short = basic.truncate_value(str(self.seq), 30, "...")
+        result = f"The sequence '{seq_short}' is "
+        if basic.check_value_expected_in_set(self.seq_hash, check_set, expect):
+            result = result + "valid."
+            status = success
+        else:
+            result = result + "not valid."
+            status = fail
+        definition = "Check the nucleotide sequence."
+        definition = basic.join_strings([definition, eval_def])
+        self.set_eval(eval_id, definition, result, status)
+
+
     def check_authors(self, check_set=set(), expect=True, eval_id=None,
                       success="correct", fail="error", eval_def=None):
         """Check author list.
@@ -898,6 +980,9 @@ class Genome:
         """Identify nested, duplicated, or partially-duplicated
         features.
 
+        All pairs of conflicting features are reported, including features
+        nested within features that wrap around the end of the genome.
+
         :param cds_ftr: Indicates whether ids of CDS features should be included.
         :type cds_ftr: bool
         :param trna_ftr: Indicates whether ids of tRNA features should be included.
@@ -955,12 +1040,16 @@ class Genome:
 
         msgs = ["There are one or more errors with the feature coordinates."]
         for unsorted_features in unsorted_feature_lists:
-            sorted_features = sorted(unsorted_features,
-                                     key=attrgetter("start", "stop"))
-            index = 0
-            while index < len(sorted_features) - 1:
-                current = sorted_features[index]
-                next = sorted_features[index + 1]
+            coordinates = []
+            for feature in unsorted_features:
+                coordinates.append((feature.start, feature.stop,
+                                    basic.reformat_strand(feature.orientation,
+                                                          format="fr_short")))
+            conflicts = intervals.find_coordinate_conflicts(
+                            coordinates, genome_length=self.length)
+            for index1, index2, conflict in conflicts:
+                current = unsorted_features[index1]
+                next = unsorted_features[index2]
                 ftrs = (f"Feature1 ID: {current.id}, "
                         f"start coordinate: {current.start}, "
                         f"stop coordinate: {current.stop}, "
@@ -969,40 +1058,15 @@ class Genome:
                         f"start coordinate: {next.start}, "
                         f"stop coordinate: {next.stop}, "
                         f"orientation: {next.orientation}. ")
-
-                if (current.start == next.start and current.stop == next.stop):
-                    msgs.append(ftrs)
+                msgs.append(ftrs)
+                if conflict == intervals.DUPLICATE:
                     msgs.append("Feature1 and Feature2 contain identical "
                                 "start and stop coordinates.")
-
-                # To identify nested features, the following tests
-                # avoid false errors due to genes that may wrap around the
-                # genome.
-                elif (current.start < next.start and
-                      current.start < next.stop and
-                      current.stop > next.start and
-                      current.stop > next.stop):
-                    msgs.append(ftrs)
+                elif conflict == intervals.NESTED:
                     msgs.append("Feature2 is nested within Feature1.")
-                elif (current.start == next.start and
-                        basic.reformat_strand(current.orientation,
-                            format="fr_short") == "r" and
-                        basic.reformat_strand(next.orientation,
-                            format="fr_short") == "r"):
-                    msgs.append(ftrs)
-                    msgs.append(("Feature1 and Feature2 contain "
-                                 "identical stop coordinates."))
-                elif (current.stop == next.stop and
-                        basic.reformat_strand(current.orientation,
-                            format="fr_short") == "f" and
-                        basic.reformat_strand(next.orientation,
-                            format="fr_short") == "f"):
-                    msgs.append(ftrs)
+                else:
                     msgs.append(("Feature1 and Feature2 contain "
                                  "identical stop coordinates."))
-                else:
-                    pass
-                index += 1
         if len(msgs) > 1:
             result = result + " ".join(msgs)
             status = fail
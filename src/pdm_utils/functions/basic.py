@@ -6,6 +6,8 @@ import sys
 import os
 import csv
 import getpass
+import gzip
+import hashlib
 from pathlib import Path
 
 
@@ -1273,7 +1275,8 @@ def show_progress(current, end, width=50):
     return progress
 
 
-def export_data_dict(data_dicts, file_path, headers, include_headers=False):
+def export_data_dict(data_dicts, file_path, headers, include_headers=False,
+                     compress=False):
     """Save a dictionary of data to file using specified column headers.
 
     Ensures the output file contains a specified number of columns,
@@ -1293,13 +1296,19 @@ def export_data_dict(data_dicts, file_path, headers, include_headers=False):
         Indicates whether the file should contain a
         row of column names derived from the headers parameter.
     :type include_headers: bool
+    :param compress: Indicates whether the file should be gzip-compressed.
+    :type compress: bool
     """
 
     headers_dict = {}
     for header in headers:
         headers_dict[header] = header
     # with open(file_path, "w") as file_handle:
-    with file_path.open("w") as file_handle:
+    if compress:
+        file_handle = gzip.open(file_path, "wt")
+    else:
+        file_handle = file_path.open("w")
+    with file_handle:
         file_writer = csv.DictWriter(file_handle, headers)
         if include_headers:
             file_writer.writerow(headers_dict)
@@ -1376,3 +1385,20 @@ def merge_set_dicts(dict1, dict2):
 
         dict3[key] = set1 | set2
     return dict3
+
+
+def get_seq_hash(seq):
+    """Compute the hash of a nucleotide sequence.
+
+    The hash is computed from the upper-case sequence using SHA-256, which
+    is identical to the hash MySQL computes using
+    SHA2(UPPER(<sequence>), 256).
+
+    :param seq: Nucleotide sequence.
+    :type seq: str or Seq
+    :returns: Hexadecimal digest of the sequence.
+    :rtype: str
+    """
+    seq_bytes = str(seq).upper().encode("latin-1")
+    seq_hash = hashlib.sha256(seq_bytes).hexdigest()
+    return seq_hash
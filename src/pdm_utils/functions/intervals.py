@@ -0,0 +1,158 @@
+"""Functions to identify conflicting coordinates among genome features."""
+
+from heapq import heappush
+from itertools import combinations
+
+DUPLICATE = "duplicate"
+NESTED = "nested"
+SHARED_STOP = "shared_stop"
+
+
+def find_coordinate_conflicts(features, genome_length=0):
+    """Identify all pairs of nested, duplicated, or partially-duplicated
+    features.
+
+    Features are compared with a sweep over their sorted start coordinates,
+    so that each feature is only compared to the features that overlap it.
+    Features that wrap around the end of the genome (start coordinate larger
+    than stop coordinate) are extended past the genome length, and features
+    at the beginning of the genome are also compared to them after being
+    shifted by the genome length.
+
+    Conflicts are:
+
+        1. 'duplicate': both features have identical start and stop
+           coordinates, regardless of strand.
+        2. 'nested': the second feature is entirely within the first feature,
+           regardless of strand.
+        3. 'shared_stop': both features are on the forward strand and have
+           identical stop coordinates, or are on the reverse strand and
+           have identical start coordinates, and they are not duplicates.
+
+    :param features:
+        List of (start, stop, strand) tuples, where strand is 'f' or 'r'
+        (e.g. as returned by basic.reformat_strand() in 'fr_short' format).
+        Features on any other strand are only evaluated for duplicate
+        and nested coordinates.
+    :type features: list
+    :param genome_length:
+        Length of the genome, used to extend wrap-around features. If it is
+        shorter than the largest coordinate, the largest coordinate is used.
+    :type genome_length: int
+    :returns:
+        List of (index1, index2, conflict) tuples, where index1 and index2
+        are the indices of the conflicting features in the input list.
+        Nested features are listed after the feature they are nested within.
+        Otherwise, features are listed in order of coordinates.
+    :rtype: list
+    """
+    if len(features) < 2:
+        return []
+
+    # Order used to list features in each conflict.
+    order = sorted(range(len(features)),
+                   key=lambda x: (features[x][0], features[x][1], x))
+    rank = [0] * len(features)
+    for position, index in enumerate(order):
+        rank[index] = position
+
+    conflicts = set()
+    coordinates = {}
+    stops = {}
+    for index, (start, stop, strand) in enumerate(features):
+        coordinates.setdefault((start, stop), []).append(index)
+        if strand == "f":
+            stops.setdefault(("f", stop), []).append(index)
+        elif strand == "r":
+            stops.setdefault(("r", start), []).append(index)
+
+    for indices in coordinates.values():
+        for pair in combinations(sorted(indices, key=rank.__getitem__), 2):
+            conflicts.add(pair + (DUPLICATE,))
+    for indices in stops.values():
+        for index1, index2 in combinations(
+                sorted(indices, key=rank.__getitem__), 2):
+            if features[index1][:2] != features[index2][:2]:
+                conflicts.add((index1, index2, SHARED_STOP))
+
+    for container, nested in find_nested_intervals(
+            get_unwrapped_intervals(features, genome_length)):
+        if container != nested:
+            conflicts.add((container, nested, NESTED))
+
+    return sorted(conflicts, key=lambda x: (rank[x[0]], rank[x[1]]))
+
+
+def get_unwrapped_intervals(features, genome_length=0):
+    """Convert feature coordinates to linear intervals.
+
+    Wrap-around features are extended past the genome length. If there are
+    any wrap-around features, non-wrap-around features that start before
+    the last wrap-around feature stops are also shifted by the genome length.
+
+    :param features: List of (start, stop, strand) tuples.
+    :type features: list
+    :param genome_length: Length of the genome.
+    :type genome_length: int
+    :returns: List of (start, stop, index) tuples.
+    :rtype: list
+    """
+    length = max([genome_length] + [max(ftr[:2]) + 1 for ftr in features])
+    intervals = []
+    wrap_stop = None
+    for index, (start, stop, strand) in enumerate(features):
+        if start > stop:
+            intervals.append((start, stop + length, index))
+            if wrap_stop is None or stop > wrap_stop:
+                wrap_stop = stop
+        else:
+            intervals.append((start, stop, index))
+
+    if wrap_stop is not None:
+        for index, (start, stop, strand) in enumerate(features):
+            if start <= stop and start <= wrap_stop:
+                intervals.append((start + length, stop + length, index))
+    return intervals
+
+
+def find_nested_intervals(intervals):
+    """Identify all pairs of intervals in which one interval is strictly
+    within another interval.
+
+    Intervals are swept in order of start coordinate, and the stop
+    coordinates of the intervals that have started are kept in a max-heap.
+    An interval is nested within every earlier interval that stops after
+    it, and these are found by only descending the heap while stop
+    coordinates are larger. Intervals that stop before the current interval
+    starts are never reached, so they do not need to be removed. The sweep
+    requires O(n log n + k) time for n intervals and k nested pairs.
+
+    :param intervals: List of (start, stop, index) tuples.
+    :type intervals: list
+    :returns:
+        List of (index1, index2) tuples, where the interval of index2
+        is nested within the interval of index1.
+    :rtype: list
+    """
+    pairs = []
+    heap = [] # (-stop, index) tuples of intervals that have started
+    intervals = sorted(intervals, key=lambda x: (x[0], -x[1]))
+    x = 0
+    while x < len(intervals):
+        start = intervals[x][0]
+
+        # Intervals with the same start can not be nested in each other.
+        y = x
+        while y < len(intervals) and intervals[y][0] == start:
+            stop, index = intervals[y][1:]
+            nodes = [0]
+            while nodes:
+                node = nodes.pop()
+                if node < len(heap) and -heap[node][0] > stop:
+                    pairs.append((heap[node][1], index))
+                    nodes.extend([2 * node + 1, 2 * node + 2])
+            y += 1
+        for _, stop, index in intervals[x:y]:
+            heappush(heap, (-stop, index))
+        x = y
+    return pairs
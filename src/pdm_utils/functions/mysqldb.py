@@ -12,6 +12,8 @@ from pdm_utils.classes import cds
 from pdm_utils.constants import constants
 from pdm_utils.functions import basic
 
+# Maximum number of PhageIDs used to condition a single gene table query.
+PHAGE_ID_BATCH_SIZE = 1000
 
 
 # TODO unittest.
@@ -285,8 +287,52 @@ def parse_cds_data(engine, column=None, phage_id_list=None, query=None):
     return cds_list
 
 
+def parse_cds_data_by_genome(engine, phage_id_list, query,
+                             batch_size=PHAGE_ID_BATCH_SIZE):
+    """Returns Cds objects for several genomes containing data parsed from a
+    MySQL database.
+
+    Instead of querying the gene table once for each genome, each query
+    is conditioned on a batch of PhageIDs, and the Cds objects are grouped
+    by genome.
+
+    :param engine:
+        This parameter is passed directly to the 'retrieve_data' function.
+    :type engine: Engine
+    :param phage_id_list: A list of valid PhageIDs.
+    :type phage_id_list: list
+    :param query:
+        This parameter is passed directly to the 'retrieve_data' function.
+        It must select the PhageID column.
+    :type query: str
+    :param batch_size: Number of PhageIDs used to condition each query.
+    :type batch_size: int
+    :returns:
+        A dictionary
+        WHERE
+        key (str) = PhageID
+        value (list) = pdm_utils Cds objects for the genome, in the same
+        order as they are retrieved for the genome alone.
+    :rtype: dict
+    """
+    cds_dict = {}
+    for phage_id in phage_id_list:
+        cds_dict[phage_id] = []
+
+    batch_indices = basic.create_indices(phage_id_list, batch_size)
+    for start, stop in batch_indices:
+        result_list = retrieve_data(
+                        engine, column="PhageID", query=query,
+                        phage_id_list=phage_id_list[start:stop])
+        for data_dict in result_list:
+            cds_ftr = parse_gene_table_data(data_dict)
+            cds_dict[data_dict["PhageID"]].append(cds_ftr)
+    return cds_dict
+
+
 def parse_genome_data(engine, phage_id_list=None, phage_query=None,
-                      gene_query=None, trna_query=None, gnm_type=""):
+                      gene_query=None, trna_query=None, gnm_type="",
+                      batch_size=PHAGE_ID_BATCH_SIZE):
     """Returns a list of Genome objects containing data parsed from a MySQL
     database.
 
@@ -320,6 +366,12 @@ def parse_genome_data(engine, phage_id_list=None, phage_query=None,
     :type phage_id_list: list
     :param gnm_type: Identifier for the type of genome.
     :type gnm_type: str
+    :param batch_size:
+        Number of genomes for which CDS data is retrieved in a single
+        query, using the 'parse_cds_data_by_genome' function. The gene_query
+        must select the PhageID column. If None, CDS data is retrieved
+        with a separate query for each genome.
+    :type batch_size: int
     :returns: A list of pdm_utils Genome objects.
     :rtype: list
     """
@@ -327,12 +379,20 @@ def parse_genome_data(engine, phage_id_list=None, phage_query=None,
     result_list1 = retrieve_data(engine, column="PhageID",
                                  phage_id_list=phage_id_list,
                                  query=phage_query)
+    if gene_query is not None and batch_size is not None:
+        cds_dict = parse_cds_data_by_genome(
+                        engine,
+                        [data_dict["PhageID"] for data_dict in result_list1],
+                        gene_query, batch_size=batch_size)
     for data_dict in result_list1:
         gnm = parse_phage_table_data(data_dict, gnm_type=gnm_type)
         if gene_query is not None:
-            cds_list = parse_cds_data(engine, column="PhageID",
-                                      phage_id_list=[gnm.id],
-                                      query=gene_query)
+            if batch_size is not None:
+                cds_list = cds_dict[gnm.id]
+            else:
+                cds_list = parse_cds_data(engine, column="PhageID",
+                                          phage_id_list=[gnm.id],
+                                          query=gene_query)
 
             for x in range(len(cds_list)):
                 cds_list[x].genome_length = gnm.length
@@ -395,6 +455,25 @@ def create_seq_set(engine):
     return result_set
 
 
+def create_seq_hash_set(engine):
+    """Create set of genome sequence hashes currently in a MySQL database.
+
+    Hashes are computed by MySQL, so the sequences are not retrieved.
+    Each hash is identical to the hash computed by basic.get_seq_hash().
+
+    :param engine: SQLAlchemy Engine object able to connect to a MySQL database.
+    :type engine: Engine
+    :returns: A set of unique SHA-256 hashes of phage.Sequence.
+    :rtype: set
+    """
+    # Sequence data is stored as MEDIUMBLOB, and UPPER() has no effect
+    # on binary strings, so it needs to be converted first.
+    query = ("SELECT SHA2(UPPER(CONVERT(Sequence USING latin1)), 256) "
+             "FROM phage")
+    result_set = query_set(engine, query)
+    return result_set
+
+
 def convert_for_sql(value, check_set=set(), single=True):
     """Convert a value for inserting into MySQL.
 
@@ -562,6 +641,127 @@ def create_genome_statements(gnm, tkt_type=""):
     return sql_statements
 
 
+def get_phage_table_data(gnm):
+    """Get the data to INSERT a new row in the 'phage' table.
+
+    Values are converted in the same way as for create_phage_table_insert().
+
+    :param gnm: A pdm_utils Genome object.
+    :type gnm: Genome
+    :returns: Dictionary of column names and values.
+    :rtype: dict
+    """
+    cluster = None if gnm.cluster == "Singleton" else gnm.cluster
+    subcluster = None if gnm.subcluster == "none" else gnm.subcluster
+
+    # gnm.seq is a BioPython Seq object.
+    data_dict = {"PhageID": gnm.id,
+                 "Accession": gnm.accession,
+                 "Name": gnm.name,
+                 "HostGenus": gnm.host_genus,
+                 "Sequence": str(gnm.seq),
+                 "Length": gnm.length,
+                 "GC": gnm.gc,
+                 "Status": gnm.annotation_status,
+                 "DateLastModified": gnm.date,
+                 "RetrieveRecord": gnm.retrieve_record,
+                 "AnnotationAuthor": gnm.annotation_author,
+                 "Cluster": cluster,
+                 "Subcluster": subcluster}
+    return data_dict
+
+
+def get_gene_table_data(cds_ftr):
+    """Get the data to INSERT a new row in the 'gene' table.
+
+    Values are converted in the same way as for create_gene_table_insert().
+
+    :param cds_ftr: A pdm_utils Cds object.
+    :type cds_ftr: Cds
+    :returns: Dictionary of column names and values.
+    :rtype: dict
+    """
+    locus_tag = None if cds_ftr.locus_tag == "" else cds_ftr.locus_tag
+
+    # cds_ftr.translation is a BioPython Seq object.
+    data_dict = {"GeneID": cds_ftr.id,
+                 "PhageID": cds_ftr.genome_id,
+                 "Start": cds_ftr.start,
+                 "Stop": cds_ftr.stop,
+                 "Length": cds_ftr.translation_length,
+                 "Name": cds_ftr.name,
+                 "Translation": str(cds_ftr.translation),
+                 "Orientation": cds_ftr.orientation,
+                 "Notes": cds_ftr.description,
+                 "LocusTag": locus_tag,
+                 "Parts": cds_ftr.parts}
+    return data_dict
+
+
+def create_bulk_insert(table, data_list):
+    """Create a parameterized MySQL INSERT statement for many rows.
+
+    Values are not formatted into the statement, so they do not need
+    to be quoted or escaped. When executed with execute_transaction(),
+    all rows are inserted using one multi-row INSERT statement.
+
+    :param table: The database table to insert information.
+    :type table: str
+    :param data_list:
+        List of dictionaries of column names and values, one for each row.
+        All dictionaries should contain the same columns.
+    :type data_list: list
+    :returns:
+        tuple (statement, data_list)
+        WHERE
+        statement (str) is a MySQL INSERT statement with named parameters.
+        data_list (list) is the list of dictionaries of parameter values.
+    :rtype: tuple
+    """
+    columns = list(data_list[0].keys())
+    column_string = ", ".join(columns)
+    param_string = ", ".join([f":{column}" for column in columns])
+    statement = (f"INSERT INTO {table} ({column_string}) "
+                 f"VALUES ({param_string})")
+    return (statement, data_list)
+
+
+def create_genome_bulk_statements(gnm, tkt_type=""):
+    """Create list of parameterized MySQL statements based on the ticket type.
+
+    This produces the same changes to the database as
+    create_genome_statements(), but each table only requires one
+    statement, regardless of the number of features. As for
+    create_genome_statements(), no data is inserted into the trna and
+    tmrna tables, since tRNA feature ids are not set and tmRNA features
+    are not parsed when genomes are imported.
+
+    :param gnm: A pdm_utils Genome object.
+    :type gnm: Genome
+    :param tkt_type: 'add' or 'replace'.
+    :type tkt_type: str
+    :returns:
+        List of tuples of MySQL statements and parameter values
+        to INSERT all data from a genome into the database,
+        as returned by create_bulk_insert().
+    :rtype: list
+    """
+    sql_statements = []
+    if tkt_type == "replace":
+        statement1 = ("DELETE FROM phage WHERE PhageID = :PhageID",
+                      {"PhageID": gnm.id})
+        sql_statements.append(statement1)
+    statement2 = create_bulk_insert("phage", [get_phage_table_data(gnm)])
+    sql_statements.append(statement2)
+    if len(gnm.cds_features) > 0:
+        gene_data = [get_gene_table_data(cds_ftr)
+                     for cds_ftr in gnm.cds_features]
+        statement3 = create_bulk_insert("gene", gene_data)
+        sql_statements.append(statement3)
+
+    return sql_statements
+
+
 def get_phage_table_count(engine):
     """Get the current number of genomes in the database.
 
@@ -994,7 +1194,11 @@ def execute_transaction(engine, statement_list=[]):
     :type engine: Engine
     :param statement_list:
         a list of any number of MySQL statements with
-        no expectation that anything will return
+        no expectation that anything will return.
+        Statements can also be provided as a tuple of the statement
+        with named parameters and the parameter values (a dictionary, or
+        a list of dictionaries to execute the statement for many rows),
+        such as from create_bulk_insert().
     :returns:
         tuple (result, message)
         WHERE
@@ -1007,7 +1211,11 @@ def execute_transaction(engine, statement_list=[]):
     trans = connection.begin()
     try:
         for statement in statement_list:
-            connection.execute(statement)
+            if isinstance(statement, tuple):
+                connection.execute(sqlalchemy.text(statement[0]),
+                                   statement[1])
+            else:
+                connection.execute(statement)
         trans.commit()
 
     except sqlalchemy.exc.DBAPIError as err:
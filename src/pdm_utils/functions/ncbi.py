@@ -1,7 +1,30 @@
 """Misc. functions to interact with NCBI databases."""
+import http.client
+import io
+import queue
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
 from Bio import Entrez, SeqIO
 from pdm_utils.functions import basic
 
+# Base URL of the NCBI E-utilities.
+EUTILS_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/"
+# Maximum number of requests per second allowed by NCBI,
+# without and with an API key.
+REQUEST_RATE = 3
+API_KEY_REQUEST_RATE = 10
+# Number of attempts made for each request, and seconds between attempts.
+MAX_TRIES = 3
+RETRY_DELAY = 15
+# Seconds to wait for a response from NCBI.
+TIMEOUT = 120
+# HTTP errors that indicate a request may succeed if it is retried.
+RETRY_CODES = {429, 500, 502, 503, 504}
+
 # TODO unittest.
 def get_ncbi_creds(filename):
     """Get NCBI credentials from a file.
@@ -114,3 +137,331 @@ def get_records(accession_list, db="nucleotide", rettype="gb", retmode="text"):
         retrieved_records.append(record)
     fetch_handle.close()
     return retrieved_records
+
+
+class RateLimiter:
+    """Limits the rate of requests made by one or more threads."""
+
+    def __init__(self, rate):
+        """
+        :param rate: Maximum number of requests per second.
+        :type rate: float
+        """
+        self.interval = 1 / rate
+        self.next_time = 0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        """Wait until another request can be made."""
+        with self.lock:
+            current = time.monotonic()
+            start = max(current, self.next_time)
+            self.next_time = start + self.interval
+        if start > current:
+            time.sleep(start - current)
+
+
+class EntrezClient:
+    """Client for the NCBI E-utilities.
+
+    All requests made through a client are limited to the rate allowed by
+    NCBI, including requests made from different threads, and requests
+    that fail for reasons that may be temporary are retried.
+    """
+
+    def __init__(self, tool=None, email=None, api_key=None,
+                 base_url=EUTILS_URL, rate=None, max_tries=MAX_TRIES,
+                 retry_delay=RETRY_DELAY):
+        """
+        :param tool: Name of the software/tool being used.
+        :type tool: str
+        :param email: Email contact information for NCBI.
+        :type email: str
+        :param api_key: Unique NCBI-issued identifier to enhance retrieval speed.
+        :type api_key: str
+        :param base_url: Base URL of the E-utilities.
+        :type base_url: str
+        :param rate:
+            Maximum number of requests per second. If not provided,
+            the rate allowed by NCBI is used.
+        :type rate: float
+        :param max_tries: Number of attempts made for each request.
+        :type max_tries: int
+        :param retry_delay: Seconds to wait before retrying a request.
+        :type retry_delay: float
+        """
+        self.tool = tool
+        self.email = email
+        self.api_key = api_key
+        self.base_url = base_url
+        if rate is None:
+            if api_key is None:
+                rate = REQUEST_RATE
+            else:
+                rate = API_KEY_REQUEST_RATE
+        self.limiter = RateLimiter(rate)
+        self.max_tries = max_tries
+        self.retry_delay = retry_delay
+
+    def open(self, utility, params):
+        """Send a request to one of the E-utilities.
+
+        :param utility: Name of the E-utility (e.g. 'esearch').
+        :type utility: str
+        :param params: Parameters of the request.
+        :type params: dict
+        :returns: Response to the request.
+        :rtype: HTTPResponse
+        """
+        params = params.copy()
+        for key, value in [("tool", self.tool), ("email", self.email),
+                           ("api_key", self.api_key)]:
+            if value is not None:
+                params[key] = value
+        url = urllib.parse.urljoin(self.base_url, f"{utility}.fcgi")
+        # Parameters are posted, since the list of accessions may be too
+        # long for a URL.
+        data = urllib.parse.urlencode(params).encode("utf-8")
+        self.limiter.wait()
+        return urllib.request.urlopen(url, data=data, timeout=TIMEOUT)
+
+    def retry(self, func):
+        """Call a function that makes requests, retrying it if it fails
+        for reasons that may be temporary.
+
+        :param func: Function to be called without any arguments.
+        :type func: function
+        :returns: The result of the function.
+        """
+        attempt = 1
+        while True:
+            try:
+                return func()
+            except urllib.error.HTTPError as err:
+                if err.code not in RETRY_CODES or attempt >= self.max_tries:
+                    raise
+            except (OSError, http.client.HTTPException):
+                if attempt >= self.max_tries:
+                    raise
+            attempt += 1
+            time.sleep(self.retry_delay)
+
+    def read(self, utility, params):
+        """Send a request and parse the XML response with Entrez.read().
+
+        :param utility: same as for open().
+        :param params: same as for open().
+        :returns: The parsed response.
+        """
+        def request():
+            with self.open(utility, params) as response:
+                data = response.read()
+            return Entrez.read(io.BytesIO(data))
+        return self.retry(request)
+
+    def esearch(self, db="", term="", usehistory=""):
+        """Search for valid records in NCBI.
+
+        :param db: Name of the database to search.
+        :type db: str
+        :param term: Search term.
+        :type term: str
+        :param usehistory: Indicates if prior searches should be used.
+        :type usehistory: str
+        :returns: Results of the search for each valid record.
+        :rtype: dict
+        """
+        params = {"db": db, "term": term, "usehistory": usehistory}
+        return self.read("esearch", params)
+
+    def esummary(self, db="", query_key="", webenv=""):
+        """Retrieve record summaries from NCBI.
+
+        :param db: Name of the database to get summaries from.
+        :type db: str
+        :param query_key: Identifier for the search from esearch().
+        :type query_key: str
+        :param webenv: Identifier from esearch().
+        :type webenv: str
+        :returns:
+            List of dictionaries, where each dictionary is a record summary.
+        :rtype: list
+        """
+        params = {"db": db, "query_key": query_key, "webenv": webenv}
+        return self.read("esummary", params)
+
+    def efetch(self, accession_list, handle, db="nucleotide", rettype="gb",
+               retmode="text"):
+        """Retrieve records from NCBI and write them to a file handle.
+
+        The response is copied to the handle as it is received. If the
+        request is retried, anything written by the failed attempt
+        is discarded first.
+
+        :param accession_list: List of NCBI accessions.
+        :type accession_list: list
+        :param handle:
+            Seekable file handle opened in text mode, to which records
+            are written.
+        :type handle: file
+        :param db: Name of the database to get records from.
+        :type db: str
+        :param rettype: Type of record to retrieve (e.g. 'gb').
+        :type rettype: str
+        :param retmode: Format of data to retrieve (e.g. 'text').
+        :type retmode: str
+        """
+        params = {"db": db, "id": ",".join(accession_list),
+                  "rettype": rettype, "retmode": retmode}
+        start = handle.tell()
+        def request():
+            handle.seek(start)
+            handle.truncate()
+            with self.open("efetch", params) as response:
+                text = io.TextIOWrapper(response, encoding="utf-8")
+                for line in text:
+                    handle.write(line)
+        self.retry(request)
+        handle.seek(start)
+
+
+def create_entrez_client(ncbi_cred_dict, **kwargs):
+    """Create an EntrezClient from a dictionary of NCBI credentials.
+
+    :param ncbi_cred_dict: Dictionary of NCBI credentials from get_ncbi_creds().
+    :type ncbi_cred_dict: dict
+    :param kwargs: Keyword arguments passed to EntrezClient.
+    :returns: A client for the NCBI E-utilities.
+    :rtype: EntrezClient
+    """
+    return EntrezClient(tool=ncbi_cred_dict.get("ncbi_tool"),
+                        email=ncbi_cred_dict.get("ncbi_email"),
+                        api_key=ncbi_cred_dict.get("ncbi_api_key"),
+                        **kwargs)
+
+
+def search_batches(client, accession_list, batch_size=200, db="nucleotide"):
+    """Search for and summarize batches of accessions.
+
+    :param client: Client for the NCBI E-utilities.
+    :type client: EntrezClient
+    :param accession_list: List of NCBI accessions.
+    :type accession_list: list
+    :param batch_size: Number of accessions searched in each request.
+    :type batch_size: int
+    :param db: Name of the database to search.
+    :type db: str
+    :returns:
+        Dictionary for each batch
+        WHERE
+        "start" (int) is the index of the first accession in the batch.
+        "stop" (int) is the index after the last accession in the batch.
+        "search" (dict) is the result from esearch(), or None if the
+        batch could not be searched.
+        "summaries" (list) is the result from esummary().
+        "error" (Exception) is the error that stopped the batch, or None.
+    :rtype: generator
+    """
+    batch_indices = basic.create_indices(accession_list, batch_size)
+    for start, stop in batch_indices:
+        batch = {"start": start, "stop": stop, "search": None,
+                 "summaries": [], "error": None}
+        term = " | ".join([accession + "[ACCN]"
+                           for accession in accession_list[start:stop]])
+        try:
+            batch["search"] = client.esearch(db=db, term=term, usehistory="y")
+            if int(batch["search"]["Count"]) > 0:
+                batch["summaries"] = client.esummary(
+                                        db=db,
+                                        query_key=batch["search"]["QueryKey"],
+                                        webenv=batch["search"]["WebEnv"])
+        except Exception as err:
+            batch["error"] = err
+        yield batch
+
+
+def prefetch(iterable, size=1):
+    """Iterate over an iterable in a background thread.
+
+    Up to size items are retrieved ahead of the item being processed,
+    so that slow retrieval of the next item overlaps with the processing
+    of the current item.
+
+    :param iterable: Iterable to be iterated over.
+    :type iterable: iterable
+    :param size: Number of items retrieved ahead.
+    :type size: int
+    :returns: The items of the iterable, in order.
+    :rtype: generator
+    """
+    item_queue = queue.Queue(maxsize=max(1, size))
+    stop = threading.Event()
+    end = object()
+
+    def produce():
+        try:
+            for item in iterable:
+                if stop.is_set():
+                    return
+                item_queue.put((True, item))
+            item_queue.put((True, end))
+        except Exception as err:
+            item_queue.put((False, err))
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            success, item = item_queue.get()
+            if not success:
+                raise item
+            if item is end:
+                break
+            yield item
+    finally:
+        # Let the thread finish if the items are not all consumed.
+        stop.set()
+        while thread.is_alive():
+            try:
+                item_queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+
+def split_genbank_records(handle):
+    """Split GenBank-formatted text into the text of each record.
+
+    :param handle: File handle of GenBank-formatted text.
+    :type handle: file
+    :returns: Text of each record, including the final '//' line.
+    :rtype: generator
+    """
+    lines = []
+    for line in handle:
+        if len(lines) == 0 and line.strip() == "":
+            continue
+        lines.append(line)
+        if line.rstrip() == "//":
+            yield "".join(lines)
+            lines = []
+    if len(lines) > 0 and "".join(lines).strip() != "":
+        yield "".join(lines)
+
+
+def parse_locus(record_text):
+    """Parse the name and date from the LOCUS line of a GenBank record.
+
+    :param record_text: Text of a GenBank-formatted record.
+    :type record_text: str
+    :returns:
+        tuple (name, date)
+        WHERE
+        name (str) is the name of the record.
+        date (str) is the date of the record (e.g. '02-JAN-2020').
+    :rtype: tuple
+    """
+    line = record_text.lstrip().split("\n", 1)[0]
+    fields = line.split()
+    if len(fields) < 3 or fields[0] != "LOCUS":
+        raise ValueError("Record does not begin with a LOCUS line.")
+    return (fields[1], fields[-1])
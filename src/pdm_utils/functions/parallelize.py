@@ -7,15 +7,19 @@ import multiprocessing as mp
 
 from pdm_utils.functions.basic import show_progress
 
+# Number of chunks that may be queued or in progress for each worker.
+CHUNKS_PER_PROCESSOR = 2
 
-def parallelize(inputs, num_processors, task):
+
+def parallelize(inputs, num_processors, task, chunk_size=1):
     """
     Parallelizes some task on an input list across the specified number
     of processors
     :param inputs: list of inputs
     :param num_processors: number of processor cores to use
     :param task: name of the function to run
-    :return: results
+    :param chunk_size: number of inputs sent to a worker at a time
+    :return: results (only those that are lists)
     """
     results = []
 
@@ -25,14 +29,15 @@ def parallelize(inputs, num_processors, task):
 
     num_processors = count_processors(inputs, num_processors)
 
-    tasks = []
-    for item in inputs:
-        if not isinstance(item, tuple):
-            item = (item,)
-        tasks.append((task, item))
+    # Remove non-list results (e.g. progress results)
+    with Executor(num_processors) as executor:
+        for result in executor.imap(task, inputs, chunk_size=chunk_size,
+                                    total=len(inputs)):
+            if isinstance(result, list):
+                results.append(result)
 
-    # Start working on the jobs
-    results = start_processes(tasks, num_processors)
+    # Leave the progress bar line
+    print("\n")
 
     return results
 
@@ -56,9 +61,21 @@ def count_processors(inputs, num_processors):
 
 
 def worker(input_queue, output_queue):
-    for func, args in iter(input_queue.get, 'STOP'):
-        result = func(*args)
-        output_queue.put(result)
+    """
+    Runs chunks of tasks from the input queue until a 'STOP' signal
+    is received, and puts the results of each chunk in the output queue.
+    If a task raises an exception, the exception is returned instead.
+    :param input_queue: queue of lists of (function, arguments) tuples
+    :param output_queue: queue of (success, results) tuples
+    :return:
+    """
+    for chunk in iter(input_queue.get, 'STOP'):
+        try:
+            results = [func(*args) for func, args in chunk]
+        except Exception as err:
+            output_queue.put((False, err))
+        else:
+            output_queue.put((True, results))
     return
 
 
@@ -67,50 +84,157 @@ def start_processes(inputs, num_processors):
     Creates input and output queues, and runs the jobs
     :param inputs: jobs to run
     :param num_processors: optimized number of processors
-    :return: results
+    :return: results (only those that are lists)
     """
-    # Make sure new processes are forked, not spawned
-    mp.set_start_method("fork")
-
-    job_queue = mp.Queue()
-    done_queue = mp.Queue()
-
-    # Counter so we know how many tasks we have in all (input + show_progress tasks)
-    task_count = 0
-
-    # Put inputs into job queue
-    for i in range(len(inputs)):
-        task_count += 1
-        if i % 10 == 0:
-            job_queue.put((show_progress, (i, len(inputs))))
-            task_count += 1
-        job_queue.put(inputs[i])
-    task_count += 1
-    job_queue.put((show_progress, (len(inputs), len(inputs))))
-
-    # Put a bunch of 'STOP' signals at the end of the queue
-    for i in range(num_processors):
-        job_queue.put('STOP')
-
-    # Start up workers
-    worker_pool = []
-    for i in range(num_processors):
-        worker_n = mp.Process(target=worker, args=(job_queue, done_queue))
-        worker_n.start()
-        worker_pool.append(worker_n)
-
-    # Grab results from done queue
     results = []
 
     # Remove non-list results (e.g. progress results)
-    for i in range(task_count):
-        result = done_queue.get()
-        if isinstance(result, list):
-            results.append(result)
-
-    [worker_n.join() for worker_n in worker_pool]
+    with Executor(num_processors) as executor:
+        for result in executor.run_tasks(inputs, total=len(inputs)):
+            if isinstance(result, list):
+                results.append(result)
 
     # Leave the progress bar line
     print("\n")
 
     return results
+
+
+class Executor:
+    """
+    Pool of worker processes that can be reused for any number of tasks.
+
+    Tasks are sent to the workers in chunks. The number of chunks that
+    are queued or in progress is bounded, so new chunks are only
+    submitted as results are consumed.
+
+    Workers are forked, and they are stopped when the executor is
+    closed or when it is used as a context manager and the context exits.
+    """
+
+    def __init__(self, num_processors, chunks_per_processor=CHUNKS_PER_PROCESSOR):
+        """
+        :param num_processors: number of worker processes to start
+        :param chunks_per_processor:
+            number of chunks that may be queued or in progress for each
+            worker before results must be consumed
+        """
+        # Use a fork context rather than setting the global start
+        # method, which can only be set once per program.
+        context = mp.get_context("fork")
+        self.num_processors = num_processors
+        self.max_pending = max(1, num_processors * chunks_per_processor)
+        self.pending = 0
+        self.job_queue = context.Queue(self.max_pending)
+        self.done_queue = context.Queue(self.max_pending)
+        self.worker_pool = []
+        for _ in range(num_processors):
+            worker_n = context.Process(target=worker,
+                                       args=(self.job_queue, self.done_queue))
+            worker_n.daemon = True
+            worker_n.start()
+            self.worker_pool.append(worker_n)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
+
+    def imap(self, task, inputs, chunk_size=1, total=None, progress=True):
+        """
+        Runs a task on each input, yielding results as they finish.
+        Results are not necessarily yielded in the order of the inputs.
+        :param task: function to run
+        :param inputs: iterable of inputs; tuples are unpacked as arguments
+        :param chunk_size: number of inputs sent to a worker at a time
+        :param total: number of inputs, used to report progress
+        :param progress: indicates whether progress should be reported
+        :return: generator of results
+        """
+        tasks = ((task, item if isinstance(item, tuple) else (item,))
+                 for item in inputs)
+        return self.run_tasks(tasks, chunk_size=chunk_size, total=total,
+                              progress=progress)
+
+    def map(self, task, inputs, chunk_size=1, progress=True):
+        """
+        Runs a task on each input, and returns the results once all
+        inputs are processed.
+        :param task: function to run
+        :param inputs: list of inputs; tuples are unpacked as arguments
+        :param chunk_size: number of inputs sent to a worker at a time
+        :param progress: indicates whether progress should be reported
+        :return: results
+        """
+        return list(self.imap(task, inputs, chunk_size=chunk_size,
+                              total=len(inputs), progress=progress))
+
+    def run_tasks(self, tasks, chunk_size=1, total=None, progress=True):
+        """
+        Runs (function, arguments) tasks, yielding results as they finish.
+        :param tasks: iterable of (function, arguments) tuples
+        :param chunk_size: number of tasks sent to a worker at a time
+        :param total: number of tasks, used to report progress
+        :param progress: indicates whether progress should be reported
+        :return: generator of results
+        """
+        tasks = iter(tasks)
+        done = 0
+        exhausted = False
+        if progress and total:
+            show_progress(done, total)
+
+        while True:
+            # Keep the workers busy without queueing every task at once.
+            while not exhausted and self.pending < self.max_pending:
+                chunk = []
+                for func_args in tasks:
+                    chunk.append(func_args)
+                    if len(chunk) == chunk_size:
+                        break
+                if len(chunk) < chunk_size:
+                    exhausted = True
+                if len(chunk) > 0:
+                    self.job_queue.put(chunk)
+                    self.pending += 1
+
+            if self.pending == 0:
+                break
+
+            success, results = self.done_queue.get()
+            self.pending -= 1
+            if not success:
+                self.terminate()
+                raise results
+
+            done += len(results)
+            if progress and total:
+                show_progress(min(done, total), total)
+            for result in results:
+                yield result
+
+    def close(self):
+        """Stops the workers once they finish all submitted tasks."""
+        # Discard the results of tasks that were submitted but not
+        # consumed, so that the workers are not blocked on a full queue.
+        while self.pending > 0:
+            self.done_queue.get()
+            self.pending -= 1
+        for _ in self.worker_pool:
+            self.job_queue.put('STOP')
+        for worker_n in self.worker_pool:
+            worker_n.join()
+        self.worker_pool = []
+
+    def terminate(self):
+        """Stops the workers immediately."""
+        for worker_n in self.worker_pool:
+            worker_n.terminate()
+        for worker_n in self.worker_pool:
+            worker_n.join()
+        self.worker_pool = []
+        self.pending = 0
@@ -1,12 +1,23 @@
 """Functions to interact with PhagesDB"""
 
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
 import json
+import os
 import pathlib
+import threading
+import time
+import urllib.error
 import urllib.request
 
 from pdm_utils.classes import genome
 from pdm_utils.constants import constants
 
+# Maximum number of concurrent requests to PhagesDB.
+DEFAULT_WORKERS = 8
+# Seconds to wait for a response from PhagesDB.
+TIMEOUT = 60
+
 def parse_phage_name(data_dict):
     """Retrieve Phage Name from PhagesDB.
 
@@ -120,30 +131,203 @@ def parse_fasta_filename(data_dict):
     return fastafile_url
 
 
-def retrieve_url_data(url):
+class ResponseCache:
+    """Cache of responses retrieved from PhagesDB.
+
+    Responses are kept in memory for the lifetime of the cache, and on
+    disk if a cache directory is provided, so that they can be reused by
+    later runs. A response cached on disk is reused without contacting
+    PhagesDB until it is older than the time-to-live. After that, it is
+    revalidated with a conditional request using its ETag or Last-Modified
+    date, and it is only downloaded again if it has changed. In offline
+    mode, responses cached on disk are always reused and PhagesDB is
+    never contacted.
+    """
+
+    def __init__(self, cache_dir=None, ttl=0, offline=False):
+        """
+        :param cache_dir: Directory in which responses are stored.
+        :type cache_dir: Path
+        :param ttl:
+            Seconds that a response cached on disk is reused without
+            being revalidated.
+        :type ttl: int
+        :param offline: Indicates whether only cached responses are used.
+        :type offline: bool
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.offline = offline
+        self.memory = {}
+        self.lock = threading.Lock()
+        if cache_dir is not None:
+            self.cache_dir = pathlib.Path(cache_dir)
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def get_paths(self, url):
+        """Get the paths of the data and metadata files of a cached URL."""
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return (pathlib.Path(self.cache_dir, key + ".data"),
+                pathlib.Path(self.cache_dir, key + ".json"))
+
+    def load(self, url):
+        """Load a response cached on disk.
+
+        :param url: URL of the response.
+        :type url: str
+        :returns:
+            tuple (data, metadata), which are None if the URL is not cached.
+        :rtype: tuple
+        """
+        data = None
+        metadata = None
+        if self.cache_dir is not None:
+            data_path, meta_path = self.get_paths(url)
+            try:
+                with meta_path.open("r") as fh:
+                    metadata = json.load(fh)
+                data = data_path.read_bytes()
+            except (OSError, ValueError):
+                data = None
+                metadata = None
+        return (data, metadata)
+
+    def save(self, url, data, headers):
+        """Cache a response.
+
+        :param url: URL of the response.
+        :type url: str
+        :param data: Data retrieved from the URL.
+        :type data: bytes
+        :param headers: Headers of the response.
+        :type headers: Message or dict
+        """
+        with self.lock:
+            self.memory[url] = data
+        if self.cache_dir is not None:
+            metadata = {"url": url,
+                        "etag": headers.get("ETag"),
+                        "last_modified": headers.get("Last-Modified"),
+                        "time": time.time()}
+            data_path, meta_path = self.get_paths(url)
+            # Write to temporary files first, so that an interrupted
+            # write does not leave a partial response in the cache.
+            suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+            for path, content in [(data_path, data),
+                                  (meta_path,
+                                   json.dumps(metadata).encode("utf-8"))]:
+                tmp_path = path.with_name(path.name + suffix)
+                tmp_path.write_bytes(content)
+                os.replace(tmp_path, path)
+
+    def fetch(self, url):
+        """Retrieve data from a URL, using the cached response if it is
+        still valid.
+
+        :param url: URL for data to be retrieved.
+        :type url: str
+        :returns: Data from the URL.
+        :rtype: bytes
+        """
+        with self.lock:
+            data = self.memory.get(url)
+        if data is not None:
+            return data
+
+        data, metadata = self.load(url)
+        if data is not None:
+            if self.offline or time.time() - metadata["time"] < self.ttl:
+                with self.lock:
+                    self.memory[url] = data
+                return data
+        elif self.offline:
+            raise urllib.error.URLError(f"{url} is not cached.")
+
+        request = urllib.request.Request(url)
+        if metadata is not None:
+            if metadata["etag"] is not None:
+                request.add_header("If-None-Match", metadata["etag"])
+            if metadata["last_modified"] is not None:
+                request.add_header("If-Modified-Since",
+                                   metadata["last_modified"])
+        try:
+            with urllib.request.urlopen(request, timeout=TIMEOUT) as response:
+                new_data = response.read()
+                headers = response.headers
+        except urllib.error.HTTPError as err:
+            if err.code == 304 and data is not None:
+                # Not modified, so the cached response is valid again.
+                headers = {"ETag": err.headers.get("ETag",
+                                                   metadata["etag"]),
+                           "Last-Modified": err.headers.get(
+                                   "Last-Modified", metadata["last_modified"])}
+                self.save(url, data, headers)
+                return data
+            raise
+        self.save(url, new_data, headers)
+        return new_data
+
+
+def fetch_url(url, cache=None):
+    """Retrieve data from a URL, optionally through a cache.
+
+    :param url: URL for data to be retrieved.
+    :type url: str
+    :param cache: Cache of responses retrieved from PhagesDB.
+    :type cache: ResponseCache
+    :returns: Data from the URL.
+    :rtype: bytes
+    """
+    if cache is not None:
+        return cache.fetch(url)
+    request = urllib.request.Request(url)
+    with urllib.request.urlopen(request, timeout=TIMEOUT) as response:
+        data = response.read()
+    return data
+
+
+def retrieve_url_data(url, cache=None):
     """Retrieve fasta file from PhagesDB.
 
     :param url: URL for data to be retrieved.
     :type url: str
+    :param cache: Cache of responses retrieved from PhagesDB.
+    :type cache: ResponseCache
     :returns: Data from the URL.
     :rtype: str
     """
     try:
-        # gcontext = ssl.SSLContext(ssl.PROTOCOL_TLSv1) ==> required for
-        # urllib2.URLError: <urlopen error [SSL: CERTIFICATE_VERIFY_FAILED]
-        # certificate verify failed (_ssl.c:590)> ==> creating new TLS
-        # context tells urllib2 to ignore certificate chain
-        # NOTE this is BAD SECURITY, prone to man-in-the-middle attacks
-        request = urllib.request.Request(url)
-        with urllib.request.urlopen(request) as response:
-            data = response.read()
-            data = data.decode("utf-8")
+        data = fetch_url(url, cache=cache)
+        data = data.decode("utf-8")
     except:
         print(f"Unable to retrieve data from {url}")
         data = ""
     return data
 
 
+def retrieve_urls(urls, workers=DEFAULT_WORKERS, cache=None):
+    """Retrieve data from several URLs concurrently.
+
+    :param urls: URLs for data to be retrieved.
+    :type urls: list
+    :param workers: Maximum number of concurrent requests.
+    :type workers: int
+    :param cache: Cache of responses retrieved from PhagesDB.
+    :type cache: ResponseCache
+    :returns:
+        Dictionary of data from each URL, which is an empty string
+        if the data could not be retrieved.
+    :rtype: dict
+    """
+    urls = list(dict.fromkeys(urls))
+    if len(urls) == 0:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        data_list = executor.map(
+                        lambda url: retrieve_url_data(url, cache=cache), urls)
+        return dict(zip(urls, data_list))
+
+
 def parse_fasta_data(fasta_data):
     """Parses data returned from a fasta-formatted file.
 
@@ -173,7 +357,7 @@ def parse_fasta_data(fasta_data):
     return (header, sequence)
 
 
-def parse_genome_data(data_dict, gnm_type="", seq=False):
+def parse_genome_data(data_dict, gnm_type="", seq=False, cache=None):
     """Parses a dictionary of PhagesDB genome data into a pdm_utils Genome object.
 
     :param data_dict: Dictionary of data retrieved from PhagesDB.
@@ -182,6 +366,8 @@ def parse_genome_data(data_dict, gnm_type="", seq=False):
     :type gnm_type: str
     :param seq: Indicates whether the genome sequence should be retrieved.
     :type seq: bool
+    :param cache: Cache of responses retrieved from PhagesDB.
+    :type cache: ResponseCache
     :returns: A pdm_utils Genome object with the parsed data.
     :rtype: Genome
     """
@@ -217,7 +403,7 @@ def parse_genome_data(data_dict, gnm_type="", seq=False):
     # Fasta file record
     # if fastafile_url != "":
     if (fastafile_url != "" and seq == True):
-        fasta_file = retrieve_url_data(fastafile_url)
+        fasta_file = retrieve_url_data(fastafile_url, cache=cache)
 
         # TODO unit test - not sure how to test this, since this function
         # retrieves and parses files from PhagesDB.
@@ -231,18 +417,18 @@ def parse_genome_data(data_dict, gnm_type="", seq=False):
     gnm.misc = data_dict
     return gnm
 
-def retrieve_genome_data(phage_url):
+def retrieve_genome_data(phage_url, cache=None):
     """Retrieve all data from PhagesDB for a specific phage.
 
     :param phage_url: URL for data pertaining to a specific phage.
     :type phage_url: str
+    :param cache: Cache of responses retrieved from PhagesDB.
+    :type cache: ResponseCache
     :returns: Dictionary of data parsed from the URL.
     :rtype: dict
     """
     try:
-        data_json = urllib.request.urlopen(phage_url)
-        data_dict = json.loads(data_json.read())
-        # TODO should data_dict.close() be called after retrieving data?
+        data_dict = json.loads(fetch_url(phage_url, cache=cache))
     except:
         data_dict = {}
     return data_dict
@@ -260,7 +446,7 @@ def construct_phage_url(phage_name):
     return phage_url
 
 
-def get_genome(phage_id, gnm_type="", seq=False):
+def get_genome(phage_id, gnm_type="", seq=False, cache=None):
     """Get genome data from PhagesDB.
 
     :param phage_id: The name of the phage to be retrieved from PhagesDB.
@@ -269,37 +455,104 @@ def get_genome(phage_id, gnm_type="", seq=False):
     :type gnm_type: str
     :param seq: Indicates whether the genome sequence should be retrieved.
     :type seq: bool
+    :param cache: Cache of responses retrieved from PhagesDB.
+    :type cache: ResponseCache
     :returns:
         A pdm_utils Genome object with the parsed data.
         If not genome is retrieved, None is returned.
     :rtype: Genome
     """
     phage_url = construct_phage_url(phage_id)
-    data_dict = retrieve_genome_data(phage_url)
+    data_dict = retrieve_genome_data(phage_url, cache=cache)
     if len(data_dict.keys()) != 0:
-        gnm = parse_genome_data(data_dict, gnm_type=gnm_type, seq=seq)
+        gnm = parse_genome_data(data_dict, gnm_type=gnm_type, seq=seq,
+                                cache=cache)
     else:
         gnm = None
     return gnm
 
 
+def get_genomes(phage_ids, gnm_type="", seq=False, workers=DEFAULT_WORKERS,
+                cache=None):
+    """Get genome data from PhagesDB for several phages concurrently.
+
+    :param phage_ids: The names of the phages to be retrieved from PhagesDB.
+    :type phage_ids: list
+    :param gnm_type: same as for get_genome().
+    :param seq: same as for get_genome().
+    :param workers: Maximum number of concurrent requests.
+    :type workers: int
+    :param cache: same as for get_genome().
+    :returns:
+        Dictionary of pdm_utils Genome objects.
+        Key = PhageID.
+        Value = Genome object, or None if no genome is retrieved.
+    :rtype: dict
+    """
+    # Responses are retrieved concurrently, and then parsed in order.
+    if cache is None:
+        cache = ResponseCache()
+    phage_urls = {phage_id: construct_phage_url(phage_id)
+                  for phage_id in phage_ids}
+    url_data = retrieve_urls(phage_urls.values(), workers=workers,
+                             cache=cache)
+
+    data_dicts = {}
+    for phage_id, phage_url in phage_urls.items():
+        try:
+            data_dicts[phage_id] = json.loads(url_data[phage_url])
+        except ValueError:
+            data_dicts[phage_id] = {}
+    if seq:
+        prefetch_fasta_files(data_dicts.values(), workers=workers,
+                             cache=cache)
+
+    genome_dict = {}
+    for phage_id, data_dict in data_dicts.items():
+        if len(data_dict.keys()) != 0:
+            genome_dict[phage_id] = parse_genome_data(
+                                        data_dict, gnm_type=gnm_type,
+                                        seq=seq, cache=cache)
+        else:
+            genome_dict[phage_id] = None
+    return genome_dict
+
+
+def prefetch_fasta_files(data_dicts, workers=DEFAULT_WORKERS, cache=None):
+    """Retrieve the fasta files of several phages concurrently into a cache.
+
+    :param data_dicts: Dictionaries of data retrieved from PhagesDB.
+    :type data_dicts: list
+    :param workers: Maximum number of concurrent requests.
+    :type workers: int
+    :param cache: Cache of responses retrieved from PhagesDB.
+    :type cache: ResponseCache
+    """
+    urls = []
+    for data_dict in data_dicts:
+        fastafile_url = parse_fasta_filename(data_dict)
+        if fastafile_url:
+            urls.append(fastafile_url)
+    retrieve_urls(urls, workers=workers, cache=cache)
+
+
 # TODO unittest.
-def get_phagesdb_data(url):
+def get_phagesdb_data(url, cache=None):
     """Retrieve all sequenced genome data from PhagesDB.
 
     :param url: URL to connect to PhagesDB API.
     :type url: str
+    :param cache: Cache of responses retrieved from PhagesDB.
+    :type cache: ResponseCache
     :returns:
         List of dictionaries, where each dictionary contains
         data for each phage. If a problem is encountered during retrieval,
         an empty list is returned.
     :rtype: list
     """
-    data_json = urllib.request.urlopen(url)
     # Response is a bytes object that json.loads can't read without first
     # being decoded to a UTF-8 string.
-    data_dict = json.loads(data_json.read().decode("utf-8"))
-    data_json.close()
+    data_dict = json.loads(fetch_url(url, cache=cache).decode("utf-8"))
 
     # Returned dict:
     # Keys:
@@ -315,7 +568,8 @@ def get_phagesdb_data(url):
 
 
 # TODO unittest.
-def parse_genomes_dict(data_dict, gnm_type="", seq=False):
+def parse_genomes_dict(data_dict, gnm_type="", seq=False,
+                       workers=DEFAULT_WORKERS, cache=None):
     """Returns a dictionary of pdm_utils Genome objects
 
     :param data_dict:
@@ -327,47 +581,60 @@ def parse_genomes_dict(data_dict, gnm_type="", seq=False):
     :type gnm_type: str
     :param seq: Indicates whether the genome sequence should be retrieved.
     :type seq: bool
+    :param workers: Maximum number of concurrent requests.
+    :type workers: int
+    :param cache: Cache of responses retrieved from PhagesDB.
+    :type cache: ResponseCache
     :returns:
         Dictionary of pdm_utils Genome object.
         Key = PhageID.
         Value = Genome object.
     :rtype: dict
     """
+    if seq:
+        if cache is None:
+            cache = ResponseCache()
+        prefetch_fasta_files(data_dict.values(), workers=workers, cache=cache)
+
     genome_dict = {}
     for key in data_dict.keys():
-        gnm = parse_genome_data(data_dict[key], gnm_type=gnm_type, seq=seq)
+        gnm = parse_genome_data(data_dict[key], gnm_type=gnm_type, seq=seq,
+                                cache=cache)
         genome_dict[gnm.id] = gnm
     return genome_dict
 
 
 
 
-def retrieve_data_list(url):
+def retrieve_data_list(url, cache=None):
     """Retrieve list of data from PhagesDB.
 
     :param url: A URL from which to retrieve data.
     :type url: str
+    :param cache: Cache of responses retrieved from PhagesDB.
+    :type cache: ResponseCache
     :returns: A list of data retrieved from the URL.
     :rtype: list
     """
     try:
-        data_json = urllib.request.urlopen(url)
-        data_list = json.loads(data_json.read())
+        data_list = json.loads(fetch_url(url, cache=cache))
     except:
         data_list = []
     return data_list
 
 
-def create_host_genus_set(url=constants.API_HOST_GENERA):
+def create_host_genus_set(url=constants.API_HOST_GENERA, cache=None):
     """Create a set of host genera currently in PhagesDB.
 
     :param url: A URL from which to retrieve host genus data.
     :type url: str
+    :param cache: Cache of responses retrieved from PhagesDB.
+    :type cache: ResponseCache
     :returns: All unique host genera listed on PhagesDB.
     :rtype: set
     """
     try:
-        output = retrieve_data_list(url)
+        output = retrieve_data_list(url, cache=cache)
     except:
         output = []
     host_genera_set = set()
@@ -379,11 +646,13 @@ def create_host_genus_set(url=constants.API_HOST_GENERA):
     return host_genera_set
 
 
-def create_cluster_subcluster_sets(url=constants.API_CLUSTERS):
+def create_cluster_subcluster_sets(url=constants.API_CLUSTERS, cache=None):
     """Create sets of clusters and subclusters currently in PhagesDB.
 
     :param url: A URL from which to retrieve cluster and subcluster data.
     :type url: str
+    :param cache: Cache of responses retrieved from PhagesDB.
+    :type cache: ResponseCache
     :returns:
         tuple (cluster_set, subcluster_set)
         WHERE
@@ -392,7 +661,7 @@ def create_cluster_subcluster_sets(url=constants.API_CLUSTERS):
     :rtype: tuple
     """
     try:
-        output = retrieve_data_list(url)
+        output = retrieve_data_list(url, cache=cache)
     except:
         output = []
     cluster_set = set()
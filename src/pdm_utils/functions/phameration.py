@@ -3,12 +3,24 @@
 import shlex
 from subprocess import Popen, PIPE
 import csv
+import json
 import random
 import colorsys
+import shutil
+from pathlib import Path
 
 from pdm_utils.constants.constants import BLASTCLUST_PATH
+from pdm_utils.functions import basic
 from pdm_utils.functions import mysqldb
 
+# Names of the MMseqs2 databases that are kept between incremental runs.
+UPDATE_DBS = ("sequenceDB", "clusterDB")
+UPDATE_PARAMS_FILE = "params.json"
+# MMseqs2 parameters that change the clusters. Other parameters (e.g.
+# --threads and -v) are not saved, so that they can differ between runs.
+CLUSTER_PARAMS = ("--min-seq-id", "-c", "--cov-mode", "--cluster-mode",
+                  "--alignment-mode", "--cluster-steps", "--max-seqs")
+
 def get_program_params(program, args):
     program_params = dict()
 
@@ -174,6 +186,37 @@ def map_translations_to_geneids(engine):
     return ts_to_gs
 
 
+def map_hashes_to_geneids(trans_groups):
+    """
+    Constructs a dictionary mapping the hash of each unique translation to
+    its group of geneids. Unlike GeneIDs, translation hashes do not change
+    between phameration runs, so they are used as the sequence identifiers
+    for incremental phameration.
+    :param trans_groups: dictionary mapping translations to their
+    associated GeneIDs
+    :return: hs_to_gs
+    """
+    hs_to_gs = dict()
+    for translation in trans_groups.keys():
+        hs_to_gs[basic.get_seq_hash(translation)] = trans_groups[translation]
+    return hs_to_gs
+
+
+def write_hashed_fasta(trans_groups, wd):
+    """
+    Writes the translations in `trans_groups` to a fasta file in `wd`,
+    using the hash of each translation as its identifier.
+    :param trans_groups: dictionary mapping translations to their
+    associated GeneIDs
+    :param wd: the temporary working directory for phameration
+    :return:
+    """
+    print("Begin writing hashed translations to fasta...")
+    with open(f"{wd}/input.fasta", "w") as fasta:
+        for translation in trans_groups.keys():
+            fasta.write(f">{basic.get_seq_hash(translation)}\n{translation}\n")
+
+
 def write_fasta(trans_groups, wd):
     """
     Writes the translations in `trans_dict` to a fasta_file in `wd`.
@@ -248,6 +291,120 @@ def mmseqsdb_command(wd):
     return command
 
 
+def get_cluster_params(params):
+    """
+    Selects the MMseqs2 parameters that change the clusters, which need
+    to match between incremental phameration runs.
+    :param params: dictionary of MMseqs2 parameters
+    :return: dictionary of MMseqs2 parameters in CLUSTER_PARAMS
+    """
+    return {key: value for key, value in params.items()
+            if key in CLUSTER_PARAMS}
+
+
+def check_update_dir(update_dir, params):
+    """
+    Checks whether MMseqs2 databases from a previous phameration run are
+    present in `update_dir`, and were built with the same parameters
+    (only those in CLUSTER_PARAMS are compared), so that they can be updated instead of clustering from scratch.
+    :param update_dir: the directory in which databases are kept between runs
+    :param params: dictionary of MMseqs2 parameters
+    :return: whether the previous databases can be updated
+    """
+    update_dir = Path(update_dir)
+    params_file = update_dir.joinpath(UPDATE_PARAMS_FILE)
+    for db in UPDATE_DBS:
+        if not update_dir.joinpath(f"{db}.dbtype").exists():
+            print(f"No previous {db} found in '{update_dir}'...")
+            return False
+
+    if not params_file.exists():
+        print(f"No previous parameters found in '{update_dir}'...")
+        return False
+
+    with params_file.open("r") as fh:
+        old_params = json.load(fh)
+
+    # Parameters are compared after a round trip through JSON, since
+    # this converts them in the same way as the stored parameters.
+    if old_params != json.loads(json.dumps(get_cluster_params(params))):
+        print("Parameters differ from the previous phameration run...")
+        return False
+
+    return True
+
+
+def update_clusterdb(params, wd, update_dir):
+    """
+    Builds an MMseqs2 database from input.fasta, then updates the
+    clusters from the previous run with new and changed translations.
+    Translations that are no longer present are removed from the clusters.
+    :param params: dictionary of MMseqs2 parameters
+    :param wd: the temporary working directory for phameration
+    :param update_dir: the directory in which databases are kept between runs
+    :return:
+    """
+    command = f"mmseqs createdb {wd}/input.fasta {wd}/inputDB"
+
+    print("Build MMseqs2 protein database for mmseqs clusterupdate...")
+    with Popen(args=shlex.split(command), stdout=PIPE) as process:
+        print(process.stdout.read().decode("utf-8") + "\n\n")
+
+    command = mmseqs_clusterupdate_command(params, wd, update_dir)
+
+    print("Begin updating clusters with mmseqs...")
+    with Popen(args=shlex.split(command), stdout=PIPE, stderr=PIPE) as process:
+        print(process.stdout.read().decode("utf-8") + "\n\n")
+        print(process.stderr.read().decode("utf-8") + "\n\n")
+
+    print("Finish updating clusters with mmseqs...")
+
+
+def mmseqs_clusterupdate_command(parameters, wd, update_dir):
+    """
+    Builds MMseqs2 cluster update command (base command + user args).
+    The updated databases are written to `wd` using the same names as
+    mmseqs cluster, so they can be parsed in the same way.
+    :param parameters: dictionary of MMseqs2 parameters
+    :param wd: the temporary working directory for phameration
+    :param update_dir: the directory in which databases are kept between runs
+    :return: command
+    """
+    command = f"mmseqs clusterupdate {update_dir}/sequenceDB " \
+              f"{wd}/inputDB {update_dir}/clusterDB {wd}/sequenceDB " \
+              f"{wd}/clusterDB {wd}/tmp"
+
+    for parameter in parameters.keys():
+        command += f" {parameter} {parameters[parameter]}"
+
+    return command
+
+
+def save_update_dbs(wd, update_dir, params):
+    """
+    Replaces the MMseqs2 databases in `update_dir` with those from the
+    current phameration run, along with the parameters used to build them
+    that change the clusters.
+    :param wd: the temporary working directory for phameration
+    :param update_dir: the directory in which databases are kept between runs
+    :param params: dictionary of MMseqs2 parameters
+    :return:
+    """
+    wd = Path(wd)
+    update_dir = Path(update_dir)
+    update_dir.mkdir(parents=True, exist_ok=True)
+
+    print(f"Save MMseqs2 databases to '{update_dir}'...")
+    for db in UPDATE_DBS:
+        for old_file in update_dir.glob(f"{db}*"):
+            old_file.unlink()
+        for new_file in wd.glob(f"{db}*"):
+            shutil.copy(str(new_file), str(update_dir.joinpath(new_file.name)))
+
+    with update_dir.joinpath(UPDATE_PARAMS_FILE).open("w") as fh:
+        json.dump(get_cluster_params(params), fh)
+
+
 def phamerate(params, program, wd):
     """
     Phamerates unique translations using specified program
@@ -332,70 +489,55 @@ def parse_output(program, wd):
 def parse_mmseqs(wd):
     """
     Parses MMseqs2 clustering output by running:
-    - mmseqs createseqfiledb sequenceDB clusterDB clusterSeqs
-    - mmseqs result2flat sequenceDB sequenceDB clusterSeqs output.txt
-    and then parsing output.txt
+    - mmseqs createtsv sequenceDB sequenceDB clusterDB clusterDB.tsv
+    and then streaming the representative-member pairs in clusterDB.tsv
     :param wd: the temporary working directory for phameration
     :return: parsed_phams (dictionary)
     """
-    filename = f"{wd}/output.txt"
+    filename = f"{wd}/clusterDB.tsv"
 
     print("Convert MMseqs2 output into parseable format...")
 
-    command = f"mmseqs createseqfiledb {wd}/sequenceDB {wd}/clusterDB " \
-              f"{wd}/clusterSeqs"
+    command = f"mmseqs createtsv {wd}/sequenceDB {wd}/sequenceDB " \
+              f"{wd}/clusterDB {filename}"
 
     with Popen(args=shlex.split(command), stdout=PIPE) as process:
         print(process.stdout.read().decode("utf-8") + "\n\n")
 
-    command = f"mmseqs result2flat {wd}/sequenceDB {wd}/sequenceDB " \
-              f"{wd}/clusterSeqs {filename}"
+    print("Begin parsing MMseqs2 output...")
 
-    with Popen(args=shlex.split(command), stdout=PIPE) as process:
-        print(process.stdout.read().decode("utf-8") + "\n\n")
+    parsed_phams = parse_mmseqs_tsv(filename)
 
-    print("Begin parsing MMseqs2 output...")
+    print("Finish parsing MMseqs2 output...")
+    print(f"Genes were sorted into {len(parsed_phams)} phams...")
 
-    parsed_phams = dict()
-    pham_geneids = list()
-    pham_name = 0
+    return parsed_phams
 
-    with open(filename, "r") as fh:
-        # Latest MMseqs2 output format indicates the start of a new
-        # pham by repeating the pham representative's identifier in
-        # two adjacent lines - need references to the prior line as
-        # well as the current one.
-        prior_line = fh.readline()
-        current_line = fh.readline()
-
-        # While not EOF, iterate through lines
-        while current_line:
-            if current_line.startswith(">"):
-                if prior_line.startswith(">"):
-                    try:
-                        pham_geneids.pop(-1)
-                    except IndexError:
-                        # First pham should fail because pham_geneids is empty
-                        pass
-                    parsed_phams[pham_name] = pham_geneids
-                    pham_name += 1
-                    pham_geneids = [current_line.lstrip(">").rstrip()]
-                else:
-                    pham_geneids.append(current_line.lstrip(">").rstrip())
-            else:
-                # Translation, skip
-                pass
-            # prior gets current's value, current gets new line
-            prior_line, current_line = current_line, fh.readline()
 
-        # Dump the last working pham into the dictionary
-        parsed_phams[pham_name] = pham_geneids
+def parse_mmseqs_tsv(filename):
+    """
+    Parses the output of mmseqs createtsv, which has one line per cluster
+    member with the cluster representative in the first column and the
+    member in the second. Phams are numbered from 1 in the order in which
+    their representatives first appear.
+    :param filename: the path to the tab-separated cluster file
+    :return: parsed_phams (dictionary)
+    """
+    parsed_phams = dict()
+    rep_phams = dict()
 
-    # Pham 0 is a placeholder - remove it and then return parsed_phams
-    parsed_phams.pop(0)
+    with open(filename, "r") as fh:
+        for line in fh:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) < 2:
+                continue
 
-    print("Finish parsing MMseqs2 output...")
-    print(f"Genes were sorted into {len(parsed_phams)} phams...")
+            pham_geneids = rep_phams.get(fields[0])
+            if pham_geneids is None:
+                pham_geneids = list()
+                rep_phams[fields[0]] = pham_geneids
+                parsed_phams[len(parsed_phams) + 1] = pham_geneids
+            pham_geneids.append(fields[1])
 
     return parsed_phams
 
@@ -448,6 +590,23 @@ def reintroduce_duplicates(new_phams, trans_groups, genes_and_trans):
     return new_phams
 
 
+def reintroduce_hashed_duplicates(new_phams, hash_groups):
+    """
+    Replaces the translation hashes in each pham with ALL GeneIDs that
+    map onto those translations.
+    :param new_phams: the pham dictionary of translation hashes
+    :param hash_groups: the dictionary that maps translation hashes to the
+    GeneIDs that share them
+    :return:
+    """
+    for key in new_phams.keys():
+        geneids = set()
+        for translation_hash in new_phams[key]:
+            geneids.update(hash_groups[translation_hash])
+        new_phams[key] = geneids
+    return new_phams
+
+
 def preserve_phams(old_phams, new_phams, old_colors, new_genes):
     """
     Attempts to keep pham numbers consistent from one round of pham
@@ -465,52 +624,67 @@ def preserve_phams(old_phams, new_phams, old_colors, new_genes):
     total = len(old_phams)
     new_phams_copy = new_phams.copy()
 
-    # Iterate through old and new phams
+    # Index each gene to the new phams that contain it, so that only new
+    # phams sharing genes with an old pham need to be compared to it.
+    # New phams are compared in the same order as they are stored.
+    new_pham_order = dict()
+    gene_index = dict()
+    for order, new_key in enumerate(new_phams.keys()):
+        new_pham_order[new_key] = order
+        for gene in new_phams[new_key]:
+            gene_index.setdefault(gene, []).append(new_key)
+
+    # Iterate through old phams
     for old_key in old_phams.keys():
         outcount += 1
-        print("Pham Name Conservation: {} / {}".format(outcount, total))
+        if outcount % 1000 == 0 or outcount == total:
+            print("Pham Name Conservation: {} / {}".format(outcount, total))
 
         old_pham = old_phams[old_key]
 
         if old_key in final_phams.keys():
             continue
 
-        for new_key in new_phams_copy.keys():
-            new_pham = new_phams_copy[new_key]
+        # Only the first new pham that shares genes with the old pham
+        # determines whether the old pham name is conserved
+        candidates = set()
+        for gene in old_pham:
+            for new_key in gene_index.get(gene, []):
+                if new_key in new_phams_copy.keys():
+                    candidates.add(new_key)
+        if len(candidates) == 0:
+            continue
+        new_key = min(candidates, key=new_pham_order.get)
+        new_pham = new_phams_copy[new_key]
 
-            if old_pham & new_pham == set():
-                continue
+        # Case 1 + 5 (Identity and Subtraction)
+        if old_pham == new_pham:
+            final_phams[old_key] = new_pham
+            final_colors[old_key] = old_colors[old_key]
+            new_phams_copy.pop(new_key)
 
-            # Case 1 + 5 (Identity and Subtraction)
-            if old_pham == new_pham:
-                final_phams[old_key] = new_pham
-                final_colors[old_key] = old_colors[old_key]
-                new_phams_copy.pop(new_key)
-                break
-
-            # Case 2 and 4 (Addition and Join) - PHAM GREW
-            elif new_pham - old_pham != set():
+        # Case 2 and 4 (Addition and Join) - PHAM GREW
+        elif new_pham - old_pham != set():
 
-                # Case 2 and 4 (Addition and Join)
-                if new_pham & new_genes != set():
+            # Case 2 and 4 (Addition and Join)
+            if new_pham & new_genes != set():
 
-                    # Case 4 - Join with new gene
-                    if (new_pham - (new_pham & new_genes)) - old_pham != set():
-                        break
+                # Case 4 - Join with new gene
+                if (new_pham - (new_pham & new_genes)) - old_pham != set():
+                    continue
 
-                    # Case 2 - Addition with new gene
-                    final_phams[old_key] = new_pham
-                    final_colors[old_key] = old_colors[old_key]
-                    new_phams_copy.pop(new_key)
-                    break
+                # Case 2 - Addition with new gene
+                final_phams[old_key] = new_pham
+                final_colors[old_key] = old_colors[old_key]
+                new_phams_copy.pop(new_key)
 
-                # Case 4 - Join without new gene
-                else:
-                    break
+            # Case 4 - Join without new gene
+            else:
+                continue
 
-            # Case 3 - split - PHAM SHRANK, BUT NOT BY REMOVAL
-            elif old_pham - new_pham != set():
-                break
+        # Case 3 - split - PHAM SHRANK, BUT NOT BY REMOVAL
+        elif old_pham - new_pham != set():
+            continue
 
     final_phams[0] = "placeholder"
     highest_pham = max(map(int, final_phams.keys())) + 1
@@ -569,6 +743,45 @@ def reinsert_pham_data(new_phams, new_colors, engine):
     mysqldb.execute_transaction(engine, commands)
 
 
+def reinsert_pham_data_bulk(new_phams, new_colors, engine):
+    """
+    Puts pham data back into the database using multi-row INSERTs, and
+    assigns genes to phams with one joined UPDATE from a temporary table,
+    instead of one statement per pham and per gene
+    :param new_phams: the dictionary that maps phams to their genes
+    :param new_colors: the dictionary that maps phams to colors
+    :param engine: the Engine allowing access to the database
+    :return: result, msg from mysqldb.execute_transaction()
+    """
+    pham_data = [{"PhamID": key, "Color": new_colors[key]}
+                 for key in new_colors.keys()]
+    gene_data = [{"GeneID": gene, "PhamID": key}
+                 for key in new_phams.keys() for gene in new_phams[key]]
+
+    # Temporary tables only exist for the connection that creates them,
+    # so all statements are executed in the same transaction.
+    # Colors have to go first, since PhamID column in gene table references
+    # PhamID in pham table
+    commands = ["DROP TEMPORARY TABLE IF EXISTS pham_assignment",
+                "CREATE TEMPORARY TABLE pham_assignment "
+                "(GeneID varchar(35) NOT NULL, "
+                "PhamID int(10) unsigned NOT NULL, "
+                "PRIMARY KEY (GeneID))"]
+    if len(pham_data) > 0:
+        commands.append(mysqldb.create_bulk_insert("pham", pham_data))
+    if len(gene_data) > 0:
+        commands.append(mysqldb.create_bulk_insert("pham_assignment",
+                                                   gene_data))
+    commands.append("UPDATE gene INNER JOIN pham_assignment "
+                    "ON gene.GeneID = pham_assignment.GeneID "
+                    "SET gene.PhamID = pham_assignment.PhamID")
+    commands.append("DROP TEMPORARY TABLE pham_assignment")
+
+    print(f"Inserting {len(pham_data)} phams and assigning "
+          f"{len(gene_data)} genes...")
+    return mysqldb.execute_transaction(engine, commands)
+
+
 def fix_miscolored_phams(engine):
     print("Phixing Phalsely Hued Phams...")
     # Phams which are colored as though they are orphams, when really
@@ -1,3 +1,4 @@
+from networkx import all_pairs_shortest_path
 from networkx import Graph
 from networkx import shortest_path
 from pdm_utils.functions import parsing
@@ -54,6 +55,9 @@ def build_graph(metadata):
             graph.add_edge(target_table, referent_table, 
                                          key=foreign_key)
 
+    #Precompute join paths so queries do not search the graph each time.
+    graph.graph["paths"] = dict(all_pairs_shortest_path(graph))
+
     return graph
 
 def build_where_clause(db_graph, filter_expression): 
@@ -194,9 +198,16 @@ def get_table_pathing(db_graph, table_list, center_table=None):
         table_list.remove(center_table)
 
 
+    paths = None
+    if isinstance(db_graph, Graph):
+        paths = db_graph.graph.get("paths")
+
     table_paths = []
     for table in table_list:
-        path = shortest_path(db_graph, center_table.name, table.name)
+        if paths is None:
+            path = shortest_path(db_graph, center_table.name, table.name)
+        else:
+            path = paths[center_table.name].get(table.name)
 
         if not path:
             raise ValueError( "Operation cannot be performed. "
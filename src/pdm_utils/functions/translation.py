@@ -0,0 +1,278 @@
+"""Functions to translate all CDS features of a genome at once."""
+
+from itertools import product
+
+from Bio.Alphabet import IUPAC
+from Bio.Data import CodonTable
+from Bio.Seq import Seq
+import numpy as np
+
+# Translation tables that are translated with codon lookup tables.
+# Features using other tables are translated individually by Biopython.
+TRANSLATION_TABLES = {4, 11}
+
+NUCLEOTIDES = "ACGT"
+# Nucleotides are encoded as 0-3 in the order above, and all other
+# characters are encoded as 4. Codons are encoded as base-5 numbers
+# (25 * first + 5 * second + third nucleotide code).
+NUCLEOTIDE_CODES = bytearray([4] * 256)
+for code, nucleotide in enumerate(NUCLEOTIDES):
+    NUCLEOTIDE_CODES[ord(nucleotide)] = code
+    NUCLEOTIDE_CODES[ord(nucleotide.lower())] = code
+NUCLEOTIDE_CODES = bytes(NUCLEOTIDE_CODES)
+COMPLEMENTS = str.maketrans("ACGTacgt", "TGCAtgca")
+AMBIGUOUS_CODONS = np.array([4 in (x // 25, x // 5 % 5, x % 5)
+                             for x in range(125)], dtype=bool)
+# Encoded reverse complement of each encoded codon.
+COMPLEMENT_CODES = [3, 2, 1, 0, 4]
+REVERSE_CODONS = np.array([25 * COMPLEMENT_CODES[x % 5]
+                           + 5 * COMPLEMENT_CODES[x // 5 % 5]
+                           + COMPLEMENT_CODES[x // 25]
+                           for x in range(125)], dtype=np.uint8)
+
+CODON_TABLES = {}
+
+
+def get_codon_table(table):
+    """Get lookup tables for all encoded codons.
+
+    The tables are derived from the Biopython codon table used to translate
+    ambiguous DNA, so that translations are identical to those of Biopython.
+    Codons containing ambiguous nucleotides are not translated.
+
+    :param table: Translation table number.
+    :type table: int
+    :returns:
+        tuple (amino_acids, start_codons, stop_codons)
+        WHERE
+        amino_acids (ndarray) is the amino acid byte of each codon,
+        start_codons (ndarray) indicates whether each codon is a start codon,
+        stop_codons (ndarray) indicates whether each codon is a stop codon.
+    :rtype: tuple
+    """
+    if table not in CODON_TABLES.keys():
+        codon_table = CodonTable.ambiguous_generic_by_id[table]
+        amino_acids = np.full(125, ord("*"), dtype=np.uint8)
+        start_codons = np.zeros(125, dtype=bool)
+        stop_codons = np.zeros(125, dtype=bool)
+        for codon in product(range(4), repeat=3):
+            index = 25 * codon[0] + 5 * codon[1] + codon[2]
+            codon = "".join([NUCLEOTIDES[x] for x in codon])
+            try:
+                amino_acids[index] = ord(codon_table.forward_table[codon])
+            except (KeyError, CodonTable.TranslationError):
+                pass
+            start_codons[index] = codon in codon_table.start_codons
+            stop_codons[index] = codon in codon_table.stop_codons
+        CODON_TABLES[table] = (amino_acids, start_codons, stop_codons)
+    return CODON_TABLES[table]
+
+
+def encode_codons(seq):
+    """Encode the codon starting at each position of a nucleotide sequence.
+
+    :param seq: Nucleotide sequence.
+    :type seq: Seq or str
+    :returns: Array of encoded codons, one for each position.
+    :rtype: ndarray
+    """
+    data = str(seq).encode("latin-1", "replace").translate(NUCLEOTIDE_CODES)
+    nucleotides = np.frombuffer(data, dtype=np.uint8)
+    length = max(len(nucleotides) - 2, 0)
+    return (25 * nucleotides[:length] + 5 * nucleotides[1:length + 1]
+            + nucleotides[2:length + 2])
+
+
+def get_feature_parts(cds_ftr, genome_length):
+    """Get the (start, end, strand) coordinates of each part of a feature.
+
+    Parts are listed in the order used by Biopython to extract the
+    nucleotide sequence of the feature.
+
+    :param cds_ftr: A pdm_utils Cds object.
+    :type cds_ftr: Cds
+    :param genome_length: Length of the genome nucleotide sequence.
+    :type genome_length: int
+    :returns:
+        List of (start, end, strand) tuples, or None if the feature has
+        no location or if any part is not within the genome.
+    :rtype: list
+    """
+    if cds_ftr.seqfeature is None or cds_ftr.seqfeature.location is None:
+        return None
+    parts = []
+    for part in cds_ftr.seqfeature.location.parts:
+        start = part.nofuzzy_start
+        end = part.nofuzzy_end
+        if start < 0 or start > end or end > genome_length:
+            return None
+        elif part.ref is not None or part.ref_db is not None:
+            return None
+        parts.append((start, end, part.strand))
+    return parts
+
+
+def join_feature_parts(genome_str, parts):
+    """Join the nucleotide sequences of all parts of a feature.
+
+    :param genome_str: Nucleotide sequence of the genome.
+    :type genome_str: str
+    :param parts: List of (start, end, strand) tuples.
+    :type parts: list
+    :returns: Nucleotide sequence of the feature.
+    :rtype: str
+    """
+    part_seqs = []
+    for start, end, strand in parts:
+        if strand == -1:
+            part_seqs.append(genome_str[start:end].translate(COMPLEMENTS)[::-1])
+        else:
+            part_seqs.append(genome_str[start:end])
+    return "".join(part_seqs)
+
+
+def translate_cds_features(genome_seq, cds_features):
+    """Translate the nucleotide sequences of all CDS features of a genome.
+
+    The codons of the genome are encoded once, and the codons of all
+    features are gathered from them in one step. Features with more than
+    one part (e.g. translational frameshifts or wrap-around features) are
+    joined and appended to the genome before it is encoded. All codons are
+    then translated and validated with lookup tables for each
+    translation table.
+
+    The translation of each feature is identical to the translation of the
+    nucleotide sequence extracted from the genome by the feature SeqFeature
+    (as by Cds.set_nucleotide_sequence()) using Cds.translate_seq(),
+    including the translation of alternative start codons to methionine
+    and an empty Seq object for sequences that are not valid CDS sequences.
+    Features without a valid SeqFeature, features using other translation
+    tables, and features containing ambiguous nucleotides are translated
+    by Cds.translate_seq().
+
+    :param genome_seq: Nucleotide sequence of the genome.
+    :type genome_seq: Seq
+    :param cds_features: List of pdm_utils Cds objects.
+    :type cds_features: list
+    :returns: List of amino acid Seq objects, one for each feature.
+    :rtype: list
+    """
+    translations = [None] * len(cds_features)
+    if isinstance(genome_seq, Seq):
+        genome_str = str(genome_seq)
+        seqs = [genome_str]
+        length = len(genome_str)
+
+        # Group the single-part location of each feature by table.
+        table_dict = {}
+        for index, cds_ftr in enumerate(cds_features):
+            if cds_ftr.translation_table not in TRANSLATION_TABLES:
+                continue
+            parts = get_feature_parts(cds_ftr, len(genome_str))
+            if parts is None:
+                continue
+            elif len(parts) > 1:
+                seqs.append(join_feature_parts(genome_str, parts))
+                parts = [(length, length + len(seqs[-1]), 1)]
+                length += len(seqs[-1])
+            indices, locations = table_dict.setdefault(
+                                    cds_ftr.translation_table, ([], []))
+            indices.append(index)
+            locations.append(parts[0])
+
+        codons = encode_codons("".join(seqs))
+        for table, (indices, locations) in table_dict.items():
+            # Biopython determines the alphabet from the nucleotide alphabet.
+            try:
+                alphabet = genome_seq[:0].translate(table=table).alphabet
+            except:
+                continue
+            proteins = translate_encoded_features(codons, locations, table)
+            for index, protein in zip(indices, proteins):
+                if protein == "":
+                    translations[index] = Seq("", IUPAC.protein)
+                elif protein is not None:
+                    translations[index] = Seq(protein, alphabet)
+
+    for index, cds_ftr in enumerate(cds_features):
+        if translations[index] is None:
+            translations[index] = cds_ftr.translate_seq()
+    return translations
+
+
+def translate_encoded_features(codons, locations, table):
+    """Translate feature locations from encoded codons with one
+    codon table.
+
+    :param codons: Encoded codons, as from encode_codons().
+    :type codons: ndarray
+    :param locations: List of (start, end, strand) tuples.
+    :type locations: list
+    :param table: Translation table number.
+    :type table: int
+    :returns:
+        List of amino acid sequences, one for each location. Sequences are
+        empty if they are not valid CDS sequences, and None if they
+        contain ambiguous nucleotides.
+    :rtype: list
+    """
+    amino_acids, start_codons, stop_codons = get_codon_table(table)
+    proteins = [None] * len(locations)
+
+    # Only sequences of at least two codons are gathered.
+    indices = []
+    starts = []
+    ends = []
+    strands = []
+    for index, (start, end, strand) in enumerate(locations):
+        if (end - start) % 3 != 0:
+            proteins[index] = ""
+        elif end - start >= 6:
+            indices.append(index)
+            starts.append(start)
+            ends.append(end)
+            strands.append(strand == -1)
+    if len(indices) == 0:
+        return proteins
+
+    # Codons of reverse strand locations are gathered from the last codon
+    # to the first codon, and are looked up as reverse complements
+    # (codon + 125) in lookup tables extended for both strands.
+    dtype = np.int32 if len(codons) < 2**31 else np.int64
+    starts = np.array(starts, dtype=dtype)
+    ends = np.array(ends, dtype=dtype)
+    strands = np.array(strands, dtype=bool)
+    lengths = (ends - starts) // 3
+    firsts = np.cumsum(lengths) - lengths
+    lasts = firsts + lengths - 1
+    offsets = (np.arange(lengths.sum(), dtype=dtype)
+               - np.repeat(firsts, lengths))
+    directions = np.where(strands, -3, 3).astype(dtype)
+    positions = (np.repeat(np.where(strands, ends - 3, starts), lengths)
+                 + np.repeat(directions, lengths) * offsets)
+    ftr_codons = np.add(codons.take(positions),
+                        np.repeat(strands, lengths) * np.int16(125),
+                        dtype=np.int16)
+
+    amino_acids, start_codons, stop_codons, ambiguous_codons = [
+        np.concatenate([x, x.take(REVERSE_CODONS)])
+        for x in [amino_acids, start_codons, stop_codons.astype(dtype),
+                  AMBIGUOUS_CODONS.astype(dtype)]]
+    ambiguous_tally = np.add.reduceat(ambiguous_codons.take(ftr_codons),
+                                      firsts)
+    stop_tally = np.add.reduceat(stop_codons.take(ftr_codons), firsts)
+    valid = (start_codons.take(ftr_codons.take(firsts))
+             & (stop_codons.take(ftr_codons.take(lasts)) == 1)
+             & (stop_tally == 1))
+
+    protein_str = amino_acids.take(ftr_codons).tobytes().decode()
+    for index, ambiguous, is_valid, first, last in zip(
+            indices, ambiguous_tally.tolist(), valid.tolist(),
+            firsts.tolist(), lasts.tolist()):
+        if ambiguous > 0:
+            continue
+        elif is_valid:
+            proteins[index] = "M" + protein_str[first + 1:last]
+        else:
+            proteins[index] = ""
+    return proteins
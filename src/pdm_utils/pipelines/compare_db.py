@@ -20,6 +20,9 @@ import argparse
 import pathlib
 from pdm_utils.functions import ncbi
 from pdm_utils.functions import basic
+from pdm_utils.functions import intervals
+from pdm_utils.functions import parallelize
+from pdm_utils.functions import phagesdb
 
 
 
@@ -301,17 +304,27 @@ class AnnotatedGenome(UnannotatedGenome):
         self.__cds_features_tally = 0
         self.__cds_features_with_translation_error_tally = 0
         self.__cds_features_boundary_error_tally = 0
+        self.__cds_features_coordinate_conflict_tally = 0
 
     # Define all attribute setters:
     def set_cds_features(self,value):
         self.__cds_features = value #Should be a list
         self.__cds_features_tally = len(self.__cds_features)
     def compute_cds_feature_errors(self):
+        coordinates = []
         for cds_feature in self.__cds_features:
             if cds_feature.get_amino_acid_errors():
                 self.__cds_features_with_translation_error_tally += 1
             if cds_feature.get_boundary_error():
                 self.__cds_features_boundary_error_tally += 1
+            else:
+                coordinates.append((int(cds_feature.get_left_boundary()),\
+                                    int(cds_feature.get_right_boundary()),\
+                                    cds_feature.get_strand()[:1]))
+
+        #Count all pairs of nested, duplicated, or partially-duplicated features
+        conflicts = intervals.find_coordinate_conflicts(coordinates,self.get_length())
+        self.__cds_features_coordinate_conflict_tally = len(conflicts)
 
     # Define all attribute getters:
     def get_cds_features(self):
@@ -322,6 +335,8 @@ class AnnotatedGenome(UnannotatedGenome):
         return self.__cds_features_with_translation_error_tally
     def get_cds_features_boundary_error_tally(self):
         return self.__cds_features_boundary_error_tally
+    def get_cds_features_coordinate_conflict_tally(self):
+        return self.__cds_features_coordinate_conflict_tally
 
 
 
@@ -1461,114 +1476,119 @@ class DatabaseSummary:
     #Define setter functions
     def compute_summary(self):
         for matched_genomes in self.__matched_genomes_list:
+            self.add_matched_genomes(matched_genomes)
 
-            self.__ph_total_genomes_analyzed += 1
-            ph_genome = matched_genomes.get_phamerator_genome()
-            pdb_genome = matched_genomes.get_phagesdb_genome()
-            ncbi_genome = matched_genomes.get_ncbi_genome()
+    #Tally one set of matched genomes, so that the summary can also be
+    #computed while matched genomes are streamed.
+    def add_matched_genomes(self,matched_genomes):
 
-            if matched_genomes.get_contains_errors():
-                self.__total_genomes_with_errors += 1
+        self.__ph_total_genomes_analyzed += 1
+        ph_genome = matched_genomes.get_phamerator_genome()
+        pdb_genome = matched_genomes.get_phagesdb_genome()
+        ncbi_genome = matched_genomes.get_ncbi_genome()
 
+        if matched_genomes.get_contains_errors():
+            self.__total_genomes_with_errors += 1
 
-            #MySQL data
-            if isinstance(ph_genome,PhameratorGenome):
 
-                self.__ph_ncbi_update_flag_tally += ph_genome.get_ncbi_update_flag()
+        #MySQL data
+        if isinstance(ph_genome,PhameratorGenome):
 
-                #Genome data checks
-                if ph_genome.get_nucleotide_errors():
-                    self.__ph_genomes_with_nucleotide_errors_tally += 1
-                if ph_genome.get_cds_features_with_translation_error_tally() > 0:
-                    self.__ph_genomes_with_translation_errors_tally += 1
-                    self.__ph_translation_errors_tally += ph_genome.get_cds_features_with_translation_error_tally()
-                if ph_genome.get_cds_features_boundary_error_tally() > 0:
-                    self.__ph_genomes_with_boundary_errors_tally += 1
-                    self.__ph_boundary_errors_tally += ph_genome.get_cds_features_boundary_error_tally()
-                if ph_genome.get_status_accession_error():
-                    self.__ph_genomes_with_status_accession_error_tally += 1
-                if ph_genome.get_status_description_error():
-                    self.__ph_genomes_with_status_description_error_tally += 1
+            self.__ph_ncbi_update_flag_tally += ph_genome.get_ncbi_update_flag()
 
-            #Phagesdb data
-            if isinstance(pdb_genome,PhagesdbGenome):
+            #Genome data checks
+            if ph_genome.get_nucleotide_errors():
+                self.__ph_genomes_with_nucleotide_errors_tally += 1
+            if ph_genome.get_cds_features_with_translation_error_tally() > 0:
+                self.__ph_genomes_with_translation_errors_tally += 1
+                self.__ph_translation_errors_tally += ph_genome.get_cds_features_with_translation_error_tally()
+            if ph_genome.get_cds_features_boundary_error_tally() > 0:
+                self.__ph_genomes_with_boundary_errors_tally += 1
+                self.__ph_boundary_errors_tally += ph_genome.get_cds_features_boundary_error_tally()
+            if ph_genome.get_status_accession_error():
+                self.__ph_genomes_with_status_accession_error_tally += 1
+            if ph_genome.get_status_description_error():
+                self.__ph_genomes_with_status_description_error_tally += 1
 
-                #Genome data checks
-                if pdb_genome.get_nucleotide_errors():
-                    self.__pdb_genomes_with_nucleotide_errors_tally += 1
-            else:
-                self.__ph_genomes_unmatched_to_pdb_tally += 1
-
-            #NCBI data
-            if isinstance(ncbi_genome,NcbiGenome):
-
-                #Genome data checks
-                if ncbi_genome.get_nucleotide_errors():
-                    self.__ncbi_genomes_with_nucleotide_errors_tally += 1
-                if ncbi_genome.get_cds_features_with_translation_error_tally() > 0:
-                    self.__ncbi_genomes_with_translation_errors_tally += 1
-                    self.__ncbi_translation_errors_tally += ncbi_genome.get_cds_features_with_translation_error_tally()
-                if ncbi_genome.get_cds_features_boundary_error_tally() > 0:
-                    self.__ncbi_genomes_with_boundary_errors_tally += 1
-                    self.__ncbi_boundary_errors_tally += ncbi_genome.get_cds_features_boundary_error_tally()
-                if ncbi_genome.get_missing_locus_tags_tally() > 0:
-                    self.__ncbi_genomes_with_missing_locus_tags_tally += 1
-                    self.__ncbi_missing_locus_tags_tally += ncbi_genome.get_missing_locus_tags_tally()
-                if ncbi_genome.get_locus_tag_typos_tally() > 0:
-                    self.__ncbi_genomes_with_locus_tag_typos_tally += 1
-                    self.__ncbi_locus_tag_typos_tally += ncbi_genome.get_locus_tag_typos_tally()
-                if ncbi_genome.get_description_field_error_tally() > 0:
-                    self.__ncbi_genomes_with_description_field_errors_tally += 1
-                    self.__ncbi_description_field_errors_tally += ncbi_genome.get_description_field_error_tally()
+        #Phagesdb data
+        if isinstance(pdb_genome,PhagesdbGenome):
 
-            else:
-                self.__ph_genomes_unmatched_to_ncbi_tally += 1
-
-            #MySQL-phagesdb checks
-            if matched_genomes.get_phamerator_phagesdb_sequence_mismatch():
-                self.__ph_pdb_sequence_mismatch_tally += 1
-            if matched_genomes.get_phamerator_phagesdb_sequence_length_mismatch():
-                self.__ph_pdb_sequence_length_mismatch_tally += 1
-            if matched_genomes.get_phamerator_phagesdb_cluster_subcluster_mismatch():
-                self.__ph_pdb_cluster_subcluster_mismatch_tally += 1
-            if matched_genomes.get_phamerator_phagesdb_accession_mismatch():
-                self.__ph_pdb_accession_mismatch_tally += 1
-            if matched_genomes.get_phamerator_phagesdb_host_mismatch():
-                self.__ph_pdb_host_mismatch_tally += 1
-
-            #MySQL-NCBI checks
-            if matched_genomes.get_phamerator_ncbi_sequence_mismatch():
-                self.__ph_ncbi_sequence_mismatch_tally += 1
-            if matched_genomes.get_phamerator_ncbi_sequence_length_mismatch():
-                self.__ph_ncbi_sequence_length_mismatch_tally += 1
-            if matched_genomes.get_ncbi_record_header_fields_phage_name_mismatch():
-                self.__ph_ncbi_record_header_phage_mismatch_tally += 1
-            if matched_genomes.get_ncbi_host_mismatch():
-                self.__ph_ncbi_record_header_host_mismatch_tally += 1
-            if matched_genomes.get_phamerator_ncbi_imperfect_matched_features_tally() > 0:
-                self.__ph_ncbi_genomes_with_imperfectly_matched_features_tally += 1
-                self.__ph_ncbi_different_start_sites_tally += matched_genomes.get_phamerator_ncbi_imperfect_matched_features_tally()
-            if matched_genomes.get_phamerator_features_unmatched_in_ncbi_tally() > 0:
-                self.__ph_ncbi_genomes_with_unmatched_phamerator_features_tally += 1
-                self.__ph_ncbi_unmatched_phamerator_features_tally += matched_genomes.get_phamerator_features_unmatched_in_ncbi_tally()
-            if matched_genomes.get_ncbi_features_unmatched_in_phamerator_tally() > 0:
-                self.__ph_ncbi_genomes_with_unmatched_ncbi_features_tally += 1
-                self.__ph_ncbi_unmatched_ncbi_features_tally += matched_genomes.get_ncbi_features_unmatched_in_phamerator_tally()
-            if matched_genomes.get_phamerator_ncbi_different_descriptions_tally() > 0:
-                self.__ph_ncbi_genomes_with_different_descriptions_tally += 1
-                self.__ph_ncbi_different_descriptions_tally += matched_genomes.get_phamerator_ncbi_different_descriptions_tally()
-            if matched_genomes.get_phamerator_ncbi_different_translation_tally() > 0:
-                self.__ph_ncbi_genomes_with_different_translations_tally += 1
-                self.__ph_ncbi_different_translation_tally += matched_genomes.get_phamerator_ncbi_different_translation_tally()
-            if matched_genomes.get_ph_ncbi_author_error():
-                self.__ph_ncbi_genomes_with_author_errors_tally += 1
-
-
-            #phagesdb-NCBI checks
-            if matched_genomes.get_phagesdb_ncbi_sequence_mismatch():
-                self.__pdb_ncbi_sequence_mismatch_tally += 1
-            if matched_genomes.get_phagesdb_ncbi_sequence_length_mismatch():
-                self.__pdb_ncbi_sequence_length_mismatch_tally += 1
+            #Genome data checks
+            if pdb_genome.get_nucleotide_errors():
+                self.__pdb_genomes_with_nucleotide_errors_tally += 1
+        else:
+            self.__ph_genomes_unmatched_to_pdb_tally += 1
+
+        #NCBI data
+        if isinstance(ncbi_genome,NcbiGenome):
+
+            #Genome data checks
+            if ncbi_genome.get_nucleotide_errors():
+                self.__ncbi_genomes_with_nucleotide_errors_tally += 1
+            if ncbi_genome.get_cds_features_with_translation_error_tally() > 0:
+                self.__ncbi_genomes_with_translation_errors_tally += 1
+                self.__ncbi_translation_errors_tally += ncbi_genome.get_cds_features_with_translation_error_tally()
+            if ncbi_genome.get_cds_features_boundary_error_tally() > 0:
+                self.__ncbi_genomes_with_boundary_errors_tally += 1
+                self.__ncbi_boundary_errors_tally += ncbi_genome.get_cds_features_boundary_error_tally()
+            if ncbi_genome.get_missing_locus_tags_tally() > 0:
+                self.__ncbi_genomes_with_missing_locus_tags_tally += 1
+                self.__ncbi_missing_locus_tags_tally += ncbi_genome.get_missing_locus_tags_tally()
+            if ncbi_genome.get_locus_tag_typos_tally() > 0:
+                self.__ncbi_genomes_with_locus_tag_typos_tally += 1
+                self.__ncbi_locus_tag_typos_tally += ncbi_genome.get_locus_tag_typos_tally()
+            if ncbi_genome.get_description_field_error_tally() > 0:
+                self.__ncbi_genomes_with_description_field_errors_tally += 1
+                self.__ncbi_description_field_errors_tally += ncbi_genome.get_description_field_error_tally()
+
+        else:
+            self.__ph_genomes_unmatched_to_ncbi_tally += 1
+
+        #MySQL-phagesdb checks
+        if matched_genomes.get_phamerator_phagesdb_sequence_mismatch():
+            self.__ph_pdb_sequence_mismatch_tally += 1
+        if matched_genomes.get_phamerator_phagesdb_sequence_length_mismatch():
+            self.__ph_pdb_sequence_length_mismatch_tally += 1
+        if matched_genomes.get_phamerator_phagesdb_cluster_subcluster_mismatch():
+            self.__ph_pdb_cluster_subcluster_mismatch_tally += 1
+        if matched_genomes.get_phamerator_phagesdb_accession_mismatch():
+            self.__ph_pdb_accession_mismatch_tally += 1
+        if matched_genomes.get_phamerator_phagesdb_host_mismatch():
+            self.__ph_pdb_host_mismatch_tally += 1
+
+        #MySQL-NCBI checks
+        if matched_genomes.get_phamerator_ncbi_sequence_mismatch():
+            self.__ph_ncbi_sequence_mismatch_tally += 1
+        if matched_genomes.get_phamerator_ncbi_sequence_length_mismatch():
+            self.__ph_ncbi_sequence_length_mismatch_tally += 1
+        if matched_genomes.get_ncbi_record_header_fields_phage_name_mismatch():
+            self.__ph_ncbi_record_header_phage_mismatch_tally += 1
+        if matched_genomes.get_ncbi_host_mismatch():
+            self.__ph_ncbi_record_header_host_mismatch_tally += 1
+        if matched_genomes.get_phamerator_ncbi_imperfect_matched_features_tally() > 0:
+            self.__ph_ncbi_genomes_with_imperfectly_matched_features_tally += 1
+            self.__ph_ncbi_different_start_sites_tally += matched_genomes.get_phamerator_ncbi_imperfect_matched_features_tally()
+        if matched_genomes.get_phamerator_features_unmatched_in_ncbi_tally() > 0:
+            self.__ph_ncbi_genomes_with_unmatched_phamerator_features_tally += 1
+            self.__ph_ncbi_unmatched_phamerator_features_tally += matched_genomes.get_phamerator_features_unmatched_in_ncbi_tally()
+        if matched_genomes.get_ncbi_features_unmatched_in_phamerator_tally() > 0:
+            self.__ph_ncbi_genomes_with_unmatched_ncbi_features_tally += 1
+            self.__ph_ncbi_unmatched_ncbi_features_tally += matched_genomes.get_ncbi_features_unmatched_in_phamerator_tally()
+        if matched_genomes.get_phamerator_ncbi_different_descriptions_tally() > 0:
+            self.__ph_ncbi_genomes_with_different_descriptions_tally += 1
+            self.__ph_ncbi_different_descriptions_tally += matched_genomes.get_phamerator_ncbi_different_descriptions_tally()
+        if matched_genomes.get_phamerator_ncbi_different_translation_tally() > 0:
+            self.__ph_ncbi_genomes_with_different_translations_tally += 1
+            self.__ph_ncbi_different_translation_tally += matched_genomes.get_phamerator_ncbi_different_translation_tally()
+        if matched_genomes.get_ph_ncbi_author_error():
+            self.__ph_ncbi_genomes_with_author_errors_tally += 1
+
+
+        #phagesdb-NCBI checks
+        if matched_genomes.get_phagesdb_ncbi_sequence_mismatch():
+            self.__pdb_ncbi_sequence_mismatch_tally += 1
+        if matched_genomes.get_phagesdb_ncbi_sequence_length_mismatch():
+            self.__pdb_ncbi_sequence_length_mismatch_tally += 1
 
 
 
@@ -1738,6 +1758,618 @@ class DatabaseSummary:
 
 
 #here
+#MySQL queries for streaming genome data. Both tables are sorted by the
+#binary PhageID so that they can be merged in Python, and genes within
+#a genome keep the order of the primary key.
+PHAGE_QUERY = ("SELECT PhageID,Name,HostGenus,Sequence,Length,"
+               "Status,Cluster,Accession,RetrieveRecord,"
+               "DateLastModified,AnnotationAuthor FROM phage "
+               "ORDER BY BINARY PhageID")
+GENE_QUERY = ("SELECT PhageID,GeneID,Name,Start,Stop,Orientation,"
+              "Translation,Notes FROM gene ORDER BY BINARY PhageID, GeneID")
+
+
+#Pair streamed genome data with streamed gene data
+def merge_genome_gene_data(genome_tuples, gene_tuples):
+    """Pair each phage table row with its gene table rows.
+
+    Both iterables must be sorted by PhageID, which is the first element
+    of each row. Genes with a PhageID that is not in the phage table
+    are skipped.
+
+    :param genome_tuples: Iterable of phage table rows.
+    :type genome_tuples: iterable
+    :param gene_tuples: Iterable of gene table rows.
+    :type gene_tuples: iterable
+    :returns: Generator of (genome tuple, list of gene tuples) tuples.
+    :rtype: generator
+    """
+    gene_tuples = iter(gene_tuples)
+    gene_tuple = next(gene_tuples, None)
+    for genome_tuple in genome_tuples:
+        phage_id = genome_tuple[0]
+        while gene_tuple is not None and gene_tuple[0] < phage_id:
+            gene_tuple = next(gene_tuples, None)
+
+        genome_gene_tuples = []
+        while gene_tuple is not None and gene_tuple[0] == phage_id:
+            genome_gene_tuples.append(gene_tuple)
+            gene_tuple = next(gene_tuples, None)
+
+        yield genome_tuple, genome_gene_tuples
+
+
+#Connect to MySQL with a consistent snapshot of the database
+def connect_mysql_snapshot(username, password, database):
+    """Connect to MySQL and start a transaction with a consistent snapshot.
+
+    All reads on the connection see the database as it was when the
+    transaction started, even if it is changed by other connections
+    (e.g. by import or phamerate) before the reads are finished.
+
+    :param username: MySQL username.
+    :type username: str
+    :param password: MySQL password.
+    :type password: str
+    :param database: Name of the MySQL database.
+    :type database: str
+    :returns: The PyMySQL connection.
+    :rtype: Connection
+    """
+    con = pms.connect(host="localhost", user=username,
+                      password=password, database=database)
+    con.autocommit(False)
+    cur = con.cursor()
+    cur.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT")
+    cur.close()
+    return con
+
+
+#Stream genome data from MySQL
+def stream_mysql_genome_data(phage_con, gene_con):
+    """Retrieve each MySQL genome with its genes, one genome at a time.
+
+    The phage and gene tables are read with unbuffered server-side
+    cursors on separate connections, so only the current genome is
+    held in memory. Both connections should be opened with
+    connect_mysql_snapshot() at the same time, so that genomes are not
+    paired with genes from a different version of the database. Both
+    connections are closed once all genomes are retrieved.
+
+    :param phage_con: Connection used to read the phage table.
+    :type phage_con: Connection
+    :param gene_con: Connection used to read the gene table.
+    :type gene_con: Connection
+    :returns: Generator of (genome tuple, list of gene tuples) tuples.
+    :rtype: generator
+    """
+    try:
+        phage_cur = phage_con.cursor(pms.cursors.SSCursor)
+        phage_cur.execute(PHAGE_QUERY)
+        gene_cur = gene_con.cursor(pms.cursors.SSCursor)
+        gene_cur.execute(GENE_QUERY)
+        yield from merge_genome_gene_data(phage_cur, gene_cur)
+    finally:
+        gene_con.close()
+        phage_con.close()
+
+
+#Create a MySQL genome object with its genes
+def create_phamerator_genome(genome_tuple, gene_tuples,
+                             dna_alphabet_set, protein_alphabet_set):
+    """Create a MySQL genome and its CDS features from table rows.
+
+    :param genome_tuple: Row of the phage table, as selected by PHAGE_QUERY.
+    :type genome_tuple: tuple
+    :param gene_tuples: Rows of the gene table, as selected by GENE_QUERY.
+    :type gene_tuples: list
+    :param dna_alphabet_set: Valid nucleotides.
+    :type dna_alphabet_set: set
+    :param protein_alphabet_set: Valid amino acids.
+    :type protein_alphabet_set: set
+    :returns: The MySQL genome.
+    :rtype: PhameratorGenome
+    """
+    genome_object = PhameratorGenome()
+    genome_object.set_phage_id(genome_tuple[0])
+    genome_object.set_phage_name(genome_tuple[1])
+    genome_object.set_host(genome_tuple[2])
+    genome_object.set_sequence(genome_tuple[3].decode("utf-8"))
+    genome_object.set_accession(genome_tuple[7]) #Set accession before status
+    genome_object.set_status(genome_tuple[5])
+    genome_object.set_cluster_subcluster(genome_tuple[6])
+    genome_object.set_ncbi_update_flag(genome_tuple[8])
+    genome_object.set_date_last_modified(genome_tuple[9])
+    genome_object.set_annotation_author(genome_tuple[10])
+    genome_object.compute_nucleotide_errors(dna_alphabet_set)
+
+    gene_object_list = []
+    for gene_tuple in gene_tuples:
+        gene_object = PhameratorCdsFeature()
+        gene_object.set_phage_id(gene_tuple[0])
+        gene_object.set_gene_id(gene_tuple[1])
+        gene_object.set_gene_name(gene_tuple[2])
+        gene_object.set_type_id('CDS')
+        gene_object.set_left_boundary(gene_tuple[3])
+        gene_object.set_right_boundary(gene_tuple[4])
+        gene_object.set_strand(gene_tuple[5])
+        gene_object.set_translation(gene_tuple[6])
+
+        gene_object_description, gene_object_search_description = retrieve_description(gene_tuple[7].decode("utf-8"))
+        gene_object.set_notes(gene_object_description, gene_object_search_description)
+
+        gene_object.compute_amino_acid_errors(protein_alphabet_set)
+        gene_object.set_start_end_strand_id()
+        gene_object.compute_boundary_error()
+        gene_object_list.append(gene_object)
+
+    genome_object.set_cds_features(gene_object_list)
+    genome_object.compute_cds_feature_errors()
+    genome_object.compute_status_description_error()
+    return genome_object
+
+
+#Create MySQL genome objects from streamed data
+def iter_phamerator_genomes(mysql_genome_data, valid_genome_status_set,
+                            valid_genome_author_set, dna_alphabet_set,
+                            protein_alphabet_set, total, output_path=None):
+    """Create MySQL genomes with a user-selected status and authorship.
+
+    :param mysql_genome_data: Iterable of (genome tuple, gene tuples) tuples.
+    :type mysql_genome_data: iterable
+    :param valid_genome_status_set: Statuses of genomes to create.
+    :type valid_genome_status_set: set
+    :param valid_genome_author_set: Authorships of genomes to create.
+    :type valid_genome_author_set: set
+    :param dna_alphabet_set: Valid nucleotides.
+    :type dna_alphabet_set: set
+    :param protein_alphabet_set: Valid amino acids.
+    :type protein_alphabet_set: set
+    :param total: Number of genomes in the phage table.
+    :type total: int
+    :param output_path: Folder to save each genome to as a fasta file.
+    :type output_path: str
+    :returns: Generator of PhameratorGenome objects.
+    :rtype: generator
+    """
+    ph_genome_count = 1
+    for genome_tuple, gene_tuples in mysql_genome_data:
+        print("Processing MySQL genome %s out of %s" %(ph_genome_count,total))
+        ph_genome_count += 1
+
+        #Check to see if the genome has a user-selected status and authorship
+        if genome_tuple[5] not in valid_genome_status_set or \
+            genome_tuple[10] not in valid_genome_author_set:
+            continue
+
+        genome_object = create_phamerator_genome(genome_tuple, gene_tuples,
+                                                 dna_alphabet_set,
+                                                 protein_alphabet_set)
+
+        #If selected by user, save retrieved record to file
+        if output_path is not None:
+
+            #To output a fasta file, a Biopython SeqRecord must be created first
+            phamerator_fasta_seqrecord = SeqRecord(Seq(genome_object.get_sequence()),\
+                                        id=genome_object.get_search_name(),\
+                                        description='')
+
+            #Create unique filename
+            phamerator_fasta_seqrecord_path = create_unique_filename(\
+                                                output_path,
+                                                genome_object.get_search_name(),
+                                                '.fasta')
+            #Output the fasta file
+            SeqIO.write(phamerator_fasta_seqrecord,\
+                                phamerator_fasta_seqrecord_path,\
+                                'fasta')
+
+        yield genome_object
+
+
+#Match phagesdb and NCBI genomes to a MySQL genome
+def match_genomes(phamerator_genome, pdb_genome_dict,
+                  pdb_search_name_duplicate_set, ph_search_name_duplicate_set,
+                  ncbi_genome_dict, ph_accession_duplicate_set):
+    """Match a MySQL genome to its phagesdb and NCBI genomes.
+
+    :param phamerator_genome: The MySQL genome.
+    :type phamerator_genome: PhameratorGenome
+    :param pdb_genome_dict: phagesdb genomes by search name.
+    :type pdb_genome_dict: dict
+    :param pdb_search_name_duplicate_set: Duplicated phagesdb search names.
+    :type pdb_search_name_duplicate_set: set
+    :param ph_search_name_duplicate_set: Duplicated MySQL search names.
+    :type ph_search_name_duplicate_set: set
+    :param ncbi_genome_dict: NCBI genomes by accession.
+    :type ncbi_genome_dict: dict
+    :param ph_accession_duplicate_set: Duplicated MySQL accessions.
+    :type ph_accession_duplicate_set: set
+    :returns:
+        tuple (matched_objects, pdb_unmatched, ncbi_unmatched) of the
+        MatchedGenomes object and whether the MySQL genome is reported as
+        unmatched to phagesdb and to NCBI.
+    :rtype: tuple
+    """
+    matched_objects = MatchedGenomes()
+    matched_objects.set_phamerator_genome(phamerator_genome)
+    pdb_unmatched = False
+    ncbi_unmatched = False
+
+    #Match up phagesdb genome
+    #First try to match up the phageID, and if that doesn't work, try to match up the phageName
+    if phamerator_genome.get_search_id() in pdb_genome_dict.keys():
+        pdb_genome = pdb_genome_dict[phamerator_genome.get_search_id()]
+        #Make sure the pdb_genome doesn't have a search name that was duplicated
+        if pdb_genome.get_search_name() in pdb_search_name_duplicate_set:
+            pdb_genome = ''
+
+    elif phamerator_genome.get_search_name() in pdb_genome_dict.keys() and not \
+        phamerator_genome.get_search_name() in ph_search_name_duplicate_set:
+
+        pdb_genome = pdb_genome_dict[phamerator_genome.get_search_name()]
+        #Make sure the pdb_genome doesn't have a search name that was duplicated
+        if pdb_genome.get_search_name in pdb_search_name_duplicate_set:
+            pdb_genome = ''
+
+    else:
+        pdb_genome = ''
+        pdb_unmatched = True
+
+    matched_objects.set_phagesdb_genome(pdb_genome)
+
+    #Now match up NCBI genome
+    if phamerator_genome.get_accession() != '' and \
+        phamerator_genome.get_accession() not in ph_accession_duplicate_set:
+            #Retrieval of record may have failed
+            try:
+                ncbi_genome = ncbi_genome_dict[phamerator_genome.get_accession()]
+            except:
+                ncbi_genome = ''
+                ncbi_unmatched = True
+
+    else:
+        ncbi_genome = ''
+        ncbi_unmatched = True
+
+    matched_objects.set_ncbi_genome(ncbi_genome)
+    return matched_objects, pdb_unmatched, ncbi_unmatched
+
+
+#Compare one set of matched genomes
+def compare_matched_genomes(matched_genomes):
+    """Run all comparisons and error tallies for one set of matched genomes.
+
+    :param matched_genomes: MySQL genome and its phagesdb and NCBI matches.
+    :type matched_genomes: MatchedGenomes
+    :returns: The compared MatchedGenomes object.
+    :rtype: MatchedGenomes
+    """
+    matched_genomes.compare_phamerator_ncbi_genomes() #This method automatically calls method to match and compare cds features
+    matched_genomes.compare_phamerator_phagesdb_genomes()
+    matched_genomes.compare_phagesdb_ncbi_genomes()
+    matched_genomes.compute_total_genome_errors()
+    return matched_genomes
+
+
+def compare_indexed_genomes(index, matched_genomes):
+    """Compare matched genomes in a worker process, keeping their position."""
+    return index, compare_matched_genomes(matched_genomes)
+
+
+#Compare sets of matched genomes as they are streamed
+def iter_compared_genomes(matched_genomes_iterable, total, workers=1):
+    """Compare each set of matched genomes, optionally in parallel.
+
+    Each set of matched genomes is independent, so sets are compared in
+    separate processes when more than one worker is requested. Compared
+    sets are yielded in their original order, so the database summary
+    and reports are identical to those of a serial comparison. Only the
+    sets that are being compared or waiting for an earlier set are held
+    in memory.
+
+    :param matched_genomes_iterable: Iterable of MatchedGenomes objects.
+    :type matched_genomes_iterable: iterable
+    :param total: Number of sets of matched genomes, to report progress.
+    :type total: int
+    :param workers: Number of processes used to compare genomes.
+    :type workers: int
+    :returns: Generator of compared MatchedGenomes objects.
+    :rtype: generator
+    """
+    if workers <= 1 or total <= 1:
+        comparison_count = 1
+        for matched_genomes in matched_genomes_iterable:
+            print("Comparison matched genome set %s of %s" %(comparison_count,total))
+            yield compare_matched_genomes(matched_genomes)
+            comparison_count += 1
+        return
+
+    workers = parallelize.count_processors(range(total), workers)
+    compared_genomes_dict = {} #Key = index; #Value = compared MatchedGenomes
+    next_index = 0
+    with parallelize.Executor(workers) as executor:
+        results = executor.imap(compare_indexed_genomes,
+                                enumerate(matched_genomes_iterable),
+                                total=total)
+        for index, matched_genomes in results:
+            compared_genomes_dict[index] = matched_genomes
+            while next_index in compared_genomes_dict:
+                yield compared_genomes_dict.pop(next_index)
+                next_index += 1
+
+    #Leave the progress bar line
+    print("\n")
+
+
+#Output the genome and gene data of one set of matched genomes
+def write_matched_genomes(matched_genomes, genome_report_writer, gene_report_writer):
+    """Write the genome report row and gene report rows of matched genomes.
+
+    :param matched_genomes: Compared MySQL, phagesdb and NCBI genomes.
+    :type matched_genomes: MatchedGenomes
+    :param genome_report_writer: csv writer of the genome report.
+    :param gene_report_writer: csv writer of the gene report.
+    """
+
+    genome_data_output = []
+    ph_genome = matched_genomes.get_phamerator_genome()
+    pdb_genome = matched_genomes.get_phagesdb_genome()
+    ncbi_genome = matched_genomes.get_ncbi_genome()
+
+
+
+
+    #Genome summary data
+    genome_data_output.append(ph_genome.get_phage_id())# PhageID
+    genome_data_output.append(matched_genomes.get_contains_errors())# any errors detected in this genome?
+
+    #MySQL data
+    #General genome data
+    genome_data_output.append(ph_genome.get_phage_name())# Name
+    genome_data_output.append(ph_genome.get_search_id())# search_id
+    genome_data_output.append(ph_genome.get_search_name())# search name
+    genome_data_output.append(ph_genome.get_status())# status
+    genome_data_output.append(ph_genome.get_cluster_subcluster())# cluster_subcluster
+    genome_data_output.append(ph_genome.get_host())# Host
+    genome_data_output.append(ph_genome.get_accession())# Accession
+    genome_data_output.append(ph_genome.get_length())# sequence_length
+    genome_data_output.append(ph_genome.get_cds_features_tally())# # genes
+    genome_data_output.append(ph_genome.get_description_tally()) # # genes with descriptions
+    genome_data_output.append(ph_genome.get_ncbi_update_flag())# ncbi_update_flag
+    genome_data_output.append(ph_genome.get_date_last_modified()) # DateLastModified
+    genome_data_output.append(ph_genome.get_annotation_author()) # AnnotationAuthor
+
+
+    #Genome data checks
+    genome_data_output.append(ph_genome.get_nucleotide_errors())# sequence contains std nucleotides?
+    genome_data_output.append(ph_genome.get_cds_features_with_translation_error_tally())# # translations with non-std amino acids
+    genome_data_output.append(ph_genome.get_cds_features_boundary_error_tally())# # genes with non-standard start-stops
+    genome_data_output.append(ph_genome.get_status_description_error())# status-description error
+    genome_data_output.append(ph_genome.get_status_accession_error())# status-accession error
+
+
+    #Phagesdb data
+    if isinstance(pdb_genome,PhagesdbGenome):
+
+        #General genome data
+        genome_data_output.append(pdb_genome.get_phage_name())# Name
+        genome_data_output.append(pdb_genome.get_search_name())# search name
+        genome_data_output.append(pdb_genome.get_cluster())# cluster
+        genome_data_output.append(pdb_genome.get_subcluster())# subcluster
+        genome_data_output.append(pdb_genome.get_host())# Host
+        genome_data_output.append(pdb_genome.get_accession())# Accession
+        genome_data_output.append(pdb_genome.get_length())# sequence_length
+
+        #Genome data checks
+        genome_data_output.append(pdb_genome.get_nucleotide_errors())# sequence contains std nucleotides?
+    else:
+        genome_data_output.extend(['','','','','','','',''])
+
+
+
+    #NCBI data
+    if isinstance(ncbi_genome,NcbiGenome):
+
+        #General genome data
+        genome_data_output.append(ncbi_genome.get_phage_name())# the assigned phage name for this record
+        genome_data_output.append(ncbi_genome.get_search_name())# the assigned search phage name for this record
+        genome_data_output.append(ncbi_genome.get_record_id())# record_id
+        genome_data_output.append(ncbi_genome.get_record_name())# record_name
+        genome_data_output.append(ncbi_genome.get_record_accession())# record_accession
+        genome_data_output.append(ncbi_genome.get_record_description())# record_description
+        genome_data_output.append(ncbi_genome.get_record_source())# record_source
+        genome_data_output.append(ncbi_genome.get_record_organism())# record_organism
+        genome_data_output.append(ncbi_genome.get_source_feature_organism())# source_feature_organism
+        genome_data_output.append(ncbi_genome.get_source_feature_host())# source_feature_host
+        genome_data_output.append(ncbi_genome.get_source_feature_lab_host())# source_feature_lab_host
+        genome_data_output.append(ncbi_genome.get_record_authors())# author list
+        genome_data_output.append(ncbi_genome.get_length())# sequence_length
+        genome_data_output.append(ncbi_genome.get_cds_features_tally())# # genes
+
+
+        #Genome data checks
+        genome_data_output.append(ncbi_genome.get_nucleotide_errors())# sequence contains std nucleotides?
+        genome_data_output.append(ncbi_genome.get_cds_features_with_translation_error_tally())# # translations with non-std amino acids
+        genome_data_output.append(ncbi_genome.get_cds_features_boundary_error_tally())# # genes with non-standard start-stops
+        genome_data_output.append(ncbi_genome.get_product_descriptions_tally())# # genes with product descriptions
+        genome_data_output.append(ncbi_genome.get_function_descriptions_tally())# # genes with function descriptions
+        genome_data_output.append(ncbi_genome.get_note_descriptions_tally())# # genes with notes descriptions
+        genome_data_output.append(ncbi_genome.get_missing_locus_tags_tally())# # genes with missing locus tags
+        genome_data_output.append(ncbi_genome.get_locus_tag_typos_tally())# # genes with locus tag typos
+        genome_data_output.append(ncbi_genome.get_description_field_error_tally())# # genes with descriptions in wrong field
+
+    else:
+        genome_data_output.extend(['','','','','','','','','','',\
+                                    '','','','','','','','','','',\
+                                    '','',''])
+
+    #MySQL-phagesdb checks
+    if isinstance(pdb_genome,PhagesdbGenome):
+        genome_data_output.append(matched_genomes.get_phamerator_phagesdb_sequence_mismatch())# sequence
+        genome_data_output.append(matched_genomes.get_phamerator_phagesdb_sequence_length_mismatch())# sequence length
+        genome_data_output.append(matched_genomes.get_phamerator_phagesdb_cluster_subcluster_mismatch())# cluster_subcluster
+        genome_data_output.append(matched_genomes.get_phamerator_phagesdb_accession_mismatch())# accession
+        genome_data_output.append(matched_genomes.get_phamerator_phagesdb_host_mismatch())# host
+    else:
+        genome_data_output.extend(['','','','',''])
+
+
+    #MySQL-NCBI checks
+    if isinstance(ncbi_genome,NcbiGenome):
+        genome_data_output.append(matched_genomes.get_phamerator_ncbi_sequence_mismatch())# sequence
+        genome_data_output.append(matched_genomes.get_phamerator_ncbi_sequence_length_mismatch())# sequence length
+        genome_data_output.append(matched_genomes.get_ncbi_record_header_fields_phage_name_mismatch())# PhageID or PhageName in record header fields mismatch
+        genome_data_output.append(matched_genomes.get_ncbi_host_mismatch())# Host in record header or source feature mismatch
+        genome_data_output.append(matched_genomes.get_ph_ncbi_author_error())# Author list is missing 'Hatfull'
+        genome_data_output.append(matched_genomes.get_phamerator_ncbi_perfect_matched_features_tally())# # genes perfectly matched
+        genome_data_output.append(matched_genomes.get_phamerator_ncbi_imperfect_matched_features_tally())# # genes imperfectly matched (different start sites)
+        genome_data_output.append(matched_genomes.get_phamerator_features_unmatched_in_ncbi_tally())# # MySQL genes not matched
+        genome_data_output.append(matched_genomes.get_ncbi_features_unmatched_in_phamerator_tally())# # NCBI genes not matched
+        genome_data_output.append(matched_genomes.get_phamerator_ncbi_different_descriptions_tally())# # genes with MySQL descriptions not in NCBI description fields
+        genome_data_output.append(matched_genomes.get_phamerator_ncbi_different_translation_tally())# # genes perfectly matched with different translations
+    else:
+        genome_data_output.extend(['','','','','',\
+                                    '','','','','',''])
+
+    #Number of genes with errors
+    genome_data_output.append(matched_genomes.get_total_number_genes_with_errors())# # genes with at least one error
+
+
+
+    #Output phagesdb-NCBI checks
+    if isinstance(pdb_genome,PhagesdbGenome) and isinstance(ncbi_genome,NcbiGenome):
+        genome_data_output.append(matched_genomes.get_phagesdb_ncbi_sequence_mismatch())# sequence
+        genome_data_output.append(matched_genomes.get_phagesdb_ncbi_sequence_length_mismatch())# sequence length
+    else:
+        genome_data_output.extend(['',''])
+
+    #Gene coordinate conflicts
+    genome_data_output.append(ph_genome.get_cds_features_coordinate_conflict_tally())# # pairs of MySQL genes with conflicting coordinates
+    if isinstance(ncbi_genome,NcbiGenome):
+        genome_data_output.append(ncbi_genome.get_cds_features_coordinate_conflict_tally())# # pairs of NCBI genes with conflicting coordinates
+    else:
+        genome_data_output.append('')
+
+    genome_report_writer.writerow(genome_data_output)
+
+
+    #Once all matched genome data has been outputted, iterate through all matched gene data
+
+
+    perfectly_matched_features = matched_genomes.get_phamerator_ncbi_perfect_matched_features()
+    imperfectly_matched_features = matched_genomes.get_phamerator_ncbi_imperfect_matched_features()
+    ph_unmatched_features = matched_genomes.get_phamerator_features_unmatched_in_ncbi()
+    ncbi_unmatched_features = matched_genomes.get_ncbi_features_unmatched_in_phamerator()
+
+    all_features_list = []
+    all_features_list.extend(perfectly_matched_features)
+    all_features_list.extend(imperfectly_matched_features)
+    all_features_list.extend(ph_unmatched_features)
+    all_features_list.extend(ncbi_unmatched_features)
+
+
+
+    #Iterate through the list of mixed feature objects
+    for mixed_feature_object in all_features_list:
+
+        feature_data_output = [] #Will hold all data for each gene
+
+        #Gene summaries
+        #Add MySQL genome search name to each gene row regardless of the type of CDS data (matched or unmatched)
+        feature_data_output.append(ph_genome.get_search_name())# matched MySQL search name
+        feature_data_output.append(mixed_feature_object.get_total_errors())# total # of errors for this gene
+
+        #Now retrieve specific data
+        if isinstance(mixed_feature_object,MatchedCdsFeatures):
+            phamerator_feature = mixed_feature_object.get_phamerator_feature()
+            ncbi_feature = mixed_feature_object.get_ncbi_feature()
+        else:
+
+            if isinstance(mixed_feature_object,PhameratorCdsFeature):
+                phamerator_feature = mixed_feature_object
+                ncbi_feature = ''
+            elif isinstance(mixed_feature_object,NcbiCdsFeature):
+                phamerator_feature = ''
+                ncbi_feature = mixed_feature_object
+            else:
+                phamerator_feature = ''
+                ncbi_feature = ''
+
+        #MySQL feature
+        if isinstance(phamerator_feature,PhameratorCdsFeature):
+
+            #General gene data
+            feature_data_output.append(phamerator_feature.get_phage_id())# phage_id
+            feature_data_output.append(phamerator_feature.get_search_id())# search_id
+            feature_data_output.append(phamerator_feature.get_type_id())# type_id
+            feature_data_output.append(phamerator_feature.get_gene_id())# gene_id
+            feature_data_output.append(phamerator_feature.get_gene_name())# gene_name
+            feature_data_output.append(phamerator_feature.get_left_boundary())# left boundary
+            feature_data_output.append(phamerator_feature.get_right_boundary())# right boundary
+            feature_data_output.append(phamerator_feature.get_strand())# strand
+            feature_data_output.append(phamerator_feature.get_translation())# translation
+            feature_data_output.append(phamerator_feature.get_translation_length())# translation_length
+            feature_data_output.append(phamerator_feature.get_notes())# notes
+
+            #Gene data checks
+            feature_data_output.append(phamerator_feature.get_amino_acid_errors())# translation contains std amino acids
+            feature_data_output.append(phamerator_feature.get_boundary_error())# contains std start and stop coordinates
+
+        else:
+
+            feature_data_output.extend(['','','','','',\
+                                        '','','','','',\
+                                        '','',''])
+
+
+        #NCBI feature
+        if isinstance(ncbi_feature,NcbiCdsFeature):
+
+            #General gene data
+            feature_data_output.append(ncbi_feature.get_locus_tag())# locus_tag
+            feature_data_output.append(ncbi_feature.get_gene_number())# gene_number
+            feature_data_output.append(ncbi_feature.get_type_id())# type_id
+            feature_data_output.append(ncbi_feature.get_left_boundary())# left boundary
+            feature_data_output.append(ncbi_feature.get_right_boundary())# right boundary
+            feature_data_output.append(ncbi_feature.get_strand())# strand
+            feature_data_output.append(ncbi_feature.get_translation())# translation
+            feature_data_output.append(ncbi_feature.get_translation_length())# translation_length
+            feature_data_output.append(ncbi_feature.get_product_description())# product description
+            feature_data_output.append(ncbi_feature.get_function_description())# function description
+            feature_data_output.append(ncbi_feature.get_note_description())# note description
+
+            #Gene data checks
+            feature_data_output.append(ncbi_feature.get_amino_acid_errors())# translation contains std amino acids
+            feature_data_output.append(ncbi_feature.get_boundary_error())# contains std start and stop coordinates
+            feature_data_output.append(ncbi_feature.get_locus_tag_missing())# missing locus tag
+            feature_data_output.append(ncbi_feature.get_locus_tag_typo())# locus tag typo
+            feature_data_output.append(ncbi_feature.get_description_field_error())# description in function or note but not product
+
+
+        else:
+            feature_data_output.extend(['','','','','',\
+                                        '','','','','',\
+                                        '','','','','',''])
+
+
+        #MySQL-NCBI checks
+        if isinstance(mixed_feature_object,MatchedCdsFeatures):
+
+            #If this is a matched cds feature, both MySQL and ncbi features should have identical unmatched_error value.
+            feature_data_output.append(mixed_feature_object.get_phamerator_feature().get_unmatched_error())
+
+            feature_data_output.append(mixed_feature_object.get_phamerator_ncbi_different_descriptions())# MySQL description in product, function, or note description
+            feature_data_output.append(mixed_feature_object.get_phamerator_ncbi_different_start_sites())# same start site
+            feature_data_output.append(mixed_feature_object.get_phamerator_ncbi_different_translations())# same translation
+        else:
+            feature_data_output.append(mixed_feature_object.get_unmatched_error())
+            feature_data_output.extend(['','',''])
+
+
+        gene_report_writer.writerow(feature_data_output)
+
+
 def parse_args(unparsed_args_list):
     """Verify the correct arguments are selected for comparing databases."""
 
@@ -1746,12 +2378,15 @@ def parse_args(unparsed_args_list):
     DATABASE_HELP = "Name of the MySQL database from which to compare data."
     OUTPUT_FOLDER_HELP = ("Path to the folder to store results.")
     NCBI_CRED_FILE_HELP = ("Path to the file containing NCBI credentials.")
+    WORKERS_HELP = ("Number of processes used to compare matched genomes.")
 
     parser = argparse.ArgumentParser(description=COMPARE_HELP)
     parser.add_argument("database", type=str, help=DATABASE_HELP)
     parser.add_argument("output_folder", type=pathlib.Path, help=OUTPUT_FOLDER_HELP)
     parser.add_argument("-c", "--ncbi_credentials_file", type=pathlib.Path,
         help=NCBI_CRED_FILE_HELP)
+    parser.add_argument("-w", "--workers", type=int, default=1,
+        help=WORKERS_HELP)
 
     # Assumed command line arg structure:
     # python3 -m pdm_utils <pipeline> <additional args...>
@@ -2032,7 +2667,7 @@ def main(unparsed_args_list):
 
 
     #Retrieve database version
-    #Retrieve current genome data in database
+    #Genome data streamed from the database (PHAGE_QUERY)
     #0 = PhageID
     #1 = Name
     #2 = HostGenus
@@ -2045,7 +2680,7 @@ def main(unparsed_args_list):
     #9 = DateLastModified
     #10 = annotation authorship
 
-    #Retrieve current gene data in database
+    #Gene data streamed from the database (GENE_QUERY)
     #0 = PhageID
     #1 = GeneID
     #2 = Name
@@ -2055,41 +2690,34 @@ def main(unparsed_args_list):
     #6 = Translation
     #7 = Notes
 
+    #Both connections keep a snapshot of the database taken now, so the
+    #phage and gene tables streamed later contain the same genomes as
+    #ph_genome_list, even if the database is changed in the meantime.
     try:
-        con = pms.connect("localhost", username, password, database)
-        # con = mdb.connect(mysqlhost, username, password, database)
-        con.autocommit(False)
+        con = connect_mysql_snapshot(username, password, database)
+        gene_con = connect_mysql_snapshot(username, password, database)
         cur = con.cursor()
     except pms.err.Error as err:
         print("Error connecting to MySQL database")
         print("Error {}: {}".format(err.args[0], err.args[1]))
         sys.exit(1)
 
+    #Only retrieve the fields needed to match genomes here. Sequences and
+    #genes are streamed one genome at a time when genomes are compared.
     try:
-        cur.execute("START TRANSACTION")
         cur.execute("SELECT Version FROM version")
         ph_version = str(cur.fetchone()[0])
-        cur.execute("SELECT PhageID,Name,HostGenus,Sequence,Length,\
-                            Status,Cluster,Accession,RetrieveRecord,\
-                            DateLastModified,AnnotationAuthor FROM phage")
+        cur.execute("SELECT PhageID,Name,Status,Accession,AnnotationAuthor FROM phage ORDER BY BINARY PhageID")
         ph_genome_data_tuples = cur.fetchall()
-        cur.execute("SELECT PhageID,GeneID,Name,Start,Stop,Orientation,Translation,Notes from gene")
-        ph_gene_data_tuples = cur.fetchall()
-        cur.execute("COMMIT")
         cur.close()
-        con.autocommit(True)
 
     except:
         mdb_exit("\nUnable to access the database to retrieve genome information.\nNo changes have been made to the database.")
 
-    con.close()
-
 
 
     print('\n\nPreparing genome data sets from the MySQL database...')
-    ph_genome_count = 1
-    processed_ph_genome_count = 0 #May not be equal to ph_genome_count
-    ph_genome_object_dict = {} #Key = PhageID; #Value = genome_object
+    ph_genome_list = [] #MySQL genomes without sequence or gene data
     ph_search_name_set = set()
     ph_search_name_duplicate_set = set()
     ph_accession_set = set()
@@ -2098,27 +2726,19 @@ def main(unparsed_args_list):
 
     #Iterate through each MySQL genome and create a genome object
     for genome_tuple in ph_genome_data_tuples:
-        print("Processing MySQL genome %s out of %s" \
-                %(ph_genome_count,ph_total_genome_count))
 
         #Check to see if the genome has a user-selected status and authorship
-        if genome_tuple[5] not in valid_genome_status_set or \
-            genome_tuple[10] not in valid_genome_author_set:
+        if genome_tuple[2] not in valid_genome_status_set or \
+            genome_tuple[4] not in valid_genome_author_set:
             continue
         else:
             genome_object = PhameratorGenome()
             genome_object.set_phage_id(genome_tuple[0])
             genome_object.set_phage_name(genome_tuple[1])
-            genome_object.set_host(genome_tuple[2])
-            genome_object.set_sequence(genome_tuple[3].decode("utf-8"))
-            genome_object.set_accession(genome_tuple[7]) #Set accession before status
-            genome_object.set_status(genome_tuple[5])
-            genome_object.set_cluster_subcluster(genome_tuple[6])
-            genome_object.set_ncbi_update_flag(genome_tuple[8])
-            genome_object.set_date_last_modified(genome_tuple[9])
-            genome_object.set_annotation_author(genome_tuple[10])
-            genome_object.compute_nucleotide_errors(dna_alphabet_set)
-            ph_genome_object_dict[genome_tuple[0]] = genome_object
+            genome_object.set_accession(genome_tuple[3]) #Set accession before status
+            genome_object.set_status(genome_tuple[2])
+            genome_object.set_annotation_author(genome_tuple[4])
+            ph_genome_list.append(genome_object)
 
             #This keeps track of whether there are duplicate phage names that will be used
             #to match up to phagesdb data.
@@ -2134,28 +2754,6 @@ def main(unparsed_args_list):
                     ph_accession_duplicate_set.add(genome_object.get_accession())
                 else:
                     ph_accession_set.add(genome_object.get_accession())
-            ph_genome_count += 1
-            processed_ph_genome_count += 1
-            #Currently, the processed_ph_genome_count variable does not appear to be used.
-
-
-            #If selected by user, save retrieved record to file
-            if save_phamerator_records == 'yes':
-
-                #To output a fasta file, a Biopython SeqRecord must be created first
-                phamerator_fasta_seqrecord = SeqRecord(Seq(genome_object.get_sequence()),\
-                                            id=genome_object.get_search_name(),\
-                                            description='')
-
-                #Create unique filename
-                phamerator_fasta_seqrecord_path = create_unique_filename(\
-                                                    phamerator_output_path,
-                                                    genome_object.get_search_name(),
-                                                    '.fasta')
-                #Output the fasta file
-                SeqIO.write(phamerator_fasta_seqrecord,\
-                                    phamerator_fasta_seqrecord_path,\
-                                    'fasta')
 
 
 
@@ -2191,57 +2789,6 @@ def main(unparsed_args_list):
 
 
 
-    print('\n\nPreparing gene data sets from the MySQL database...')
-    ph_gene_count = 1
-    ph_gene_objects_list = []
-    ph_gene_data_phage_id_set = set()
-    ph_total_gene_count = len(ph_gene_data_tuples)
-
-    for gene_tuple in ph_gene_data_tuples:
-        print("Processing MySQL gene %s of %s" %(ph_gene_count,ph_total_gene_count))
-        ph_gene_data_phage_id_set.add(gene_tuple[0])
-
-        gene_object = PhameratorCdsFeature()
-        gene_object.set_phage_id(gene_tuple[0])
-        gene_object.set_gene_id(gene_tuple[1])
-        gene_object.set_gene_name(gene_tuple[2])
-        gene_object.set_type_id('CDS')
-        gene_object.set_left_boundary(gene_tuple[3])
-        gene_object.set_right_boundary(gene_tuple[4])
-        gene_object.set_strand(gene_tuple[5])
-        gene_object.set_translation(gene_tuple[6])
-
-        gene_object_description, gene_object_search_description = retrieve_description(gene_tuple[7].decode("utf-8"))
-        gene_object.set_notes(gene_object_description, gene_object_search_description)
-
-
-        gene_object.compute_amino_acid_errors(protein_alphabet_set)
-        gene_object.set_start_end_strand_id()
-        gene_object.compute_boundary_error()
-
-        ph_gene_objects_list.append(gene_object)
-        ph_gene_count += 1
-
-
-    #ph_gene_objects_dict = {} #Key = PhageID; #Value = list of gene objects
-    print('Matching gene and genome data sets from the MySQL database...')
-    ph_match_count = 1
-    ph_total_match_count = len(ph_genome_object_dict.keys())
-    for phage_id in ph_genome_object_dict.keys():
-        print("Matching gene data for genome %s of %s" %(ph_match_count,ph_total_match_count))
-        genome_object = ph_genome_object_dict[phage_id]
-        new_gene_object_list = []
-        for gene_object in ph_gene_objects_list:
-            if gene_object.get_phage_id() == phage_id:
-                new_gene_object_list.append(gene_object)
-
-        genome_object.set_cds_features(new_gene_object_list)
-        genome_object.compute_cds_feature_errors()
-        genome_object.compute_status_description_error()
-        ph_match_count += 1
-
-
-
 
 
 
@@ -2276,6 +2823,22 @@ def main(unparsed_args_list):
 
         pdb_total_genome_count = len(pdb_sequenced_phages_dict['results'])
 
+        #Retrieve all fasta files concurrently before processing each genome
+        print("Retrieving fasta files from phagesdb...")
+        fastafile_urls = [element_dict['fasta_file']
+                          for element_dict in pdb_sequenced_phages_dict['results']
+                          if element_dict['fasta_file'] is not None]
+        fastafile_dict = phagesdb.retrieve_urls(fastafile_urls)
+
+        #A fasta file that could not be retrieved would be compared as an
+        #empty sequence and reported as a sequence mismatch, so stop instead
+        failed_fastafile_urls = [url for url in fastafile_dict.keys()
+                                 if fastafile_dict[url] == ""]
+        if len(failed_fastafile_urls) > 0:
+            print("\nUnable to retrieve %s fasta files from phagesdb."
+                  % len(failed_fastafile_urls))
+            sys.exit(1)
+
         for element_dict in pdb_sequenced_phages_dict['results']:
             print("Processing phagesdb genome %s of %s" %(pdb_genome_count,pdb_total_genome_count))
 
@@ -2303,14 +2866,7 @@ def main(unparsed_args_list):
             if element_dict['fasta_file'] is not None:
                 fastafile_url = element_dict['fasta_file']
 
-                # response = urllib2.urlopen(fastafile_url)
-                # retrieved_fasta_file = response.read()
-                # response.close()
-
-                request = urllib.request.Request(fastafile_url)
-                with urllib.request.urlopen(request) as response:
-                    retrieved_fasta_file = response.read()
-                    retrieved_fasta_file = retrieved_fasta_file.decode("utf-8")
+                retrieved_fasta_file = fastafile_dict[fastafile_url]
 
                 #All sequence rows in the fasta file may not have equal widths, so some processing of the data is required
                 #If you split by newline, the header is retained in the first list element
@@ -2705,62 +3261,22 @@ def main(unparsed_args_list):
 
 
 
-    #Now that all NCBI and phagesdb data is retrieved, match up to MySQL genome data
+    #Now that all NCBI and phagesdb data is retrieved, identify the MySQL
+    #genomes that cannot be matched
     print("Matching phagesdb and NCBI genomes to MySQL genomes...")
-    matched_genomes_list = [] #Will store a list of MatchedGenomes objects
     ph_unmatched_to_pdb_genomes = [] #List of the MySQL genome objects with no phagesdb matches
     ph_unmatched_to_ncbi_genomes = [] #List of the MySQL genome objects with no NCBI matches
-    matched_genome_count = 1
-    matched_total_genome_count = len(ph_genome_object_dict.keys())
-    #Iterate through each phage in the MySQL database
-    for phage_id in ph_genome_object_dict.keys():
-
-        print("Matching genome %s of %s" %(matched_genome_count,matched_total_genome_count))
-
-        phamerator_genome = ph_genome_object_dict[phage_id]
-        matched_objects = MatchedGenomes()
-        matched_objects.set_phamerator_genome(phamerator_genome)
-
-        #Match up phagesdb genome
-        #First try to match up the phageID, and if that doesn't work, try to match up the phageName
-        if phamerator_genome.get_search_id() in pdb_genome_dict.keys():
-            pdb_genome = pdb_genome_dict[phamerator_genome.get_search_id()]
-            #Make sure the pdb_genome doesn't have a search name that was duplicated
-            if pdb_genome.get_search_name() in pdb_search_name_duplicate_set:
-                pdb_genome = ''
-
-        elif phamerator_genome.get_search_name() in pdb_genome_dict.keys() and not \
-            phamerator_genome.get_search_name() in ph_search_name_duplicate_set:
-
-            pdb_genome = pdb_genome_dict[phamerator_genome.get_search_name()]
-            #Make sure the pdb_genome doesn't have a search name that was duplicated
-            if pdb_genome.get_search_name in pdb_search_name_duplicate_set:
-                pdb_genome = ''
-
-        else:
-            pdb_genome = ''
+    for phamerator_genome in ph_genome_list:
+        matched_objects, pdb_unmatched, ncbi_unmatched = match_genomes(
+                            phamerator_genome, pdb_genome_dict,
+                            pdb_search_name_duplicate_set,
+                            ph_search_name_duplicate_set,
+                            ncbi_genome_dict, ph_accession_duplicate_set)
+        if pdb_unmatched:
             ph_unmatched_to_pdb_genomes.append(phamerator_genome)
-
-        matched_objects.set_phagesdb_genome(pdb_genome)
-
-        #Now match up NCBI genome
-        if phamerator_genome.get_accession() != '' and \
-            phamerator_genome.get_accession() not in ph_accession_duplicate_set:
-                #Retrieval of record may have failed
-                try:
-                    ncbi_genome = ncbi_genome_dict[phamerator_genome.get_accession()]
-                except:
-                    ncbi_genome = ''
-                    ph_unmatched_to_ncbi_genomes.append(phamerator_genome)
-
-        else:
-            ncbi_genome = ''
+        if ncbi_unmatched:
             ph_unmatched_to_ncbi_genomes.append(phamerator_genome)
 
-        matched_objects.set_ncbi_genome(ncbi_genome)
-        matched_genomes_list.append(matched_objects)
-        matched_genome_count += 1
-
 
     #Output unmatched data to file
     unmatched_genome_output_fh = open(os.path.join(main_output_path,date + '_database_comparison_unmatched_genomes.csv'), 'w')
@@ -2799,38 +3315,6 @@ def main(unparsed_args_list):
 
 
 
-    #Now that all genomes have been matched, iterate through each matched objects
-    #and run methods to compare the genomes
-    print("Comparing matched genomes and identifying inconsistencies...")
-    comparison_count = 1
-    comparison_total_count = len(matched_genomes_list)
-    for matched_genome_object in matched_genomes_list:
-        print("Comparison matched genome set %s of %s" %(comparison_count,comparison_total_count))
-        matched_genome_object.compare_phamerator_ncbi_genomes() #This method automatically calls method to match and compare cds features
-        matched_genome_object.compare_phamerator_phagesdb_genomes()
-        matched_genome_object.compare_phagesdb_ncbi_genomes()
-        matched_genome_object.compute_total_genome_errors()
-        comparison_count += 1
-
-    #Now that all individual matched_genome_objects have all computed attributes,
-    #compute database summary
-    summary_object = DatabaseSummary(matched_genomes_list)
-    summary_object.compute_summary()
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
     #Now output results
     print("Outputting results to file...")
     #Open files to record update information
@@ -3064,7 +3548,12 @@ def main(unparsed_args_list):
 
         #phagesdb-ncbi
         'pdb_ncbi_dna_seq_error',\
-        'pdb_ncbi_dna_seq_length_error']
+        'pdb_ncbi_dna_seq_length_error',\
+
+        #Gene coordinate conflicts are reported last, so that the
+        #position of all other columns is unchanged.
+        'ph_gene_coords_conflict_tally',\
+        'ncbi_gene_coords_conflict_tally']
     genome_report_writer.writerow(genome_report_column_headers)
 
 
@@ -3141,6 +3630,44 @@ def main(unparsed_args_list):
 
 
 
+    #Now stream each MySQL genome, then match it, compare it and output it.
+    #All MySQL genomes are stored in a MatchedGenomes object, even if there are no phagesdb or NCBI matches.
+    #All but a few MySQL phages should be matched to phagesdb
+    #Only ~half of MySQL phages should be matched to NCBI
+    print("Comparing matched genomes and identifying inconsistencies...")
+    summary_object = DatabaseSummary([])
+    if save_phamerator_records == 'yes':
+        ph_records_path = phamerator_output_path
+    else:
+        ph_records_path = None
+
+    mysql_genome_data = stream_mysql_genome_data(con, gene_con)
+    ph_genomes = iter_phamerator_genomes(mysql_genome_data,
+                                         valid_genome_status_set,
+                                         valid_genome_author_set,
+                                         dna_alphabet_set,
+                                         protein_alphabet_set,
+                                         ph_total_genome_count,
+                                         output_path=ph_records_path)
+    matched_genomes_iter = (match_genomes(phamerator_genome, pdb_genome_dict,
+                                          pdb_search_name_duplicate_set,
+                                          ph_search_name_duplicate_set,
+                                          ncbi_genome_dict,
+                                          ph_accession_duplicate_set)[0]
+                            for phamerator_genome in ph_genomes)
+
+    #The phage table is streamed from the same snapshot as ph_genome_list
+    #and is filtered in the same way, so every genome in ph_genome_list,
+    #and only those genomes, is compared.
+    for matched_genomes in iter_compared_genomes(matched_genomes_iter,
+                                                 len(ph_genome_list),
+                                                 workers=args.workers):
+        summary_object.add_matched_genomes(matched_genomes)
+        write_matched_genomes(matched_genomes, genome_report_writer,
+                              gene_report_writer)
+
+
+
     #Output all data to file
 
     summary_data_output = []
@@ -3253,263 +3780,6 @@ def main(unparsed_args_list):
 
 
 
-    #Now iterate through matched objects.
-    #All MySQL genomes are stored in a MatchedGenomes object, even if there are no phagesdb or NCBI matches.
-    #All but a few MySQL phages should be matched to phagesdb
-    #Only ~half of MySQL phages should be matched to NCBI
-    for matched_genomes in summary_object.get_matched_genomes_list():
-
-        genome_data_output = []
-        ph_genome = matched_genomes.get_phamerator_genome()
-        pdb_genome = matched_genomes.get_phagesdb_genome()
-        ncbi_genome = matched_genomes.get_ncbi_genome()
-
-
-
-
-        #Genome summary data
-        genome_data_output.append(ph_genome.get_phage_id())# PhageID
-        genome_data_output.append(matched_genomes.get_contains_errors())# any errors detected in this genome?
-
-        #MySQL data
-        #General genome data
-        genome_data_output.append(ph_genome.get_phage_name())# Name
-        genome_data_output.append(ph_genome.get_search_id())# search_id
-        genome_data_output.append(ph_genome.get_search_name())# search name
-        genome_data_output.append(ph_genome.get_status())# status
-        genome_data_output.append(ph_genome.get_cluster_subcluster())# cluster_subcluster
-        genome_data_output.append(ph_genome.get_host())# Host
-        genome_data_output.append(ph_genome.get_accession())# Accession
-        genome_data_output.append(ph_genome.get_length())# sequence_length
-        genome_data_output.append(ph_genome.get_cds_features_tally())# # genes
-        genome_data_output.append(ph_genome.get_description_tally()) # # genes with descriptions
-        genome_data_output.append(ph_genome.get_ncbi_update_flag())# ncbi_update_flag
-        genome_data_output.append(ph_genome.get_date_last_modified()) # DateLastModified
-        genome_data_output.append(ph_genome.get_annotation_author()) # AnnotationAuthor
-
-
-        #Genome data checks
-        genome_data_output.append(ph_genome.get_nucleotide_errors())# sequence contains std nucleotides?
-        genome_data_output.append(ph_genome.get_cds_features_with_translation_error_tally())# # translations with non-std amino acids
-        genome_data_output.append(ph_genome.get_cds_features_boundary_error_tally())# # genes with non-standard start-stops
-        genome_data_output.append(ph_genome.get_status_description_error())# status-description error
-        genome_data_output.append(ph_genome.get_status_accession_error())# status-accession error
-
-
-        #Phagesdb data
-        if isinstance(pdb_genome,PhagesdbGenome):
-
-            #General genome data
-            genome_data_output.append(pdb_genome.get_phage_name())# Name
-            genome_data_output.append(pdb_genome.get_search_name())# search name
-            genome_data_output.append(pdb_genome.get_cluster())# cluster
-            genome_data_output.append(pdb_genome.get_subcluster())# subcluster
-            genome_data_output.append(pdb_genome.get_host())# Host
-            genome_data_output.append(pdb_genome.get_accession())# Accession
-            genome_data_output.append(pdb_genome.get_length())# sequence_length
-
-            #Genome data checks
-            genome_data_output.append(pdb_genome.get_nucleotide_errors())# sequence contains std nucleotides?
-        else:
-            genome_data_output.extend(['','','','','','','',''])
-
-
-
-        #NCBI data
-        if isinstance(ncbi_genome,NcbiGenome):
-
-            #General genome data
-            genome_data_output.append(ncbi_genome.get_phage_name())# the assigned phage name for this record
-            genome_data_output.append(ncbi_genome.get_search_name())# the assigned search phage name for this record
-            genome_data_output.append(ncbi_genome.get_record_id())# record_id
-            genome_data_output.append(ncbi_genome.get_record_name())# record_name
-            genome_data_output.append(ncbi_genome.get_record_accession())# record_accession
-            genome_data_output.append(ncbi_genome.get_record_description())# record_description
-            genome_data_output.append(ncbi_genome.get_record_source())# record_source
-            genome_data_output.append(ncbi_genome.get_record_organism())# record_organism
-            genome_data_output.append(ncbi_genome.get_source_feature_organism())# source_feature_organism
-            genome_data_output.append(ncbi_genome.get_source_feature_host())# source_feature_host
-            genome_data_output.append(ncbi_genome.get_source_feature_lab_host())# source_feature_lab_host
-            genome_data_output.append(ncbi_genome.get_record_authors())# author list
-            genome_data_output.append(ncbi_genome.get_length())# sequence_length
-            genome_data_output.append(ncbi_genome.get_cds_features_tally())# # genes
-
-
-            #Genome data checks
-            genome_data_output.append(ncbi_genome.get_nucleotide_errors())# sequence contains std nucleotides?
-            genome_data_output.append(ncbi_genome.get_cds_features_with_translation_error_tally())# # translations with non-std amino acids
-            genome_data_output.append(ncbi_genome.get_cds_features_boundary_error_tally())# # genes with non-standard start-stops
-            genome_data_output.append(ncbi_genome.get_product_descriptions_tally())# # genes with product descriptions
-            genome_data_output.append(ncbi_genome.get_function_descriptions_tally())# # genes with function descriptions
-            genome_data_output.append(ncbi_genome.get_note_descriptions_tally())# # genes with notes descriptions
-            genome_data_output.append(ncbi_genome.get_missing_locus_tags_tally())# # genes with missing locus tags
-            genome_data_output.append(ncbi_genome.get_locus_tag_typos_tally())# # genes with locus tag typos
-            genome_data_output.append(ncbi_genome.get_description_field_error_tally())# # genes with descriptions in wrong field
-
-        else:
-            genome_data_output.extend(['','','','','','','','','','',\
-                                        '','','','','','','','','','',\
-                                        '','',''])
-
-        #MySQL-phagesdb checks
-        if isinstance(pdb_genome,PhagesdbGenome):
-            genome_data_output.append(matched_genomes.get_phamerator_phagesdb_sequence_mismatch())# sequence
-            genome_data_output.append(matched_genomes.get_phamerator_phagesdb_sequence_length_mismatch())# sequence length
-            genome_data_output.append(matched_genomes.get_phamerator_phagesdb_cluster_subcluster_mismatch())# cluster_subcluster
-            genome_data_output.append(matched_genomes.get_phamerator_phagesdb_accession_mismatch())# accession
-            genome_data_output.append(matched_genomes.get_phamerator_phagesdb_host_mismatch())# host
-        else:
-            genome_data_output.extend(['','','','',''])
-
-
-        #MySQL-NCBI checks
-        if isinstance(ncbi_genome,NcbiGenome):
-            genome_data_output.append(matched_genomes.get_phamerator_ncbi_sequence_mismatch())# sequence
-            genome_data_output.append(matched_genomes.get_phamerator_ncbi_sequence_length_mismatch())# sequence length
-            genome_data_output.append(matched_genomes.get_ncbi_record_header_fields_phage_name_mismatch())# PhageID or PhageName in record header fields mismatch
-            genome_data_output.append(matched_genomes.get_ncbi_host_mismatch())# Host in record header or source feature mismatch
-            genome_data_output.append(matched_genomes.get_ph_ncbi_author_error())# Author list is missing 'Hatfull'
-            genome_data_output.append(matched_genomes.get_phamerator_ncbi_perfect_matched_features_tally())# # genes perfectly matched
-            genome_data_output.append(matched_genomes.get_phamerator_ncbi_imperfect_matched_features_tally())# # genes imperfectly matched (different start sites)
-            genome_data_output.append(matched_genomes.get_phamerator_features_unmatched_in_ncbi_tally())# # MySQL genes not matched
-            genome_data_output.append(matched_genomes.get_ncbi_features_unmatched_in_phamerator_tally())# # NCBI genes not matched
-            genome_data_output.append(matched_genomes.get_phamerator_ncbi_different_descriptions_tally())# # genes with MySQL descriptions not in NCBI description fields
-            genome_data_output.append(matched_genomes.get_phamerator_ncbi_different_translation_tally())# # genes perfectly matched with different translations
-        else:
-            genome_data_output.extend(['','','','','',\
-                                        '','','','','',''])
-
-        #Number of genes with errors
-        genome_data_output.append(matched_genomes.get_total_number_genes_with_errors())# # genes with at least one error
-
-
-
-        #Output phagesdb-NCBI checks
-        if isinstance(pdb_genome,PhagesdbGenome) and isinstance(ncbi_genome,NcbiGenome):
-            genome_data_output.append(matched_genomes.get_phagesdb_ncbi_sequence_mismatch())# sequence
-            genome_data_output.append(matched_genomes.get_phagesdb_ncbi_sequence_length_mismatch())# sequence length
-        else:
-            genome_data_output.extend(['',''])
-
-        genome_report_writer.writerow(genome_data_output)
-
-
-        #Once all matched genome data has been outputted, iterate through all matched gene data
-
-
-        perfectly_matched_features = matched_genomes.get_phamerator_ncbi_perfect_matched_features()
-        imperfectly_matched_features = matched_genomes.get_phamerator_ncbi_imperfect_matched_features()
-        ph_unmatched_features = matched_genomes.get_phamerator_features_unmatched_in_ncbi()
-        ncbi_unmatched_features = matched_genomes.get_ncbi_features_unmatched_in_phamerator()
-
-        all_features_list = []
-        all_features_list.extend(perfectly_matched_features)
-        all_features_list.extend(imperfectly_matched_features)
-        all_features_list.extend(ph_unmatched_features)
-        all_features_list.extend(ncbi_unmatched_features)
-
-
-
-        #Iterate through the list of mixed feature objects
-        for mixed_feature_object in all_features_list:
-
-            feature_data_output = [] #Will hold all data for each gene
-
-            #Gene summaries
-            #Add MySQL genome search name to each gene row regardless of the type of CDS data (matched or unmatched)
-            feature_data_output.append(ph_genome.get_search_name())# matched MySQL search name
-            feature_data_output.append(mixed_feature_object.get_total_errors())# total # of errors for this gene
-
-            #Now retrieve specific data
-            if isinstance(mixed_feature_object,MatchedCdsFeatures):
-                phamerator_feature = mixed_feature_object.get_phamerator_feature()
-                ncbi_feature = mixed_feature_object.get_ncbi_feature()
-            else:
-
-                if isinstance(mixed_feature_object,PhameratorCdsFeature):
-                    phamerator_feature = mixed_feature_object
-                    ncbi_feature = ''
-                elif isinstance(mixed_feature_object,NcbiCdsFeature):
-                    phamerator_feature = ''
-                    ncbi_feature = mixed_feature_object
-                else:
-                    phamerator_feature = ''
-                    ncbi_feature = ''
-
-            #MySQL feature
-            if isinstance(phamerator_feature,PhameratorCdsFeature):
-
-                #General gene data
-                feature_data_output.append(phamerator_feature.get_phage_id())# phage_id
-                feature_data_output.append(phamerator_feature.get_search_id())# search_id
-                feature_data_output.append(phamerator_feature.get_type_id())# type_id
-                feature_data_output.append(phamerator_feature.get_gene_id())# gene_id
-                feature_data_output.append(phamerator_feature.get_gene_name())# gene_name
-                feature_data_output.append(phamerator_feature.get_left_boundary())# left boundary
-                feature_data_output.append(phamerator_feature.get_right_boundary())# right boundary
-                feature_data_output.append(phamerator_feature.get_strand())# strand
-                feature_data_output.append(phamerator_feature.get_translation())# translation
-                feature_data_output.append(phamerator_feature.get_translation_length())# translation_length
-                feature_data_output.append(phamerator_feature.get_notes())# notes
-
-                #Gene data checks
-                feature_data_output.append(phamerator_feature.get_amino_acid_errors())# translation contains std amino acids
-                feature_data_output.append(phamerator_feature.get_boundary_error())# contains std start and stop coordinates
-
-            else:
-
-                feature_data_output.extend(['','','','','',\
-                                            '','','','','',\
-                                            '','',''])
-
-
-            #NCBI feature
-            if isinstance(ncbi_feature,NcbiCdsFeature):
-
-                #General gene data
-                feature_data_output.append(ncbi_feature.get_locus_tag())# locus_tag
-                feature_data_output.append(ncbi_feature.get_gene_number())# gene_number
-                feature_data_output.append(ncbi_feature.get_type_id())# type_id
-                feature_data_output.append(ncbi_feature.get_left_boundary())# left boundary
-                feature_data_output.append(ncbi_feature.get_right_boundary())# right boundary
-                feature_data_output.append(ncbi_feature.get_strand())# strand
-                feature_data_output.append(ncbi_feature.get_translation())# translation
-                feature_data_output.append(ncbi_feature.get_translation_length())# translation_length
-                feature_data_output.append(ncbi_feature.get_product_description())# product description
-                feature_data_output.append(ncbi_feature.get_function_description())# function description
-                feature_data_output.append(ncbi_feature.get_note_description())# note description
-
-                #Gene data checks
-                feature_data_output.append(ncbi_feature.get_amino_acid_errors())# translation contains std amino acids
-                feature_data_output.append(ncbi_feature.get_boundary_error())# contains std start and stop coordinates
-                feature_data_output.append(ncbi_feature.get_locus_tag_missing())# missing locus tag
-                feature_data_output.append(ncbi_feature.get_locus_tag_typo())# locus tag typo
-                feature_data_output.append(ncbi_feature.get_description_field_error())# description in function or note but not product
-
-
-            else:
-                feature_data_output.extend(['','','','','',\
-                                            '','','','','',\
-                                            '','','','','',''])
-
-
-            #MySQL-NCBI checks
-            if isinstance(mixed_feature_object,MatchedCdsFeatures):
-
-                #If this is a matched cds feature, both MySQL and ncbi features should have identical unmatched_error value.
-                feature_data_output.append(mixed_feature_object.get_phamerator_feature().get_unmatched_error())
-
-                feature_data_output.append(mixed_feature_object.get_phamerator_ncbi_different_descriptions())# MySQL description in product, function, or note description
-                feature_data_output.append(mixed_feature_object.get_phamerator_ncbi_different_start_sites())# same start site
-                feature_data_output.append(mixed_feature_object.get_phamerator_ncbi_different_translations())# same translation
-            else:
-                feature_data_output.append(mixed_feature_object.get_unmatched_error())
-                feature_data_output.extend(['','',''])
-
-
-            gene_report_writer.writerow(feature_data_output)
-
-
 
 
 
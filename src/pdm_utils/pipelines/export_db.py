@@ -23,6 +23,7 @@ from pdm_utils.classes.filter import Filter
 from pdm_utils.functions import basic
 from pdm_utils.functions import flat_files
 from pdm_utils.functions import mysqldb
+from pdm_utils.functions import parallelize
 from pdm_utils.functions import parsing
 from pdm_utils.functions import querying
 
@@ -38,6 +39,12 @@ BIOPYTHON_CHOICES = ["gb", "fasta", "clustal", "fasta-2line", "nexus",
 # Biopython formats that are not writable
 # BIOPYTHON_CHOICES_NOT_WRITABLE = ["ig"]
 
+# Number of genomes retrieved from the database and written at a time
+# during formatted file export.
+BATCH_SIZE = 20
+# Number of rows fetched from the database at a time during csv export.
+CHUNK_SIZE = 10000
+
 def run_export(unparsed_args_list):
     """Uses parsed args to run the entirety of the file export pipeline.
 
@@ -83,7 +90,11 @@ def run_export(unparsed_args_list):
                             values=values, verbose=args.verbose,
                             csv_export=csvx, ffile_export=ffx, db_export=dbx,
                             table=args.table,
-                            filters=filters, groups=groups)
+                            filters=filters, groups=groups,
+                            batch_size=args.batch_size,
+                            workers=args.workers,
+                            columns=args.columns,
+                            compress=args.compress)
     else:
         pass
 
@@ -162,6 +173,24 @@ def parse_export(unparsed_args_list):
     FILE_FORMAT_HELP = """
         Positional argument specifying the format of the file to export
         """
+    BATCH_SIZE_HELP = """
+        Formatted file export option to change the number of genomes
+        retrieved from the database and written at a time.
+            Follow selection argument with the number of genomes.
+        """
+    COLUMNS_HELP = """
+        Csv export option to select a subset of columns from the table.
+            Follow selection argument with space separated
+            names of columns in the table.
+        """
+    COMPRESS_HELP = """
+        Csv export option to compress the exported file with gzip.
+        """
+    WORKERS_HELP = """
+        Formatted file export option to convert and write
+        batches of genomes in parallel.
+            Follow selection argument with the number of processes.
+        """
     export_options = BIOPYTHON_CHOICES + ["csv", "sql"]
 
     selection_parser = argparse.ArgumentParser()
@@ -202,6 +231,18 @@ def parse_export(unparsed_args_list):
                                 help=GROUPS_HELP,
                                 dest="groups")
 
+    if export.pipeline == "csv":
+        parser.add_argument("-c", "--columns", nargs="*",
+                                help=COLUMNS_HELP)
+        parser.add_argument("-z", "--compress", action="store_true",
+                                help=COMPRESS_HELP)
+
+    if export.pipeline in BIOPYTHON_CHOICES:
+        parser.add_argument("-b", "--batch_size", type=int,
+                                help=BATCH_SIZE_HELP)
+        parser.add_argument("-w", "--workers", type=int,
+                                help=WORKERS_HELP)
+
     date = time.strftime("%Y%m%d")
     default_folder_name = f"{date}_export"
     default_folder_path = Path.cwd()
@@ -211,6 +252,8 @@ def parse_export(unparsed_args_list):
                         verbose=False, input=[],
                         pipeline=export.pipeline,
                         table="phage", filters=[], groups=[],
+                        batch_size=BATCH_SIZE, workers=1,
+                        columns=None, compress=False,
                         ix=False, csvx=False, dbx=False, ffx=False)
 
     parsed_args = parser.parse_args(unparsed_args_list[3:])
@@ -219,7 +262,9 @@ def parse_export(unparsed_args_list):
 def execute_export(alchemist, output_path, output_name,
                         values=[], verbose=False,
                         csv_export=False, ffile_export=None, db_export=False,
-                        table="phage", filters=[], groups=[]):
+                        table="phage", filters=[], groups=[],
+                        batch_size=BATCH_SIZE, workers=1,
+                        columns=None, compress=False):
     """Executes the entirety of the file export pipeline.
 
     :param sql_handle:
@@ -252,6 +297,20 @@ def execute_export(alchemist, output_path, output_name,
     :param groups:
         Input a list of supported group values.
     :type groups: List[str]
+    :param batch_size:
+        Input the number of genomes retrieved and written at a time
+        during ffile_export.
+    :type batch_size: int
+    :param workers:
+        Input the number of processes used to convert and write
+        genomes during ffile_export.
+    :type workers: int
+    :param columns:
+        Input a list of columns to export during csv_export.
+    :type columns: List[str]
+    :param compress:
+        Input a boolean value to gzip-compress the csv_export file.
+    :type compress: boolean
     """
 
     if verbose:
@@ -301,36 +360,102 @@ def execute_export(alchemist, output_path, output_name,
                 execute_csv_export(alchemist,
                                         export_path,
                                         table=table, values=values,
-                                        verbose=verbose)
+                                        verbose=verbose,
+                                        columns=columns,
+                                        compress=compress)
 
             elif ffile_export != None:
                 execute_ffx_export(alchemist,
                                         export_path, ffile_export,
                                         db_version,
                                         table=table, values=values,
-                                        verbose=verbose)
+                                        verbose=verbose,
+                                        batch_size=batch_size,
+                                        workers=workers)
 
 def build_groups_map(db_filter, export_path, groups=[], values_map={},
                                                        verbose=False):
-    db_filter = db_filter.copy()
+    """Partitions filter values by one or more nested groups and creates
+    a directory for each group.
+
+    :param db_filter: A connected and fully built Filter object.
+    :type db_filter: Filter
+    :param export_path: Path to a dir for file creation.
+    :type export_path: Path
+    :param groups: Columns to group by, outermost group first.
+    :type groups: list[str]
+    :param values_map: Dictionary to store group dir paths and their values.
+    :type values_map: dict
+    :param verbose: A boolean value to toggle progress print statements.
+    :type verbose: bool
+    :returns: Dictionary of group dir paths and their values.
+    :rtype: dict
+    """
+    if verbose:
+        print("Grouping values...")
+
+    groups_dict = db_filter.nested_group(groups)
+    map_groups_dict(groups_dict, export_path, values_map)
 
-    current_group = groups.pop(0)
-    groups_dict = db_filter.group(current_group)
+    return values_map
 
-    for group in groups_dict.keys():
+def map_groups_dict(groups_dict, export_path, values_map):
+    """Creates nested group dirs and stores the values of each
+    innermost group.
+
+    :param groups_dict: Nested dictionary of groups and their values.
+    :type groups_dict: dict
+    :param export_path: Path to a dir for file creation.
+    :type export_path: Path
+    :param values_map: Dictionary to store group dir paths and their values.
+    :type values_map: dict
+    """
+    for group, sub_groups in groups_dict.items():
         group_path = export_path.joinpath(str(group))
         group_path.mkdir()
 
-        if groups:
-            db_filter.values = groups_dict[group]
-            return build_groups_map(db_filter, group_path, groups=groups,
-                                                       verbose=False)
+        if isinstance(sub_groups, dict):
+            map_groups_dict(sub_groups, group_path, values_map)
         else:
-            values_map.update({group_path : groups_dict[group]})
+            values_map.update({group_path : sub_groups})
 
 def execute_csv_export(alchemist, export_path,
                                         table="phage", values=[],
-                                        verbose=False):
+                                        verbose=False, columns=None,
+                                        compress=False,
+                                        chunk_size=CHUNK_SIZE):
+    """Writes the selected rows of a table to a csv file.
+
+    Rows are streamed from a server-side cursor in chunks and written
+    as they are fetched, so memory usage does not depend on the
+    size of the table.
+
+    :param alchemist:
+        Input a connected AlchemyHandler object.
+    :type alchemist: AlchemyHandler
+    :param export_path:
+        Input the path of the directory for the exported file.
+    :type export_path: Path
+    :param table:
+        Input the table to export.
+    :type table: str
+    :param values:
+        Input a list of primary key values. If empty, all rows are exported.
+    :type values: List[str]
+    :param verbose:
+        Input a boolean value for verbose option.
+    :type verbose: boolean
+    :param columns:
+        Input a list of columns to export. If None, all columns except
+        sequence columns are exported.
+    :type columns: List[str]
+    :param compress:
+        Input a boolean value to gzip-compress the file.
+    :type compress: boolean
+    :param chunk_size:
+        Input the number of rows fetched at a time.
+    :type chunk_size: int
+    """
     remove_fields = {"phage"           : ["Sequence"],
                      "gene"            : ["Translation"],
                      "domain"          : [],
@@ -345,10 +470,18 @@ def execute_csv_export(alchemist, export_path,
 
     select_columns = []
     headers = []
-    for column in table_obj.columns:
-        if column.name not in remove_fields[table]:
-            select_columns.append(column)
-            headers.append(column.name)
+    if columns:
+        for column_name in columns:
+            if column_name not in table_obj.columns.keys():
+                raise ValueError(f"Column '{column_name}' is not "
+                                 f"in the {table} table.")
+            select_columns.append(table_obj.columns[column_name])
+            headers.append(column_name)
+    else:
+        for column in table_obj.columns:
+            if column.name not in remove_fields[table]:
+                select_columns.append(column)
+                headers.append(column.name)
 
     for column in table_obj.primary_key.columns:
         primary_key = column
@@ -358,49 +491,146 @@ def execute_csv_export(alchemist, export_path,
     if values:
         query = query.where(primary_key.in_(values))
 
-    results = alchemist.execute(query)
+    if verbose:
+        print(f"Writing {table} data to csv file...")
 
-    file_path = export_path.joinpath(f"{table}.csv")
+    results = (result for chunk in alchemist.stream(query,
+                                                     chunk_size=chunk_size)
+                      for result in chunk)
+
+    file_name = f"{table}.csv"
+    if compress:
+        file_name = file_name + ".gz"
+    file_path = export_path.joinpath(file_name)
     basic.export_data_dict(results, file_path, headers,
-                                               include_headers=True)
+                                               include_headers=True,
+                                               compress=compress)
 
 def execute_ffx_export(alchemist, output_path, file_format,
                        db_version, table="phage", values=[],
-                       verbose=False):
+                       verbose=False, batch_size=BATCH_SIZE, workers=1):
+    """Writes a formatted file for each selected genome.
+
+    Genomes are retrieved from the database, converted to SeqRecords,
+    and written in batches, so that only a few batches of genomes are
+    held in memory at any one time.
+
+    :param alchemist:
+        Input a connected AlchemyHandler object.
+    :type alchemist: AlchemyHandler
+    :param output_path:
+        Input the path of the directory for the exported files.
+    :type output_path: Path
+    :param file_format:
+        Input SeqIO file output format.
+    :type file_format: str
+    :param db_version:
+        Input a version data dictionary parsed from a SQL database.
+    :type db_version: dictionary
+    :param table:
+        Input the table the values are selected from.
+    :type table: str
+    :param values:
+        Input a list of PhageIDs. If empty, all genomes are exported.
+    :type values: List[str]
+    :param verbose:
+        Input a boolean value for verbose option.
+    :type verbose: boolean
+    :param batch_size:
+        Input the number of genomes retrieved and written at a time.
+    :type batch_size: int
+    :param workers:
+        Input the number of processes used to convert and write
+        batches of genomes. If 1, batches are written by this process.
+    :type workers: int
+    """
+    if table != "phage":
+        raise ValueError
 
     if verbose:
-        print(
-          f"Retrieving {data_name} data from {sql_handle.database}...")
+        print(f"Retrieving {table} data from {alchemist.database}...")
+
+    if not values:
+        values = [data_dict["PhageID"] for data_dict in
+                  mysqldb.query_dict_list(alchemist.engine,
+                                          "SELECT PhageID FROM phage")]
+
+    batches = iter_genome_batches(alchemist.engine, values,
+                                  batch_size=batch_size)
+    tasks = ((genomes, file_format, output_path, db_version, verbose)
+             for genomes in batches)
+
+    if workers > 1:
+        # Batches are retrieved from the database by this process while
+        # previous batches are converted and written by the workers.
+        # The number of batches waiting to be written is bounded.
+        with parallelize.Executor(workers) as executor:
+            for _ in executor.imap(write_genome_batch, tasks,
+                                   progress=False):
+                pass
+    else:
+        for task in tasks:
+            write_genome_batch(*task)
+
+def iter_genome_batches(engine, phage_id_list, batch_size=BATCH_SIZE):
+    """Retrieves genomes with their CDS features from a SQL database
+    in batches.
 
-    if table == "phage":
+    :param engine:
+        Input a SQLAlchemy Engine object.
+    :type engine: Engine
+    :param phage_id_list:
+        Input a list of PhageIDs.
+    :type phage_id_list: List[str]
+    :param batch_size:
+        Input the number of genomes retrieved at a time.
+    :type batch_size: int
+    :returns:
+        Generator of lists of Genome objects.
+    """
+    for start, stop in basic.create_indices(phage_id_list, batch_size):
         genomes = mysqldb.parse_genome_data(
-                                alchemist.engine,
-                                phage_id_list=values,
+                                engine,
+                                phage_id_list=phage_id_list[start:stop],
                                 phage_query="SELECT * FROM phage",
                                 gene_query="SELECT * FROM gene")
-    else:
-        raise ValueError
+        if genomes:
+            yield genomes
 
-    if verbose:
-        print(f"Converting {data_name} data to SeqRecord format...")
-    seqrecords = []
+def write_genome_batch(genomes, file_format, export_path, db_version,
+                       verbose=False):
+    """Converts genomes to SeqRecords and writes a file for each genome.
 
-    if table == "phage":
-        for gnm in genomes:
-            set_cds_seqfeatures(gnm)
-            if verbose:
-                print(f"Converting {gnm.name}...")
-            seqrecords.append(flat_files.genome_to_seqrecord(gnm))
+    :param genomes:
+        Input a list of Genome objects.
+    :type genomes: List[genome]
+    :param file_format:
+        Input SeqIO file output format.
+    :type file_format: str
+    :param export_path:
+        Input the path of the directory for the exported files.
+    :type export_path: Path
+    :param db_version:
+        Input a version data dictionary parsed from a SQL database.
+    :type db_version: dictionary
+    :param verbose:
+        Input a boolean value for verbose option.
+    :type verbose: boolean
+    :returns:
+        Number of genomes written.
+    :rtype: int
+    """
+    seqrecords = []
+    for gnm in genomes:
+        set_cds_seqfeatures(gnm)
         if verbose:
-            print("Appending database version...")
-        for record in seqrecords:
-            append_database_version(record, db_version)
-
-    else:
-        raise ValueError
+            print(f"Converting {gnm.name}...")
+        record = flat_files.genome_to_seqrecord(gnm)
+        append_database_version(record, db_version)
+        seqrecords.append(record)
 
-    write_seqrecord(seqrecords, file_format,
-                    output_path, verbose=verbose)
+    write_seqrecord(seqrecords, file_format, export_path, verbose=verbose)
+    return len(seqrecords)
 
 def convert_path(path: str):
     """Function to convert a string to a working Path object.
@@ -1,4 +1,6 @@
 import argparse
+import itertools
+import json
 import logging
 import os
 import pathlib
@@ -6,6 +8,7 @@ import platform
 import shlex
 import sqlalchemy
 import sys
+import time
 # import warnings
 from subprocess import Popen, PIPE
 
@@ -29,12 +32,24 @@ INSERT_INTO_DOMAIN = """INSERT INTO domain (HitID, DomainID, Name, Description)
 INSERT_INTO_GENE_DOMAIN = """INSERT INTO gene_domain (GeneID, HitID, Expect, QueryStart, QueryEnd) VALUES ("{}", "{}", {}, {}, {})"""
 UPDATE_GENE = "UPDATE gene SET DomainStatus = 1 WHERE GeneID = '{}'"
 
+UPDATE_GENES = "UPDATE gene SET DomainStatus = 1 WHERE GeneID IN ({})"
+
 CLEAR_GENE_DOMAIN = "TRUNCATE gene_domain"
 CLEAR_DOMAIN = "DELETE FROM domain"
 CLEAR_GENE_DOMAINSTATUS = "UPDATE gene SET DomainStatus = 0"
 
 
 
+# Tabular rpsblast output fields used in batched mode.
+TABULAR_FIELDS = "qseqid sseqid evalue qstart qend stitle"
+
+# Number of genes whose domain data is inserted in each bulk transaction.
+INSERT_BATCH_SIZE = 1000
+
+# Search results that have not been stored yet are kept in tmp_dir,
+# so that an interrupted run can be resumed without searching them again.
+CHECKPOINT_FILE = "checkpoint.jsonl"
+
 # MISC
 VERSION = pdm_utils.__version__
 RESULTS_FOLDER = f"{constants.CURRENT_DATE}_find_domains"
@@ -62,6 +77,10 @@ def setup_argparser():
     output_folder_help = "Directory where log data can be generated."
     log_file_help = "Name of the log file generated."
     reset_help = "Clear all domain data currently in the database before finding domains."
+    batch_size_help = ("Number of translations to search with each "
+                       "rpsblast process. Batches are searched as "
+                       "multi-sequence queries with tabular output.")
+    num_threads_help = "number of threads used by each batched rpsblast search"
 
     # Initialize parser and add arguments
     parser = argparse.ArgumentParser(description=description)
@@ -83,6 +102,10 @@ def setup_argparser():
         help=log_file_help)
     parser.add_argument("--reset", action="store_true",
         default=False, help=reset_help)
+    parser.add_argument("--batch_size", default=1, type=int,
+        help=batch_size_help)
+    parser.add_argument("--num_threads", default=1, type=int,
+        help=num_threads_help)
     return parser
 
 
@@ -104,25 +127,25 @@ def make_tempdir(tmp_dir):
         print(f"Error {err.args[0]}: {err.args[1]}")
 
 
-def search_and_process(rpsblast, cdd_name, tmp_dir, evalue,
-                       geneid, translation):
+def search_translation(rpsblast, cdd_name, tmp_dir, evalue,
+                       translation_id, translation):
     """
-    Uses rpsblast to search indicated gene against the indicated CDD
+    Uses rpsblast to search indicated translation against the indicated CDD
     :param rpsblast: path to rpsblast binary
     :param cdd_name: CDD database path/name
     :param tmp_dir: path to directory where I/O will take place
     :param evalue: evalue cutoff for rpsblast
-    :param geneid: name of the gene to query
-    :param translation: protein sequence for gene to query
-    :return: results
+    :param translation_id: unique identifier for the translation sequence
+    :param translation: protein sequence to query
+    :return: list of the translation and the list of its hits
     """
     # Setup I/O variables
-    i = "{}/{}.txt".format(tmp_dir, geneid)
-    o = "{}/{}.xml".format(tmp_dir, geneid)
+    i = "{}/{}.txt".format(tmp_dir, translation_id)
+    o = "{}/{}.xml".format(tmp_dir, translation_id)
 
     # Write the input file
     with open(i, "w") as fh:
-        fh.write(">{}\n{}".format(geneid, translation))
+        fh.write(">{}\n{}".format(translation_id, translation))
 
     # Setup and run the rpsblast command
     rps_command = NcbirpsblastCommandline(cmd=rpsblast, db=cdd_name,
@@ -130,131 +153,173 @@ def search_and_process(rpsblast, cdd_name, tmp_dir, evalue,
                                           evalue=evalue)
     rps_command()
 
-    # Process results into a single list
-    results = []
-
     with open(o, "r") as fh:
-        for record in NCBIXML.parse(fh):
-            # Only need to process if there are record alignments
-            if record.alignments:
-                for align in record.alignments:
-                    for hsp in align.hsps:
-                        if hsp.expect <= evalue:
-                            align.hit_def = align.hit_def.replace("\"", "\'")
-
-                            des_list = align.hit_def.split(",")
-                            if len(des_list) == 1:
-                                description = des_list[0].strip()
-                                domain_id = None
-                                name = None
-                            elif len(des_list) == 2:
-                                domain_id = des_list[0].strip()
-                                description = des_list[1].strip()
-                                name = None
-                            else:
-                                domain_id = des_list[0].strip()
-                                name = des_list[1].strip()
-                                # Name is occassionally longer than permitted
-                                # in the database. Truncating avoids a
-                                # MySQL error.
-                                # TODO perhaps the database schema should be
-                                # changed to account for this.
-                                name = basic.truncate_value(name, 25, "...")
-                                description = ",".join(des_list[2:]).strip()
-
-                            # Try to put domain into domain table
-                            results.append(INSERT_INTO_DOMAIN.format(
-                                align.hit_id, domain_id, name, description))
-
-                            # Try to put this hit into gene_domain table
-                            results.append(INSERT_INTO_GENE_DOMAIN.format(
-                                geneid, align.hit_id, float(hsp.expect),
-                                int(hsp.query_start), int(hsp.query_end)))
+        hits = parse_rpsblast_xml(fh, evalue)
 
-    # Update this gene's DomainStatus to 1
-    results.append(UPDATE_GENE.format(geneid))
-    return results
+    return [translation, hits]
 
-# TODO dev
-def search_and_process2(rpsblast, cdd_name, tmp_dir, evalue,
-                       translation_id, translation):
+
+def parse_rpsblast_xml(handle, evalue):
     """
-    Uses rpsblast to search indicated gene against the indicated CDD
+    Parses rpsblast XML output into a list of hit dictionaries.
+    :param handle: open handle to the rpsblast XML output
+    :param evalue: evalue cutoff for rpsblast hits
+    :return: hits
+    """
+    hits = []
+    for record in NCBIXML.parse(handle):
+        # Only need to process if there are record alignments
+        if record.alignments:
+            for align in record.alignments:
+                for hsp in align.hsps:
+                    if hsp.expect <= evalue:
+                        domain_id, name, description = parse_hit_def(
+                                                                align.hit_def)
+
+                        hits.append({
+                            "HitID": align.hit_id,
+                            "DomainID": domain_id,
+                            "Name": name,
+                            "Description": description,
+                            "Expect": float(hsp.expect),
+                            "QueryStart": int(hsp.query_start),
+                            "QueryEnd": int(hsp.query_end)
+                            })
+    return hits
+
+
+def search_translation_batch(rpsblast, cdd_name, tmp_dir, evalue,
+                             batch_id, translations, num_threads=1):
+    """
+    Uses rpsblast to search a batch of translations against the indicated
+    CDD with a single multi-sequence query
     :param rpsblast: path to rpsblast binary
     :param cdd_name: CDD database path/name
     :param tmp_dir: path to directory where I/O will take place
     :param evalue: evalue cutoff for rpsblast
-    :param translation_id: unique identifier for the translation sequence
-    :param translation: protein sequence for gene to query
-    :return: results
+    :param batch_id: unique identifier for the batch of translations
+    :param translations: protein sequences to query
+    :param num_threads: number of threads used by rpsblast
+    :return: list of lists of each translation and the list of its hits
     """
     # Setup I/O variables
-    i = "{}/{}.txt".format(tmp_dir, translation_id)
-    o = "{}/{}.xml".format(tmp_dir, translation_id)
+    i = "{}/batch_{}.txt".format(tmp_dir, batch_id)
+    o = "{}/batch_{}.tsv".format(tmp_dir, batch_id)
 
-    # Write the input file
+    # Write the input file, using each translation's index in its query id
     with open(i, "w") as fh:
-        fh.write(">{}\n{}".format(translation_id, translation))
+        for index, translation in enumerate(translations):
+            fh.write(">query_{}\n{}\n".format(index, translation))
 
     # Setup and run the rpsblast command
     rps_command = NcbirpsblastCommandline(cmd=rpsblast, db=cdd_name,
-                                          query=i, out=o, outfmt=5,
-                                          evalue=evalue)
+                                          query=i, out=o,
+                                          outfmt=f"6 {TABULAR_FIELDS}",
+                                          evalue=evalue,
+                                          num_threads=num_threads,
+                                          parse_deflines=True)
     rps_command()
 
-    # Process results into a single list
+    results = [[translation, []] for translation in translations]
+    with open(o, "r") as fh:
+        for index, hit in parse_rpsblast_tabular(fh, evalue):
+            results[index][1].append(hit)
+
+    return results
+
+
+def parse_rpsblast_tabular(handle, evalue):
+    """
+    Parses rpsblast tabular output (outfmt 6 or 7) with the
+    TABULAR_FIELDS columns, one line at a time. Query ids are expected
+    to end with the query's index in the batch, as in 'query_0'.
+    :param handle: open handle to the rpsblast tabular output
+    :param evalue: evalue cutoff for rpsblast hits
+    :return: generator of the query index and hit dictionary of each hit
+    """
+    for line in handle:
+        # Skip comment lines written with outfmt 7
+        if line.startswith("#") or not line.strip():
+            continue
+
+        fields = line.rstrip("\n").split("\t", 5)
+        query_id = fields[0].split("|")[-1]
+        expect = float(fields[2])
+        if expect > evalue:
+            continue
+
+        hit_id = fields[1]
+        hit_def = fields[5] if len(fields) > 5 else ""
+        # Some rpsblast versions include the hit id in the subject title
+        if hit_def.startswith(hit_id + " "):
+            hit_def = hit_def[len(hit_id) + 1:]
+        domain_id, name, description = parse_hit_def(hit_def)
+
+        yield int(query_id.split("_")[-1]), {
+            "HitID": hit_id,
+            "DomainID": domain_id,
+            "Name": name,
+            "Description": description,
+            "Expect": expect,
+            "QueryStart": int(fields[3]),
+            "QueryEnd": int(fields[4])
+            }
+
+
+def parse_hit_def(hit_def):
+    """
+    Splits a CDD hit definition into its domain id, name and description.
+    :param hit_def: description of the CDD hit
+    :return: tuple of domain_id, name and description
+    """
+    hit_def = hit_def.replace("\"", "\'")
+
+    des_list = hit_def.split(",")
+    if len(des_list) == 1:
+        description = des_list[0].strip()
+        domain_id = None
+        name = None
+    elif len(des_list) == 2:
+        domain_id = des_list[0].strip()
+        description = des_list[1].strip()
+        name = None
+    else:
+        domain_id = des_list[0].strip()
+        name = des_list[1].strip()
+        # Name is occassionally longer than permitted
+        # in the database. Truncating avoids a
+        # MySQL error.
+        # TODO perhaps the database schema should be
+        # changed to account for this.
+        name = basic.truncate_value(name, 25, "...")
+        description = ",".join(des_list[2:]).strip()
+
+    return domain_id, name, description
+
+
+def create_gene_statements(geneid, hits):
+    """
+    Creates the statements that store a gene's domain hits.
+    :param geneid: name of the gene that was searched
+    :param hits: list of hit dictionaries for the gene's translation
+    :return: results
+    """
     results = []
+    for hit in hits:
+        # Try to put domain into domain table
+        results.append(INSERT_INTO_DOMAIN.format(
+            hit["HitID"], hit["DomainID"], hit["Name"], hit["Description"]))
 
-    with open(o, "r") as fh:
-        for record in NCBIXML.parse(fh):
-            # Only need to process if there are record alignments
-            if record.alignments:
-                for align in record.alignments:
-                    for hsp in align.hsps:
-                        if hsp.expect <= evalue:
-                            align.hit_def = align.hit_def.replace("\"", "\'")
-
-                            des_list = align.hit_def.split(",")
-                            if len(des_list) == 1:
-                                description = des_list[0].strip()
-                                domain_id = None
-                                name = None
-                            elif len(des_list) == 2:
-                                domain_id = des_list[0].strip()
-                                description = des_list[1].strip()
-                                name = None
-                            else:
-                                domain_id = des_list[0].strip()
-                                name = des_list[1].strip()
-                                # Name is occassionally longer than permitted
-                                # in the database. Truncating avoids a
-                                # MySQL error.
-                                # TODO perhaps the database schema should be
-                                # changed to account for this.
-                                name = basic.truncate_value(name, 25, "...")
-                                description = ",".join(des_list[2:]).strip()
-
-                            # Try to put domain into domain table
-                            results.append(INSERT_INTO_DOMAIN.format(
-                                align.hit_id, domain_id, name, description))
-
-                            # Try to put this hit into gene_domain table
-                            data_dict = {
-                                "Translation": translation,
-                                "HitID": align.hit_id,
-                                "Expect": float(hsp.expect),
-                                "QueryStart": int(hsp.query_start),
-                                "QueryEnd": int(hsp.query_end)
-                                }
-                            results.append(data_dict)
-                            # results.append(INSERT_INTO_GENE_DOMAIN.format(
-                            #     geneid, align.hit_id, float(hsp.expect),
-                            #     int(hsp.query_start), int(hsp.query_end)))
+        # Try to put this hit into gene_domain table
+        results.append(INSERT_INTO_GENE_DOMAIN.format(
+            geneid, hit["HitID"], hit["Expect"],
+            hit["QueryStart"], hit["QueryEnd"]))
 
     # Update this gene's DomainStatus to 1
-    # results.append(UPDATE_GENE.format(geneid))
+    results.append(UPDATE_GENE.format(geneid))
     return results
 
+
 def learn_cdd_name(cdd_dir):
     cdd_files = os.listdir(cdd_dir)
     cdd_files = [os.path.join(cdd_dir, x.split(".")[0]) for x in cdd_files]
@@ -288,6 +353,8 @@ def main(argument_list):
     output_folder = args.output_folder
     log_file = args.log_file
     reset = args.reset
+    batch_size = args.batch_size
+    num_threads = args.num_threads
 
     # Set up directory.
     output_folder = basic.set_path(output_folder, kind="dir", expect=True)
@@ -349,62 +416,219 @@ def main(argument_list):
         # Create temp_dir
         make_tempdir(tmp_dir)
 
-        # TODO dev
-        # translations = get_unique_translations(cdd_genes)
-
-
-        # Build jobs list
-        jobs = []
-
-        # TODO dev
-        # translation_id = 0
-        # for translation in translations:
-        #     translation_id += 1
-        #     jobs.append((rpsblast, cdd_name, tmp_dir, evalue,
-        #                  translation_id, translation))
-
-        for cdd_gene in cdd_genes:
-            jobs.append((rpsblast, cdd_name, tmp_dir, evalue,
-                         cdd_gene["GeneID"], cdd_gene["Translation"]))
+        # Genes that share a translation only need to be searched once
+        translations = get_unique_translations(cdd_genes)
+        msg = (f"{len(translations)} unique translations to search for "
+               "conserved domains...")
+        logger.info(msg)
+        print(msg)
 
-        results = parallelize(jobs, threads, search_and_process)
+        # Reuse the results of translations searched by an interrupted run
+        checkpoint_file = pathlib.Path(expand_path(tmp_dir), CHECKPOINT_FILE)
+        checkpoint_params = {"db": database, "cdd_name": cdd_name,
+                             "evalue": evalue}
+        if reset and checkpoint_file.exists():
+            checkpoint_file.unlink()
+        checkpoint = load_checkpoint(checkpoint_file, checkpoint_params)
+
+        searched_results = []
+        new_translations = []
+        for translation in translations:
+            hits = checkpoint.get(basic.get_seq_hash(translation))
+            if hits is None:
+                new_translations.append(translation)
+            else:
+                searched_results.append([translation, hits])
+        checkpoint.clear()
+        if len(searched_results) > 0:
+            msg = (f"{len(searched_results)} translations were already "
+                   f"searched. Resuming from checkpoint '{checkpoint_file}'.")
+            logger.info(msg)
+            print(msg)
+
+        trans_genes = map_translations_to_genes(cdd_genes)
+        searched_genes = sum([len(trans_genes[translation])
+                              for translation in new_translations])
+
+        start = time.time()
+
+        # Results are checkpointed and stored in batches as they finish
+        with open_checkpoint(checkpoint_file, checkpoint_params) as fh:
+            search_results = search_translations(
+                                new_translations, rpsblast, cdd_name,
+                                tmp_dir, evalue, threads, batch_size,
+                                num_threads)
+            search_results = checkpoint_results(search_results, fh)
+            rolled_back = insert_search_results(
+                            engine, itertools.chain(searched_results,
+                                                    search_results),
+                            trans_genes)
         print("\n")
 
+        elapsed = time.time() - start
+        msg = (f"Searched {searched_genes} genes "
+               f"({len(new_translations)} unique translations) "
+               f"in {elapsed:.1f} s: "
+               f"{searched_genes / max(elapsed, 1e-6):.1f} genes/s.")
+        logger.info(msg)
+        print(msg)
 
-        # TODO dev
-        # results_dict = create_results_dict(results)
-        # map_results_to_genes(cdd_genes, results_dict)
+        report_insert_result(rolled_back)
 
-        insert_domain_data(engine, results)
+        # All results are stored, so the checkpoint is no longer needed
+        if rolled_back == 0:
+            checkpoint_file.unlink()
         engine.dispose()
     return
 
 
-# TODO dev
 def get_unique_translations(cdd_genes):
     """Generate list of unique translations to process."""
-    # Get unique translations.
-    translations = set()
-    for i in range(len(cdd_genes)):
-        translations.add(cdd_genes[i]["Translation"])
-    return translations
-
-# TODO dev
-def map_results_to_genes(cdd_genes, search_results):
-    """Map results of domain search back to list of gene_ids."""
-
-    for i in range(len(cdd_genes)):
-        pass
-
-# TODO dev
-def create_results_dict(search_results):
-    """Create a dictionary of search results
-    key = translation; value = results."""
-    dict = {}
-    for result in search_results:
-        trans = result[1]["Translation"]
-        dict[trans] = result
-    return dict
+    # Get unique translations, in the order they were retrieved.
+    translations = dict()
+    for cdd_gene in cdd_genes:
+        translations[cdd_gene["Translation"]] = None
+    return list(translations.keys())
+
+
+def map_translations_to_genes(cdd_genes):
+    """Create a dictionary of genes to process
+    key = translation; value = list of gene_ids."""
+    trans_genes = {}
+    for cdd_gene in cdd_genes:
+        trans_genes.setdefault(cdd_gene["Translation"], []).append(
+                                                        cdd_gene["GeneID"])
+    return trans_genes
+
+
+def search_translations(translations, rpsblast, cdd_name, tmp_dir, evalue,
+                        threads, batch_size=1, num_threads=1):
+    """
+    Uses rpsblast to search translations against the indicated CDD,
+    yielding the results of each translation as they finish
+    :param translations: list of protein sequences to query
+    :param rpsblast: path to rpsblast binary
+    :param cdd_name: CDD database path/name
+    :param tmp_dir: path to directory where I/O will take place
+    :param evalue: evalue cutoff for rpsblast
+    :param threads: number of concurrent searches to run
+    :param batch_size: number of translations searched by each rpsblast process
+    :param num_threads: number of threads used by each batched rpsblast search
+    :return: generator of lists of each translation and the list of its hits
+    """
+    # Build jobs list
+    jobs = []
+    if batch_size > 1:
+        task = search_translation_batch
+        batch_indices = basic.create_indices(translations, batch_size)
+        for batch_id, indices in enumerate(batch_indices, 1):
+            jobs.append((rpsblast, cdd_name, tmp_dir, evalue, batch_id,
+                         translations[indices[0]:indices[1]], num_threads))
+    else:
+        task = search_translation
+        for translation_id, translation in enumerate(translations, 1):
+            jobs.append((rpsblast, cdd_name, tmp_dir, evalue,
+                         translation_id, translation))
+
+    if len(jobs) == 0:
+        return
+
+    threads = count_processors(jobs, threads)
+    with Executor(threads) as executor:
+        for result in executor.imap(task, jobs, total=len(jobs)):
+            if batch_size > 1:
+                yield from result
+            else:
+                yield result
+
+
+def load_checkpoint(checkpoint_file, params):
+    """
+    Loads the search results stored by an interrupted run. Results from
+    a run with different parameters are discarded.
+    :param checkpoint_file: path to the checkpoint file
+    :param params: dictionary of parameters of the current run
+    :return: dictionary of translation hashes and lists of hits
+    """
+    checkpoint = {}
+    if not checkpoint_file.exists():
+        return checkpoint
+
+    with checkpoint_file.open("r") as fh:
+        for line in fh:
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError:
+                # The last line may be incomplete if the run was killed.
+                logger.warning(f"Skipping incomplete line in checkpoint "
+                               f"'{checkpoint_file}'.")
+                continue
+            if "Parameters" in data:
+                if data["Parameters"] != params:
+                    logger.info(f"Checkpoint '{checkpoint_file}' was "
+                                "created with different parameters and "
+                                "will be discarded.")
+                    checkpoint_file.unlink()
+                    return {}
+            else:
+                checkpoint[data["Hash"]] = data["Hits"]
+    return checkpoint
+
+
+def open_checkpoint(checkpoint_file, params):
+    """
+    Opens the checkpoint file to append search results. A new checkpoint
+    file begins with the parameters of the current run.
+    :param checkpoint_file: path to the checkpoint file
+    :param params: dictionary of parameters of the current run
+    :return: file handle
+    """
+    new_file = not checkpoint_file.exists()
+    fh = checkpoint_file.open("a")
+    if new_file:
+        fh.write(json.dumps({"Parameters": params}) + "\n")
+        fh.flush()
+    return fh
+
+
+def checkpoint_results(search_results, fh):
+    """
+    Writes each search result to the checkpoint file as it finishes.
+    :param search_results: iterable of lists of translations and hits
+    :param fh: handle to the checkpoint file
+    :return: generator of lists of each translation and the list of its hits
+    """
+    for translation, hits in search_results:
+        fh.write(json.dumps({"Hash": basic.get_seq_hash(translation),
+                             "Hits": hits}) + "\n")
+        fh.flush()
+        yield [translation, hits]
+
+
+def insert_search_results(engine, search_results, trans_genes,
+                          batch_size=INSERT_BATCH_SIZE):
+    """
+    Inserts domain data for the genes of each translation in batches,
+    as the search results are received.
+    :param engine: SQLAlchemy Engine object for the database
+    :param search_results: iterable of lists of translations and hits
+    :param trans_genes: dictionary of translations and lists of gene_ids
+    :param batch_size: number of genes to insert in each transaction
+    :return: number of genes that could not be inserted
+    """
+    hit_ids = mysqldb.query_set(engine, GET_UNIQUE_HIT_IDS)
+
+    rolled_back = 0
+    gene_hits = []
+    for translation, hits in search_results:
+        for geneid in trans_genes[translation]:
+            gene_hits.append((geneid, hits))
+        if len(gene_hits) >= batch_size:
+            rolled_back += insert_domain_batch(engine, gene_hits, hit_ids)
+            gene_hits = []
+    if len(gene_hits) > 0:
+        rolled_back += insert_domain_batch(engine, gene_hits, hit_ids)
+    return rolled_back
 
 
 def get_rpsblast_command():
@@ -467,14 +691,40 @@ def log_gene_ids(cdd_genes):
         logger.info("; ".join(gene_ids))
 
 
-def insert_domain_data(engine, results):
-    """Attempt to insert domain data into the database."""
+def insert_domain_batch(engine, gene_hits, hit_ids):
+    """
+    Insert domain data for a batch of genes in one transaction, or
+    one transaction per gene if the batch fails.
+    :param engine: SQLAlchemy Engine object for the database
+    :param gene_hits: list of (GeneID, list of hit dictionaries) tuples
+    :param hit_ids:
+        set of HitIDs of the domains already in the database, which is
+        updated with the domains that are inserted
+    :return: number of genes that could not be inserted
+    """
     rolled_back = 0
-    connection = engine.connect()
-    for result in results:
-        exe_result = execute_transaction(connection, result)
-        rolled_back += exe_result
-
+    statements, new_hit_ids = create_bulk_statements(gene_hits, hit_ids)
+    result, msg = mysqldb.execute_transaction(engine, statements)
+    if result == 0:
+        logger.info(f"Inserted domain data for {len(gene_hits)} genes.")
+        hit_ids.update(new_hit_ids)
+    else:
+        logger.warning(msg)
+        logger.info("Inserting domain data for each gene in the batch.")
+        connection = engine.connect()
+        for geneid, hits in gene_hits:
+            rolled_back += execute_transaction(
+                            connection, create_gene_statements(geneid, hits))
+        connection.close()
+        # Domains inserted by the individual transactions are
+        # not tracked, so refresh them from the database.
+        hit_ids.clear()
+        hit_ids.update(mysqldb.query_set(engine, GET_UNIQUE_HIT_IDS))
+    return rolled_back
+
+
+def report_insert_result(rolled_back):
+    """Report whether all domain data was inserted into the database."""
     if rolled_back > 0:
         msg = (f"Error executing {rolled_back} transaction(s). "
               "Unable to complete pipeline. "
@@ -486,6 +736,55 @@ def insert_domain_data(engine, results):
     print("\n\n\n" + msg)
 
 
+def create_bulk_statements(gene_hits, hit_ids):
+    """
+    Create parameterized statements to insert a batch of domain data.
+    Domains are only inserted once, and domains already present in
+    the database are skipped. Only the first hit to each domain is
+    inserted for a gene, as the gene_domain table permits one hit per
+    gene and domain.
+    :param gene_hits: list of (GeneID, list of hit dictionaries) tuples
+    :param hit_ids: set of HitIDs of the domains already in the database
+    :return: list of (statement, parameters) tuples, and the set of
+    HitIDs of the domains inserted
+    """
+    domain_data = []
+    gene_domain_data = []
+    new_hit_ids = set()
+    gene_params = dict()
+    for geneid, hits in gene_hits:
+        gene_hit_ids = set()
+        for hit in hits:
+            hit_id = hit["HitID"]
+            if hit_id not in hit_ids and hit_id not in new_hit_ids:
+                new_hit_ids.add(hit_id)
+                # Values are converted to strings to match the data
+                # inserted by INSERT_INTO_DOMAIN.
+                domain_data.append({"HitID": hit_id,
+                                    "DomainID": str(hit["DomainID"]),
+                                    "Name": str(hit["Name"]),
+                                    "Description": str(hit["Description"])})
+            if hit_id not in gene_hit_ids:
+                gene_hit_ids.add(hit_id)
+                gene_domain_data.append({"GeneID": geneid,
+                                         "HitID": hit_id,
+                                         "Expect": hit["Expect"],
+                                         "QueryStart": hit["QueryStart"],
+                                         "QueryEnd": hit["QueryEnd"]})
+        gene_params[f"GeneID_{len(gene_params)}"] = geneid
+
+    statements = []
+    if len(domain_data) > 0:
+        statements.append(mysqldb.create_bulk_insert("domain", domain_data))
+    if len(gene_domain_data) > 0:
+        statements.append(mysqldb.create_bulk_insert("gene_domain",
+                                                     gene_domain_data))
+    if len(gene_params) > 0:
+        param_string = ", ".join([f":{key}" for key in gene_params.keys()])
+        statements.append((UPDATE_GENES.format(param_string), gene_params))
+    return statements, new_hit_ids
+
+
 def execute_transaction(connection, statement_list=[]):
     trans = connection.begin()
     failed = 0
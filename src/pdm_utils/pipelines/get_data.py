@@ -5,8 +5,8 @@ import csv
 from datetime import datetime
 import pathlib
 import sys
+import tempfile
 import time
-from Bio import SeqIO
 from pdm_utils.classes import genomepair
 from pdm_utils.classes import ticket
 from pdm_utils.constants import constants
@@ -71,6 +71,15 @@ def parse_args(unparsed_args_list):
     ALL_HELP = "Retrieve all types of new data."
     NCBI_CRED_FILE_HELP = "Path to the file containing NCBI credentials."
     GENBANK_RESULTS_HELP = "Store results of Genbank record retrieval."
+    PHAGESDB_CACHE_HELP = \
+        ("Path to the folder in which responses from PhagesDB are cached, "
+         "so that they can be reused by later runs.")
+    PHAGESDB_TTL_HELP = \
+        ("Indicates the number of seconds that a cached response from "
+         "PhagesDB is reused before it is revalidated.")
+    PHAGESDB_OFFLINE_HELP = \
+        ("Indicates whether only cached responses from PhagesDB should be "
+         "used, without connecting to PhagesDB.")
 
 
 
@@ -92,6 +101,12 @@ def parse_args(unparsed_args_list):
         help=NCBI_CRED_FILE_HELP)
     parser.add_argument("-gr", "--genbank_results", action="store_true",
         default=False, help=GENBANK_RESULTS_HELP)
+    parser.add_argument("--phagesdb_cache", type=pathlib.Path, default=None,
+        help=PHAGESDB_CACHE_HELP)
+    parser.add_argument("--phagesdb_ttl", type=int, default=0,
+        help=PHAGESDB_TTL_HELP)
+    parser.add_argument("--phagesdb_offline", action="store_true",
+        default=False, help=PHAGESDB_OFFLINE_HELP)
 
 
     # Assumed command line arg structure:
@@ -162,13 +177,17 @@ def main(unparsed_args_list):
     # Get data from PhagesDB
     if (args.updates or args.final or args.draft) is True:
         print("Retrieving data from PhagesDB...")
-        phagesdb_phages = phagesdb.get_phagesdb_data(constants.API_SEQUENCED)
+        phagesdb_cache = phagesdb.ResponseCache(cache_dir=args.phagesdb_cache,
+                                                ttl=args.phagesdb_ttl,
+                                                offline=args.phagesdb_offline)
+        phagesdb_phages = phagesdb.get_phagesdb_data(constants.API_SEQUENCED,
+                                                     cache=phagesdb_cache)
         phagesdb_phages_dict = basic.convert_list_to_dict(phagesdb_phages,
                                                           "phage_name")
         phagesdb_genome_dict = phagesdb.parse_genomes_dict(
                                     phagesdb_phages_dict,
                                     gnm_type="phagesdb",
-                                    seq=False)
+                                    seq=False, cache=phagesdb_cache)
 
         # Exit if all phage data wasn't retrieved.
         if len(phagesdb_genome_dict) == 0:
@@ -182,7 +201,7 @@ def main(unparsed_args_list):
     if args.updates is True:
         get_update_data(working_path, matched_genomes)
     if args.final is True:
-        get_final_data(working_path, matched_genomes)
+        get_final_data(working_path, matched_genomes, cache=phagesdb_cache)
     if args.genbank is True:
         get_genbank_data(working_path, mysqldb_genome_dict,
                          ncbi_cred_dict, args.genbank_results)
@@ -347,7 +366,7 @@ def convert_tickets_to_dict(list_of_tickets, old_format=False):
 
 
 # TODO unittest
-def get_final_data(output_folder, matched_genomes):
+def get_final_data(output_folder, matched_genomes, cache=None):
     """Run sub-pipeline to retrieve 'final' genomes from PhagesDB."""
 
     phagesdb_folder = pathlib.Path(output_folder, "phagesdb")
@@ -358,6 +377,7 @@ def get_final_data(output_folder, matched_genomes):
     failed_list = []
 
     # Iterate through each phage in the MySQL database
+    updated_genomes = []
     for gnm_pair in matched_genomes:
         mysqldb_gnm = gnm_pair.genome1
         phagesdb_gnm = gnm_pair.genome2
@@ -375,40 +395,49 @@ def get_final_data(output_folder, matched_genomes):
         set_phagesdb_gnm_date(phagesdb_gnm)
         set_phagesdb_gnm_file(phagesdb_gnm)
         if (phagesdb_gnm.filename != "" and phagesdb_gnm.date > mysqldb_gnm.date):
-            # Save the file on the hard drive with the same name as
-            # stored on PhagesDB
-            flatfile_data = phagesdb.retrieve_url_data(phagesdb_gnm.filename)
-            if flatfile_data == "":
-                failed_list.append(mysqldb_gnm.id)
-            else:
-                flatfile_filename = phagesdb_gnm.filename.split("/")[-1]
-                flatfile_path = pathlib.Path(genome_folder,
-                                             flatfile_filename)
-                with flatfile_path.open("w") as fh:
-                    fh.write(flatfile_data)
-                # Create the new import ticket
-                # Since the PhagesDB phage has been matched to
-                # the MySQL database phage, the AnnotationAuthor field
-                # could be assigned from the current mysqldb author
-                # variable. However, since this genbank-formatted
-                # file is acquired through PhagesDB, both the
-                # Annotation status is expected to be 'final' and
-                # the Annotation author is expected to be 'hatfull'.
-                tkt = ticket.ImportTicket()
-                tkt.type = "replace"
-                tkt.phage_id = mysqldb_gnm.id
-                tkt.data_dict["host_genus"] = "retrieve"
-                tkt.data_dict["cluster"] = "retrieve"
-                tkt.data_dict["subcluster"] = "retrieve"
-                tkt.data_dict["annotation_status"] = "final"
-                tkt.data_dict["annotation_author"] = 1
-                tkt.description_field = "product"
-                tkt.data_dict["accession"] = "retrieve"
-                tkt.eval_mode = "final"
-                # TODO secondary_phage_id data is for old ticket format.
-                tkt.data_dict["secondary_phage_id"] = mysqldb_gnm.id
-                tkt.data_dict["retrieve_record"] = 1
-                import_tickets.append(tkt)
+            updated_genomes.append(gnm_pair)
+
+    # Download all flatfiles concurrently.
+    flatfile_urls = [gnm_pair.genome2.filename for gnm_pair in updated_genomes]
+    flatfile_dict = phagesdb.retrieve_urls(flatfile_urls, cache=cache)
+
+    for gnm_pair in updated_genomes:
+        mysqldb_gnm = gnm_pair.genome1
+        phagesdb_gnm = gnm_pair.genome2
+        # Save the file on the hard drive with the same name as
+        # stored on PhagesDB
+        flatfile_data = flatfile_dict[phagesdb_gnm.filename]
+        if flatfile_data == "":
+            failed_list.append(mysqldb_gnm.id)
+        else:
+            flatfile_filename = phagesdb_gnm.filename.split("/")[-1]
+            flatfile_path = pathlib.Path(genome_folder,
+                                         flatfile_filename)
+            with flatfile_path.open("w") as fh:
+                fh.write(flatfile_data)
+            # Create the new import ticket
+            # Since the PhagesDB phage has been matched to
+            # the MySQL database phage, the AnnotationAuthor field
+            # could be assigned from the current mysqldb author
+            # variable. However, since this genbank-formatted
+            # file is acquired through PhagesDB, both the
+            # Annotation status is expected to be 'final' and
+            # the Annotation author is expected to be 'hatfull'.
+            tkt = ticket.ImportTicket()
+            tkt.type = "replace"
+            tkt.phage_id = mysqldb_gnm.id
+            tkt.data_dict["host_genus"] = "retrieve"
+            tkt.data_dict["cluster"] = "retrieve"
+            tkt.data_dict["subcluster"] = "retrieve"
+            tkt.data_dict["annotation_status"] = "final"
+            tkt.data_dict["annotation_author"] = 1
+            tkt.description_field = "product"
+            tkt.data_dict["accession"] = "retrieve"
+            tkt.eval_mode = "final"
+            # TODO secondary_phage_id data is for old ticket format.
+            tkt.data_dict["secondary_phage_id"] = mysqldb_gnm.id
+            tkt.data_dict["retrieve_record"] = 1
+            import_tickets.append(tkt)
 
 
     count1 = len(import_tickets)
@@ -489,6 +518,8 @@ def get_genbank_data(output_folder, genome_dict, ncbi_cred_dict={},
     # Create output folder
     ncbi_folder = pathlib.Path(output_folder, f"genbank")
     ncbi_folder.mkdir()
+    genome_folder = pathlib.Path(ncbi_folder, GENOMES_DIR)
+    genome_folder.mkdir()
 
     ncbi_results_list = []
     tallies = {}
@@ -507,12 +538,10 @@ def get_genbank_data(output_folder, genome_dict, ncbi_cred_dict={},
     # Sayers, recommends that a single request not contain more than about 200
     # UIDS so we will use that as our batch size, and all Entrez requests must
     # include the user's email address and tool name.
-    ncbi.set_entrez_credentials(
-        tool=ncbi_cred_dict["ncbi_tool"],
-        email=ncbi_cred_dict["ncbi_email"],
-        api_key=ncbi_cred_dict["ncbi_api_key"])
+    client = ncbi.create_entrez_client(ncbi_cred_dict)
 
-    results_tuple2 = retrieve_records(unique_accession_dict, batch_size=200)
+    results_tuple2 = retrieve_records(unique_accession_dict, genome_folder,
+                                      client, batch_size=200)
     tallies["docsum_not_new"] = results_tuple2[0]
     retrieved_record_list = results_tuple2[1]
     retrieval_error_list = results_tuple2[2]
@@ -531,6 +560,12 @@ def get_genbank_data(output_folder, genome_dict, ncbi_cred_dict={},
     tallies["record_not_new"] = (len(retrieved_record_list)
                                  - len(new_record_list))
 
+    # Records were saved as they were retrieved, so remove the records
+    # that are not new.
+    for record in retrieved_record_list:
+        if record not in new_record_list:
+            record["filepath"].unlink()
+
     if len(new_record_list) > 0:
         save_files_and_tkts(new_record_list, unique_accession_dict, ncbi_folder)
 
@@ -564,6 +599,8 @@ def get_genbank_data(output_folder, genome_dict, ncbi_cred_dict={},
     print(f"{tallies['retrieved_for_import']:>6}: retrieved for import")
 
     # Now remove empty folders.
+    if len(basic.identify_contents(genome_folder, kind=None)) == 0:
+        genome_folder.rmdir()
     if len(basic.identify_contents(ncbi_folder, kind=None)) == 0:
         ncbi_folder.rmdir()
 
@@ -631,54 +668,45 @@ def process_failed_retrieval(accession_list, accession_dict):
 
 
 # TODO unittest.
-def retrieve_records(accession_dict, batch_size=200):
+def retrieve_records(accession_dict, genome_folder, client, batch_size=200):
     """Retrieve GenBank records."""
     # First use esearch to verify the accessions are valid.
-    # Seoncd use efetch to retrieve the record.
+    # Second use esummary to check which records are new,
+    # and efetch to retrieve them. The next batch of accessions is searched
+    # while the records from the current batch are retrieved, and each
+    # record is saved to a file as it is retrieved.
     print("\n\nRetrieving records from NCBI")
     retrieved_records = [] # GenBank records that have been retrieved.
     retrieval_errors = []
     tally_not_new = 0 # Keeps track if docsum date is new or not.
     results = [] # Summary of retrieval results.
     accessions = list(accession_dict.keys())
-    mod_accessions = [accession + "[ACCN]" for accession in accessions]
-
 
-    # When retrieving in batch sizes, first create the list of values
-    # indicating which indices of the accessions should be used
-    # to create each batch.
-    # For instace, if there are five accessions, batch size of two produces
-    # indices = 0,2,4
-
-    batch_indices = basic.create_indices(mod_accessions, batch_size)
-    print(f"There are {len(mod_accessions)} GenBank accession(s) to check.")
-    for indices in batch_indices:
-        start = indices[0]
-        stop = indices[1]
+    print(f"There are {len(accessions)} GenBank accession(s) to check.")
+    batches = ncbi.prefetch(ncbi.search_batches(client, accessions,
+                                                batch_size=batch_size,
+                                                db="nucleotide"))
+    for batch in batches:
+        start = batch["start"]
+        stop = batch["stop"]
         print(f"Checking accessions {start + 1} to {stop}...")
-        delimiter = " | "
-        esearch_term = delimiter.join(mod_accessions[start:stop])
-
-        # Use esearch for each accession
-        search_record = ncbi.run_esearch(db="nucleotide", term=esearch_term,
-                            usehistory="y")
-        search_count = int(search_record["Count"])
-        search_webenv = search_record["WebEnv"]
-        search_query_key = search_record["QueryKey"]
+        if batch["error"] is not None:
+            print(f"Unable to search accessions {start + 1} to {stop}: "
+                  f"{batch['error']}")
+            retrieval_errors.extend(accessions[start:stop])
+            continue
 
         # Keep track of the accessions that failed to be located in NCBI
         # Each accession in the error list is formatted "accession[ACCN]"
+        search_record = batch["search"]
+        search_count = int(search_record["Count"])
         current_batch_size = stop - start
         if search_count < current_batch_size:
             search_failure = search_record["ErrorList"]["PhraseNotFound"]
             for accession in search_failure:
                 retrieval_errors.append(accession[:-6])
 
-        # Now get summaries for these records using esummary
-        summary_records = ncbi.get_summaries(db="nucleotide",
-                                             query_key=search_query_key,
-                                             webenv=search_webenv)
-
+        summary_records = batch["summaries"]
         results_tuple = get_accessions_to_retrieve(summary_records,
                                                    accession_dict)
         accessions_to_retrieve = results_tuple[0]
@@ -686,15 +714,41 @@ def retrieve_records(accession_dict, batch_size=200):
         tally_not_new += len(summary_records) - len(accessions_to_retrieve)
 
         if len(accessions_to_retrieve) > 0:
-            output_list = ncbi.get_records(accessions_to_retrieve,
-                                           db="nucleotide",
-                                           rettype="gb",
-                                           retmode="text")
-            retrieved_records.extend(output_list)
+            try:
+                output_list = save_records(client, accessions_to_retrieve,
+                                           accession_dict, genome_folder)
+            except Exception as err:
+                print("Unable to retrieve records for accessions "
+                      f"{start + 1} to {stop}: {err}")
+                retrieval_errors.extend(accessions_to_retrieve)
+            else:
+                retrieved_records.extend(output_list)
 
     return (tally_not_new, retrieved_records, retrieval_errors, results)
 
 
+def save_records(client, accession_list, accession_dict, genome_folder):
+    """Retrieve GenBank records and save each one to a file.
+
+    Returns a list of dictionaries with the name, date, and filepath
+    of each record."""
+    records = []
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as handle:
+        client.efetch(accession_list, handle, db="nucleotide",
+                      rettype="gb", retmode="text")
+        for record_text in ncbi.split_genbank_records(handle):
+            name, date = ncbi.parse_locus(record_text)
+            accession = name.split('.')[0]
+            gnm = accession_dict[accession]
+            ncbi_filename = f"{gnm.name.lower()}__{accession}.gb"
+            flatfile_path = pathlib.Path(genome_folder, ncbi_filename)
+            with flatfile_path.open("w") as fh:
+                fh.write(record_text)
+            records.append({"name": name, "date": date,
+                            "filepath": flatfile_path})
+    return records
+
+
 
 # TODO unittest.
 def get_accessions_to_retrieve(summary_records, accession_dict):
@@ -730,9 +784,9 @@ def check_record_date(record_list, accession_dict):
     # import table entries for them.
     for index in range(len(record_list)):
         record = record_list[index]
-        date = record.annotations["date"]
+        date = record["date"]
         date = datetime.strptime(date, '%d-%b-%Y')
-        accession = record.name
+        accession = record["name"]
         accession = accession.split('.')[0]
         gnm = accession_dict[accession]
 
@@ -762,17 +816,12 @@ def check_record_date(record_list, accession_dict):
 
 # TODO unittest.
 def save_files_and_tkts(record_list, accession_dict, output_folder):
-    """Save flat files retrieved from GenBank and create import tickets."""
+    """Create import tickets for flat files retrieved from GenBank."""
     import_tickets = []
-    genome_folder = pathlib.Path(output_folder, GENOMES_DIR)
-    genome_folder.mkdir()
     for record in record_list:
-        accession = record.name
+        accession = record["name"]
         accession = accession.split('.')[0]
         gnm = accession_dict[accession]
-        ncbi_filename = f"{gnm.name.lower()}__{accession}.gb"
-        flatfile_path = pathlib.Path(genome_folder, ncbi_filename)
-        SeqIO.write(record, str(flatfile_path), "genbank")
 
         tkt = ticket.ImportTicket()
         tkt.type = "replace"
@@ -3,8 +3,8 @@
 import argparse
 import pathlib
 import sys
+import tempfile
 import time
-from Bio import SeqIO
 from pdm_utils.functions import basic
 from pdm_utils.functions import ncbi
 from pdm_utils.functions import mysqldb
@@ -72,7 +72,8 @@ def main(unparsed_args_list):
 
 
 # TODO unittest.
-def get_genbank_data(output_folder, accession_set, ncbi_cred_dict={}):
+def get_genbank_data(output_folder, accession_set, ncbi_cred_dict={},
+                     client=None):
     """Retrieve genomes from GenBank."""
 
     batch_size = 200
@@ -82,10 +83,8 @@ def get_genbank_data(output_folder, accession_set, ncbi_cred_dict={}):
     # Sayers, recommends that a single request not contain more than about 200
     # UIDS so we will use that as our batch size, and all Entrez requests must
     # include the user's email address and tool name.
-    ncbi.set_entrez_credentials(
-        tool=ncbi_cred_dict["ncbi_tool"],
-        email=ncbi_cred_dict["ncbi_email"],
-        api_key=ncbi_cred_dict["ncbi_api_key"])
+    if client is None:
+        client = ncbi.create_entrez_client(ncbi_cred_dict)
 
 
     # Use esearch to verify the accessions are valid and efetch to retrieve
@@ -93,51 +92,51 @@ def get_genbank_data(output_folder, accession_set, ncbi_cred_dict={}):
     # Create batches of accessions
     unique_accession_list = list(accession_set)
 
-    # Add [ACCN] field to each accession number
-    appended_accessions = \
-        [accession + "[ACCN]" for accession in unique_accession_list]
-
-
-    # When retrieving in batch sizes, first create the list of values
-    # indicating which indices of the unique_accession_list should be used
-    # to create each batch.
-    # For instace, if there are five accessions, batch size of two produces
-    # indices = 0,2,4
-    batch_indices = basic.create_indices(unique_accession_list, batch_size)
+    # The next batch of accessions is searched while the records from
+    # the current batch are retrieved.
     print(f"There are {len(unique_accession_list)} GenBank accessions to check.")
-    for indices in batch_indices:
-        batch_index_start = indices[0]
-        batch_index_stop = indices[1]
+    batches = ncbi.prefetch(ncbi.search_batches(client, unique_accession_list,
+                                                batch_size=batch_size,
+                                                db="nucleotide"))
+    failed_list = []
+    for batch in batches:
+        batch_index_start = batch["start"]
+        batch_index_stop = batch["stop"]
         print("Checking accessions "
               f"{batch_index_start + 1} to {batch_index_stop}...")
-        current_batch_size = batch_index_stop - batch_index_start
-        delimiter = " | "
-        esearch_term = delimiter.join(appended_accessions[
-                                      batch_index_start:batch_index_stop])
-
-        # Use esearch for each accession
-        search_record = ncbi.run_esearch(db="nucleotide", term=esearch_term,
-                            usehistory="y")
-        search_count = int(search_record["Count"])
-        search_webenv = search_record["WebEnv"]
-        search_query_key = search_record["QueryKey"]
-        summary_records = ncbi.get_summaries(db="nucleotide",
-                                             query_key=search_query_key,
-                                             webenv=search_webenv)
+        if batch["error"] is not None:
+            print(f"Unable to search accessions: {batch['error']}")
+            failed_list.extend(unique_accession_list[
+                                    batch_index_start:batch_index_stop])
+            continue
 
         accessions_to_retrieve = []
-        for doc_sum in summary_records:
+        for doc_sum in batch["summaries"]:
             doc_sum_accession = doc_sum["Caption"]
             accessions_to_retrieve.append(doc_sum_accession)
 
         if len(accessions_to_retrieve) > 0:
-            output_list = ncbi.get_records(accessions_to_retrieve,
-                                           db="nucleotide",
-                                           rettype="gb",
-                                           retmode="text")
-            for retrieved_record in output_list:
-                ncbi_filename = (f"{retrieved_record.name}.gb")
-                flatfile_path = pathlib.Path(output_folder, ncbi_filename)
-                SeqIO.write(retrieved_record, str(flatfile_path), "genbank")
+            # Records are saved to files as they are retrieved,
+            # without being parsed.
+            try:
+                with tempfile.TemporaryFile("w+", encoding="utf-8") as handle:
+                    client.efetch(accessions_to_retrieve, handle,
+                                  db="nucleotide", rettype="gb",
+                                  retmode="text")
+                    for record_text in ncbi.split_genbank_records(handle):
+                        name = ncbi.parse_locus(record_text)[0]
+                        ncbi_filename = (f"{name}.gb")
+                        flatfile_path = pathlib.Path(output_folder,
+                                                     ncbi_filename)
+                        with flatfile_path.open("w") as fh:
+                            fh.write(record_text)
+            except Exception as err:
+                print(f"Unable to retrieve records: {err}")
+                failed_list.extend(accessions_to_retrieve)
+
+    if len(failed_list) > 0:
+        print(f"{len(failed_list)} accession(s) could not be retrieved:")
+        for accession in failed_list:
+            print(accession)
 
 ###
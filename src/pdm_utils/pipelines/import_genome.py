@@ -3,10 +3,18 @@ into the MySQL database."""
 
 
 import argparse
+import collections
+import contextlib
 import csv
 from datetime import datetime, date
+import functools
+import io
+import itertools
 import logging
+import logging.handlers
+import multiprocessing
 import pathlib
+import queue
 import shutil
 import sys
 from tabulate import tabulate
@@ -16,6 +24,7 @@ from pdm_utils.functions import tickets
 from pdm_utils.functions import flat_files
 from pdm_utils.functions import phagesdb
 from pdm_utils.functions import mysqldb
+from pdm_utils.functions import translation
 from pdm_utils.classes import bundle
 from pdm_utils.classes import genomepair
 from pdm_utils.constants import constants, eval_descriptions
@@ -40,6 +49,16 @@ GENOMES_FOLDER = "genomes"
 LOGS_FOLDER = "logs"
 VERSION = pdm_utils.__version__
 EDD = eval_descriptions.EVAL_DESCRIPTIONS
+EMPTY_SEQ_HASH = basic.get_seq_hash(constants.EMPTY_GENOME_SEQ)
+MYSQL_REF_KEYS = ("phage_id_set", "accession_set", "seq_hash_set",
+                  "host_genera_set", "cluster_set", "subcluster_set")
+# Phage table column, and replacement value for NULL data,
+# for each set of MySQL reference data other than sequences.
+MYSQL_REF_COLUMNS = {"phage_id_set": ("PhageID", None),
+                     "accession_set": ("Accession", None),
+                     "host_genera_set": ("HostGenus", None),
+                     "cluster_set": ("Cluster", "Singleton"),
+                     "subcluster_set": ("Subcluster", "none")}
 
 def main(unparsed_args_list):
     """Runs the complete import pipeline.
@@ -90,6 +109,12 @@ def main(unparsed_args_list):
     mysqldb.check_schema_compatibility(engine, "the import pipeline")
     logger.info(f"Schema version is compatible.")
 
+    # Responses from PhagesDB are cached for the duration of the import,
+    # and optionally on disk so that later runs can reuse them.
+    phagesdb_cache = phagesdb.ResponseCache(cache_dir=args.phagesdb_cache,
+                                            ttl=args.phagesdb_ttl,
+                                            offline=args.phagesdb_offline)
+
     # If everything checks out, pass on args for data input/output.
     data_io(engine=engine,
             genome_folder=args.input_folder,
@@ -100,7 +125,10 @@ def main(unparsed_args_list):
             description_field=args.description_field,
             eval_mode=args.eval_mode,
             output_folder=results_path,
-            interactive=args.interactive)
+            interactive=args.interactive,
+            verify_ref_data=args.verify_ref_data,
+            workers=args.workers,
+            phagesdb_cache=phagesdb_cache)
 
     logger.info("Import complete.")
 
@@ -149,6 +177,26 @@ def parse_args(unparsed_args_list):
          "This will be created in the output folder.")
     INTERACTIVE_HELP = \
         "Indicates whether interactive evaluation of data is permitted."
+    VERIFY_REF_DATA_HELP = \
+        ("Indicates whether the reference data cached from the MySQL "
+         "database should be verified against the database after "
+         "each genome is imported.")
+    WORKERS_HELP = \
+        ("Indicates the number of processes used to parse and evaluate "
+         "flat files. Data is still imported into the database one "
+         "flat file at a time, in the same order as in serial mode. "
+         "Not used in interactive mode, in which flat files are always "
+         "evaluated serially so that CDS descriptions reviewed at the "
+         "prompt are used to check the features.")
+    PHAGESDB_CACHE_HELP = \
+        ("Path to the folder in which responses from PhagesDB are cached, "
+         "so that they can be reused by later runs.")
+    PHAGESDB_TTL_HELP = \
+        ("Indicates the number of seconds that a cached response from "
+         "PhagesDB is reused before it is revalidated.")
+    PHAGESDB_OFFLINE_HELP = \
+        ("Indicates whether only cached responses from PhagesDB should be "
+         "used, without connecting to PhagesDB.")
 
     parser = argparse.ArgumentParser(description=IMPORT_HELP)
     parser.add_argument("database", type=str, help=DATABASE_HELP)
@@ -180,6 +228,16 @@ def parse_args(unparsed_args_list):
         help=LOG_FILE_HELP)
     parser.add_argument("-i", "--interactive", action="store_true",
         default=False, help=INTERACTIVE_HELP)
+    parser.add_argument("-vr", "--verify_ref_data", action="store_true",
+        default=False, help=VERIFY_REF_DATA_HELP)
+    parser.add_argument("-w", "--workers", type=int, default=1,
+        help=WORKERS_HELP)
+    parser.add_argument("--phagesdb_cache", type=pathlib.Path, default=None,
+        help=PHAGESDB_CACHE_HELP)
+    parser.add_argument("--phagesdb_ttl", type=int, default=0,
+        help=PHAGESDB_TTL_HELP)
+    parser.add_argument("--phagesdb_offline", action="store_true",
+        default=False, help=PHAGESDB_OFFLINE_HELP)
 
     # Assumed command line arg structure:
     # python3 -m pdm_utils.run <pipeline> <additional args...>
@@ -194,7 +252,8 @@ def parse_args(unparsed_args_list):
 def data_io(engine=None, genome_folder=pathlib.Path(),
     import_table_file=pathlib.Path(), genome_id_field="", host_genus_field="",
     prod_run=False, description_field="", eval_mode="",
-    output_folder=pathlib.Path(), interactive=False):
+    output_folder=pathlib.Path(), interactive=False, verify_ref_data=False,
+    workers=1, phagesdb_cache=None):
     """Set up output directories, log files, etc. for import.
 
     :param engine: SQLAlchemy Engine object able to connect to a MySQL database.
@@ -223,6 +282,19 @@ def data_io(engine=None, genome_folder=pathlib.Path(),
         Indicates whether user is able to interact with genome evaluations
         at run time.
     :type interactive: bool
+    :param verify_ref_data:
+        Indicates whether the cached MySQL reference data should be
+        verified against the database after each import.
+    :type verify_ref_data: bool
+    :param workers:
+        Number of processes used to parse and evaluate flat files.
+        If set to 1, or if interactive is True, files are evaluated serially.
+        Worker processes check the CDS features using the description
+        field in the ticket, so the field cannot be changed interactively
+        once the features are checked.
+    :type workers: int
+    :param phagesdb_cache: Cache of responses retrieved from PhagesDB.
+    :type phagesdb_cache: ResponseCache
     """
 
     logger.info("Setting up environment.")
@@ -277,7 +349,10 @@ def data_io(engine=None, genome_folder=pathlib.Path(),
                         genome_id_field=genome_id_field,
                         host_genus_field=host_genus_field,
                         interactive=interactive,
-                        log_folder_paths_dict=log_folder_paths_dict)
+                        log_folder_paths_dict=log_folder_paths_dict,
+                        verify_ref_data=verify_ref_data,
+                        workers=workers,
+                        phagesdb_cache=phagesdb_cache)
     success_ticket_list = results_tuple[0]
     failed_ticket_list = results_tuple[1]
     success_filepath_list = results_tuple[2]
@@ -494,7 +569,9 @@ def prepare_tickets(import_table_file=pathlib.Path(), eval_data_dict=None,
 def process_files_and_tickets(ticket_dict, files_in_folder, engine=None,
                               prod_run=False, genome_id_field="",
                               host_genus_field="", interactive=False,
-                              log_folder_paths_dict=None):
+                              log_folder_paths_dict=None,
+                              verify_ref_data=False, workers=1,
+                              phagesdb_cache=None):
     """Process GenBank-formatted flat files and import tickets.
 
     :param ticket_dict:
@@ -513,6 +590,9 @@ def process_files_and_tickets(ticket_dict, files_in_folder, engine=None,
     :param log_folder_paths_dict:
         Dictionary indicating paths to success and fail folders.
     :type log_folder_paths_dict: dict
+    :param verify_ref_data: same as for data_io().
+    :param workers: same as for data_io().
+    :param phagesdb_cache: same as for data_io().
     :returns:
         tuple of five objects
         WHERE
@@ -548,45 +628,108 @@ def process_files_and_tickets(ticket_dict, files_in_folder, engine=None,
     # else:
     #   external_ref_data = <empty data dictionary>
 
+    # Responses from PhagesDB are cached at least for the rest of the import.
+    if phagesdb_cache is None:
+        phagesdb_cache = phagesdb.ResponseCache()
+
     # Retrieve valid cluster, subcluster, host data from PhagesDB.
-    external_ref_data = get_phagesdb_reference_sets()
+    external_ref_data = get_phagesdb_reference_sets(cache=phagesdb_cache)
+
+    # Retrieve PhagesDB data for all tickets that need it concurrently,
+    # instead of one request at a time as each flat file is processed.
+    phage_urls = [phagesdb.construct_phage_url(tkt.phage_id)
+                  for tkt in ticket_dict.values()
+                  if len(tkt.data_retrieve) > 0]
+    phagesdb.retrieve_urls(phage_urls, cache=phagesdb_cache)
+
+    # Retrieve valid data from MySQL. Since data from each parsed flat file
+    # is imported into the database one file at a time, this data is not
+    # static. Instead of re-querying the database for every flat file,
+    # the data is retrieved once and updated after each successful import.
+    mysql_ref_data = get_mysql_reference_sets(engine)
 
     # To minimize memory usage, each flat_file is evaluated one by one.
+    # If multiple workers are requested, flat files are parsed and their
+    # features are checked in separate processes, but everything that relies
+    # on the tickets or the database is still performed here in file order.
+    # Interactive evaluation requires user input, so it is always serial.
+    # This also ensures that features are only checked after the user has
+    # reviewed the CDS description field in populate_bundle().
+    if workers > 1 and interactive:
+        msg = ("Flat files are evaluated serially in interactive mode, "
+               f"so {workers} workers are not used.")
+        logger.info(msg)
+        print(msg)
+    if workers > 1 and not interactive and len(files_in_folder) > 0:
+        evaluations = iter_flat_file_evaluations(
+                            files_in_folder, workers,
+                            ticket_dict=ticket_dict,
+                            genome_id_field=genome_id_field,
+                            host_genus_field=host_genus_field,
+                            file_ref=file_ref,
+                            id_conversion_dict=constants.PHAGE_ID_DICT,
+                            log_level=logger.getEffectiveLevel())
+    else:
+        evaluations = itertools.repeat(None)
+
     bundle_count = 1
     file_count = 1
-    for filepath in files_in_folder:
+    # Evaluations are retrieved first so that the pool of processes is
+    # closed as soon as the last flat file is evaluated.
+    for evaluation, filepath in zip(evaluations, files_in_folder):
         replace_gnm_pair_key = file_ref + "_" + retain_ref
         progress = f"Processing data for file #{file_count}: {filepath.name}."
         print("\n\n" + progress)
         logger.info(progress)
 
-        bndl = prepare_bundle(filepath=filepath, ticket_dict=ticket_dict,
-                              engine=engine,
-                              genome_id_field=genome_id_field,
-                              host_genus_field=host_genus_field,
-                              id=bundle_count,
-                              file_ref=file_ref, ticket_ref=ticket_ref,
-                              retrieve_ref=retrieve_ref, retain_ref=retain_ref,
-                              interactive=interactive,
-                              id_conversion_dict=constants.PHAGE_ID_DICT)
-
-        # Create sets of unique values for different data fields.
-        # Since data from each parsed flat file is imported into the
-        # database one file at a time, these sets are not static.
-        # So these sets should be recomputed for every flat file evaluated.
-        # Retrieve valid data from MySQL and merge with the valid external data.
-        mysql_ref_data = get_mysql_reference_sets(engine)
+        # The features were checked using the ticket that matched the flat
+        # file when processing started. If that ticket has since been matched
+        # to a previous flat file, the file needs to be evaluated again.
+        if (evaluation is not None and evaluation["matched_ticket"] and
+                evaluation["genome"].id not in ticket_dict.keys()):
+            evaluation = None
+
+        if evaluation is None:
+            feature_output = None
+            bndl = prepare_bundle(filepath=filepath, ticket_dict=ticket_dict,
+                                  engine=engine,
+                                  genome_id_field=genome_id_field,
+                                  host_genus_field=host_genus_field,
+                                  id=bundle_count,
+                                  file_ref=file_ref, ticket_ref=ticket_ref,
+                                  retrieve_ref=retrieve_ref,
+                                  retain_ref=retain_ref,
+                                  interactive=interactive,
+                                  id_conversion_dict=constants.PHAGE_ID_DICT,
+                                  phagesdb_cache=phagesdb_cache)
+        else:
+            feature_output = evaluation["feature_output"]
+            bndl = bundle.Bundle()
+            bndl.id = bundle_count
+            replay_output(evaluation["parse_output"])
+            # The features were checked by the worker using the description
+            # field in the ticket, so it is not reviewed interactively.
+            if evaluation["genome"] is not None:
+                populate_bundle(bndl, evaluation["genome"], filepath=filepath,
+                                ticket_dict=ticket_dict, engine=engine,
+                                ticket_ref=ticket_ref,
+                                retrieve_ref=retrieve_ref,
+                                retain_ref=retain_ref, interactive=False,
+                                phagesdb_cache=phagesdb_cache)
+
+        # Merge valid data from MySQL with the valid external data.
         ref_data = basic.merge_set_dicts(external_ref_data, mysql_ref_data)
         logger.info(f"Checking file: {filepath.name}.")
         run_checks(bndl,
                    accession_set=ref_data["accession_set"],
                    phage_id_set=ref_data["phage_id_set"],
-                   seq_set=ref_data["seq_set"],
+                   seq_hash_set=ref_data["seq_hash_set"],
                    host_genus_set=ref_data["host_genera_set"],
                    cluster_set=ref_data["cluster_set"],
                    subcluster_set=ref_data["subcluster_set"],
                    file_ref=file_ref, ticket_ref=ticket_ref,
-                   retrieve_ref=retrieve_ref, retain_ref=retain_ref)
+                   retrieve_ref=retrieve_ref, retain_ref=retain_ref,
+                   feature_output=feature_output)
 
         review_bundled_objects(bndl, interactive=interactive)
 
@@ -599,6 +742,13 @@ def process_files_and_tickets(ticket_dict, files_in_folder, engine=None,
         result = import_into_db(bndl, engine=engine,
                                 gnm_key=file_ref, prod_run=prod_run)
         bndl.check_for_errors()
+        if result and prod_run:
+            update_mysql_reference_sets(mysql_ref_data, bndl, engine=engine,
+                                        file_ref=file_ref,
+                                        retain_ref=retain_ref)
+            if verify_ref_data:
+                mysql_ref_data = verify_mysql_reference_sets(mysql_ref_data,
+                                                             engine)
         dict_of_eval_lists = bndl.get_evaluations()
         logfile_path = get_logfile_path(bndl, paths_dict=log_folder_paths_dict,
                                         filepath=filepath, file_ref=file_ref)
@@ -644,9 +794,132 @@ def process_files_and_tickets(ticket_dict, files_in_folder, engine=None,
             failed_filepath_list, evaluation_dict)
 
 
-def get_phagesdb_reference_sets():
+def iter_flat_file_evaluations(files_in_folder, workers, **kwargs):
+    """Evaluate flat files in a pool of processes.
+
+    Flat files are submitted to the pool in a limited window, so that
+    only a few more parsed genomes than there are workers are held in
+    memory at any one time.
+
+    :param files_in_folder: same as for process_files_and_tickets().
+    :param workers: Number of processes used to evaluate flat files.
+    :type workers: int
+    :param kwargs: Keyword arguments passed to evaluate_flat_file().
+    :returns:
+        Dictionaries from evaluate_flat_file(), in the same order as
+        the flat files.
+    :rtype: generator
+    """
+    task = functools.partial(evaluate_flat_file, **kwargs)
+    with multiprocessing.Pool(processes=workers) as pool:
+        pending = collections.deque()
+        for filepath in files_in_folder:
+            pending.append(pool.apply_async(task, (filepath,)))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().get()
+        while len(pending) > 0:
+            yield pending.popleft().get()
+
+
+def evaluate_flat_file(filepath, ticket_dict={}, genome_id_field="",
+                       host_genus_field="", file_ref="", id_conversion_dict={},
+                       log_level=logging.DEBUG):
+    """Parse a flat file and check the data that does not rely on MySQL.
+
+    The ticket dictionary is not modified. If a ticket matches the flat
+    file, the CDS and tRNA features are checked using that ticket.
+    Everything that is logged or printed is captured instead of being
+    output, so that it can be replayed in file order with replay_output().
+
+    :param filepath: same as for prepare_bundle().
+    :param ticket_dict: same as for prepare_bundle().
+    :param genome_id_field: same as for data_io().
+    :param host_genus_field: same as for data_io().
+    :param file_ref: same as for prepare_bundle().
+    :param id_conversion_dict: same as for prepare_bundle().
+    :param log_level: Lowest level of log records to capture.
+    :type log_level: int
+    :returns:
+        Dictionary
+        WHERE
+        "genome" (Genome) is the parsed flat file, or None.
+        "matched_ticket" (bool) indicates whether a ticket matched the file.
+        "parse_output" (tuple) is the output from parsing the file.
+        "feature_output" (tuple) is the output from checking the features.
+    :rtype: dict
+    """
+    with capture_output(log_level=log_level) as parse_output:
+        ff_gnm = parse_flat_file(filepath, genome_id_field=genome_id_field,
+                                 host_genus_field=host_genus_field,
+                                 file_ref=file_ref,
+                                 id_conversion_dict=id_conversion_dict)
+
+    with capture_output(log_level=log_level) as feature_output:
+        if ff_gnm is not None and ff_gnm.id in ticket_dict.keys():
+            matched_ticket = True
+            tkt = ticket_dict[ff_gnm.id]
+            set_cds_descriptions(ff_gnm, tkt)
+            check_features(ff_gnm, tkt.eval_flags,
+                           description_field=tkt.description_field)
+        else:
+            matched_ticket = False
+
+    dict = {"genome": ff_gnm,
+            "matched_ticket": matched_ticket,
+            "parse_output": parse_output,
+            "feature_output": feature_output}
+    return dict
+
+
+@contextlib.contextmanager
+def capture_output(log_level=logging.DEBUG):
+    """Capture log records and printed text instead of outputting them.
+
+    :param log_level: Lowest level of log records to capture.
+    :type log_level: int
+    :returns:
+        Tuple of two objects, populated after the context exits
+        WHERE
+        [0] (list) is a list of LogRecords.
+        [1] (list) is a list containing the printed text.
+    :rtype: tuple
+    """
+    root_logger = logging.getLogger()
+    prior_handlers = root_logger.handlers
+    prior_level = root_logger.level
+    record_queue = queue.SimpleQueue()
+    text = io.StringIO()
+    output = ([], [])
+    root_logger.handlers = [logging.handlers.QueueHandler(record_queue)]
+    root_logger.setLevel(log_level)
+    try:
+        with contextlib.redirect_stdout(text):
+            yield output
+    finally:
+        root_logger.handlers = prior_handlers
+        root_logger.setLevel(prior_level)
+        while not record_queue.empty():
+            output[0].append(record_queue.get())
+        output[1].append(text.getvalue())
+
+
+def replay_output(output):
+    """Output log records and printed text from capture_output().
+
+    :param output: Tuple of captured output from capture_output().
+    :type output: tuple
+    """
+    records, text = output
+    sys.stdout.write("".join(text))
+    for record in records:
+        logging.getLogger(record.name).handle(record)
+
+
+def get_phagesdb_reference_sets(cache=None):
     """Get multiple sets of data from PhagesDB for reference.
 
+    :param cache: Cache of responses retrieved from PhagesDB.
+    :type cache: ResponseCache
     :returns:
         Dictionary of unique clusters, subclusters, and host genera
         stored on PhagesDB.
@@ -656,8 +929,8 @@ def get_phagesdb_reference_sets():
     # Retrieve data from PhagesDB to create sets of
     # valid host genera, clusters, and subclusters.
     # If there is no subcluster, value may be empty string or "none".
-    host_genera = phagesdb.create_host_genus_set()
-    results_tuple = phagesdb.create_cluster_subcluster_sets()
+    host_genera = phagesdb.create_host_genus_set(cache=cache)
+    results_tuple = phagesdb.create_cluster_subcluster_sets(cache=cache)
     clusters = results_tuple[0]
     subclusters = results_tuple[1]
     dict = {"host_genera_set": host_genera,
@@ -672,29 +945,118 @@ def get_mysql_reference_sets(engine):
     :param engine: same as for data_io().
     :returns:
         Dictionary of unique PhageIDs, clusters, subclusters,
-        host genera, accessions, and sequences stored in the MySQL database.
+        host genera, accessions, and sequence hashes stored in the
+        MySQL database.
     :rtype: dict
     """
-    phage_ids = mysqldb.get_distinct_data(engine, "phage", "PhageID")
-    accessions = mysqldb.get_distinct_data(engine, "phage", "Accession")
-    clusters = mysqldb.get_distinct_data(engine, "phage", "Cluster",
-                                         null="Singleton")
+    dict = {}
+    for key in MYSQL_REF_KEYS:
+        dict[key] = get_mysql_reference_set(engine, key)
+    return dict
+
+
+def get_mysql_reference_set(engine, key):
+    """Get one set of data from the MySQL database for reference.
+
+    :param engine: same as for data_io().
+    :param key:
+        Name of the set of data, as used in the dictionary returned by
+        get_mysql_reference_sets().
+    :type key: str
+    :returns: Set of unique values stored in the MySQL database.
+    :rtype: set
+    """
+    if key == "seq_hash_set":
+        values = mysqldb.create_seq_hash_set(engine)
+    else:
+        column, null = MYSQL_REF_COLUMNS[key]
+        values = mysqldb.get_distinct_data(engine, "phage", column, null=null)
 
     # Cluster "UNK" may or may not already be present, but it is valid.
-    clusters.add("UNK")
-    subclusters = mysqldb.get_distinct_data(engine, "phage", "Subcluster",
-                                            null="none")
-    host_genera = mysqldb.get_distinct_data(engine, "phage", "HostGenus")
-    seqs = mysqldb.create_seq_set(engine)
-    dict = {"phage_id_set": phage_ids,
-            "accession_set": accessions,
-            "seq_set": seqs,
-            "host_genera_set": host_genera,
-            "cluster_set": clusters,
-            "subcluster_set": subclusters}
+    if key == "cluster_set":
+        values.add("UNK")
+    return values
+
+
+def get_genome_reference_values(gnm):
+    """Get the values of a Genome as they are stored in the reference sets.
+
+    Values are converted in the same way they are after being
+    inserted into and retrieved from the MySQL database.
+
+    :param gnm: A pdm_utils Genome object.
+    :type gnm: Genome
+    :returns:
+        Dictionary of values using the same keys as
+        get_mysql_reference_sets().
+    :rtype: dict
+    """
+    dict = {"phage_id_set": gnm.id,
+            "accession_set": gnm.accession,
+            "seq_hash_set": gnm.seq_hash,
+            "host_genera_set": gnm.host_genus,
+            "cluster_set": gnm.cluster,
+            "subcluster_set": gnm.subcluster}
     return dict
 
 
+def update_mysql_reference_sets(ref_data, bndl, engine=None, file_ref="",
+                                retain_ref=""):
+    """Update sets of MySQL data after a genome is imported.
+
+    Data from the imported genome is added to each set. For 'replace'
+    tickets, a value from the genome that was replaced may no longer be
+    present in the database, so any set in which the value changed is
+    retrieved from the database again.
+
+    :param ref_data: Dictionary of sets from get_mysql_reference_sets().
+    :type ref_data: dict
+    :param bndl: same as for run_checks().
+    :param engine: same as for data_io().
+    :param file_ref: same as for prepare_bundle().
+    :param retain_ref: same as for prepare_bundle().
+    """
+    new_values = get_genome_reference_values(bndl.genome_dict[file_ref])
+    if (bndl.ticket.type == "replace"
+            and retain_ref in bndl.genome_dict.keys()):
+        old_values = get_genome_reference_values(bndl.genome_dict[retain_ref])
+    else:
+        old_values = new_values
+
+    for key in MYSQL_REF_KEYS:
+        if old_values[key] != new_values[key]:
+            logger.info(f"Retrieving updated {key} data from the database.")
+            ref_data[key] = get_mysql_reference_set(engine, key)
+        else:
+            ref_data[key].add(new_values[key])
+
+
+def verify_mysql_reference_sets(ref_data, engine):
+    """Verify sets of MySQL data are consistent with the database.
+
+    :param ref_data: Dictionary of sets from get_mysql_reference_sets().
+    :type ref_data: dict
+    :param engine: same as for data_io().
+    :returns:
+        The original dictionary if it is consistent with the database,
+        otherwise a new dictionary retrieved from the database.
+    :rtype: dict
+    """
+    mysql_ref_data = get_mysql_reference_sets(engine)
+    diff_keys = [key for key in MYSQL_REF_KEYS
+                 if ref_data[key] != mysql_ref_data[key]]
+    if len(diff_keys) > 0:
+        logger.warning("The cached MySQL reference data is not consistent "
+                       "with the database for the following data: "
+                       f"{', '.join(diff_keys)}. "
+                       "Reference data will be retrieved from the database.")
+        ref_data = mysql_ref_data
+    else:
+        logger.info("The cached MySQL reference data is consistent "
+                    "with the database.")
+    return ref_data
+
+
 def get_logfile_path(bndl, paths_dict=None, filepath=None, file_ref=None):
     """Choose the path to output the file-specific log.
 
@@ -742,7 +1104,8 @@ def get_logfile_path(bndl, paths_dict=None, filepath=None, file_ref=None):
 def prepare_bundle(filepath=pathlib.Path(), ticket_dict={}, engine=None,
                    genome_id_field="", host_genus_field="", id=None,
                    file_ref="", ticket_ref="", retrieve_ref="", retain_ref="",
-                   id_conversion_dict={}, interactive=False):
+                   id_conversion_dict={}, interactive=False,
+                   phagesdb_cache=None):
     """Gather all genomic data needed to evaluate the flat file.
 
     :param filepath: Name of a GenBank-formatted flat file.
@@ -765,6 +1128,7 @@ def prepare_bundle(filepath=pathlib.Path(), ticket_dict={}, engine=None,
     :param id_conversion_dict: Dictionary of PhageID conversions.
     :type id_conversion_dict: dict
     :param interactive: same as for data_io().
+    :param phagesdb_cache: same as for data_io().
     :returns:
         A pdm_utils Bundle object containing all data required to
         evaluate a flat file.
@@ -772,9 +1136,37 @@ def prepare_bundle(filepath=pathlib.Path(), ticket_dict={}, engine=None,
     """
     bndl = bundle.Bundle()
     bndl.id = id
+    ff_gnm = parse_flat_file(filepath, genome_id_field=genome_id_field,
+                             host_genus_field=host_genus_field,
+                             file_ref=file_ref,
+                             id_conversion_dict=id_conversion_dict)
+    if ff_gnm is not None:
+        populate_bundle(bndl, ff_gnm, filepath=filepath,
+                        ticket_dict=ticket_dict, engine=engine,
+                        ticket_ref=ticket_ref, retrieve_ref=retrieve_ref,
+                        retain_ref=retain_ref, interactive=interactive,
+                        phagesdb_cache=phagesdb_cache)
+    return bndl
+
+
+def parse_flat_file(filepath, genome_id_field="", host_genus_field="",
+                    file_ref="", id_conversion_dict={}):
+    """Parse a flat file into a Genome object.
+
+    :param filepath: same as for prepare_bundle().
+    :param genome_id_field: same as for data_io().
+    :param host_genus_field: same as for data_io().
+    :param file_ref: same as for prepare_bundle().
+    :param id_conversion_dict: same as for prepare_bundle().
+    :returns:
+        A pdm_utils Genome object containing data parsed from the flat file.
+        If no record can be retrieved from the file, None is returned.
+    :rtype: Genome
+    """
     seqrecord = flat_files.retrieve_genome_data(filepath)
     if seqrecord is None:
         logger.error(f"No record was retrieved from the file: {filepath.name}.")
+        ff_gnm = None
     else:
         logger.info(f"Parsing record from the file: {filepath.name}.")
         ff_gnm = flat_files.parse_genome_data(
@@ -800,91 +1192,110 @@ def prepare_bundle(filepath=pathlib.Path(), ticket_dict={}, engine=None,
             ff_gnm.set_feature_genome_ids("cds")
             ff_gnm.set_feature_genome_ids("source")
             # TODO set tRNA and tmRNA feature genome_ids.
+    return ff_gnm
 
-        bndl.genome_dict[ff_gnm.type] = ff_gnm
 
-        # Match ticket (if available) to flat file.
-        bndl.ticket = ticket_dict.pop(ff_gnm.id, None)
-        if bndl.ticket is None:
-            logger.info(f"No matched ticket for file: {filepath.name}.")
-        else:
-            logger.info(f"Preparing ticket data for file: {filepath.name}.")
-            # With the flat file parsed and matched
-            # to a ticket, use the ticket to populate specific
-            # genome-level fields such as host, cluster, subcluster, etc.
-            # Genome attributes from the ticket table that should not be
-            # populated from the ticket, from PhagesDB, or from
-            # the MySQL database, are stored in data_parse.
-            # There is no need to evaluate what is stored in data_parse.
-
-            if len(bndl.ticket.data_add) > 0:
-                tkt_gnm = tickets.get_genome(bndl.ticket, gnm_type=ticket_ref)
-                bndl.genome_dict[tkt_gnm.type] = tkt_gnm
-
-                # Copy ticket data to flat file. Since the ticket data has been
-                # added to a genome object using genome methods, the data
-                # can be directly passed from one genome object to another.
-                for attr in bndl.ticket.data_add:
-                    attr_value = getattr(tkt_gnm, attr)
+def populate_bundle(bndl, ff_gnm, filepath=pathlib.Path(), ticket_dict={},
+                    engine=None, ticket_ref="", retrieve_ref="", retain_ref="",
+                    interactive=False, phagesdb_cache=None):
+    """Match a parsed flat file to its ticket and gather related data.
+
+    :param bndl: same as for run_checks().
+    :param ff_gnm: A pdm_utils Genome object parsed from a flat file.
+    :type ff_gnm: Genome
+    :param filepath: same as for prepare_bundle().
+    :param ticket_dict: same as for prepare_bundle().
+    :param engine: same as for data_io().
+    :param ticket_ref: same as for prepare_bundle().
+    :param retrieve_ref: same as for prepare_bundle().
+    :param retain_ref: same as for prepare_bundle().
+    :param interactive: same as for data_io().
+    :param phagesdb_cache: same as for data_io().
+    """
+    bndl.genome_dict[ff_gnm.type] = ff_gnm
+
+    # Match ticket (if available) to flat file.
+    bndl.ticket = ticket_dict.pop(ff_gnm.id, None)
+    if bndl.ticket is None:
+        logger.info(f"No matched ticket for file: {filepath.name}.")
+    else:
+        logger.info(f"Preparing ticket data for file: {filepath.name}.")
+        # With the flat file parsed and matched
+        # to a ticket, use the ticket to populate specific
+        # genome-level fields such as host, cluster, subcluster, etc.
+        # Genome attributes from the ticket table that should not be
+        # populated from the ticket, from PhagesDB, or from
+        # the MySQL database, are stored in data_parse.
+        # There is no need to evaluate what is stored in data_parse.
+
+        if len(bndl.ticket.data_add) > 0:
+            tkt_gnm = tickets.get_genome(bndl.ticket, gnm_type=ticket_ref)
+            bndl.genome_dict[tkt_gnm.type] = tkt_gnm
+
+            # Copy ticket data to flat file. Since the ticket data has been
+            # added to a genome object using genome methods, the data
+            # can be directly passed from one genome object to another.
+            for attr in bndl.ticket.data_add:
+                attr_value = getattr(tkt_gnm, attr)
+                setattr(ff_gnm, attr, attr_value)
+
+        # Check to see if there is any missing data for each genome, and
+        # retrieve it from PhagesDB.
+        # If the ticket genome has fields set to 'retrieve', data is
+        # retrieved from PhagesDB and populates a new Genome object.
+        if len(bndl.ticket.data_retrieve) > 0:
+            pdb_gnm = phagesdb.get_genome(bndl.ticket.phage_id,
+                                          gnm_type=retrieve_ref,
+                                          cache=phagesdb_cache)
+            if pdb_gnm is not None:
+                bndl.genome_dict[pdb_gnm.type] = pdb_gnm
+
+                for attr in bndl.ticket.data_retrieve:
+                    attr_value = getattr(pdb_gnm, attr)
                     setattr(ff_gnm, attr, attr_value)
 
-            # Check to see if there is any missing data for each genome, and
-            # retrieve it from PhagesDB.
-            # If the ticket genome has fields set to 'retrieve', data is
-            # retrieved from PhagesDB and populates a new Genome object.
-            if len(bndl.ticket.data_retrieve) > 0:
-                pdb_gnm = phagesdb.get_genome(bndl.ticket.phage_id,
-                                              gnm_type=retrieve_ref)
-                if pdb_gnm is not None:
-                    bndl.genome_dict[pdb_gnm.type] = pdb_gnm
-
-                    for attr in bndl.ticket.data_retrieve:
-                        attr_value = getattr(pdb_gnm, attr)
+        # If the ticket type is 'replace', retrieve data from the MySQL database.
+        # If any attributes in flat_file are set to 'retain', copy data
+        # from the MySQL genome.
+        if bndl.ticket.type == "replace":
+
+            if engine is None:
+                logger.info(
+                      f"Ticket {bndl.ticket.id} is a 'replace' ticket "
+                      "but no details about how to connect to the "
+                      "MySQL database have been provided. "
+                      "Unable to retrieve data.")
+            else:
+                query = "SELECT * FROM phage"
+                pmr_genomes =  mysqldb.parse_genome_data(
+                                   engine=engine,
+                                   phage_id_list=[ff_gnm.id],
+                                   phage_query=query,
+                                   gnm_type=retain_ref)
+                if len(pmr_genomes) == 1:
+                    pmr_gnm = pmr_genomes[0]
+                    bndl.genome_dict[pmr_gnm.type] = pmr_gnm
+
+                    # The ticket may indicate some data should be retained.
+                    for attr in bndl.ticket.data_retain:
+                        attr_value = getattr(pmr_gnm, attr)
                         setattr(ff_gnm, attr, attr_value)
 
-            # If the ticket type is 'replace', retrieve data from the MySQL database.
-            # If any attributes in flat_file are set to 'retain', copy data
-            # from the MySQL genome.
-            if bndl.ticket.type == "replace":
-
-                if engine is None:
-                    logger.info(
-                          f"Ticket {bndl.ticket.id} is a 'replace' ticket "
-                          "but no details about how to connect to the "
-                          "MySQL database have been provided. "
-                          "Unable to retrieve data.")
+                    # Pair the genomes for comparison evaluations.
+                    gnm_pair = genomepair.GenomePair()
+                    bndl.set_genome_pair(gnm_pair, ff_gnm.type, pmr_gnm.type)
                 else:
-                    query = "SELECT * FROM phage"
-                    pmr_genomes =  mysqldb.parse_genome_data(
-                                       engine=engine,
-                                       phage_id_list=[ff_gnm.id],
-                                       phage_query=query,
-                                       gnm_type=retain_ref)
-                    if len(pmr_genomes) == 1:
-                        pmr_gnm = pmr_genomes[0]
-                        bndl.genome_dict[pmr_gnm.type] = pmr_gnm
-
-                        # The ticket may indicate some data should be retained.
-                        for attr in bndl.ticket.data_retain:
-                            attr_value = getattr(pmr_gnm, attr)
-                            setattr(ff_gnm, attr, attr_value)
-
-                        # Pair the genomes for comparison evaluations.
-                        gnm_pair = genomepair.GenomePair()
-                        bndl.set_genome_pair(gnm_pair, ff_gnm.type, pmr_gnm.type)
-                    else:
-                        logger.info(f"There is no {ff_gnm.id} genome "
-                                    "in the MySQL database. "
-                                    "Unable to retrieve data.")
-
-            set_cds_descriptions(ff_gnm, bndl.ticket, interactive=interactive)
-    return bndl
+                    logger.info(f"There is no {ff_gnm.id} genome "
+                                "in the MySQL database. "
+                                "Unable to retrieve data.")
+
+        set_cds_descriptions(ff_gnm, bndl.ticket, interactive=interactive)
 
 
 def run_checks(bndl, accession_set=set(), phage_id_set=set(),
-               seq_set=set(), host_genus_set=set(), cluster_set=set(),
+               seq_hash_set=set(), host_genus_set=set(), cluster_set=set(),
                subcluster_set=set(), file_ref="", ticket_ref="",
-               retrieve_ref="", retain_ref=""):
+               retrieve_ref="", retain_ref="", feature_output=None):
     """Run checks on the different types of data in a Bundle object.
 
     :param bndl: A pdm_utils Bundle object containing bundled data.
@@ -893,8 +1304,8 @@ def run_checks(bndl, accession_set=set(), phage_id_set=set(),
     :type accession_set: set
     :param phage_id_set: Set of PhageIDs to check against.
     :type phage_id_set: set
-    :param seq_set: Set of nucleotide sequences to check against.
-    :type seq_set: set
+    :param seq_hash_set: Set of nucleotide sequence hashes to check against.
+    :type seq_hash_set: set
     :param host_genus_set: Set of host genera to check against.
     :type host_genus_set: set
     :param cluster_set: Set of Clusters to check against.
@@ -905,6 +1316,10 @@ def run_checks(bndl, accession_set=set(), phage_id_set=set(),
     :param ticket_ref: same as for prepare_bundle().
     :param retrieve_ref: same as for prepare_bundle().
     :param retain_ref: same as for prepare_bundle().
+    :param feature_output:
+        Output captured from check_features() if CDS and tRNA features
+        were already checked in a separate process.
+    :type feature_output: tuple
     """
     logger.info("Checking data.")
     check_bundle(bndl, ticket_ref=ticket_ref, file_ref=file_ref,
@@ -922,17 +1337,18 @@ def run_checks(bndl, accession_set=set(), phage_id_set=set(),
             gnm = bndl.genome_dict[file_ref]
             check_genome(gnm, tkt.type, eval_flags,
                          accession_set=accession_set, phage_id_set=phage_id_set,
-                         seq_set=seq_set, host_genus_set=host_genus_set,
+                         seq_hash_set=seq_hash_set,
+                         host_genus_set=host_genus_set,
                          cluster_set=cluster_set, subcluster_set=subcluster_set)
 
-            # Check each type of feature.
-            for x in range(len(gnm.cds_features)):
-                check_cds(gnm.cds_features[x], eval_flags,
-                          description_field=tkt.description_field)
-
-            for x in range(len(gnm.trna_features)):
-                # TODO make sure this tRNA is implemented correctly.
-                check_trna(gnm.trna_features[x], eval_flags)
+            # Check each type of feature. CDS and tRNA features may have
+            # already been checked in a separate process, in which case
+            # the output from those checks is replayed instead.
+            if feature_output is None:
+                check_features(gnm, eval_flags,
+                               description_field=tkt.description_field)
+            else:
+                replay_output(feature_output)
 
             for x in range(len(gnm.source_features)):
                 check_source(gnm.source_features[x], eval_flags,
@@ -947,6 +1363,30 @@ def run_checks(bndl, accession_set=set(), phage_id_set=set(),
             check_retain_genome(gnm2, tkt.type, eval_flags)
 
 
+def check_features(gnm, eval_flags, description_field="product"):
+    """Check the CDS and tRNA features of a Genome object.
+
+    These checks only rely on data parsed from the flat file, so they
+    can be performed independently of the MySQL database.
+
+    :param gnm: A pdm_utils Genome object.
+    :type gnm: Genome
+    :param eval_flags: same as for check_cds().
+    :param description_field: same as for check_cds().
+    """
+    # Translate all CDS features at once instead of one at a time.
+    translations = translation.translate_cds_features(gnm.seq,
+                                                      gnm.cds_features)
+    for x in range(len(gnm.cds_features)):
+        check_cds(gnm.cds_features[x], eval_flags,
+                  description_field=description_field,
+                  translation=translations[x])
+
+    for x in range(len(gnm.trna_features)):
+        # TODO make sure this tRNA is implemented correctly.
+        check_trna(gnm.trna_features[x], eval_flags)
+
+
 def review_bundled_objects(bndl, interactive=False):
     """Review all evaluations of all bundled objects.
 
@@ -1376,7 +1816,7 @@ def check_ticket(tkt, type_set=set(), description_field_set=set(),
 
 
 def check_genome(gnm, tkt_type, eval_flags, phage_id_set=set(),
-                 seq_set=set(), host_genus_set=set(),
+                 seq_hash_set=set(), host_genus_set=set(),
                  cluster_set=set(), subcluster_set=set(),
                  accession_set=set()):
     """Check a Genome object parsed from file for errors.
@@ -1389,8 +1829,8 @@ def check_genome(gnm, tkt_type, eval_flags, phage_id_set=set(),
     :type eval_flags: dicts
     :param phage_id_set: Set of PhageIDs to check against.
     :type phage_id_set: set
-    :param seq_set: Set of genome sequences to check against.
-    :type seq_set: set
+    :param seq_hash_set: Set of genome sequence hashes to check against.
+    :type seq_hash_set: set
     :param host_genus_set: Set of host genera to check against.
     :type host_genus_set: set
     :param cluster_set: Set of clusters to check against.
@@ -1407,9 +1847,10 @@ def check_genome(gnm, tkt_type, eval_flags, phage_id_set=set(),
                             eval_id="GNM_001", eval_def=EDD["GNM_001"])
         gnm.check_attribute("name", phage_id_set | {""}, expect=False,
                             eval_id="GNM_002", eval_def=EDD["GNM_002"])
-        gnm.check_attribute("seq", seq_set | {constants.EMPTY_GENOME_SEQ},
-                            expect=False, eval_id="GNM_003",
-                            eval_def=EDD["GNM_003"])
+        # Sequences are checked using their hashes, so that sequences from
+        # the database do not need to be retrieved.
+        gnm.check_seq_hash(seq_hash_set | {EMPTY_SEQ_HASH}, expect=False,
+                           eval_id="GNM_003", eval_def=EDD["GNM_003"])
         gnm.check_attribute("annotation_status", {"final"}, expect=False,
                             eval_id="GNM_004", fail="warning",
                             eval_def=EDD["GNM_004"])
@@ -1431,8 +1872,8 @@ def check_genome(gnm, tkt_type, eval_flags, phage_id_set=set(),
     else:
         gnm.check_attribute("id", phage_id_set, expect=True, eval_id="GNM_006",
                             eval_def=EDD["GNM_006"])
-        gnm.check_attribute("seq", seq_set, expect=True,
-                            eval_id="GNM_007", eval_def=EDD["GNM_007"])
+        gnm.check_seq_hash(seq_hash_set, expect=True, eval_id="GNM_007",
+                           eval_def=EDD["GNM_007"])
         gnm.check_attribute("annotation_status", {"draft"}, expect=False,
                             eval_id="GNM_008", fail="warning",
                             eval_def=EDD["GNM_008"])
@@ -1620,7 +2061,8 @@ def check_source(src_ftr, eval_flags, host_genus=""):
                                     fail="warning", eval_def=EDD["SRC_004"])
 
 
-def check_cds(cds_ftr, eval_flags, description_field="product"):
+def check_cds(cds_ftr, eval_flags, description_field="product",
+              translation=None):
     """Check a Cds object for errors.
 
     :param cds_ftr: A pdm_utils Cds object.
@@ -1629,6 +2071,8 @@ def check_cds(cds_ftr, eval_flags, description_field="product"):
     :type eval_flags: dicts
     :param description_field: Description field to check against.
     :type description_field: str
+    :param translation: same as for Cds.check_translation().
+    :type translation: Seq
     """
     logger.info(f"Checking CDS feature: {cds_ftr.id}.")
 
@@ -1638,7 +2082,8 @@ def check_cds(cds_ftr, eval_flags, description_field="product"):
     cds_ftr.check_amino_acids(check_set=constants.PROTEIN_ALPHABET,
                               fail="warning", eval_id="CDS_001",
                               eval_def=EDD["CDS_001"])
-    cds_ftr.check_translation(eval_id="CDS_002", eval_def=EDD["CDS_002"])
+    cds_ftr.check_translation(eval_id="CDS_002", eval_def=EDD["CDS_002"],
+                              translation=translation)
     cds_ftr.check_attribute("translation_table", {11},
                             expect=True, eval_id="CDS_004", fail="warning",
                             eval_def=EDD["CDS_004"])
@@ -1790,7 +2235,7 @@ def import_into_db(bndl, engine=None, gnm_key="", prod_run=False):
 
         # Update the date field to reflect the day of import.
         import_gnm.date = IMPORT_DATE
-        bndl.sql_statements = mysqldb.create_genome_statements(
+        bndl.sql_statements = mysqldb.create_genome_bulk_statements(
                                 import_gnm, bndl.ticket.type)
         if prod_run:
             logger.info("Importing data into the database for "
@@ -1804,9 +2249,11 @@ def import_into_db(bndl, engine=None, gnm_key="", prod_run=False):
                 result = True
                 logger.info("Data successfully imported. " + msg)
                 logger.info("The following MySQL statements were executed:")
-                for statement in bndl.sql_statements:
+                for statement, values in bndl.sql_statements:
+                    if isinstance(values, dict):
+                        values = [values]
                     statement = basic.truncate_value(statement, 150, "...")
-                    logger.info(statement)
+                    logger.info(f"{statement} ({len(values)} set(s) of values)")
 
             # Result of statement execution is stored in an eval object
             # so that it can be recorded in the log file.
@@ -43,6 +43,13 @@ def setup_argparser():
                         help="cluster mode in range [0, 3] (mmseqs only)")
     parser.add_argument("--temp_dir", type=str, default="/tmp/phamerate",
                         help="temporary directory for phameration file I/O")
+    parser.add_argument("--update_dir", type=str, default=None,
+                        help="directory in which MMseqs2 databases are kept "
+                             "between runs, so that only new and changed "
+                             "translations are clustered (mmseqs only)")
+    parser.add_argument("--bulk_reinsert", action="store_true",
+                        help="insert phams with multi-row statements and "
+                             "assign genes to phams with one joined update")
     return parser
 
 
@@ -65,6 +72,15 @@ def main(argument_list):
     # Record start time
     start = datetime.datetime.now()
 
+    # The temp_dir is deleted below, so it must not contain the update_dir
+    if args.update_dir is not None:
+        abs_temp_dir = os.path.abspath(temp_dir)
+        abs_update_dir = os.path.abspath(args.update_dir)
+        if os.path.commonpath([abs_temp_dir, abs_update_dir]) == abs_temp_dir:
+            print(f"Update directory '{args.update_dir}' cannot be inside "
+                  f"temp directory '{temp_dir}'")
+            return
+
     # Refresh temp_dir
     if os.path.exists(temp_dir):
         try:
@@ -87,17 +103,35 @@ def main(argument_list):
     genes_and_trans = map_geneids_to_translations(engine)
     translation_groups = map_translations_to_geneids(engine)
 
-    # Write input fasta file
-    write_fasta(translation_groups, temp_dir)
-
-    # Create clusterdb and perform clustering
     program_params = get_program_params(program, args)
-    create_clusterdb(program, temp_dir)
-    phamerate(program_params, program, temp_dir)
-
-    # Parse phameration output
-    new_phams = parse_output(program, temp_dir)
-    new_phams = reintroduce_duplicates(new_phams, translation_groups, genes_and_trans)
+    update = args.update_dir is not None and program == "mmseqs"
+
+    if update:
+        # Translations are identified by their hashes, so that clusters
+        # from the previous run can be updated with new translations
+        hash_groups = map_hashes_to_geneids(translation_groups)
+        write_hashed_fasta(translation_groups, temp_dir)
+
+        if check_update_dir(args.update_dir, program_params):
+            update_clusterdb(program_params, temp_dir, args.update_dir)
+        else:
+            create_clusterdb(program, temp_dir)
+            phamerate(program_params, program, temp_dir)
+
+        new_phams = parse_output(program, temp_dir)
+        new_phams = reintroduce_hashed_duplicates(new_phams, hash_groups)
+    else:
+        # Write input fasta file
+        write_fasta(translation_groups, temp_dir)
+
+        # Create clusterdb and perform clustering
+        create_clusterdb(program, temp_dir)
+        phamerate(program_params, program, temp_dir)
+
+        # Parse phameration output
+        new_phams = parse_output(program, temp_dir)
+        new_phams = reintroduce_duplicates(new_phams, translation_groups,
+                                           genes_and_trans)
 
     # Preserve old pham names and colors
     new_phams, new_colors = preserve_phams(old_phams, new_phams, old_colors,
@@ -118,11 +152,18 @@ def main(argument_list):
 
 
     # Insert new pham/color data
-    reinsert_pham_data(new_phams, new_colors, engine)
+    if args.bulk_reinsert:
+        reinsert_pham_data_bulk(new_phams, new_colors, engine)
+    else:
+        reinsert_pham_data(new_phams, new_colors, engine)
 
     # Fix miscolored phams/orphams
     fix_miscolored_phams(engine)
 
+    # Keep the databases for the next incremental run
+    if update:
+        save_update_dbs(temp_dir, args.update_dir, program_params)
+
     # Close all connections in the connection pool.
     engine.dispose()
 
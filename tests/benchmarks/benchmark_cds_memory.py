@@ -0,0 +1,80 @@
+"""Benchmarks for the memory used by Cds objects.
+
+Parses 1M synthetic gene table rows with mysqldb.parse_gene_table_data
+and compares the memory retained per CDS feature by the slotted Cds class
+with the memory retained by an equivalent object that stores the same
+attributes in an instance dictionary, with an eagerly created nucleotide
+Seq and evaluation list (the layout used before Cds defined __slots__).
+Does not require MySQL.
+
+Run from the src directory:
+
+    > python3 ../tests/benchmarks/benchmark_cds_memory.py
+"""
+
+import time
+import tracemalloc
+
+from pdm_utils.classes import cds
+from pdm_utils.functions import mysqldb
+
+FEATURE_COUNT = 1000000
+GENE_COUNT = 100
+
+
+class DictCds:
+    """CDS feature that stores its attributes in an instance dictionary."""
+
+    def __init__(self, cds_ftr):
+        for attr in cds.Cds.__slots__:
+            if attr in {"_seq", "_evaluations"}:
+                attr = attr[1:]
+            setattr(self, attr, getattr(cds_ftr, attr))
+
+
+def create_data_dict(x):
+    """Create a dictionary of gene table data for one CDS feature."""
+    phage_id = f"Phage_{x // GENE_COUNT}"
+    name = str(x % GENE_COUNT + 1)
+    return {"GeneID": f"{phage_id}_CDS_{name}", "PhageID": phage_id,
+            "Start": 100 * x, "Stop": 100 * x + 99, "Parts": 1,
+            "Length": 32, "Name": name,
+            "Translation": "MKLAGHTREWQSDFGKLPSTRAGNHIKLAGHW",
+            "Orientation": "F", "Notes": b"terminase large subunit",
+            "LocusTag": f"SEA_{phage_id.upper()}_{name}",
+            "PhamID": x % 5000, "DomainStatus": 0}
+
+
+def create_slotted_cds(x):
+    return mysqldb.parse_gene_table_data(create_data_dict(x))
+
+
+def create_dict_cds(x):
+    return DictCds(mysqldb.parse_gene_table_data(create_data_dict(x)))
+
+
+def benchmark(create):
+    """Create all CDS features and measure the memory they retain."""
+    start = time.perf_counter()
+    tracemalloc.start()
+    features = [create(x) for x in range(FEATURE_COUNT)]
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    elapsed = time.perf_counter() - start
+    del features
+    return elapsed, retained / FEATURE_COUNT
+
+
+def main():
+    dict_time, dict_bytes = benchmark(create_dict_cds)
+    slot_time, slot_bytes = benchmark(create_slotted_cds)
+
+    print(f"CDS features created: {FEATURE_COUNT}")
+    print(f"Instance dictionary: {dict_bytes:.0f} bytes per CDS "
+          f"({dict_time:.2f} s)")
+    print(f"Slots: {slot_bytes:.0f} bytes per CDS ({slot_time:.2f} s)")
+    print(f"Memory reduction: {dict_bytes / slot_bytes:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
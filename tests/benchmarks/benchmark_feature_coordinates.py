@@ -0,0 +1,80 @@
+"""Benchmarks for identifying feature coordinate conflicts.
+
+Compares the time to find all nested, duplicated, and partially-duplicated
+features in genomes with thousands of random CDS features by comparing
+every pair of features with the time to find them with
+intervals.find_coordinate_conflicts, and reports the time to evaluate the
+same features with Genome.check_feature_coordinates. Does not require MySQL.
+
+Run from the src directory:
+
+    > python3 ../tests/benchmarks/benchmark_feature_coordinates.py
+"""
+
+from pathlib import Path
+import random
+import sys
+import time
+
+from pdm_utils.classes import cds, genome
+from pdm_utils.functions import intervals
+
+# Import helper functions to build random features.
+benchmark_file = Path(__file__)
+test_dir = benchmark_file.parent.parent
+if str(test_dir) not in set(sys.path):
+    sys.path.append(str(test_dir))
+from unit.test_intervals import (create_random_features,
+                                 find_coordinate_conflicts_by_pair)
+
+FEATURE_COUNTS = [1000, 2000, 5000]
+
+
+def benchmark(function, *args, **kwargs):
+    """Time one call of a function."""
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def create_genome(features):
+    """Create a Genome object with one CDS feature for each coordinate."""
+    gnm = genome.Genome()
+    cds_features = []
+    for x, (start, stop, strand) in enumerate(features):
+        cds_ftr = cds.Cds()
+        cds_ftr.id = f"Benchmark_CDS_{x + 1}"
+        cds_ftr.start = start
+        cds_ftr.stop = stop
+        cds_ftr.orientation = strand.upper()
+        cds_features.append(cds_ftr)
+    gnm.cds_features = cds_features
+    return gnm
+
+
+def main():
+    for feature_count in FEATURE_COUNTS:
+        rng = random.Random(feature_count)
+        features = create_random_features(feature_count, rng,
+                                          genome_length=feature_count * 100)
+        pair_time, pair_conflicts = benchmark(
+                                        find_coordinate_conflicts_by_pair,
+                                        features)
+        sweep_time, sweep_conflicts = benchmark(
+                                        intervals.find_coordinate_conflicts,
+                                        features)
+        assert set(sweep_conflicts) == pair_conflicts
+
+        gnm = create_genome(features)
+        check_time, _ = benchmark(gnm.check_feature_coordinates, cds_ftr=True)
+
+        print(f"Features: {feature_count}, "
+              f"conflicts: {len(sweep_conflicts)}")
+        print(f"Every pair of features: {pair_time:.3f} s")
+        print(f"Sweep: {sweep_time:.3f} s")
+        print(f"Speedup: {pair_time / sweep_time:.1f}x")
+        print(f"Genome.check_feature_coordinates: {check_time:.3f} s\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Benchmarks for the import pipeline.
+
+Compares the per-file cost of retrieving MySQL reference data from the
+database for every flat file with the cost of updating cached reference
+data in memory. Requires the same 'pdm_anon' MySQL user as the
+integration tests.
+
+Run from the src directory:
+
+    > python3 ../tests/benchmarks/benchmark_import_genome.py
+"""
+
+from pathlib import Path
+import sys
+import time
+
+from Bio.Alphabet import IUPAC
+from Bio.Seq import Seq
+import sqlalchemy
+
+from pdm_utils.classes import bundle, genome, ticket
+from pdm_utils.pipelines import import_genome
+
+# Import helper functions to build mock database.
+benchmark_file = Path(__file__)
+test_dir = benchmark_file.parent.parent
+if str(test_dir) not in set(sys.path):
+    sys.path.append(str(test_dir))
+import test_db_utils
+
+FILE_COUNT = 50
+
+
+def create_bundle(x):
+    """Create a mock bundle to simulate an imported flat file."""
+    gnm = genome.Genome()
+    gnm.id = f"Benchmark{x}"
+    gnm.accession = f"BM{x}"
+    gnm.host_genus = "Mycobacterium"
+    gnm.cluster = "A"
+    gnm.subcluster = "A1"
+    gnm.seq = Seq("ATCG" * 1000 + str(x), IUPAC.ambiguous_dna)
+    tkt = ticket.ImportTicket()
+    tkt.type = "add"
+    bndl = bundle.Bundle()
+    bndl.ticket = tkt
+    bndl.genome_dict["flat_file"] = gnm
+    return bndl
+
+
+def benchmark_queries(engine, file_count):
+    """Retrieve reference data from MySQL for every file."""
+    start = time.perf_counter()
+    for x in range(file_count):
+        import_genome.get_mysql_reference_sets(engine)
+    return time.perf_counter() - start
+
+
+def benchmark_cache(engine, file_count):
+    """Retrieve reference data once, then update it for every file."""
+    start = time.perf_counter()
+    ref_data = import_genome.get_mysql_reference_sets(engine)
+    for x in range(file_count):
+        import_genome.update_mysql_reference_sets(
+            ref_data, create_bundle(x), engine=engine, file_ref="flat_file")
+    return time.perf_counter() - start
+
+
+def main():
+    test_db_utils.create_filled_test_db()
+    engine_string = test_db_utils.create_engine_string()
+    engine = sqlalchemy.create_engine(engine_string, echo=False)
+    try:
+        query_time = benchmark_queries(engine, FILE_COUNT)
+        cache_time = benchmark_cache(engine, FILE_COUNT)
+    finally:
+        engine.dispose()
+        test_db_utils.remove_db()
+
+    query_per_file = query_time / FILE_COUNT
+    cache_per_file = cache_time / FILE_COUNT
+    print(f"Flat files simulated: {FILE_COUNT}")
+    print(f"Query per file: {query_per_file * 1000:.2f} ms/file")
+    print(f"Cached reference data: {cache_per_file * 1000:.2f} ms/file")
+    print(f"Per-file speedup: {query_per_file / cache_per_file:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
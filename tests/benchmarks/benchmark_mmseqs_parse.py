@@ -0,0 +1,122 @@
+"""Benchmarks for parsing MMseqs2 clustering output.
+
+Writes the output of mmseqs createtsv and mmseqs result2flat for the same
+synthetic clusterDB with 10k, 100k, and 1M genes, then compares the size
+of each file and the time needed to parse it into phams. Does not require
+MMseqs2.
+
+Run from the src directory:
+
+    > python3 ../tests/benchmarks/benchmark_mmseqs_parse.py
+"""
+
+from pathlib import Path
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from pdm_utils.functions import phameration
+
+# Import helper functions to build synthetic clusters.
+benchmark_file = Path(__file__)
+test_dir = benchmark_file.parent.parent
+if str(test_dir) not in set(sys.path):
+    sys.path.append(str(test_dir))
+from unit.test_phameration import create_random_clusters, write_mmseqs_tsv
+
+GENE_COUNTS = [10000, 100000, 1000000]
+
+
+def write_mmseqs_flat(clusters, translations, filename):
+    """Write clusters in the format of mmseqs result2flat."""
+    with open(filename, "w") as fh:
+        for cluster in clusters:
+            fh.write(f">{cluster[0]}\n")
+            for gene in cluster:
+                fh.write(f">{gene}\n{translations[gene]}\n")
+
+
+def parse_mmseqs_flat(filename):
+    """Reference implementation: parse the output of mmseqs result2flat,
+    which lists each cluster's representative header followed by the FASTA
+    records of its members.
+    """
+    parsed_phams = dict()
+    pham_geneids = list()
+    pham_name = 0
+
+    with open(filename, "r") as fh:
+        # Latest MMseqs2 output format indicates the start of a new
+        # pham by repeating the pham representative's identifier in
+        # two adjacent lines - need references to the prior line as
+        # well as the current one.
+        prior_line = fh.readline()
+        current_line = fh.readline()
+
+        # While not EOF, iterate through lines
+        while current_line:
+            if current_line.startswith(">"):
+                if prior_line.startswith(">"):
+                    try:
+                        pham_geneids.pop(-1)
+                    except IndexError:
+                        # First pham should fail because pham_geneids is empty
+                        pass
+                    parsed_phams[pham_name] = pham_geneids
+                    pham_name += 1
+                    pham_geneids = [current_line.lstrip(">").rstrip()]
+                else:
+                    pham_geneids.append(current_line.lstrip(">").rstrip())
+            else:
+                # Translation, skip
+                pass
+            # prior gets current's value, current gets new line
+            prior_line, current_line = current_line, fh.readline()
+
+        # Dump the last working pham into the dictionary
+        parsed_phams[pham_name] = pham_geneids
+
+    # Pham 0 is a placeholder - remove it and then return parsed_phams
+    parsed_phams.pop(0)
+
+    return parsed_phams
+
+
+def benchmark(parser, filename):
+    """Time one call of an MMseqs2 output parser."""
+    start = time.perf_counter()
+    parsed_phams = parser(filename)
+    return time.perf_counter() - start, parsed_phams
+
+
+def main():
+    wd = Path(tempfile.mkdtemp())
+    try:
+        for gene_count in GENE_COUNTS:
+            rng = random.Random(gene_count)
+            clusters, translations = create_random_clusters(gene_count, rng)
+            tsv_file = wd.joinpath("clusterDB.tsv")
+            flat_file = wd.joinpath("output.txt")
+            write_mmseqs_tsv(clusters, tsv_file)
+            write_mmseqs_flat(clusters, translations, flat_file)
+            del translations
+
+            tsv_time, tsv_phams = benchmark(phameration.parse_mmseqs_tsv,
+                                            tsv_file)
+            flat_time, flat_phams = benchmark(parse_mmseqs_flat, flat_file)
+            assert tsv_phams == flat_phams
+
+            tsv_size = tsv_file.stat().st_size / 1e6
+            flat_size = flat_file.stat().st_size / 1e6
+            print(f"Genes: {gene_count}, phams: {len(tsv_phams)}")
+            print(f"result2flat: {flat_size:.1f} MB, {flat_time:.2f} s")
+            print(f"createtsv: {tsv_size:.1f} MB, {tsv_time:.2f} s")
+            print(f"Speedup: {flat_time / tsv_time:.1f}x")
+    finally:
+        shutil.rmtree(wd)
+
+
+if __name__ == "__main__":
+    main()
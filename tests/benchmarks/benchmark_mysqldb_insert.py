@@ -0,0 +1,106 @@
+"""Benchmarks for inserting genome data into MySQL.
+
+Compares the throughput of inserting genomes using one INSERT statement
+per row (create_genome_statements) with using parameterized multi-row
+INSERT statements (create_genome_bulk_statements). Requires the same
+'pdm_anon' MySQL user as the integration tests.
+
+Run from the src directory:
+
+    > python3 ../tests/benchmarks/benchmark_mysqldb_insert.py
+"""
+
+from pathlib import Path
+import sys
+import time
+
+from Bio.Alphabet import IUPAC
+from Bio.Seq import Seq
+import sqlalchemy
+
+from pdm_utils.classes import cds, genome
+from pdm_utils.constants import constants
+from pdm_utils.functions import mysqldb
+
+# Import helper functions to build mock database.
+benchmark_file = Path(__file__)
+test_dir = benchmark_file.parent.parent
+if str(test_dir) not in set(sys.path):
+    sys.path.append(str(test_dir))
+import test_db_utils
+
+GENOME_COUNT = 20
+CDS_COUNT = 300
+
+
+def create_genome(x, cds_count):
+    """Create a mock genome with the indicated number of CDS features."""
+    gnm = genome.Genome()
+    gnm.id = f"Benchmark{x}"
+    gnm.name = gnm.id
+    gnm.accession = f"BM{x}"
+    gnm.host_genus = "Mycobacterium"
+    gnm.cluster = "A"
+    gnm.subcluster = "A1"
+    gnm.seq = Seq("ATCG" * 10000, IUPAC.ambiguous_dna)
+    gnm.length = len(gnm.seq)
+    gnm.gc = 50.0
+    gnm.annotation_status = "draft"
+    gnm.date = constants.EMPTY_DATE
+    gnm.retrieve_record = 1
+    gnm.annotation_author = 1
+    cds_list = []
+    for y in range(1, cds_count + 1):
+        cds_ftr = cds.Cds()
+        cds_ftr.id = f"{gnm.id}_{y}"
+        cds_ftr.genome_id = gnm.id
+        cds_ftr.name = str(y)
+        cds_ftr.start = y * 100
+        cds_ftr.stop = y * 100 + 99
+        cds_ftr.parts = 1
+        cds_ftr.orientation = "F"
+        cds_ftr.translation = Seq("MKL" * 100, IUPAC.protein)
+        cds_ftr.translation_length = len(cds_ftr.translation)
+        cds_ftr.description = "terminase large subunit"
+        cds_ftr.locus_tag = f"SEA_{gnm.id.upper()}_{y}"
+        cds_list.append(cds_ftr)
+    gnm.cds_features = cds_list
+    return gnm
+
+
+def benchmark(engine, genomes, create_statements):
+    """Insert all genomes, then remove them from the database."""
+    start = time.perf_counter()
+    for gnm in genomes:
+        result, msg = mysqldb.execute_transaction(
+                            engine, create_statements(gnm, tkt_type="add"))
+        if result != 0:
+            raise RuntimeError(msg)
+    elapsed = time.perf_counter() - start
+    engine.execute("DELETE FROM phage")
+    return elapsed
+
+
+def main():
+    test_db_utils.create_empty_test_db()
+    engine_string = test_db_utils.create_engine_string()
+    engine = sqlalchemy.create_engine(engine_string, echo=False)
+    genomes = [create_genome(x, CDS_COUNT) for x in range(GENOME_COUNT)]
+    try:
+        string_time = benchmark(engine, genomes,
+                                mysqldb.create_genome_statements)
+        bulk_time = benchmark(engine, genomes,
+                              mysqldb.create_genome_bulk_statements)
+    finally:
+        engine.dispose()
+        test_db_utils.remove_db()
+
+    rows = GENOME_COUNT * (CDS_COUNT + 1)
+    print(f"Genomes inserted: {GENOME_COUNT} ({CDS_COUNT} CDS features each)")
+    print(f"One statement per row: {rows / string_time:.0f} rows/s")
+    print(f"Multi-row parameterized: {rows / bulk_time:.0f} rows/s")
+    print(f"Speedup: {string_time / bulk_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Benchmarks for retrieving genome data from MySQL.
+
+Compares the time to construct Genome objects with CDS features using
+one gene table query per genome with using one gene table query per
+batch of genomes (parse_genome_data with and without batch_size=None).
+Requires the same 'pdm_anon' MySQL user as the integration tests.
+
+Run from the src directory:
+
+    > python3 ../tests/benchmarks/benchmark_mysqldb_parse.py
+"""
+
+from pathlib import Path
+import sys
+import time
+
+import sqlalchemy
+
+from pdm_utils.classes import cds
+from pdm_utils.functions import mysqldb
+
+# Import helper functions to build mock database.
+benchmark_file = Path(__file__)
+test_dir = benchmark_file.parent.parent
+if str(test_dir) not in set(sys.path):
+    sys.path.append(str(test_dir))
+import test_db_utils
+from benchmark_mysqldb_insert import create_genome
+
+GENOME_COUNT = 1000
+CDS_COUNT = 100
+PHAGE_QUERY = "SELECT * FROM phage"
+GENE_QUERY = "SELECT * FROM gene"
+
+
+def benchmark(engine, batch_size):
+    """Construct all genomes with their CDS features."""
+    start = time.perf_counter()
+    genomes = mysqldb.parse_genome_data(engine, phage_query=PHAGE_QUERY,
+                                        gene_query=GENE_QUERY,
+                                        batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    return elapsed, genomes
+
+
+def get_cds_data(genomes):
+    """Get the attributes of each CDS feature of each genome."""
+    return [(gnm.id, [[getattr(cds_ftr, attr) for attr in cds.Cds.__slots__]
+                      for cds_ftr in gnm.cds_features])
+            for gnm in genomes]
+
+
+def main():
+    test_db_utils.create_empty_test_db()
+    engine_string = test_db_utils.create_engine_string()
+    engine = sqlalchemy.create_engine(engine_string, echo=False)
+    try:
+        for x in range(GENOME_COUNT):
+            gnm = create_genome(x, CDS_COUNT)
+            result, msg = mysqldb.execute_transaction(
+                    engine, mysqldb.create_genome_bulk_statements(gnm))
+            if result != 0:
+                raise RuntimeError(msg)
+        single_time, single_genomes = benchmark(engine, None)
+        batch_time, batch_genomes = benchmark(engine,
+                                              mysqldb.PHAGE_ID_BATCH_SIZE)
+    finally:
+        engine.dispose()
+        test_db_utils.remove_db()
+
+    if get_cds_data(single_genomes) != get_cds_data(batch_genomes):
+        raise RuntimeError("Batched genomes differ from single genomes.")
+
+    print(f"Genomes retrieved: {GENOME_COUNT} ({CDS_COUNT} CDS features each)")
+    print(f"One gene query per genome: {single_time:.2f} s")
+    print(f"One gene query per {mysqldb.PHAGE_ID_BATCH_SIZE} genomes: "
+          f"{batch_time:.2f} s")
+    print(f"Speedup: {single_time / batch_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Benchmarks for pham name conservation.
+
+Times preserve_phams() on randomized phams with 10k, 100k, and 1M genes.
+The reference implementation, which compares every old pham to every
+new pham, is only timed for the smallest set. Does not require MySQL.
+
+Run from the src directory:
+
+    > python3 ../tests/benchmarks/benchmark_phameration.py
+"""
+
+import contextlib
+import io
+from pathlib import Path
+import random
+import sys
+import time
+
+from pdm_utils.functions import phameration
+
+# Import helper functions to build randomized phams.
+benchmark_file = Path(__file__)
+test_dir = benchmark_file.parent.parent
+if str(test_dir) not in set(sys.path):
+    sys.path.append(str(test_dir))
+from unit.test_phameration import create_random_phams, preserve_phams_reference
+
+GENE_COUNTS = [10000, 100000, 1000000]
+REFERENCE_GENE_COUNT = 10000
+
+
+def benchmark(function, old_phams, new_phams, old_colors, new_genes):
+    """Time one call of a pham name conservation function."""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        function(old_phams, new_phams.copy(), old_colors, new_genes)
+    return time.perf_counter() - start
+
+
+def main():
+    for gene_count in GENE_COUNTS:
+        rng = random.Random(gene_count)
+        data = create_random_phams(gene_count, rng)
+        print(f"Genes: {gene_count}, old phams: {len(data[0])}, "
+              f"new phams: {len(data[1])}")
+        index_time = benchmark(phameration.preserve_phams, *data)
+        print(f"Gene index: {index_time:.2f} s")
+        if gene_count <= REFERENCE_GENE_COUNT:
+            reference_time = benchmark(preserve_phams_reference, *data)
+            print(f"Reference: {reference_time:.2f} s")
+            print(f"Speedup: {reference_time / index_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Benchmarks for translating CDS features.
+
+Compares the time to translate all CDS features of random genomes one
+feature at a time with Cds.translate_seq with the time to translate them
+all at once with translation.translate_cds_features, for translation
+tables 11 and 4, using the fastest of several runs, and verifies that the
+translations are identical.
+
+Run from the src directory:
+
+    > python3 ../tests/benchmarks/benchmark_translation.py
+"""
+
+from pathlib import Path
+import random
+import sys
+import time
+
+from pdm_utils.functions import translation
+
+# Import helper functions to build random genomes.
+benchmark_file = Path(__file__)
+test_dir = benchmark_file.parent.parent
+if str(test_dir) not in set(sys.path):
+    sys.path.append(str(test_dir))
+from unit.test_translation import create_random_genome
+
+GENOME_COUNT = 100
+CDS_COUNT = 100
+CODON_COUNT = 600
+REPEAT_COUNT = 5
+
+
+def translate_each(genomes):
+    """Translate each CDS feature with Biopython."""
+    return [[cds_ftr.translate_seq() for cds_ftr in cds_features]
+            for gnm_seq, cds_features in genomes]
+
+
+def translate_all(genomes):
+    """Translate all CDS features of each genome at once."""
+    return [translation.translate_cds_features(gnm_seq, cds_features)
+            for gnm_seq, cds_features in genomes]
+
+
+def benchmark(function, genomes):
+    """Time the fastest of several calls of a translation function."""
+    times = []
+    for x in range(REPEAT_COUNT):
+        start = time.perf_counter()
+        translations = function(genomes)
+        times.append(time.perf_counter() - start)
+    return min(times), translations
+
+
+def get_translation_data(translations):
+    return [[(str(x), x.alphabet) for x in gnm_translations]
+            for gnm_translations in translations]
+
+
+def main():
+    for table in [11, 4]:
+        rng = random.Random(table)
+        genomes = [create_random_genome(rng, CDS_COUNT, table=table,
+                                        codon_count=CODON_COUNT)
+                   for x in range(GENOME_COUNT)]
+        each_time, each_translations = benchmark(translate_each, genomes)
+        all_time, all_translations = benchmark(translate_all, genomes)
+        if (get_translation_data(each_translations) !=
+                get_translation_data(all_translations)):
+            raise RuntimeError("Translations differ from Biopython.")
+
+        print(f"Translation table {table}: {GENOME_COUNT} genomes "
+              f"({CDS_COUNT} CDS features each)")
+        print(f"One feature at a time: {each_time:.2f} s")
+        print(f"All features of a genome at once: {all_time:.2f} s")
+        print(f"Speedup: {each_time / all_time:.1f}x\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@
 
 import argparse
 import csv
+import gzip
 from pathlib import Path
 import tempfile
 import unittest
@@ -683,6 +684,24 @@ class TestBasicFunctions6(unittest.TestCase):
         with self.subTest():
             self.assertEqual(set(exp_success_tkts[0].keys()), set(headers))
 
+    def test_export_data_dict_2(self):
+        """Verify data from a generator is exported to a gzip file."""
+
+        data = (data_dict for data_dict in [self.tkt_dict1, self.tkt_dict2])
+        headers = ["phage_id", "host_genus"]
+        export_file = Path(self.base_dir, "table.csv.gz")
+        basic.export_data_dict(data, export_file, headers,
+                               include_headers=True, compress=True)
+
+        with gzip.open(export_file, "rt") as file:
+            file_reader = csv.DictReader(file)
+            exp_success_tkts = list(file_reader)
+
+        with self.subTest():
+            self.assertEqual(len(exp_success_tkts), 2)
+        with self.subTest():
+            self.assertEqual(exp_success_tkts[1], self.tkt_dict2)
+
 
 
 
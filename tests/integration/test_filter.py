@@ -166,6 +166,17 @@ class TestFilter(unittest.TestCase):
         self.assertTrue("Myrna" in group_results["Mycobacterium"])
         self.assertTrue("D29" in group_results["Mycobacterium"]) 
 
+    def test_nested_group_1(self):
+        self.db_filter.key = self.phageid
+        self.db_filter.values = ["Myrna", "D29"]
+        group_results = self.db_filter.nested_group(["phage.HostGenus",
+                                                     self.phageid])
+
+        self.assertTrue("Mycobacterium" in group_results.keys())
+
+        self.assertTrue("Myrna" in group_results["Mycobacterium"]["Myrna"])
+        self.assertTrue("D29" in group_results["Mycobacterium"]["D29"])
+
     @classmethod
     def tearDownClass(self):
         teardown_test_db()
@@ -631,5 +631,76 @@ class TestFindDomains2(unittest.TestCase):
             self.assertEqual(es_mock.call_count, 2)
 
 
+class TestFindDomains3(unittest.TestCase):
+
+    def setUp(self):
+        test_db_utils.create_empty_test_db()
+        test_db_utils.insert_phage_data(test_data_utils.get_trixie_phage_data())
+        test_db_utils.insert_gene_data(test_data_utils.get_trixie_gene_data())
+        self.engine = sqlalchemy.create_engine(engine_string, echo=False)
+
+        domain_data = test_data_utils.get_trixie_domain_data()
+        gene_domain_data = test_data_utils.get_trixie_gene_domain_data()
+        self.hit1 = {"HitID": domain_data["HitID"],
+                     "DomainID": domain_data["DomainID"],
+                     "Name": domain_data["Name"],
+                     "Description": domain_data["Description"],
+                     "Expect": gene_domain_data["Expect"],
+                     "QueryStart": gene_domain_data["QueryStart"],
+                     "QueryEnd": gene_domain_data["QueryEnd"]}
+        self.hit2 = self.hit1.copy()
+        self.hit2["HitID"] = "gnl|CDD|100"
+        self.hit2["Description"] = "Domain covering 100% of 'ParB'"
+
+    def tearDown(self):
+        test_db_utils.remove_db()
+        self.engine.dispose()
+
+    def test_insert_search_results_1(self):
+        """Verify domain data is inserted, existing and duplicated
+        domains are skipped, and DomainStatus is updated."""
+        test_db_utils.insert_domain_data(
+            test_data_utils.get_trixie_domain_data())
+        search_results = [["MKL", [self.hit1, self.hit2, self.hit2]]]
+        trans_genes = {"MKL": ["TRIXIE_0001"]}
+        result = find_domains.insert_search_results(
+                    self.engine, search_results, trans_genes)
+        gene_table_results = test_db_utils.get_data(test_db_utils.gene_table_query)
+        gene_domain_table_results = test_db_utils.get_data(test_db_utils.gene_domain_table_query)
+        domain_table_results = test_db_utils.get_data(test_db_utils.domain_table_query)
+        descriptions = {x["HitID"]: x["Description"].decode("utf-8")
+                        for x in domain_table_results}
+        with self.subTest():
+            self.assertEqual(result, 0)
+        with self.subTest():
+            self.assertEqual(len(domain_table_results), 2)
+        with self.subTest():
+            self.assertEqual(descriptions["gnl|CDD|100"],
+                             self.hit2["Description"])
+        with self.subTest():
+            self.assertEqual(len(gene_domain_table_results), 2)
+        with self.subTest():
+            self.assertEqual(gene_table_results[0]["DomainStatus"], 1)
+
+    def test_insert_search_results_2(self):
+        """Verify that if a batch fails, the genes in the batch are
+        inserted individually."""
+        search_results = [["MKL", [self.hit1]], ["MAG", [self.hit2]]]
+        trans_genes = {"MKL": ["TRIXIE_0001"], "MAG": ["TRIXIE_9999"]}
+        result = find_domains.insert_search_results(
+                    self.engine, search_results, trans_genes)
+        gene_table_results = test_db_utils.get_data(test_db_utils.gene_table_query)
+        gene_domain_table_results = test_db_utils.get_data(test_db_utils.gene_domain_table_query)
+        with self.subTest():
+            self.assertEqual(result, 1)
+        with self.subTest():
+            self.assertEqual(len(gene_domain_table_results), 1)
+        with self.subTest():
+            self.assertEqual(gene_domain_table_results[0]["GeneID"],
+                             "TRIXIE_0001")
+        with self.subTest():
+            self.assertEqual(gene_table_results[0]["DomainStatus"], 1)
+
+
 if __name__ == '__main__':
     unittest.main()
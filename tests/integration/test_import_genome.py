@@ -1,5 +1,6 @@
 """Integration tests for the main import pipeline."""
 
+import copy
 import csv
 from pathlib import Path
 import shutil
@@ -503,10 +504,12 @@ class TestImportGenome1(unittest.TestCase):
         test_db_utils.insert_phage_data(phage_data3)
 
         ref_dict = import_genome.get_mysql_reference_sets(self.engine)
-        exp_keys = {"phage_id_set", "accession_set", "seq_set",
+        exp_keys = {"phage_id_set", "accession_set", "seq_hash_set",
                     "host_genera_set", "cluster_set", "subcluster_set"}
         exp_phage_ids = {"D29", "Trixie", "L5"}
-        exp_seqs = {"AAAA", "TTTT", "CCCC"}
+        exp_seq_hashes = {basic.get_seq_hash("AAAA"),
+                          basic.get_seq_hash("TTTT"),
+                          basic.get_seq_hash("CCCC")}
         exp_accessions = {"ABC", "EFG", ""}
         exp_host_genera = {"Mycobacterium", "Gordonia"}
         exp_clusters = {"A", "B", "Singleton", "UNK"}
@@ -518,7 +521,7 @@ class TestImportGenome1(unittest.TestCase):
         with self.subTest():
             self.assertEqual(ref_dict["accession_set"], exp_accessions)
         with self.subTest():
-            self.assertEqual(ref_dict["seq_set"], exp_seqs)
+            self.assertEqual(ref_dict["seq_hash_set"], exp_seq_hashes)
         with self.subTest():
             self.assertEqual(ref_dict["host_genera_set"], exp_host_genera)
         with self.subTest():
@@ -526,6 +529,43 @@ class TestImportGenome1(unittest.TestCase):
         with self.subTest():
             self.assertEqual(ref_dict["subcluster_set"], exp_subclusters)
 
+    def test_get_mysql_reference_set_1(self):
+        """Verify individual sets contain the same data
+        as the reference sets."""
+        phage_data1 = test_data_utils.get_alice_genome_draft_data_in_db(seq=False)
+        phage_data1["PhageID"] = "D29"
+        phage_data1["Sequence"] = "AAAA"
+        phage_data1["Cluster"] = "NULL"
+        phage_data1["Subcluster"] = "NULL"
+        test_db_utils.insert_phage_data(phage_data1)
+
+        ref_dict = import_genome.get_mysql_reference_sets(self.engine)
+        for key in import_genome.MYSQL_REF_KEYS:
+            ref_set = import_genome.get_mysql_reference_set(self.engine, key)
+            with self.subTest(key=key):
+                self.assertEqual(ref_set, ref_dict[key])
+
+    def test_verify_mysql_reference_sets_1(self):
+        """Verify consistent sets are retained and inconsistent
+        sets are retrieved again from the database."""
+        phage_data1 = test_data_utils.get_alice_genome_draft_data_in_db(seq=False)
+        phage_data1["PhageID"] = "D29"
+        phage_data1["Sequence"] = "AAAA"
+        test_db_utils.insert_phage_data(phage_data1)
+
+        ref_dict1 = import_genome.get_mysql_reference_sets(self.engine)
+        ref_dict2 = import_genome.verify_mysql_reference_sets(
+                        ref_dict1, self.engine)
+        ref_dict1["phage_id_set"].add("Trixie")
+        ref_dict3 = import_genome.verify_mysql_reference_sets(
+                        ref_dict1, self.engine)
+        with self.subTest():
+            self.assertIs(ref_dict1, ref_dict2)
+        with self.subTest():
+            self.assertIsNot(ref_dict1, ref_dict3)
+        with self.subTest():
+            self.assertEqual(ref_dict3["phage_id_set"], {"D29"})
+
 
 
 class TestImportGenome2(unittest.TestCase):
@@ -1340,6 +1380,43 @@ class TestImportGenome5(unittest.TestCase):
             self.assertEqual(bndl2._errors, 0)
 
 
+    # Patching to avoid an attempt to add data to the database.
+    @patch("pdm_utils.pipelines.import_genome.import_into_db")
+    def test_process_files_and_tickets_12(self, import_into_db_mock):
+        """Verify the same output is produced using multiple workers as
+        is produced serially, using:
+        two files with matched tickets,
+        one file with the same PhageID as a previous file,
+        unsuccessful import,
+        no unmatched tickets."""
+        files = [self.flat_file_l5, self.flat_file_trixie, self.flat_file_l5]
+        import_into_db_mock.return_value = False
+
+        results = []
+        for workers in [1, 2]:
+            ticket_dict = {self.tkt1.phage_id: copy.deepcopy(self.tkt1),
+                           self.tkt2.phage_id: copy.deepcopy(self.tkt2)}
+            with self.assertLogs(level="INFO") as log:
+                results_tuple = import_genome.process_files_and_tickets(
+                                    ticket_dict, files, engine=self.engine,
+                                    prod_run=False,
+                                    genome_id_field="_organism_name",
+                                    workers=workers)
+            evaluation_dict = results_tuple[4]
+            evaluations = {}
+            for key in evaluation_dict.keys():
+                for sub_key, evl_list in evaluation_dict[key].items():
+                    evaluations[(key, sub_key)] = [str(evl) for evl in evl_list]
+            results.append((results_tuple[:4], evaluations, log.output))
+
+        with self.subTest():
+            self.assertEqual(results[0][0], results[1][0])
+        with self.subTest():
+            self.assertEqual(results[0][1], results[1][1])
+        with self.subTest():
+            self.assertEqual(results[0][2], results[1][2])
+
+
 
 
 class TestImportGenome6(unittest.TestCase):
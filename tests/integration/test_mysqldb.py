@@ -12,7 +12,7 @@ import sqlalchemy
 
 from pdm_utils.classes import cds, genome
 from pdm_utils.constants import constants
-from pdm_utils.functions import mysqldb
+from pdm_utils.functions import basic, mysqldb
 
 # Import helper functions to build mock database and mock flat files
 unittest_file = Path(__file__)
@@ -152,6 +152,14 @@ class TestMysqldbFunctions1(unittest.TestCase):
         with self.subTest():
             self.assertTrue(Seq("ATCG", IUPAC.ambiguous_dna) in result)
 
+    def test_create_seq_hash_set_1(self):
+        """Retrieve a set of hashes of all data from Sequence column,
+        computed from upper-case sequences."""
+        result = mysqldb.create_seq_hash_set(self.engine)
+        exp = {basic.get_seq_hash("ATCG"), basic.get_seq_hash("AATT"),
+               basic.get_seq_hash("GGCC")}
+        self.assertEqual(result, exp)
+
 
 
 
@@ -305,6 +313,26 @@ class TestMysqldbFunctions1(unittest.TestCase):
         with self.subTest():
             self.assertEqual(len(genome_dict["L5"].cds_features), 0)
 
+    def test_parse_genome_data_5(self):
+        """Verify that Genome objects with CDS features retrieved in
+        batches are identical to those retrieved one genome at a time."""
+        genome_list1 = mysqldb.parse_genome_data(
+                        self.engine, phage_query=self.phage_query,
+                        gene_query=self.gene_query, batch_size=None)
+        genome_list2 = mysqldb.parse_genome_data(
+                        self.engine, phage_query=self.phage_query,
+                        gene_query=self.gene_query, batch_size=2)
+        with self.subTest():
+            self.assertEqual([gnm.id for gnm in genome_list1],
+                             [gnm.id for gnm in genome_list2])
+        for gnm1, gnm2 in zip(genome_list1, genome_list2):
+            with self.subTest(phage_id=gnm1.id):
+                self.assertEqual(
+                    [[getattr(cds_ftr, attr) for attr in cds.Cds.__slots__]
+                     for cds_ftr in gnm1.cds_features],
+                    [[getattr(cds_ftr, attr) for attr in cds.Cds.__slots__]
+                     for cds_ftr in gnm2.cds_features])
+
 
 
 
@@ -814,6 +842,61 @@ class TestMysqldbFunctions4(unittest.TestCase):
         return_code, msg = mysqldb.execute_transaction(self.engine)
         self.assertEqual(return_code, 0)
 
+    def test_execute_transaction_4(self):
+        """Valid parameterized statements for one and many rows should
+        result in execution of all statements - return code 0."""
+        phage_data = {"PhageID": "D29", "Accession": "ABC123",
+                      "Name": "D29_Draft", "HostGenus": "Mycobacterium",
+                      "Sequence": "ATCG", "Length": 4, "GC": 0.5001,
+                      "Status": "final",
+                      "DateLastModified": constants.EMPTY_DATE,
+                      "RetrieveRecord": 1, "AnnotationAuthor": 1,
+                      "Cluster": None, "Subcluster": None}
+        gene_data = []
+        for x in range(1, 4):
+            gene_data.append({"GeneID": f"D29_{x}", "PhageID": "D29",
+                              "Start": x, "Stop": x + 100, "Length": 33,
+                              "Name": str(x), "Translation": "MKL",
+                              "Orientation": "F",
+                              "Notes": """5' "exo" 50% nuclease""",
+                              "LocusTag": None, "Parts": 1})
+        stmts = [mysqldb.create_bulk_insert("phage", [phage_data]),
+                 mysqldb.create_bulk_insert("gene", gene_data)]
+        return_code, msg = mysqldb.execute_transaction(self.engine, stmts)
+        query = ("SELECT Notes, LocusTag FROM gene "
+                 "WHERE PhageID = 'D29' ORDER BY GeneID")
+        results = self.engine.execute(query).fetchall()
+        with self.subTest():
+            self.assertEqual(return_code, 0)
+        with self.subTest():
+            self.assertEqual(len(results), 3)
+        with self.subTest():
+            self.assertEqual(results[0][0].decode("utf-8"),
+                             """5' "exo" 50% nuclease""")
+        with self.subTest():
+            self.assertIsNone(results[0][1])
+
+    def test_execute_transaction_5(self):
+        """Valid connection but invalid parameterized transaction
+        should return code 1."""
+        gene_data = [{"GeneID": "Trixie_10", "PhageID": "Trixie",
+                      "Start": 1, "Stop": 100, "Length": 33, "Name": "10",
+                      "Translation": "MKL", "Orientation": "F",
+                      "Notes": "", "LocusTag": None, "Parts": 1},
+                     {"GeneID": "Trixie_11", "PhageID": "Invalid",
+                      "Start": 1, "Stop": 100, "Length": 33, "Name": "11",
+                      "Translation": "MKL", "Orientation": "F",
+                      "Notes": "", "LocusTag": None, "Parts": 1}]
+        stmts = [mysqldb.create_bulk_insert("gene", gene_data)]
+        return_code, msg = mysqldb.execute_transaction(self.engine, stmts)
+        query = "SELECT COUNT(GeneID) FROM gene WHERE PhageID = 'Trixie'"
+        result_list = self.engine.execute(query).fetchall()
+        count = result_list[0][0]
+        with self.subTest():
+            self.assertEqual(return_code, 1)
+        with self.subTest():
+            self.assertEqual(count, 2)
+
 
 
 
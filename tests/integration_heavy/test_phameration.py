@@ -391,6 +391,60 @@ class TestPhamerationFunctions(unittest.TestCase):
         with self.subTest():
             self.assertEqual(genes_1_count, genes_2_count)
 
+    def test_21_update_phams(self):
+        """Verify that updating saved clusters with the same translations
+        produces the same phams as clustering from scratch"""
+        refresh_tempdir(self.temp_dir)
+        update_dir = f"{self.temp_dir}_update"
+        refresh_tempdir(update_dir)
+        params = get_program_params("mmseqs")
+
+        ts_to_gs = map_translations_to_geneids(self.engine)
+        hs_to_gs = map_hashes_to_geneids(ts_to_gs)
+
+        write_hashed_fasta(ts_to_gs, self.temp_dir)
+        create_clusterdb("mmseqs", self.temp_dir)
+        phamerate(params, "mmseqs", self.temp_dir)
+        full_phams = parse_output("mmseqs", self.temp_dir)
+        full_phams = reintroduce_hashed_duplicates(full_phams, hs_to_gs)
+        save_update_dbs(self.temp_dir, update_dir, params)
+
+        refresh_tempdir(self.temp_dir)
+        write_hashed_fasta(ts_to_gs, self.temp_dir)
+        with self.subTest():
+            self.assertTrue(check_update_dir(update_dir, params))
+        update_clusterdb(params, self.temp_dir, update_dir)
+        updated_phams = parse_output("mmseqs", self.temp_dir)
+        updated_phams = reintroduce_hashed_duplicates(updated_phams, hs_to_gs)
+        shutil.rmtree(update_dir)
+
+        full_phams = {frozenset(pham) for pham in full_phams.values()}
+        updated_phams = {frozenset(pham) for pham in updated_phams.values()}
+        with self.subTest():
+            self.assertEqual(full_phams, updated_phams)
+
+    def test_22_reinsert_pham_data_bulk(self):
+        """Verify that bulk reinsertion restores the same pham data as
+        reinsertion with one statement per pham and per gene"""
+        old_phams = get_pham_geneids(self.engine)
+        old_colors = get_pham_colors(self.engine)
+
+        results = []
+        for reinsert in [reinsert_pham_data, reinsert_pham_data_bulk]:
+            mysqldb.execute_transaction(self.engine, ["DELETE FROM pham"])
+            with self.subTest():
+                self.assertEqual(len(get_pham_geneids(self.engine)), 0)
+            reinsert(old_phams, old_colors, self.engine)
+            results.append((get_pham_geneids(self.engine),
+                            get_pham_colors(self.engine)))
+
+        with self.subTest():
+            self.assertEqual(results[1][0], old_phams)
+        with self.subTest():
+            self.assertEqual(results[1][1], old_colors)
+        with self.subTest():
+            self.assertEqual(results[0], results[1])
+
     # Don't really have a good way to verify that reinsert_pham_data() or
     # fix_miscolored_phams() appear to be working properly, but both functions
     # have undergone rigorous manual checks to make sure the MySQL commands
@@ -1,8 +1,12 @@
-from sqlalchemy import MetaData
+from pathlib import Path
+from sqlalchemy import create_engine
+from sqlalchemy import Column, ForeignKey, Integer, MetaData, String, Table
 from sqlalchemy.engine.base import Engine
 from sqlalchemy.exc import OperationalError
+from pdm_utils.classes import alchemyhandler
 from pdm_utils.classes.alchemyhandler import AlchemyHandler
-from unittest.mock import patch, Mock, PropertyMock
+from unittest.mock import patch, Mock, MagicMock, PropertyMock
+import shutil
 import unittest
 
 class TestAlchemyHandler(unittest.TestCase):
@@ -241,6 +245,27 @@ class TestAlchemyHandler(unittest.TestCase):
         MockProxy.fetchall.assert_called()
         BuildEngine.assert_not_called() 
    
+    @patch("pdm_utils.classes.alchemyhandler.AlchemyHandler.build_engine")
+    def test_stream_1(self, BuildEngine):
+        MockEngine = MagicMock()
+        MockConnection = MockEngine.connect.return_value.__enter__.return_value
+        MockProxy = MockConnection.execution_options.return_value.\
+                                                        execute.return_value
+
+        MockProxy.fetchmany.side_effect = [[{"A": 1}, {"A": 2}], [{"A": 3}],
+                                           []]
+
+        self.alchemist._engine = MockEngine
+
+        chunks = list(self.alchemist.stream("Executable", chunk_size=2))
+
+        self.assertEqual(chunks, [[{"A": 1}, {"A": 2}], [{"A": 3}]])
+        MockConnection.execution_options.assert_called_with(
+                                                        stream_results=True)
+        MockProxy.fetchmany.assert_called_with(2)
+        MockProxy.close.assert_called()
+        BuildEngine.assert_not_called()
+
     @patch("pdm_utils.classes.alchemyhandler.AlchemyHandler.build_engine")
     def test_scalar_1(self, BuildEngine):
         MockEngine = Mock()
@@ -411,5 +436,133 @@ class TestAlchemyHandler(unittest.TestCase):
         BuildMetadata.assert_called()
         GetMap.assert_called_with(None, "Test") 
 
+class TestSchemaCache(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path("/tmp", "pdm_utils_tests_schema_cache")
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+        self.test_dir.mkdir()
+        self.cache_dir = self.test_dir.joinpath("cache")
+
+        db_path = self.test_dir.joinpath("test_db.sqlite")
+        self.engine = create_engine(f"sqlite:///{db_path}")
+        metadata = MetaData()
+        Table("version", metadata,
+              Column("Version", Integer),
+              Column("SchemaVersion", Integer))
+        Table("phage", metadata,
+              Column("PhageID", String(25), primary_key=True))
+        Table("gene", metadata,
+              Column("GeneID", String(35), primary_key=True),
+              Column("PhageID", String(25), ForeignKey("phage.PhageID")))
+        metadata.create_all(self.engine)
+        self.engine.execute("INSERT INTO version VALUES (1, 10)")
+
+        alchemyhandler.SCHEMA_CACHE.clear()
+
+    def tearDown(self):
+        alchemyhandler.SCHEMA_CACHE.clear()
+        self.engine.dispose()
+        shutil.rmtree(self.test_dir)
+
+    def create_alchemist(self):
+        alchemist = AlchemyHandler(database="test_db",
+                                   cache_dir=self.cache_dir)
+        alchemist._engine = self.engine
+        alchemist.connected = True
+        return alchemist
+
+    def test_build_metadata_1(self):
+        """Verify a reflected schema is cached in memory and on disk."""
+        alchemist = self.create_alchemist()
+        alchemist.build_metadata()
+
+        self.assertTrue("gene" in alchemist.metadata.tables.keys())
+        self.assertEqual(len(alchemyhandler.SCHEMA_CACHE), 1)
+        self.assertEqual(len(list(self.cache_dir.iterdir())), 1)
+
+    def test_build_metadata_2(self):
+        """Verify a cached schema is used without reflection."""
+        first_alchemist = self.create_alchemist()
+        first_alchemist.build_metadata()
+
+        alchemist = self.create_alchemist()
+        with patch("pdm_utils.classes.alchemyhandler.MetaData") as MetaData:
+            alchemist.build_metadata()
+            MetaData.assert_not_called()
+
+        self.assertTrue(alchemist.metadata is first_alchemist.metadata)
+
+    def test_build_metadata_3(self):
+        """Verify a schema cached on disk is used by a new process."""
+        self.create_alchemist().build_metadata()
+        alchemyhandler.SCHEMA_CACHE.clear()
+
+        alchemist = self.create_alchemist()
+        with patch("pdm_utils.classes.alchemyhandler.MetaData") as MetaData:
+            alchemist.build_metadata()
+            MetaData.assert_not_called()
+
+        gene = alchemist.get_table("gene")
+        self.assertEqual(gene.columns["PhageID"].type.length, 25)
+        self.assertIsNone(alchemist.metadata.bind)
+
+    def test_build_metadata_4(self):
+        """Verify a changed schema version invalidates the cache."""
+        first_alchemist = self.create_alchemist()
+        first_alchemist.build_metadata()
+        self.engine.execute("UPDATE version SET SchemaVersion = 11")
+        alchemyhandler.SCHEMA_CACHE.clear()
+
+        alchemist = self.create_alchemist()
+        alchemist.build_metadata()
+
+        self.assertFalse(alchemist.metadata is first_alchemist.metadata)
+        schema = list(alchemyhandler.SCHEMA_CACHE.values())[0]
+        self.assertEqual(schema["version"][0], 11)
+
+    def test_build_metadata_5(self):
+        """Verify the schema is reflected but not cached without a
+        version table."""
+        self.engine.execute("DROP TABLE version")
+
+        alchemist = self.create_alchemist()
+        alchemist.build_metadata()
+
+        self.assertTrue("gene" in alchemist.metadata.tables.keys())
+        self.assertEqual(alchemyhandler.SCHEMA_CACHE, {})
+        self.assertFalse(self.cache_dir.exists())
+
+    def test_build_metadata_6(self):
+        """Verify a handler with another engine does not change the
+        metadata or engine of a handler sharing the cached schema."""
+        first_alchemist = self.create_alchemist()
+        first_alchemist.build_metadata()
+
+        engine = create_engine(self.engine.url)
+        alchemist = AlchemyHandler(database="test_db",
+                                   cache_dir=self.cache_dir)
+        alchemist._engine = engine
+        alchemist.connected = True
+        alchemist.build_metadata()
+        engine.dispose()
+
+        self.assertTrue(alchemist.metadata is first_alchemist.metadata)
+        self.assertIsNone(first_alchemist.metadata.bind)
+        self.assertTrue(first_alchemist.engine is self.engine)
+
+    def test_build_graph_1(self):
+        """Verify the cached graph is reused with precomputed join paths."""
+        alchemist = self.create_alchemist()
+        alchemist.build_graph()
+        graph = alchemist.graph
+
+        alchemist = self.create_alchemist()
+        alchemist.build_graph()
+
+        self.assertTrue(alchemist.graph is graph)
+        self.assertEqual(graph.graph["paths"]["gene"]["phage"],
+                         ["gene", "phage"])
+
 if __name__ == "__main__":
     unittest.main()
@@ -2,6 +2,8 @@
 
 
 from pdm_utils.functions import basic
+from Bio.Alphabet import IUPAC
+from Bio.Seq import Seq
 from datetime import datetime
 import unittest
 import re
@@ -1597,6 +1599,23 @@ class TestBasicFunctions2(unittest.TestCase):
             self.assertEqual(self.dict3.keys(), set())
 
 
+    def test_get_seq_hash_1(self):
+        """Verify the SHA-256 hash of an upper-case sequence is returned."""
+        seq_hash = basic.get_seq_hash("AAGGCGA")
+        exp = "60f394e2cadc20ed153a5533afc6806021685b773bf2c630e18d498fd9f98b1e"
+        self.assertEqual(seq_hash, exp)
+
+    def test_get_seq_hash_2(self):
+        """Verify lower-case and Seq sequences return the same hash
+        as upper-case strings."""
+        seq_hash1 = basic.get_seq_hash("aaggcga")
+        seq_hash2 = basic.get_seq_hash(Seq("AAGGCGA", IUPAC.ambiguous_dna))
+        exp = basic.get_seq_hash("AAGGCGA")
+        with self.subTest():
+            self.assertEqual(seq_hash1, exp)
+        with self.subTest():
+            self.assertEqual(seq_hash2, exp)
+
 
 
 if __name__ == '__main__':
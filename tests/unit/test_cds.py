@@ -33,6 +33,38 @@ class TestCdsClass(unittest.TestCase):
         self.seqfeature3 = test_data_utils.create_2_part_seqfeature(
                                 1, 5, 1, 3, 7, 1, "CDS")
 
+    def test_seq_1(self):
+        """Verify that an empty Seq object is created lazily."""
+        with self.subTest():
+            self.assertIsNone(self.feature._seq)
+        with self.subTest():
+            self.assertEqual(self.feature.seq, "")
+        with self.subTest():
+            self.assertEqual(self.feature.seq.alphabet, IUPAC.ambiguous_dna)
+        with self.subTest():
+            self.assertIs(self.feature.seq, self.feature._seq)
+
+    def test_seq_2(self):
+        """Verify that an assigned Seq object is returned."""
+        self.feature.seq = self.seq1
+        self.assertIs(self.feature.seq, self.seq1)
+
+    def test_evaluations_1(self):
+        """Verify that the evaluation list is created lazily and
+        retains appended evaluations."""
+        with self.subTest():
+            self.assertIsNone(self.feature._evaluations)
+        self.feature.set_eval("eval_id", "definition", "result", "status")
+        with self.subTest():
+            self.assertEqual(len(self.feature.evaluations), 1)
+        with self.subTest():
+            self.assertEqual(self.feature.evaluations[0].id, "eval_id")
+
+    def test_slots_1(self):
+        """Verify that attributes not defined for the class can not be set."""
+        with self.assertRaises(AttributeError):
+            self.feature.invalid = 1
+
     def test_set_locus_tag_1(self):
         """Verify that standard 3-part locus_tag is parsed correctly."""
         self.feature.genome_id = "Trixie"
@@ -1286,6 +1318,16 @@ class TestCdsClass(unittest.TestCase):
         self.feature.check_translation()
         self.assertEqual(self.feature.evaluations[0].status, "error")
 
+    def test_check_translation_6(self):
+        """Verify that a supplied expected translation is used instead of
+        translating the nucleotide sequence."""
+        self.feature.translation = Seq("MF", IUPAC.protein)
+        self.feature.translation_length = 2
+        self.feature.seq = Seq("ATGATGTGA", IUPAC.unambiguous_dna)
+        self.feature.translation_table = 11
+        self.feature.check_translation(translation=Seq("MF", IUPAC.protein))
+        self.assertEqual(self.feature.evaluations[0].status, "correct")
+
 
 
 
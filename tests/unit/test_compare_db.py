@@ -0,0 +1,432 @@
+"""Unit tests for comparing matched genomes in the compare_db pipeline."""
+
+import csv
+from pathlib import Path
+import shutil
+import unittest
+from unittest.mock import MagicMock, patch
+
+from pdm_utils.pipelines import compare_db
+
+# Create the main test directory in which all files will be
+# created and managed.
+test_root_dir = Path("/tmp", "pdm_utils_tests_compare_db")
+if test_root_dir.exists() == True:
+    shutil.rmtree(test_root_dir)
+test_root_dir.mkdir()
+
+DNA_ALPHABET = set("ACGT")
+PROTEIN_ALPHABET = set("ACDEFGHIKLMNPQRSTVWY")
+
+
+def create_ph_cds(phage_id, number, left, right, strand, translation, notes):
+    cds = compare_db.PhameratorCdsFeature()
+    cds.set_phage_id(phage_id)
+    cds.set_gene_id(f"{phage_id}_{number}")
+    cds.set_gene_name(str(number))
+    cds.set_type_id("CDS")
+    cds.set_left_boundary(left)
+    cds.set_right_boundary(right)
+    cds.set_strand(strand)
+    cds.set_translation(translation)
+    cds.set_notes(notes, notes.lower())
+    cds.compute_amino_acid_errors(PROTEIN_ALPHABET)
+    cds.set_start_end_strand_id()
+    cds.compute_boundary_error()
+    return cds
+
+
+def create_ncbi_cds(phage_id, number, left, right, strand, translation,
+                    product):
+    cds = compare_db.NcbiCdsFeature()
+    cds.set_type_id("CDS")
+    cds.set_locus_tag(f"{phage_id.upper()}_{number}")
+    cds.set_strand(strand)
+    cds.set_left_boundary(str(left))
+    cds.set_right_boundary(str(right))
+    cds.set_translation(translation)
+    cds.set_product_description(product, product.lower())
+    cds.set_gene_number(str(number))
+    cds.compute_amino_acid_errors(PROTEIN_ALPHABET)
+    cds.set_start_end_strand_id()
+    cds.compute_boundary_error()
+    cds.compute_description_error()
+    return cds
+
+
+def create_matched_genomes(index):
+    phage_id = f"Phage{index}"
+    accession = f"AB{index:06}"
+    sequence = "ATGC" * (50 + index)
+
+    ph_cds_list = [
+        create_ph_cds(phage_id, 1, 10, 100, "F", "MKV", "terminase"),
+        create_ph_cds(phage_id, 2, 150 + index, 300, "F", "MAK", ""),
+        create_ph_cds(phage_id, 3, 400, 550, "R", "MKL", "portal"),
+        create_ph_cds(phage_id, 4, 600, 700, "R", "MXX", "")]
+    ph_genome = compare_db.PhameratorGenome()
+    ph_genome.set_phage_id(phage_id)
+    ph_genome.set_phage_name(phage_id)
+    ph_genome.set_host("Mycobacterium")
+    ph_genome.set_sequence(sequence)
+    ph_genome.set_accession(accession)
+    ph_genome.set_status("final")
+    ph_genome.set_cluster_subcluster("A1")
+    ph_genome.set_ncbi_update_flag(1)
+    ph_genome.set_date_last_modified(None)
+    ph_genome.set_annotation_author(index % 2)
+    ph_genome.compute_nucleotide_errors(DNA_ALPHABET)
+    ph_genome.set_cds_features(ph_cds_list)
+    ph_genome.compute_cds_feature_errors()
+    ph_genome.compute_status_description_error()
+
+    matched_genomes = compare_db.MatchedGenomes()
+    matched_genomes.set_phamerator_genome(ph_genome)
+
+    if index % 3 != 0:
+        ncbi_cds_list = [
+            create_ncbi_cds(phage_id, 1, 10, 100, "F", "MKV", "terminase"),
+            create_ncbi_cds(phage_id, 2, 120, 300, "F", "MAK", "hypothetical"),
+            create_ncbi_cds(phage_id, 3, 400, 550, "R", "MKI", "portal"),
+            create_ncbi_cds(phage_id, 5, 800, 900, "F", "MKK", "")]
+        ncbi_genome = compare_db.NcbiGenome()
+        ncbi_genome.set_record_name(accession)
+        ncbi_genome.set_record_id(accession + ".1")
+        ncbi_genome.set_record_accession(accession)
+        ncbi_genome.set_record_description(f"Mycobacterium phage {phage_id}")
+        ncbi_genome.set_record_source(f"Mycobacterium phage {phage_id}")
+        ncbi_genome.set_record_organism(f"Mycobacterium phage {phage_id}")
+        ncbi_genome.set_phage_name(phage_id)
+        ncbi_genome.set_record_authors("Smith,J.;Hatfull,G.F.")
+        ncbi_genome.set_sequence(sequence if index % 2 else sequence + "A")
+        ncbi_genome.compute_nucleotide_errors(DNA_ALPHABET)
+        ncbi_genome.set_cds_features(ncbi_cds_list)
+        ncbi_genome.compute_cds_feature_errors()
+        ncbi_genome.compute_ncbi_cds_feature_errors()
+        matched_genomes.set_ncbi_genome(ncbi_genome)
+
+    if index % 4 != 0:
+        pdb_genome = compare_db.PhagesdbGenome()
+        pdb_genome.set_phage_name(phage_id)
+        pdb_genome.set_host("Gordonia" if index % 5 == 0 else "Mycobacterium")
+        pdb_genome.set_accession(accession)
+        pdb_genome.set_cluster("A")
+        pdb_genome.set_subcluster("A1")
+        pdb_genome.set_sequence(sequence)
+        pdb_genome.compute_nucleotide_errors(DNA_ALPHABET)
+        matched_genomes.set_phagesdb_genome(pdb_genome)
+
+    return matched_genomes
+
+
+def get_feature_data(feature):
+    if isinstance(feature, compare_db.MatchedCdsFeatures):
+        return (feature.get_phamerator_feature().get_gene_id(),
+                feature.get_ncbi_feature().get_locus_tag(),
+                feature.get_total_errors(),
+                feature.get_phamerator_ncbi_different_descriptions(),
+                feature.get_phamerator_ncbi_different_start_sites(),
+                feature.get_phamerator_ncbi_different_translations())
+    elif isinstance(feature, compare_db.PhameratorCdsFeature):
+        return (feature.get_gene_id(), feature.get_total_errors(),
+                feature.get_unmatched_error())
+    else:
+        return (feature.get_locus_tag(), feature.get_total_errors(),
+                feature.get_unmatched_error())
+
+
+def get_report_data(matched_genomes_list):
+    """Collect the genome and gene data written to the reports."""
+    report_data = []
+    for matched_genomes in matched_genomes_list:
+        features = []
+        features.extend(
+            matched_genomes.get_phamerator_ncbi_perfect_matched_features())
+        features.extend(
+            matched_genomes.get_phamerator_ncbi_imperfect_matched_features())
+        features.extend(matched_genomes.get_phamerator_features_unmatched_in_ncbi())
+        features.extend(matched_genomes.get_ncbi_features_unmatched_in_phamerator())
+        report_data.append((
+            matched_genomes.get_phamerator_genome().get_phage_id(),
+            matched_genomes.get_contains_errors(),
+            matched_genomes.get_total_number_genes_with_errors(),
+            matched_genomes.get_phamerator_ncbi_sequence_mismatch(),
+            matched_genomes.get_ncbi_record_header_fields_phage_name_mismatch(),
+            matched_genomes.get_ncbi_host_mismatch(),
+            matched_genomes.get_ph_ncbi_author_error(),
+            matched_genomes.get_phamerator_ncbi_different_descriptions_tally(),
+            matched_genomes.get_phamerator_ncbi_different_translation_tally(),
+            matched_genomes.get_phamerator_phagesdb_host_mismatch(),
+            matched_genomes.get_phagesdb_ncbi_sequence_mismatch(),
+            [get_feature_data(feature) for feature in features]))
+    return report_data
+
+
+def get_summary_data(matched_genomes_list):
+    summary = compare_db.DatabaseSummary(matched_genomes_list)
+    summary.compute_summary()
+    return [getattr(summary, name)() for name in dir(summary)
+            if name.startswith("get_") and name.endswith("tally")]
+
+
+class TestCompareMatchedGenomes(unittest.TestCase):
+
+    def setUp(self):
+        self.serial_list = [create_matched_genomes(x) for x in range(12)]
+        self.parallel_list = [create_matched_genomes(x) for x in range(12)]
+
+    def test_compare_matched_genomes_1(self):
+        """Verify matched CDS features are compared and tallied."""
+        matched_genomes = compare_db.compare_matched_genomes(
+                                self.serial_list[1])
+        self.assertEqual(
+            matched_genomes.get_phamerator_ncbi_perfect_matched_features_tally(),
+            2)
+        self.assertEqual(
+            matched_genomes.get_phamerator_ncbi_imperfect_matched_features_tally(),
+            1)
+        self.assertEqual(
+            matched_genomes.get_phamerator_features_unmatched_in_ncbi_tally(),
+            1)
+        self.assertEqual(
+            matched_genomes.get_ncbi_features_unmatched_in_phamerator_tally(),
+            1)
+        self.assertEqual(
+            matched_genomes.get_phamerator_ncbi_different_translation_tally(),
+            1)
+        self.assertTrue(matched_genomes.get_contains_errors())
+
+    def test_iter_compared_genomes_1(self):
+        """Verify a serial comparison compares the same objects in order."""
+        compared_list = list(compare_db.iter_compared_genomes(
+                                self.serial_list, len(self.serial_list),
+                                workers=1))
+        self.assertEqual(len(compared_list), len(self.serial_list))
+        for compared, matched in zip(compared_list, self.serial_list):
+            with self.subTest():
+                self.assertTrue(compared is matched)
+
+    def test_iter_compared_genomes_2(self):
+        """Verify a parallel comparison returns the same results, in the
+        same order, as a serial comparison."""
+        serial_list = list(compare_db.iter_compared_genomes(
+                                self.serial_list, len(self.serial_list),
+                                workers=1))
+        parallel_list = list(compare_db.iter_compared_genomes(
+                                self.parallel_list, len(self.parallel_list),
+                                workers=3))
+
+        self.assertEqual(len(parallel_list), len(serial_list))
+        with self.subTest():
+            self.assertEqual(get_report_data(parallel_list),
+                             get_report_data(serial_list))
+        with self.subTest():
+            self.assertEqual(get_summary_data(parallel_list),
+                             get_summary_data(serial_list))
+
+    def test_iter_compared_genomes_3(self):
+        """Verify genomes streamed from a generator to a process pool are
+        yielded in their original order."""
+        serial_list = list(compare_db.iter_compared_genomes(
+                                self.serial_list, len(self.serial_list),
+                                workers=1))
+        matched_genomes_iter = (matched_genomes for matched_genomes
+                                in self.parallel_list)
+        parallel_list = list(compare_db.iter_compared_genomes(
+                                matched_genomes_iter, len(self.parallel_list),
+                                workers=2))
+        self.assertEqual(get_report_data(parallel_list),
+                         get_report_data(serial_list))
+
+    def write_reports(self, matched_genomes_list, workers, output_dir):
+        """Compare matched genomes and write the genome and gene reports."""
+        output_dir.mkdir()
+        genome_report = Path(output_dir, "genome_output.csv")
+        gene_report = Path(output_dir, "gene_output.csv")
+        with genome_report.open("w") as genome_fh, \
+                gene_report.open("w") as gene_fh:
+            genome_report_writer = csv.writer(genome_fh)
+            gene_report_writer = csv.writer(gene_fh)
+            for matched_genomes in compare_db.iter_compared_genomes(
+                                        iter(matched_genomes_list),
+                                        len(matched_genomes_list),
+                                        workers=workers):
+                compare_db.write_matched_genomes(matched_genomes,
+                                                 genome_report_writer,
+                                                 gene_report_writer)
+        return genome_report.read_bytes(), gene_report.read_bytes()
+
+    def test_write_matched_genomes_1(self):
+        """Verify the genome and gene reports written from a parallel
+        comparison are identical to those of a serial comparison."""
+        base_dir = Path(test_root_dir, "write_matched_genomes")
+        base_dir.mkdir()
+        try:
+            serial_reports = self.write_reports(
+                                self.serial_list, 1, Path(base_dir, "serial"))
+            parallel_reports = self.write_reports(
+                                self.parallel_list, 2,
+                                Path(base_dir, "parallel"))
+        finally:
+            shutil.rmtree(base_dir)
+        with self.subTest():
+            self.assertTrue(len(serial_reports[0]) > 0)
+        with self.subTest():
+            self.assertTrue(len(serial_reports[1]) > 0)
+        with self.subTest():
+            self.assertEqual(parallel_reports[0], serial_reports[0])
+        with self.subTest():
+            self.assertEqual(parallel_reports[1], serial_reports[1])
+
+    def test_add_matched_genomes_1(self):
+        """Verify a summary tallied one genome at a time is the same as a
+        summary computed from a list."""
+        compared_list = list(compare_db.iter_compared_genomes(
+                                self.serial_list, len(self.serial_list),
+                                workers=1))
+        summary = compare_db.DatabaseSummary([])
+        for matched_genomes in compared_list:
+            summary.add_matched_genomes(matched_genomes)
+        streamed_data = [getattr(summary, name)() for name in dir(summary)
+                         if name.startswith("get_") and name.endswith("tally")]
+        self.assertEqual(streamed_data, get_summary_data(compared_list))
+
+
+class TestAnnotatedGenome(unittest.TestCase):
+
+    def test_compute_cds_feature_errors_1(self):
+        """Verify that all pairs of CDS features with conflicting
+        coordinates are tallied, ignoring fuzzy coordinates."""
+        cds_list = [
+            create_ncbi_cds("Alice", 1, 10, 1000, "F", "MKV", ""),
+            create_ncbi_cds("Alice", 2, 20, 200, "R", "MKV", ""),
+            create_ncbi_cds("Alice", 3, 300, 400, "F", "MKV", ""),
+            create_ncbi_cds("Alice", 4, 350, 400, "F", "MKV", ""),
+            create_ncbi_cds("Alice", 5, "<5", 400, "F", "MKV", "")]
+        gnm = compare_db.NcbiGenome()
+        gnm.set_sequence("ATGC" * 500)
+        gnm.set_cds_features(cds_list)
+        gnm.compute_cds_feature_errors()
+        with self.subTest():
+            self.assertEqual(gnm.get_cds_features_boundary_error_tally(), 1)
+        with self.subTest():
+            self.assertEqual(
+                gnm.get_cds_features_coordinate_conflict_tally(), 4)
+
+
+class TestStreamMysqlGenomeData(unittest.TestCase):
+
+    def setUp(self):
+        self.genome_tuples = [
+            ("Alice", "Alice", "Mycobacterium", b"ATGCATGC", 8, "final",
+             "A1", "AB000001", 1, None, 1),
+            ("Bob", "Bob", "Mycobacterium", b"GGCC", 4, "draft",
+             "A1", "", 1, None, 1),
+            ("Carol", "Carol", "Gordonia", b"ATTA", 4, "final",
+             "C", "AB000003", 0, None, 0)]
+        self.gene_tuples = [
+            ("Alice", "Alice_1", "1", 1, 100, "F", "MKV", b"terminase"),
+            ("Alice", "Alice_2", "2", 200, 300, "R", "MAK", b""),
+            ("Aloha", "Aloha_1", "1", 1, 100, "F", "MKV", b""),
+            ("Carol", "Carol_1", "1", 1, 100, "F", "MKL", b"portal")]
+
+    def test_merge_genome_gene_data_1(self):
+        """Verify each genome is paired with only its genes."""
+        merged = list(compare_db.merge_genome_gene_data(self.genome_tuples,
+                                                        self.gene_tuples))
+        self.assertEqual([genome[0] for genome, genes in merged],
+                         ["Alice", "Bob", "Carol"])
+        self.assertEqual([[gene[1] for gene in genes]
+                          for genome, genes in merged],
+                         [["Alice_1", "Alice_2"], [], ["Carol_1"]])
+
+    def test_merge_genome_gene_data_3(self):
+        """Verify genes with a PhageID that has no phage row are skipped,
+        when they are listed before, between and after valid genes."""
+        gene_tuples = [
+            ("Aaron", "Aaron_1", "1", 1, 100, "F", "MKV", b""),
+            ("Alice", "Alice_1", "1", 1, 100, "F", "MKV", b"terminase"),
+            ("Alice_X", "Alice_X_1", "1", 1, 100, "F", "MKV", b""),
+            ("Bert", "Bert_1", "1", 1, 100, "F", "MKV", b""),
+            ("Bert", "Bert_2", "2", 1, 100, "F", "MKV", b""),
+            ("Carol", "Carol_1", "1", 1, 100, "F", "MKL", b"portal"),
+            ("Dave", "Dave_1", "1", 1, 100, "F", "MKV", b"")]
+        merged = list(compare_db.merge_genome_gene_data(self.genome_tuples,
+                                                        gene_tuples))
+        with self.subTest():
+            self.assertEqual([genome[0] for genome, genes in merged],
+                             ["Alice", "Bob", "Carol"])
+        with self.subTest():
+            self.assertEqual([[gene[1] for gene in genes]
+                              for genome, genes in merged],
+                             [["Alice_1"], [], ["Carol_1"]])
+
+    def test_merge_genome_gene_data_2(self):
+        """Verify rows are consumed lazily, one genome at a time."""
+        genome_iter = iter(self.genome_tuples)
+        merged = compare_db.merge_genome_gene_data(genome_iter,
+                                                   iter(self.gene_tuples))
+        genome_tuple, gene_tuples = next(merged)
+        self.assertEqual(genome_tuple[0], "Alice")
+        self.assertEqual(next(genome_iter)[0], "Bob")
+
+    def test_create_phamerator_genome_1(self):
+        """Verify a genome is created with its CDS features."""
+        gnm = compare_db.create_phamerator_genome(
+                    self.genome_tuples[0], self.gene_tuples[:2],
+                    DNA_ALPHABET, PROTEIN_ALPHABET)
+        self.assertEqual(gnm.get_phage_id(), "Alice")
+        self.assertEqual(gnm.get_sequence(), "ATGCATGC")
+        self.assertEqual([cds.get_gene_id() for cds in gnm.get_cds_features()],
+                         ["Alice_1", "Alice_2"])
+        self.assertEqual(gnm.get_description_tally(), 1)
+
+    def test_iter_phamerator_genomes_1(self):
+        """Verify only genomes with a selected status and authorship are
+        created."""
+        merged = compare_db.merge_genome_gene_data(self.genome_tuples,
+                                                   self.gene_tuples)
+        genomes = list(compare_db.iter_phamerator_genomes(
+                            merged, {"final"}, {1}, DNA_ALPHABET,
+                            PROTEIN_ALPHABET, len(self.genome_tuples)))
+        self.assertEqual([gnm.get_phage_id() for gnm in genomes], ["Alice"])
+
+    @patch("pdm_utils.pipelines.compare_db.pms.connect")
+    def test_connect_mysql_snapshot_1(self, Connect):
+        """Verify a transaction with a consistent snapshot is started."""
+        con = compare_db.connect_mysql_snapshot("user", "pwd", "Actino_Draft")
+        with self.subTest():
+            self.assertEqual(con, Connect.return_value)
+        with self.subTest():
+            con.autocommit.assert_called_with(False)
+        with self.subTest():
+            con.cursor.return_value.execute.assert_called_with(
+                        "START TRANSACTION WITH CONSISTENT SNAPSHOT")
+
+    def test_stream_mysql_genome_data_1(self):
+        """Verify both tables are streamed with unbuffered cursors and
+        both connections are closed."""
+        phage_con = MagicMock()
+        gene_con = MagicMock()
+        phage_con.cursor.return_value.__iter__.return_value = \
+                                            iter(self.genome_tuples)
+        gene_con.cursor.return_value.__iter__.return_value = \
+                                            iter(self.gene_tuples)
+
+        merged = list(compare_db.stream_mysql_genome_data(phage_con,
+                                                          gene_con))
+
+        self.assertEqual(len(merged), 3)
+        for con in [phage_con, gene_con]:
+            with self.subTest():
+                con.cursor.assert_called_with(compare_db.pms.cursors.SSCursor)
+            with self.subTest():
+                con.close.assert_called()
+        phage_con.cursor.return_value.execute.assert_called_with(
+                                            compare_db.PHAGE_QUERY)
+        gene_con.cursor.return_value.execute.assert_called_with(
+                                            compare_db.GENE_QUERY)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -9,7 +9,16 @@ from Bio.Seq import Seq
 from Bio.SeqFeature import SeqFeature, FeatureLocation, CompoundLocation
 from pdm_utils.pipelines import export_db
 from pdm_utils.functions import flat_files
+from pdm_utils.constants import constants
 from pathlib import Path
+from pdm_utils.classes.alchemyhandler import AlchemyHandler
+from pdm_utils.classes.filter import Filter
+from pdm_utils.functions import querying
+from sqlalchemy import create_engine, MetaData, Table, Column, String, Integer
+from sqlalchemy import event
+import csv
+import gzip
+import shutil
 
 class TestFileExport(unittest.TestCase):
 
@@ -166,5 +175,289 @@ class TestFileExport(unittest.TestCase):
                 export_db.append_database_version(
                                             None, self.test_version_dictionary)
 
+class TestStreamingFileExport(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Creates genomes and an export directory for testing
+        the batched formatted file export
+        """
+        self.test_dir = Path("/tmp", "pdm_utils_tests_export_db")
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+        self.test_dir.mkdir()
+        self.version = {"Version" : "10", "SchemaVersion": "8"}
+        self.genomes = {}
+        for x in range(5):
+            gnm = genome.Genome()
+            gnm.id = f"TestPhage_{x}"
+            gnm.name = gnm.id
+            gnm.accession = f"TEST{x}"
+            gnm.host_genus = "Mycobacterium"
+            gnm.cluster = "A"
+            gnm.subcluster = "A1"
+            gnm.seq = Seq("ATGAAATAG" * 10)
+            gnm.length = len(gnm.seq)
+            gnm.date = constants.EMPTY_DATE
+            gnm.annotation_status = "final"
+            gnm.annotation_author = 1
+            gnm.retrieve_record = 1
+            cds_ftr = cds.Cds()
+            cds_ftr.id = f"{gnm.id}_1"
+            cds_ftr.genome_id = gnm.id
+            cds_ftr.start = 0
+            cds_ftr.stop = 9
+            cds_ftr.parts = 1
+            cds_ftr.coordinate_format = "0_half_open"
+            cds_ftr.orientation = "F"
+            cds_ftr.translation_table = 11
+            cds_ftr.set_translation("MK")
+            gnm.cds_features = [cds_ftr]
+            self.genomes[gnm.id] = gnm
+        self.alchemist = Mock(database="test_db", engine="engine")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def parse_genome_data(self, engine, phage_id_list=None, **kwargs):
+        return [self.genomes[phage_id] for phage_id in phage_id_list]
+
+    def test_iter_genome_batches(self):
+        """
+        Unittest for export_db.iter_genome_batches()
+            -Tests that genomes are retrieved in batches of the
+             indicated size.
+        """
+        with patch("pdm_utils.functions.mysqldb.parse_genome_data") as pgd:
+            pgd.side_effect = self.parse_genome_data
+            batches = export_db.iter_genome_batches(
+                                    "engine", list(self.genomes.keys()),
+                                    batch_size=2)
+            self.assertEqual([[gnm.id for gnm in batch] for batch in batches],
+                             [["TestPhage_0", "TestPhage_1"],
+                              ["TestPhage_2", "TestPhage_3"],
+                              ["TestPhage_4"]])
+            self.assertEqual(pgd.call_count, 3)
+
+    def test_write_genome_batch(self):
+        """
+        Unittest for export_db.write_genome_batch()
+            -Tests that a file with the database version is written
+             for each genome.
+        """
+        genomes = list(self.genomes.values())[:2]
+        count = export_db.write_genome_batch(genomes, "gb", self.test_dir,
+                                             self.version)
+        self.assertEqual(count, 2)
+        self.assertEqual(sorted(path.name for path in self.test_dir.iterdir()),
+                         ["TestPhage_0.gb", "TestPhage_1.gb"])
+        text = self.test_dir.joinpath("TestPhage_0.gb").read_text()
+        self.assertIn("Database Version: 10; Schema Version: 8", text)
+        self.assertIn("/translation=\"MK\"", text)
+
+    def test_execute_ffx_export_workers(self):
+        """
+        Unittest for export_db.execute_ffx_export()
+            -Tests that all genomes are written in batches, and that
+             files written by a pool of processes are identical.
+        """
+        serial_path = self.test_dir.joinpath("serial")
+        serial_path.mkdir()
+        parallel_path = self.test_dir.joinpath("parallel")
+        parallel_path.mkdir()
+        phage_ids = [{"PhageID": phage_id} for phage_id in self.genomes.keys()]
+        with patch("pdm_utils.functions.mysqldb.parse_genome_data") as pgd, \
+                patch("pdm_utils.functions.mysqldb.query_dict_list") as qdl:
+            pgd.side_effect = self.parse_genome_data
+            qdl.return_value = phage_ids
+            export_db.execute_ffx_export(self.alchemist, serial_path, "gb",
+                                         self.version, batch_size=2)
+            export_db.execute_ffx_export(self.alchemist, parallel_path, "gb",
+                                         self.version, batch_size=2,
+                                         workers=2)
+        serial_files = sorted(path.name for path in serial_path.iterdir())
+        self.assertEqual(serial_files,
+                         [f"{phage_id}.gb" for phage_id in self.genomes.keys()])
+        for file_name in serial_files:
+            with self.subTest(file_name=file_name):
+                self.assertEqual(
+                        serial_path.joinpath(file_name).read_text(),
+                        parallel_path.joinpath(file_name).read_text())
+
+class TestStreamingCsvExport(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Creates an in-memory gene table and an export directory for
+        testing the streamed csv export
+        """
+        self.test_dir = Path("/tmp", "pdm_utils_tests_export_db_csv")
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+        self.test_dir.mkdir()
+
+        engine = create_engine("sqlite://")
+        metadata = MetaData()
+        gene = Table("gene", metadata,
+                     Column("GeneID", String(35), primary_key=True),
+                     Column("PhageID", String(25)),
+                     Column("Start", Integer),
+                     Column("Translation", String(5)))
+        metadata.create_all(engine)
+        rows = [{"GeneID": f"Phage_{x}", "PhageID": "Phage", "Start": x,
+                 "Translation": "MK"} for x in range(25)]
+        engine.execute(gene.insert(), rows)
+
+        self.alchemist = AlchemyHandler()
+        self.alchemist._engine = engine
+        self.alchemist.metadata = metadata
+        self.alchemist.graph = querying.build_graph(metadata)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def read_rows(self, file_path, compress=False):
+        if compress:
+            handle = gzip.open(file_path, "rt")
+        else:
+            handle = file_path.open("r")
+        with handle:
+            return list(csv.DictReader(handle))
+
+    def test_execute_csv_export_1(self):
+        """
+        Unittest for export_db.execute_csv_export()
+            -Tests that rows fetched in chunks are all written, without
+             the removed sequence columns.
+        """
+        export_db.execute_csv_export(self.alchemist, self.test_dir,
+                                     table="gene", chunk_size=10)
+        rows = self.read_rows(self.test_dir.joinpath("gene.csv"))
+        self.assertEqual(len(rows), 25)
+        self.assertEqual(rows[3], {"GeneID": "Phage_3", "PhageID": "Phage",
+                                   "Start": "3"})
+
+    def test_execute_csv_export_2(self):
+        """
+        Unittest for export_db.execute_csv_export()
+            -Tests that a subset of columns for the selected values is
+             written to a gzip-compressed file.
+        """
+        export_db.execute_csv_export(self.alchemist, self.test_dir,
+                                     table="gene",
+                                     values=["Phage_1", "Phage_2"],
+                                     columns=["GeneID", "Translation"],
+                                     compress=True)
+        rows = self.read_rows(self.test_dir.joinpath("gene.csv.gz"),
+                              compress=True)
+        self.assertEqual(rows, [{"GeneID": "Phage_1", "Translation": "MK"},
+                                {"GeneID": "Phage_2", "Translation": "MK"}])
+
+    def test_execute_csv_export_3(self):
+        """
+        Unittest for export_db.execute_csv_export()
+            -Tests that an invalid column raises an error.
+        """
+        with self.assertRaises(ValueError):
+            export_db.execute_csv_export(self.alchemist, self.test_dir,
+                                         table="gene", columns=["Invalid"])
+
+class TestGroupedExport(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Creates an in-memory phage table, a filter keyed on PhageID, and
+        an export directory for testing grouped exports
+        """
+        self.test_dir = Path("/tmp", "pdm_utils_tests_export_db_groups")
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+        self.test_dir.mkdir()
+
+        engine = create_engine("sqlite://")
+        metadata = MetaData()
+        phage = Table("phage", metadata,
+                      Column("PhageID", String(25), primary_key=True),
+                      Column("Cluster", String(5)),
+                      Column("Subcluster", String(5)))
+        metadata.create_all(engine)
+        rows = [{"PhageID": "Trixie", "Cluster": "A", "Subcluster": "A2"},
+                {"PhageID": "D29", "Cluster": "A", "Subcluster": "A2"},
+                {"PhageID": "L5", "Cluster": "A", "Subcluster": "A2"},
+                {"PhageID": "Bxb1", "Cluster": "A", "Subcluster": "A1"},
+                {"PhageID": "Myrna", "Cluster": None, "Subcluster": None}]
+        engine.execute(phage.insert(), rows)
+
+        self.queries = []
+        event.listen(engine, "before_cursor_execute", self.count_query)
+
+        self.db_filter = Filter(key=phage.c.PhageID)
+        self.db_filter._engine = engine
+        self.db_filter._graph = querying.build_graph(metadata)
+        self.db_filter.values = ["Trixie", "D29", "Bxb1", "Myrna"]
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def count_query(self, conn, cursor, statement, *args):
+        self.queries.append(statement)
+
+    def test_group_1(self):
+        """
+        Unittest for Filter.group()
+            -Tests that selected values are partitioned by a single
+             group column with one query.
+        """
+        groups = self.db_filter.group("phage.Cluster")
+        self.assertEqual(len(self.queries), 1)
+        self.assertEqual(set(groups.keys()), {"A", None})
+        self.assertEqual(set(groups["A"]), {"Trixie", "D29", "Bxb1"})
+        self.assertEqual(groups[None], ["Myrna"])
+
+    def test_nested_group_1(self):
+        """
+        Unittest for Filter.nested_group()
+            -Tests that selected values are partitioned by nested group
+             columns with one query.
+        """
+        groups = self.db_filter.nested_group(["phage.Cluster",
+                                              "phage.Subcluster"])
+        self.assertEqual(len(self.queries), 1)
+        self.assertEqual(set(groups["A"].keys()), {"A1", "A2"})
+        self.assertEqual(set(groups["A"]["A2"]), {"Trixie", "D29"})
+        self.assertEqual(groups["A"]["A1"], ["Bxb1"])
+        self.assertEqual(groups[None], {None: ["Myrna"]})
+
+    def test_nested_group_2(self):
+        """
+        Unittest for Filter.nested_group()
+            -Tests that no query is made when no values are selected.
+        """
+        self.db_filter.values = []
+        self.assertEqual(self.db_filter.nested_group(["phage.Cluster"]), {})
+        self.assertEqual(self.queries, [])
+
+    def test_build_groups_map_1(self):
+        """
+        Unittest for export_db.build_groups_map()
+            -Tests that a dir is created for every nested group and that
+             every group is mapped to its values.
+        """
+        values_map = {}
+        export_db.build_groups_map(self.db_filter, self.test_dir,
+                                   groups=["phage.Cluster", "phage.Subcluster"],
+                                   values_map=values_map)
+        a1_path = self.test_dir.joinpath("A", "A1")
+        a2_path = self.test_dir.joinpath("A", "A2")
+        none_path = self.test_dir.joinpath("None", "None")
+        self.assertEqual(len(self.queries), 1)
+        self.assertEqual(set(values_map.keys()),
+                         {a1_path, a2_path, none_path})
+        self.assertEqual(set(values_map[a2_path]), {"Trixie", "D29"})
+        self.assertEqual(values_map[a1_path], ["Bxb1"])
+        self.assertEqual(values_map[none_path], ["Myrna"])
+        self.assertTrue(a1_path.is_dir())
+        self.assertTrue(a2_path.is_dir())
+
 if __name__ == "__main__":
     unittest.main()
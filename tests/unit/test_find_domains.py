@@ -0,0 +1,280 @@
+"""Unit tests for the find_domains pipeline."""
+
+from pathlib import Path
+import shutil
+import unittest
+from unittest.mock import patch, Mock
+
+from pdm_utils.functions import basic
+from pdm_utils.pipelines import find_domains
+
+unittest_file = Path(__file__)
+test_dir = unittest_file.parent.parent
+test_file_dir = Path(test_dir, "test_files")
+
+# Create the main test directory in which all files will be
+# created and managed.
+test_root_dir = Path("/tmp", "pdm_utils_tests_find_domains")
+if test_root_dir.exists() == True:
+    shutil.rmtree(test_root_dir)
+test_root_dir.mkdir()
+
+TABULAR_OUTPUT = (
+    "query_0\tgnl|CDD|334841\t1.78531e-11\t33\t115\t"
+    "pfam02195, ParBc, ParB-like \"nuclease\" domain.\n"
+    "query_0\tgnl|CDD|334841\t0.5\t2\t10\t"
+    "pfam02195, ParBc, ParB-like \"nuclease\" domain.\n"
+    "query_2\tgnl|CDD|100\t2e-05\t1\t50\t"
+    "gnl|CDD|100 cd00001, Short domain.\n")
+
+
+class TestFindDomains1(unittest.TestCase):
+
+    def setUp(self):
+        self.cdd_genes = [{"GeneID": "L5_1", "Translation": "MKL"},
+                          {"GeneID": "L5_2", "Translation": "MAG"},
+                          {"GeneID": "D29_1", "Translation": "MKL"}]
+        self.hit = {"HitID": "gnl|CDD|334841", "DomainID": "pfam02195",
+                    "Name": "ParBc", "Description": "ParB-like domain.",
+                    "Expect": 1.78531e-11, "QueryStart": 33, "QueryEnd": 115}
+
+    def test_parse_rpsblast_xml_1(self):
+        """Verify hits below the evalue cutoff are parsed and quotes in
+        descriptions are replaced."""
+        filepath = Path(test_file_dir, "test_rpsblast_output.xml")
+        with filepath.open("r") as fh:
+            hits = find_domains.parse_rpsblast_xml(fh, 0.001)
+        exp = [{"HitID": "gnl|CDD|334841", "DomainID": "pfam02195",
+                "Name": "ParBc",
+                "Description": "ParB-like 'nuclease' domain.",
+                "Expect": 1.78531e-11, "QueryStart": 33, "QueryEnd": 115}]
+        self.assertEqual(hits, exp)
+
+    def test_create_gene_statements_1(self):
+        """Verify domain, gene_domain and DomainStatus statements are
+        created for a gene."""
+        statements = find_domains.create_gene_statements("L5_1", [self.hit])
+        exp = [find_domains.INSERT_INTO_DOMAIN.format(
+                   "gnl|CDD|334841", "pfam02195", "ParBc",
+                   "ParB-like domain."),
+               find_domains.INSERT_INTO_GENE_DOMAIN.format(
+                   "L5_1", "gnl|CDD|334841", 1.78531e-11, 33, 115),
+               find_domains.UPDATE_GENE.format("L5_1")]
+        self.assertEqual(statements, exp)
+
+    def test_get_unique_translations_1(self):
+        """Verify each translation is returned once, in order."""
+        translations = find_domains.get_unique_translations(self.cdd_genes)
+        self.assertEqual(translations, ["MKL", "MAG"])
+
+    def test_create_bulk_statements_1(self):
+        """Verify domains already in the database or already inserted
+        are skipped, and one hit per gene and domain is inserted."""
+        hit2 = self.hit.copy()
+        hit2["HitID"] = "gnl|CDD|100"
+        hit2["Name"] = None
+        hit3 = self.hit.copy()
+        hit3["QueryStart"] = 200
+        gene_hits = [("L5_1", [self.hit, hit2, hit3]), ("D29_1", [hit2]),
+                     ("L5_2", [])]
+        statements, new_hit_ids = find_domains.create_bulk_statements(
+                                            gene_hits, {"gnl|CDD|334841"})
+        domain_data = [{"HitID": "gnl|CDD|100", "DomainID": "pfam02195",
+                        "Name": "None", "Description": "ParB-like domain."}]
+        gene_domain_data = [
+            {"GeneID": "L5_1", "HitID": "gnl|CDD|334841",
+             "Expect": 1.78531e-11, "QueryStart": 33, "QueryEnd": 115},
+            {"GeneID": "L5_1", "HitID": "gnl|CDD|100",
+             "Expect": 1.78531e-11, "QueryStart": 33, "QueryEnd": 115},
+            {"GeneID": "D29_1", "HitID": "gnl|CDD|100",
+             "Expect": 1.78531e-11, "QueryStart": 33, "QueryEnd": 115}]
+        exp = [
+            ("INSERT INTO domain (HitID, DomainID, Name, Description) "
+             "VALUES (:HitID, :DomainID, :Name, :Description)",
+             domain_data),
+            ("INSERT INTO gene_domain "
+             "(GeneID, HitID, Expect, QueryStart, QueryEnd) VALUES "
+             "(:GeneID, :HitID, :Expect, :QueryStart, :QueryEnd)",
+             gene_domain_data),
+            ("UPDATE gene SET DomainStatus = 1 WHERE GeneID IN "
+             "(:GeneID_0, :GeneID_1, :GeneID_2)",
+             {"GeneID_0": "L5_1", "GeneID_1": "D29_1", "GeneID_2": "L5_2"})]
+        with self.subTest():
+            self.assertEqual(statements, exp)
+        with self.subTest():
+            self.assertEqual(new_hit_ids, {"gnl|CDD|100"})
+
+    @patch("pdm_utils.pipelines.find_domains.execute_transaction")
+    @patch("pdm_utils.functions.mysqldb.execute_transaction")
+    @patch("pdm_utils.functions.mysqldb.query_set")
+    def test_insert_search_results_1(self, qs_mock, bulk_mock, gene_mock):
+        """Verify genes in a failed batch are inserted individually, and
+        genes in other batches are not."""
+        qs_mock.return_value = set()
+        bulk_mock.side_effect = [(1, "Error"), (0, "")]
+        gene_mock.side_effect = [0, 1]
+        engine = Mock()
+        search_results = [["MAG", []], ["MKL", [self.hit]]]
+        trans_genes = {"MAG": ["L5_2", "D29_1"], "MKL": ["L5_1"]}
+        result = find_domains.insert_search_results(engine, search_results,
+                                                    trans_genes, batch_size=2)
+        with self.subTest():
+            self.assertEqual(result, 1)
+        with self.subTest():
+            self.assertEqual(bulk_mock.call_count, 2)
+        with self.subTest():
+            self.assertEqual(gene_mock.call_count, 2)
+        with self.subTest():
+            self.assertEqual(gene_mock.call_args_list[1][0][1],
+                             [find_domains.UPDATE_GENE.format("D29_1")])
+
+
+class TestFindDomains2(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = Path(test_root_dir, "tmp_dir")
+        self.tmp_dir.mkdir()
+        self.exp_hit1 = {"HitID": "gnl|CDD|334841", "DomainID": "pfam02195",
+                         "Name": "ParBc",
+                         "Description": "ParB-like 'nuclease' domain.",
+                         "Expect": 1.78531e-11, "QueryStart": 33,
+                         "QueryEnd": 115}
+        self.exp_hit2 = {"HitID": "gnl|CDD|100", "DomainID": "cd00001",
+                         "Name": None, "Description": "Short domain.",
+                         "Expect": 2e-05, "QueryStart": 1, "QueryEnd": 50}
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_parse_rpsblast_tabular_1(self):
+        """Verify hits below the evalue cutoff are parsed with the index
+        of their query, and comment lines are skipped."""
+        lines = ["# RPSBLAST 2.9.0+\n"] + TABULAR_OUTPUT.splitlines(True)
+        hits = list(find_domains.parse_rpsblast_tabular(lines, 0.001))
+        self.assertEqual(hits, [(0, self.exp_hit1), (2, self.exp_hit2)])
+
+    @patch("pdm_utils.pipelines.find_domains.NcbirpsblastCommandline")
+    def test_search_translation_batch_1(self, rps_mock):
+        """Verify a batch is searched with one multi-sequence query and
+        hits are mapped back to their translations."""
+        def run_rpsblast():
+            with Path(self.tmp_dir, "batch_1.tsv").open("w") as fh:
+                fh.write(TABULAR_OUTPUT)
+        rps_mock.return_value.side_effect = run_rpsblast
+
+        results = find_domains.search_translation_batch(
+                        "rpsblast", "Cdd", self.tmp_dir, 0.001, 1,
+                        ["MKL", "MAG", "MGT"], num_threads=2)
+        with Path(self.tmp_dir, "batch_1.txt").open("r") as fh:
+            query = fh.read()
+        with self.subTest():
+            self.assertEqual(results, [["MKL", [self.exp_hit1]],
+                                       ["MAG", []],
+                                       ["MGT", [self.exp_hit2]]])
+        with self.subTest():
+            self.assertEqual(query, ">query_0\nMKL\n>query_1\nMAG\n"
+                                    ">query_2\nMGT\n")
+        with self.subTest():
+            self.assertEqual(rps_mock.call_count, 1)
+        with self.subTest():
+            self.assertEqual(rps_mock.call_args[1]["num_threads"], 2)
+
+
+class TestFindDomains3(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = Path(test_root_dir, "tmp_dir")
+        self.tmp_dir.mkdir()
+        self.checkpoint_file = Path(self.tmp_dir,
+                                    find_domains.CHECKPOINT_FILE)
+        self.params = {"db": "Actino_Draft", "cdd_name": "/cdd/Cdd",
+                       "evalue": 0.001}
+        self.hit = {"HitID": "gnl|CDD|334841", "DomainID": "pfam02195",
+                    "Name": "ParBc", "Description": "ParB-like domain.",
+                    "Expect": 1.78531e-11, "QueryStart": 33, "QueryEnd": 115}
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write_checkpoint(self, search_results):
+        with find_domains.open_checkpoint(self.checkpoint_file,
+                                          self.params) as fh:
+            results = list(find_domains.checkpoint_results(search_results,
+                                                           fh))
+        return results
+
+    def test_checkpoint_results_1(self):
+        """Verify search results are passed through and can be loaded
+        from the checkpoint file by a later run."""
+        search_results = [["MKL", [self.hit]], ["MAG", []]]
+        results = self.write_checkpoint(search_results[:1])
+        self.write_checkpoint(search_results[1:])
+        checkpoint = find_domains.load_checkpoint(self.checkpoint_file,
+                                                  self.params)
+        exp = {basic.get_seq_hash("MKL"): [self.hit],
+               basic.get_seq_hash("MAG"): []}
+        with self.subTest():
+            self.assertEqual(results, search_results[:1])
+        with self.subTest():
+            self.assertEqual(checkpoint, exp)
+
+    def test_load_checkpoint_1(self):
+        """Verify an empty checkpoint is loaded if there is no file."""
+        checkpoint = find_domains.load_checkpoint(self.checkpoint_file,
+                                                  self.params)
+        self.assertEqual(checkpoint, {})
+
+    def test_load_checkpoint_2(self):
+        """Verify a checkpoint created with different parameters is
+        discarded."""
+        self.write_checkpoint([["MKL", [self.hit]]])
+        self.params["evalue"] = 0.01
+        checkpoint = find_domains.load_checkpoint(self.checkpoint_file,
+                                                  self.params)
+        with self.subTest():
+            self.assertEqual(checkpoint, {})
+        with self.subTest():
+            self.assertFalse(self.checkpoint_file.exists())
+
+    def test_load_checkpoint_3(self):
+        """Verify an incomplete last line is skipped."""
+        self.write_checkpoint([["MKL", [self.hit]]])
+        with self.checkpoint_file.open("a") as fh:
+            fh.write('{"Hash": "abc", "Hi')
+        checkpoint = find_domains.load_checkpoint(self.checkpoint_file,
+                                                  self.params)
+        self.assertEqual(list(checkpoint.keys()), [basic.get_seq_hash("MKL")])
+
+    @patch("pdm_utils.pipelines.find_domains.insert_domain_batch")
+    @patch("pdm_utils.functions.mysqldb.query_set")
+    def test_insert_search_results_1(self, qs_mock, batch_mock):
+        """Verify genes are inserted in batches as results are received."""
+        qs_mock.return_value = set()
+        batch_mock.side_effect = [0, 1]
+        trans_genes = {"MKL": ["L5_1", "D29_1"], "MAG": ["L5_2"],
+                       "MGT": ["L5_3"]}
+        search_results = iter([["MKL", [self.hit]], ["MAG", []],
+                               ["MGT", []]])
+        rolled_back = find_domains.insert_search_results(
+                            Mock(), search_results, trans_genes, batch_size=2)
+        with self.subTest():
+            self.assertEqual(rolled_back, 1)
+        with self.subTest():
+            self.assertEqual(batch_mock.call_args_list[0][0][1],
+                             [("L5_1", [self.hit]), ("D29_1", [self.hit])])
+        with self.subTest():
+            self.assertEqual(batch_mock.call_args_list[1][0][1],
+                             [("L5_2", []), ("L5_3", [])])
+
+    def test_map_translations_to_genes_1(self):
+        """Verify genes are grouped by translation."""
+        cdd_genes = [{"GeneID": "L5_1", "Translation": "MKL"},
+                     {"GeneID": "L5_2", "Translation": "MAG"},
+                     {"GeneID": "D29_1", "Translation": "MKL"}]
+        trans_genes = find_domains.map_translations_to_genes(cdd_genes)
+        self.assertEqual(trans_genes, {"MKL": ["L5_1", "D29_1"],
+                                       "MAG": ["L5_2"]})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,6 +7,7 @@ from pdm_utils.classes import genome
 from pdm_utils.classes import cds
 from pdm_utils.classes import trna
 from pdm_utils.classes import source
+from pdm_utils.functions import basic
 from datetime import datetime
 from Bio.Seq import Seq
 from Bio.Alphabet import IUPAC
@@ -41,6 +42,26 @@ class TestGenomeClass1(unittest.TestCase):
         self.trna3 = trna.TrnaFeature()
         self.trna4 = trna.TrnaFeature()
 
+    def test_seq_1(self):
+        """Verify that an empty Seq object is created lazily."""
+        with self.subTest():
+            self.assertIsNone(self.gnm._seq)
+        with self.subTest():
+            self.assertEqual(self.gnm.seq, "")
+        with self.subTest():
+            self.assertEqual(self.gnm.seq.alphabet, IUPAC.ambiguous_dna)
+        with self.subTest():
+            self.assertIs(self.gnm.seq, self.gnm._seq)
+
+    def test_evaluations_1(self):
+        """Verify that the evaluation list is created lazily and
+        retains appended evaluations."""
+        with self.subTest():
+            self.assertIsNone(self.gnm._evaluations)
+        self.gnm.set_eval("eval_id", "definition", "result", "status")
+        with self.subTest():
+            self.assertEqual(len(self.gnm.evaluations), 1)
+
     def test_set_filename_1(self):
         """Confirm file path is split appropriately."""
         filepath = pathlib.Path("/path/to/folder/Trixie.gbk")
@@ -78,6 +99,28 @@ class TestGenomeClass1(unittest.TestCase):
 
 
 
+    def test_seq_hash_1(self):
+        """Check that the hash is computed from the upper-case sequence."""
+        self.gnm.seq = Seq("aaggcga", IUPAC.ambiguous_dna)
+        with self.subTest():
+            self.assertEqual(self.gnm.seq_hash,
+                             basic.get_seq_hash("AAGGCGA"))
+        with self.subTest():
+            self.assertEqual(len(self.gnm.seq_hash), 64)
+
+    def test_seq_hash_2(self):
+        """Check that the hash is recomputed when the sequence is set."""
+        self.gnm.seq = Seq("AAGG", IUPAC.ambiguous_dna)
+        seq_hash = self.gnm.seq_hash
+        self.gnm.set_sequence("CCTT")
+        with self.subTest():
+            self.assertNotEqual(self.gnm.seq_hash, seq_hash)
+        with self.subTest():
+            self.assertEqual(self.gnm.seq_hash, basic.get_seq_hash("CCTT"))
+
+
+
+
     def test_set_accession_1(self):
         """Check that accession is set appropriately."""
         accession = "ABC123.1"
@@ -648,6 +691,35 @@ class TestGenomeClass1(unittest.TestCase):
 
 
 
+    def test_check_seq_hash_1(self):
+        """Verify no error is produced when the sequence hash is not in
+        the check_set and is not expected to be in the set."""
+        self.gnm.seq = Seq("AATT", IUPAC.ambiguous_dna)
+        check_set = set([basic.get_seq_hash("GGCC")])
+        self.gnm.check_seq_hash(check_set, eval_id="eval_id")
+        with self.subTest():
+            self.assertEqual(self.gnm.evaluations[0].status, "correct")
+        with self.subTest():
+            self.assertEqual(self.gnm.evaluations[0].id, "eval_id")
+        with self.subTest():
+            self.assertEqual(self.gnm.evaluations[0].result,
+                             "The sequence 'AATT' is valid.")
+
+    def test_check_seq_hash_2(self):
+        """Verify an error is produced when the sequence hash is not in
+        the check_set and is expected to be in the set."""
+        self.gnm.seq = Seq("AATT", IUPAC.ambiguous_dna)
+        check_set = set([basic.get_seq_hash("GGCC")])
+        self.gnm.check_seq_hash(check_set, expect=True)
+        with self.subTest():
+            self.assertEqual(self.gnm.evaluations[0].status, "error")
+        with self.subTest():
+            self.assertEqual(self.gnm.evaluations[0].result,
+                             "The sequence 'AATT' is not valid.")
+
+
+
+
     def test_check_magnitude_1(self):
         """Verify no error is produced when
         'length' is greater than 0, as expected."""
@@ -1298,6 +1370,42 @@ class TestGenomeClass1(unittest.TestCase):
         self.gnm.check_feature_coordinates(cds_ftr=True)
         self.assertEqual(self.gnm.evaluations[0].status, "correct")
 
+    def test_check_feature_coordinates_15(self):
+        """Verify an error is produced by a CDS feature nested within a
+        larger feature that is not adjacent to it when sorted."""
+        self.cds1.orientation = "F"
+        self.cds1.start = 5
+        self.cds1.stop = 1000
+        self.cds2.orientation = "R"
+        self.cds2.start = 10
+        self.cds2.stop = 100
+        self.cds3.orientation = "F"
+        self.cds3.start = 200
+        self.cds3.stop = 300
+        self.gnm.cds_features = [self.cds3, self.cds2, self.cds1]
+        self.gnm.check_feature_coordinates(cds_ftr=True)
+        results = self.gnm.evaluations[0].result
+        with self.subTest():
+            self.assertEqual(self.gnm.evaluations[0].status, "error")
+        with self.subTest():
+            self.assertEqual(results.count("Feature2 is nested"), 2)
+        with self.subTest():
+            self.assertIn("Feature2 ID: , start coordinate: 200", results)
+
+    def test_check_feature_coordinates_16(self):
+        """Verify an error is produced by a CDS feature nested within the
+        part of a wrap-around feature at the beginning of the genome."""
+        self.gnm.length = 50001
+        self.cds1.orientation = "F"
+        self.cds1.start = 50000
+        self.cds1.stop = 40
+        self.cds2.orientation = "F"
+        self.cds2.start = 5
+        self.cds2.stop = 20
+        self.gnm.cds_features = [self.cds1, self.cds2]
+        self.gnm.check_feature_coordinates(cds_ftr=True)
+        self.assertEqual(self.gnm.evaluations[0].status, "error")
+
 
 class TestGenomeClass2(unittest.TestCase):
 
@@ -1,6 +1,9 @@
 """ Unit tests for import functions."""
 
 
+import contextlib
+import io
+import logging
 import unittest
 from Bio.Seq import Seq
 from Bio.Alphabet import IUPAC
@@ -14,6 +17,7 @@ from pdm_utils.classes import source
 from pdm_utils.classes import cds
 from pdm_utils.classes import genomepair
 from pdm_utils.constants import constants
+from pdm_utils.functions import basic
 from pdm_utils.functions import eval_modes
 from pdm_utils.pipelines import import_genome
 from pdm_utils.classes import ticket, eval
@@ -315,7 +319,7 @@ class TestImportGenome2(unittest.TestCase):
 
         self.null_set = set([""])
         self.id_set = set(["Trixie"])
-        self.seq_set = set(["AATTAA"])
+        self.seq_hash_set = set([basic.get_seq_hash("AATTAA")])
         self.host_set = set(["Mycobacterium"])
         self.cluster_set = set(["A", "B"])
         self.subcluster_set = set(["A1, A2"])
@@ -606,8 +610,8 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm.cds_features = [self.cds1, self.cds2]
 
         self.id_set = set(["L5", "RedRock"])
-        self.seq_set = set([Seq("ATGC", IUPAC.ambiguous_dna),
-                           Seq("TTTT", IUPAC.ambiguous_dna)])
+        self.seq_hash_set = set([basic.get_seq_hash("ATGC"),
+                                 basic.get_seq_hash("TTTT")])
         self.host_set = set(["Mycobacterium", "Gordonia"])
         self.cluster_set = set(["A", "B", "C"])
         self.subcluster_set = set(["A1", "A2", "A3"])
@@ -625,7 +629,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm.accession = "ABC123"
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         self.assertEqual(len(self.gnm.evaluations), self.check_sum)
 
@@ -638,7 +642,7 @@ class TestImportGenome4(unittest.TestCase):
         'annotation_author' = 1."""
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         self.assertEqual(len(self.gnm.evaluations), self.check_sum - 1)
 
@@ -653,7 +657,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm.accession = "ABC123"
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         self.assertEqual(len(self.gnm.evaluations), self.check_sum - 2)
 
@@ -668,7 +672,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm.accession = "ABC123"
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         self.assertEqual(len(self.gnm.evaluations), self.check_sum - 1)
 
@@ -684,7 +688,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm.accession = "ABC123"
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         self.assertEqual(len(self.gnm.evaluations), self.check_sum - 2)
 
@@ -699,7 +703,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm.accession = "ABC123"
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         self.assertEqual(len(self.gnm.evaluations), self.check_sum - 3)
 
@@ -714,7 +718,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm.accession = "ABC123"
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         self.assertEqual(len(self.gnm.evaluations), self.check_sum - 1)
 
@@ -729,7 +733,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm.accession = "ABC123"
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         self.assertEqual(len(self.gnm.evaluations), self.check_sum - 3)
 
@@ -744,7 +748,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm.accession = "ABC123"
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         self.assertEqual(len(self.gnm.evaluations), self.check_sum - 3)
 
@@ -759,7 +763,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm.accession = "ABC123"
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         self.assertEqual(len(self.gnm.evaluations), self.check_sum - 2)
 
@@ -774,7 +778,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm.accession = "ABC123"
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         self.assertEqual(len(self.gnm.evaluations), self.check_sum - 1)
 
@@ -787,7 +791,7 @@ class TestImportGenome4(unittest.TestCase):
         'annotation_author' = 1."""
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 0)
@@ -798,7 +802,7 @@ class TestImportGenome4(unittest.TestCase):
         self.id_set.add("Trixie")
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -809,7 +813,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm.id = ""
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 4)
@@ -820,7 +824,7 @@ class TestImportGenome4(unittest.TestCase):
         self.id_set.add("Trixie_Draft")
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -831,18 +835,18 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm.name = ""
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 2)
 
     def test_check_genome_17(self):
         """Verify correct number of errors are produced using:
-        'add' ticket type and 'seq' in seq_set."""
+        'add' ticket type and 'seq' in seq_hash_set."""
         self.gnm.seq = Seq("ATGC", IUPAC.ambiguous_dna)
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -853,7 +857,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm.seq = Seq("", IUPAC.ambiguous_dna)
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -868,7 +872,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm.name = "Trixie"
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -880,7 +884,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm.accession = "BBBBB"
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 0)
@@ -892,7 +896,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm.accession = "AAAAA"
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -909,7 +913,7 @@ class TestImportGenome4(unittest.TestCase):
         self.id_set.add("Trixie")
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 0)
@@ -925,14 +929,14 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm.seq = Seq("ATGC", IUPAC.ambiguous_dna)
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
 
     def test_check_genome_24(self):
         """Verify correct number of errors are produced using:
-        'replace' ticket type, and 'seq' not in seq_set."""
+        'replace' ticket type, and 'seq' not in seq_hash_set."""
         self.tkt.type = "replace"
         self.gnm.name = "Trixie"
         self.gnm.accession = "ABC123"
@@ -942,7 +946,7 @@ class TestImportGenome4(unittest.TestCase):
         self.id_set.add("Trixie")
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -961,7 +965,7 @@ class TestImportGenome4(unittest.TestCase):
         self.id_set.add("Trixie")
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -973,7 +977,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm.name = "Trixie"
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -985,7 +989,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm._cds_descriptions_tally = 1
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -996,7 +1000,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm.accession = "ZZZZ"
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -1016,7 +1020,7 @@ class TestImportGenome4(unittest.TestCase):
         self.cds2.stop = 20
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -1034,7 +1038,7 @@ class TestImportGenome4(unittest.TestCase):
         self.id_set.add("Trixie_Draft")
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -1052,7 +1056,7 @@ class TestImportGenome4(unittest.TestCase):
         self.id_set.add("Trixie")
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -1070,7 +1074,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm._organism_name = "Trixie_Draft"
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -1081,7 +1085,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm.annotation_status = "invalid"
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -1093,7 +1097,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm.authors = "none"
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -1104,7 +1108,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm.retrieve_record = -1
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -1117,7 +1121,7 @@ class TestImportGenome4(unittest.TestCase):
         self.subcluster_set.add("Z1")
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -1130,7 +1134,7 @@ class TestImportGenome4(unittest.TestCase):
         self.cluster_set.add("Z")
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -1141,7 +1145,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm.subcluster = "none"
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 0)
@@ -1152,7 +1156,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm.translation_table = 1
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -1163,7 +1167,7 @@ class TestImportGenome4(unittest.TestCase):
         self.host_set = {"Gordonia"}
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -1177,7 +1181,7 @@ class TestImportGenome4(unittest.TestCase):
         self.subcluster_set.add("Z1")
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 2)
@@ -1191,7 +1195,7 @@ class TestImportGenome4(unittest.TestCase):
         self.subcluster_set.add("Z")
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 2)
@@ -1205,7 +1209,7 @@ class TestImportGenome4(unittest.TestCase):
         self.subcluster_set.add("X1")
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -1216,7 +1220,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm.date = constants.EMPTY_DATE
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -1227,7 +1231,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm.gc = -1
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -1238,7 +1242,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm.gc = 101
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -1249,7 +1253,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm.length = 0
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -1260,7 +1264,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm._cds_features_tally = 0
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -1271,7 +1275,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm.seq = Seq("CCCCC-C", IUPAC.ambiguous_dna)
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -1282,7 +1286,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm._description_name = "L5"
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -1293,7 +1297,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm._source_name = "L5"
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -1304,7 +1308,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm._organism_name = "L5"
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -1315,7 +1319,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm._description_host_genus = "Gordonia"
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -1326,7 +1330,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm._source_host_genus = "Gordonia"
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -1337,7 +1341,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm._organism_host_genus = "Gordonia"
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -1348,7 +1352,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm.authors = "Doe,J., Hatful,G.F., John;R., Smith;."
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -1359,7 +1363,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm.authors = "Doe,J., Hatfull,G.F., LASTNAME, John;R., Smith;."
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -1371,7 +1375,7 @@ class TestImportGenome4(unittest.TestCase):
         self.gnm.authors = "Doe,J., Hatfull,G.F., John;R., Smith;."
         import_genome.check_genome(
             self.gnm, self.tkt.type, self.tkt.eval_flags,
-            self.id_set, self.seq_set, self.host_set,
+            self.id_set, self.seq_hash_set, self.host_set,
             self.cluster_set, self.subcluster_set, self.accession_set)
         count = count_status(self.gnm, "error", "warning")
         self.assertEqual(count, 1)
@@ -1598,7 +1602,8 @@ class TestImportGenome6(unittest.TestCase):
         self.null_set = set(["", "none", None])
         self.accession_set = set(["ABC123", "XYZ456"])
         self.phage_id_set = set(["L5", "Trixie"])
-        self.seq_set = set(["AATTGG", "ATGC"])
+        self.seq_hash_set = set([basic.get_seq_hash("AATTGG"),
+                                 basic.get_seq_hash("ATGC")])
         self.host_genus_set = set(["Mycobacterium", "Gordonia"])
         self.cluster_set = set(["A", "B"])
         self.subcluster_set = set(["A2", "B2"])
@@ -1616,7 +1621,7 @@ class TestImportGenome6(unittest.TestCase):
                 self.bndl,
                 accession_set=self.accession_set,
                 phage_id_set=self.phage_id_set,
-                seq_set=self.seq_set, host_genus_set=self.host_genus_set,
+                seq_hash_set=self.seq_hash_set, host_genus_set=self.host_genus_set,
                 cluster_set=self.cluster_set,
                 subcluster_set=self.subcluster_set,
                 file_ref="flat_file", ticket_ref="ticket",
@@ -1636,7 +1641,7 @@ class TestImportGenome6(unittest.TestCase):
                 self.bndl,
                 accession_set=self.accession_set,
                 phage_id_set=self.phage_id_set,
-                seq_set=self.seq_set, host_genus_set=self.host_genus_set,
+                seq_hash_set=self.seq_hash_set, host_genus_set=self.host_genus_set,
                 cluster_set=self.cluster_set,
                 subcluster_set=self.subcluster_set,
                 file_ref="flat_file", ticket_ref="ticket",
@@ -1657,7 +1662,7 @@ class TestImportGenome6(unittest.TestCase):
                 self.bndl,
                 accession_set=self.accession_set,
                 phage_id_set=self.phage_id_set,
-                seq_set=self.seq_set, host_genus_set=self.host_genus_set,
+                seq_hash_set=self.seq_hash_set, host_genus_set=self.host_genus_set,
                 cluster_set=self.cluster_set,
                 subcluster_set=self.subcluster_set,
                 file_ref="flat_file", ticket_ref="ticket",
@@ -1690,7 +1695,7 @@ class TestImportGenome6(unittest.TestCase):
                 self.bndl,
                 accession_set=self.accession_set,
                 phage_id_set=self.phage_id_set,
-                seq_set=self.seq_set, host_genus_set=self.host_genus_set,
+                seq_hash_set=self.seq_hash_set, host_genus_set=self.host_genus_set,
                 cluster_set=self.cluster_set,
                 subcluster_set=self.subcluster_set,
                 file_ref="flat_file", ticket_ref="ticket",
@@ -1719,7 +1724,7 @@ class TestImportGenome6(unittest.TestCase):
                 self.bndl,
                 accession_set=self.accession_set,
                 phage_id_set=self.phage_id_set,
-                seq_set=self.seq_set, host_genus_set=self.host_genus_set,
+                seq_hash_set=self.seq_hash_set, host_genus_set=self.host_genus_set,
                 cluster_set=self.cluster_set,
                 subcluster_set=self.subcluster_set,
                 file_ref="flat_file", ticket_ref="ticket",
@@ -1742,7 +1747,7 @@ class TestImportGenome6(unittest.TestCase):
                 self.bndl,
                 accession_set=self.accession_set,
                 phage_id_set=self.phage_id_set,
-                seq_set=self.seq_set, host_genus_set=self.host_genus_set,
+                seq_hash_set=self.seq_hash_set, host_genus_set=self.host_genus_set,
                 cluster_set=self.cluster_set,
                 subcluster_set=self.subcluster_set,
                 file_ref="flat_file", ticket_ref="ticket",
@@ -1769,7 +1774,7 @@ class TestImportGenome6(unittest.TestCase):
                 self.bndl,
                 accession_set=self.accession_set,
                 phage_id_set=self.phage_id_set,
-                seq_set=self.seq_set, host_genus_set=self.host_genus_set,
+                seq_hash_set=self.seq_hash_set, host_genus_set=self.host_genus_set,
                 cluster_set=self.cluster_set,
                 subcluster_set=self.subcluster_set,
                 file_ref="flat_file", ticket_ref="ticket",
@@ -1801,7 +1806,7 @@ class TestImportGenome6(unittest.TestCase):
                 self.bndl,
                 accession_set=self.accession_set,
                 phage_id_set=self.phage_id_set,
-                seq_set=self.seq_set, host_genus_set=self.host_genus_set,
+                seq_hash_set=self.seq_hash_set, host_genus_set=self.host_genus_set,
                 cluster_set=self.cluster_set,
                 subcluster_set=self.subcluster_set,
                 file_ref="flat_file", ticket_ref="ticket",
@@ -2093,6 +2098,13 @@ class TestImportGenome7(unittest.TestCase):
         count = count_status(self.cds1, "error", "warning")
         self.assertEqual(count, 1)
 
+    def test_check_cds_22(self):
+        """Verify that a supplied expected translation is checked."""
+        import_genome.check_cds(self.cds1, self.eval_flags,
+                                translation=Seq("MK", IUPAC.protein))
+        evl_dict = {evl.id: evl for evl in self.cds1.evaluations}
+        self.assertEqual(evl_dict["CDS_002"].status, "error")
+
 
 
 class TestImportGenome8(unittest.TestCase):
@@ -2341,5 +2353,220 @@ class TestImportGenome9(unittest.TestCase):
 
 
 
+class TestImportGenome10(unittest.TestCase):
+
+    def setUp(self):
+        self.ref_data = {
+            "phage_id_set": {"Trixie", "L5"},
+            "accession_set": {"ABC123", ""},
+            "host_genera_set": {"Mycobacterium"},
+            "cluster_set": {"A", "UNK"},
+            "subcluster_set": {"A2", "A1"},
+            "seq_hash_set": {basic.get_seq_hash("ATCG"),
+                             basic.get_seq_hash("GGGG")}}
+
+        self.gnm1 = genome.Genome()
+        self.gnm1.id = "D29"
+        self.gnm1.accession = "XYZ456"
+        self.gnm1.host_genus = "Gordonia"
+        self.gnm1.cluster = "Singleton"
+        self.gnm1.subcluster = "none"
+        self.gnm1.seq = Seq("aaaa", IUPAC.ambiguous_dna)
+
+        self.gnm2 = genome.Genome()
+        self.gnm2.id = "Trixie"
+        self.gnm2.accession = "ABC123"
+        self.gnm2.host_genus = "Mycobacterium"
+        self.gnm2.cluster = "A"
+        self.gnm2.subcluster = "A2"
+        self.gnm2.seq = Seq("ATCG", IUPAC.ambiguous_dna)
+
+        self.tkt = ticket.ImportTicket()
+        self.tkt.type = "add"
+        self.bndl = bundle.Bundle()
+        self.bndl.ticket = self.tkt
+
+
+
+
+    def test_get_genome_reference_values_1(self):
+        """Verify values are converted as they are stored in MySQL."""
+        values = import_genome.get_genome_reference_values(self.gnm1)
+        with self.subTest():
+            self.assertEqual(values.keys(), set(import_genome.MYSQL_REF_KEYS))
+        with self.subTest():
+            self.assertEqual(values["cluster_set"], "Singleton")
+        with self.subTest():
+            self.assertEqual(values["seq_hash_set"],
+                             basic.get_seq_hash("AAAA"))
+
+    @patch("pdm_utils.pipelines.import_genome.get_mysql_reference_set")
+    def test_update_mysql_reference_sets_1(self, get_set_mock):
+        """Verify sets are updated for an 'add' ticket
+        without retrieving data from the database."""
+        self.bndl.genome_dict["flat_file"] = self.gnm1
+        import_genome.update_mysql_reference_sets(
+            self.ref_data, self.bndl, file_ref="flat_file", retain_ref="mysql")
+        with self.subTest():
+            self.assertFalse(get_set_mock.called)
+        with self.subTest():
+            self.assertEqual(self.ref_data["phage_id_set"],
+                             {"Trixie", "L5", "D29"})
+        with self.subTest():
+            self.assertEqual(self.ref_data["cluster_set"],
+                             {"A", "UNK", "Singleton"})
+        with self.subTest():
+            self.assertIn(basic.get_seq_hash("AAAA"),
+                          self.ref_data["seq_hash_set"])
+
+    @patch("pdm_utils.pipelines.import_genome.get_mysql_reference_set")
+    def test_update_mysql_reference_sets_2(self, get_set_mock):
+        """Verify only sets with changed values are retrieved from the
+        database for a 'replace' ticket."""
+        self.tkt.type = "replace"
+        self.gnm1.id = "Trixie"
+        self.gnm1.host_genus = "Mycobacterium"
+        self.gnm1.seq = Seq("ATCG", IUPAC.ambiguous_dna)
+        self.bndl.genome_dict["flat_file"] = self.gnm1
+        self.bndl.genome_dict["mysql"] = self.gnm2
+        get_set_mock.return_value = {"retrieved"}
+        import_genome.update_mysql_reference_sets(
+            self.ref_data, self.bndl, file_ref="flat_file", retain_ref="mysql")
+        retrieved_keys = {call[0][1] for call in get_set_mock.call_args_list}
+        with self.subTest():
+            self.assertEqual(retrieved_keys,
+                             {"accession_set", "cluster_set", "subcluster_set"})
+        with self.subTest():
+            self.assertEqual(self.ref_data["accession_set"], {"retrieved"})
+        with self.subTest():
+            self.assertEqual(self.ref_data["phage_id_set"], {"Trixie", "L5"})
+        with self.subTest():
+            self.assertEqual(self.ref_data["host_genera_set"],
+                             {"Mycobacterium"})
+
+
+
+
+class TestImportGenome11(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = logging.getLogger("pdm_utils.pipelines.import_genome")
+
+    def test_capture_output_1(self):
+        """Verify log records and printed text are captured
+        instead of being output."""
+        with self.assertLogs(level="INFO") as log:
+            self.logger.info("Before.")
+            with contextlib.redirect_stdout(io.StringIO()) as stdout:
+                with import_genome.capture_output() as output:
+                    self.logger.info("Captured %s.", "message")
+                    print("Captured text.")
+        with self.subTest():
+            self.assertEqual(log.output,
+                             ["INFO:pdm_utils.pipelines.import_genome:Before."])
+        with self.subTest():
+            self.assertEqual(stdout.getvalue(), "")
+        with self.subTest():
+            self.assertEqual([record.getMessage() for record in output[0]],
+                             ["Captured message."])
+        with self.subTest():
+            self.assertEqual(output[1], ["Captured text.\n"])
+
+    def test_capture_output_2(self):
+        """Verify log records below the indicated level are not captured."""
+        with import_genome.capture_output(log_level=logging.WARNING) as output:
+            self.logger.info("Info.")
+            self.logger.warning("Warning.")
+        self.assertEqual([record.getMessage() for record in output[0]],
+                         ["Warning."])
+
+    def test_replay_output_1(self):
+        """Verify captured log records and printed text are output."""
+        with import_genome.capture_output() as output:
+            self.logger.error("Captured message.")
+            print("Captured text.")
+        with self.assertLogs(level="INFO") as log:
+            with contextlib.redirect_stdout(io.StringIO()) as stdout:
+                import_genome.replay_output(output)
+        with self.subTest():
+            self.assertEqual(log.output,
+                ["ERROR:pdm_utils.pipelines.import_genome:Captured message."])
+        with self.subTest():
+            self.assertEqual(stdout.getvalue(), "Captured text.\n")
+
+    @patch("pdm_utils.pipelines.import_genome.check_features")
+    @patch("pdm_utils.pipelines.import_genome.set_cds_descriptions")
+    @patch("pdm_utils.pipelines.import_genome.parse_flat_file")
+    def test_evaluate_flat_file_1(self, parse_mock, scd_mock, cf_mock):
+        """Verify features are checked if a ticket matches the flat file,
+        and the ticket dictionary is not modified."""
+        gnm = genome.Genome()
+        gnm.id = "L5"
+        parse_mock.return_value = gnm
+        tkt = ticket.ImportTicket()
+        tkt.phage_id = "L5"
+        tkt.eval_flags = {"check_trna": True}
+        ticket_dict = {"L5": tkt}
+        result = import_genome.evaluate_flat_file(
+                    pathlib.Path("L5.gb"), ticket_dict=ticket_dict)
+        with self.subTest():
+            self.assertTrue(result["matched_ticket"])
+        with self.subTest():
+            self.assertEqual(result["genome"], gnm)
+        with self.subTest():
+            self.assertTrue(cf_mock.called)
+        with self.subTest():
+            self.assertEqual(ticket_dict.keys(), {"L5"})
+
+    @patch("pdm_utils.pipelines.import_genome.check_features")
+    @patch("pdm_utils.pipelines.import_genome.parse_flat_file")
+    def test_evaluate_flat_file_2(self, parse_mock, cf_mock):
+        """Verify features are not checked if no ticket matches
+        the flat file."""
+        parse_mock.return_value = None
+        result = import_genome.evaluate_flat_file(
+                    pathlib.Path("L5.gb"), ticket_dict={})
+        with self.subTest():
+            self.assertFalse(result["matched_ticket"])
+        with self.subTest():
+            self.assertIsNone(result["genome"])
+        with self.subTest():
+            self.assertFalse(cf_mock.called)
+
+
+    @patch("pdm_utils.pipelines.import_genome.log_evaluations")
+    @patch("pdm_utils.pipelines.import_genome.get_logfile_path")
+    @patch("pdm_utils.pipelines.import_genome.import_into_db")
+    @patch("pdm_utils.pipelines.import_genome.review_bundled_objects")
+    @patch("pdm_utils.pipelines.import_genome.run_checks")
+    @patch("pdm_utils.pipelines.import_genome.prepare_bundle")
+    @patch("pdm_utils.pipelines.import_genome.iter_flat_file_evaluations")
+    @patch("pdm_utils.pipelines.import_genome.get_mysql_reference_sets")
+    @patch("pdm_utils.pipelines.import_genome.phagesdb.retrieve_urls")
+    @patch("pdm_utils.pipelines.import_genome.get_phagesdb_reference_sets")
+    def test_process_files_and_tickets_1(self, gprs_mock, ru_mock, gmrs_mock,
+                                         iffe_mock, pb_mock, rc_mock,
+                                         rbo_mock, iid_mock, glp_mock,
+                                         le_mock):
+        """Verify flat files are evaluated serially in interactive mode,
+        even if multiple workers are requested."""
+        ref_data = {"accession_set": set(), "phage_id_set": set(),
+                    "seq_hash_set": set(), "host_genera_set": set(),
+                    "cluster_set": set(), "subcluster_set": set()}
+        gprs_mock.return_value = ref_data
+        gmrs_mock.return_value = ref_data
+        pb_mock.return_value = bundle.Bundle()
+        iid_mock.return_value = False
+        with contextlib.redirect_stdout(io.StringIO()):
+            import_genome.process_files_and_tickets(
+                {}, [pathlib.Path("L5.gb")], interactive=True, workers=2)
+        with self.subTest():
+            self.assertFalse(iffe_mock.called)
+        with self.subTest():
+            self.assertTrue(pb_mock.call_args[1]["interactive"])
+
+
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,137 @@
+"""Unit tests for functions that identify feature coordinate conflicts."""
+
+from itertools import combinations
+import random
+import unittest
+
+from pdm_utils.functions import intervals
+
+
+def find_coordinate_conflicts_by_pair(features):
+    """Compare every pair of non-wrap-around features."""
+    conflicts = set()
+    for index1, index2 in combinations(range(len(features)), 2):
+        for x, y in [(index1, index2), (index2, index1)]:
+            start1, stop1, strand1 = features[x]
+            start2, stop2, strand2 = features[y]
+            if start1 < start2 and stop1 > stop2:
+                conflicts.add((x, y, intervals.NESTED))
+        ftr1, ftr2 = features[index1], features[index2]
+        pair = tuple(sorted([index1, index2],
+                            key=lambda x: (features[x][:2], x)))
+        if ftr1[:2] == ftr2[:2]:
+            conflicts.add(pair + (intervals.DUPLICATE,))
+        elif ftr1[2] == ftr2[2] == "f" and ftr1[1] == ftr2[1]:
+            conflicts.add(pair + (intervals.SHARED_STOP,))
+        elif ftr1[2] == ftr2[2] == "r" and ftr1[0] == ftr2[0]:
+            conflicts.add(pair + (intervals.SHARED_STOP,))
+    return conflicts
+
+
+def create_random_features(count, rng, genome_length=10000):
+    """Create random non-wrap-around features."""
+    features = []
+    for x in range(count):
+        start = rng.randint(0, genome_length - 100)
+        stop = start + rng.randint(1, 100)
+        features.append((start, stop, rng.choice(["f", "r"])))
+    return features
+
+
+class TestIntervalsFunctions(unittest.TestCase):
+
+    def test_find_coordinate_conflicts_1(self):
+        """Verify that no conflicts are reported for overlapping
+        features."""
+        features = [(5, 50, "f"), (20, 70, "f"), (100, 200, "r")]
+        conflicts = intervals.find_coordinate_conflicts(features)
+        self.assertEqual(conflicts, [])
+
+    def test_find_coordinate_conflicts_2(self):
+        """Verify that duplicate features are reported regardless
+        of strand."""
+        features = [(5, 50, "r"), (100, 200, "f"), (5, 50, "f")]
+        conflicts = intervals.find_coordinate_conflicts(features)
+        self.assertEqual(conflicts, [(0, 2, intervals.DUPLICATE)])
+
+    def test_find_coordinate_conflicts_3(self):
+        """Verify that a feature nested within a non-adjacent feature
+        is reported."""
+        features = [(10, 1000, "f"), (20, 200, "f"), (500, 600, "r")]
+        conflicts = intervals.find_coordinate_conflicts(features)
+        self.assertEqual(conflicts, [(0, 1, intervals.NESTED),
+                                     (0, 2, intervals.NESTED)])
+
+    def test_find_coordinate_conflicts_4(self):
+        """Verify that shared stop coordinates are reported according
+        to strand."""
+        features = [(10, 50, "f"), (5, 50, "f"), (10, 60, "f"),
+                    (100, 200, "r"), (100, 300, "r"), (150, 300, "f")]
+        conflicts = intervals.find_coordinate_conflicts(features)
+        self.assertEqual(conflicts, [(1, 0, intervals.SHARED_STOP),
+                                     (3, 4, intervals.SHARED_STOP)])
+
+    def test_find_coordinate_conflicts_5(self):
+        """Verify that a feature at the beginning of the genome nested
+        within a wrap-around feature is reported."""
+        features = [(50000, 20, "f"), (5, 10, "f"), (5, 50, "f")]
+        conflicts = intervals.find_coordinate_conflicts(
+                        features, genome_length=50001)
+        self.assertEqual(conflicts, [(0, 1, intervals.NESTED)])
+
+    def test_find_coordinate_conflicts_6(self):
+        """Verify that a feature at the end of the genome nested
+        within a wrap-around feature is reported when the genome length
+        is not provided."""
+        features = [(50000, 20, "r"), (50005, 50010, "f")]
+        conflicts = intervals.find_coordinate_conflicts(features)
+        self.assertEqual(conflicts, [(0, 1, intervals.NESTED)])
+
+    def test_find_coordinate_conflicts_7(self):
+        """Verify that a wrap-around feature sharing a stop coordinate
+        is reported."""
+        features = [(50000, 20, "f"), (5, 20, "f")]
+        conflicts = intervals.find_coordinate_conflicts(features)
+        self.assertEqual(conflicts, [(1, 0, intervals.SHARED_STOP)])
+
+    def test_find_coordinate_conflicts_8(self):
+        """Verify that all conflicts among random features are identical to
+        those found by comparing every pair of features."""
+        rng = random.Random(1)
+        for count in [2, 10, 100, 500]:
+            features = create_random_features(count, rng)
+            with self.subTest(count=count):
+                conflicts = intervals.find_coordinate_conflicts(features)
+                self.assertEqual(set(conflicts),
+                                 find_coordinate_conflicts_by_pair(features))
+
+    def test_find_coordinate_conflicts_9(self):
+        """Verify that no conflicts are reported for fewer than
+        two features."""
+        with self.subTest():
+            self.assertEqual(intervals.find_coordinate_conflicts([]), [])
+        with self.subTest():
+            self.assertEqual(
+                intervals.find_coordinate_conflicts([(5, 50, "f")]), [])
+
+    def test_find_nested_intervals_1(self):
+        """Verify that intervals with shared coordinates are not nested."""
+        ivls = [(5, 50, 0), (5, 20, 1), (10, 50, 2), (5, 50, 3), (6, 49, 4)]
+        pairs = intervals.find_nested_intervals(ivls)
+        self.assertEqual(sorted(pairs), [(0, 4), (3, 4)])
+
+    def test_find_nested_intervals_2(self):
+        """Verify all nested pairs of random intervals are identified."""
+        for seed in range(20):
+            rng = random.Random(seed)
+            ivls = [(start, stop, index) for index, (start, stop, _)
+                    in enumerate(create_random_features(200, rng, 2000))]
+            exp = [(ivl1[2], ivl2[2]) for ivl1 in ivls for ivl2 in ivls
+                   if ivl1[0] < ivl2[0] and ivl1[1] > ivl2[1]]
+            pairs = intervals.find_nested_intervals(ivls)
+            with self.subTest(seed=seed):
+                self.assertEqual(sorted(pairs), sorted(exp))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,7 @@
 
 
 import unittest
+from unittest.mock import patch
 from pdm_utils.functions import mysqldb
 from pdm_utils.classes import genome
 from pdm_utils.classes import cds
@@ -298,5 +299,131 @@ class TestMysqldbFunctions1(unittest.TestCase):
         self.assertEqual(len(statements), 3)
 
 
+    def test_get_phage_table_data_1(self):
+        """Verify phage table data is converted correctly."""
+        self.genome1.id = "L5"
+        self.genome1.seq = Seq("ATCG")
+        self.genome1.cluster = "Singleton"
+        self.genome1.subcluster = "none"
+        data_dict = mysqldb.get_phage_table_data(self.genome1)
+        with self.subTest():
+            self.assertEqual(len(data_dict.keys()), 13)
+        with self.subTest():
+            self.assertEqual(data_dict["PhageID"], "L5")
+        with self.subTest():
+            self.assertEqual(data_dict["Sequence"], "ATCG")
+        with self.subTest():
+            self.assertIsNone(data_dict["Cluster"])
+        with self.subTest():
+            self.assertIsNone(data_dict["Subcluster"])
+
+    def test_get_gene_table_data_1(self):
+        """Verify gene table data is converted correctly, and descriptions
+        with quotes and percent signs are not modified."""
+        cds1 = cds.Cds()
+        cds1.id = "L5_1"
+        cds1.translation = Seq("AGGPT")
+        cds1.description = """5' "exo" 50% nuclease"""
+        cds1.locus_tag = ""
+        data_dict = mysqldb.get_gene_table_data(cds1)
+        with self.subTest():
+            self.assertEqual(len(data_dict.keys()), 11)
+        with self.subTest():
+            self.assertEqual(data_dict["GeneID"], "L5_1")
+        with self.subTest():
+            self.assertEqual(data_dict["Translation"], "AGGPT")
+        with self.subTest():
+            self.assertEqual(data_dict["Notes"], """5' "exo" 50% nuclease""")
+        with self.subTest():
+            self.assertIsNone(data_dict["LocusTag"])
+
+    def test_create_bulk_insert_1(self):
+        """Verify a parameterized INSERT statement is created correctly."""
+        data_list = [{"GeneID": "L5_1", "Notes": "abc"},
+                     {"GeneID": "L5_2", "Notes": "xyz"}]
+        statement, values = mysqldb.create_bulk_insert("gene", data_list)
+        exp = "INSERT INTO gene (GeneID, Notes) VALUES (:GeneID, :Notes)"
+        with self.subTest():
+            self.assertEqual(statement, exp)
+        with self.subTest():
+            self.assertEqual(values, data_list)
+
+    def test_create_genome_bulk_statements_1(self):
+        """Verify list of statements is created correctly for:
+        'add' ticket, and no CDS features."""
+        self.genome1.id = "L5"
+        statements = mysqldb.create_genome_bulk_statements(
+                        self.genome1, tkt_type="add")
+        with self.subTest():
+            self.assertEqual(len(statements), 1)
+        with self.subTest():
+            self.assertTrue(statements[0][0].startswith("INSERT INTO phage"))
+        with self.subTest():
+            self.assertEqual(len(statements[0][1]), 1)
+
+    def test_create_genome_bulk_statements_2(self):
+        """Verify list of statements is created correctly for:
+        'replace' ticket, and two CDS features."""
+        cds1 = cds.Cds()
+        cds1.id = "L5_1"
+        cds2 = cds.Cds()
+        cds2.id = "L5_2"
+        self.genome1.id = "L5"
+        self.genome1.cds_features = [cds1, cds2]
+        statements = mysqldb.create_genome_bulk_statements(
+                        self.genome1, tkt_type="replace")
+        with self.subTest():
+            self.assertEqual(len(statements), 3)
+        with self.subTest():
+            self.assertEqual(statements[0][1], {"PhageID": "L5"})
+        with self.subTest():
+            self.assertTrue(statements[2][0].startswith("INSERT INTO gene"))
+        with self.subTest():
+            self.assertEqual([row["GeneID"] for row in statements[2][1]],
+                             ["L5_1", "L5_2"])
+
+
+
+
+    @patch("pdm_utils.functions.mysqldb.query_dict_list")
+    def test_parse_cds_data_by_genome_1(self, qdl_mock):
+        """Verify Cds objects are grouped by genome, with one query
+        for each batch of PhageIDs."""
+        qdl_mock.side_effect = [
+            [{"GeneID": "L5_1", "PhageID": "L5"},
+             {"GeneID": "Trixie_1", "PhageID": "Trixie"},
+             {"GeneID": "L5_2", "PhageID": "L5"}],
+            [{"GeneID": "D29_1", "PhageID": "D29"}]]
+        cds_dict = mysqldb.parse_cds_data_by_genome(
+                        "engine", ["L5", "Trixie", "Alice", "D29"],
+                        "SELECT * FROM gene", batch_size=3)
+        with self.subTest():
+            self.assertEqual(qdl_mock.call_count, 2)
+        with self.subTest():
+            self.assertEqual(qdl_mock.call_args_list[0][0][1],
+                             "SELECT * FROM gene WHERE PhageID IN "
+                             "('L5','Trixie','Alice');")
+        with self.subTest():
+            self.assertEqual(qdl_mock.call_args_list[1][0][1],
+                             "SELECT * FROM gene WHERE PhageID IN ('D29');")
+        with self.subTest():
+            self.assertEqual({key: [cds_ftr.id for cds_ftr in value]
+                              for key, value in cds_dict.items()},
+                             {"L5": ["L5_1", "L5_2"],
+                              "Trixie": ["Trixie_1"],
+                              "Alice": [],
+                              "D29": ["D29_1"]})
+
+    @patch("pdm_utils.functions.mysqldb.query_dict_list")
+    def test_parse_cds_data_by_genome_2(self, qdl_mock):
+        """Verify no query is made if there are no PhageIDs."""
+        cds_dict = mysqldb.parse_cds_data_by_genome(
+                        "engine", [], "SELECT * FROM gene")
+        with self.subTest():
+            self.assertEqual(cds_dict, {})
+        with self.subTest():
+            self.assertFalse(qdl_mock.called)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,420 @@
+"""Unit tests for misc. functions that interact with NCBI."""
+
+from pdm_utils.classes import genome
+from pdm_utils.functions import ncbi
+from pdm_utils.pipelines import get_data
+from pdm_utils.pipelines import get_gb_records
+from datetime import datetime
+import contextlib
+import http.server
+import io
+import pathlib
+import shutil
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.parse
+
+# Create the main test directory in which all files will be
+# created and managed.
+test_root_dir = pathlib.Path("/tmp", "pdm_utils_tests_ncbi")
+if test_root_dir.exists() == True:
+    shutil.rmtree(test_root_dir)
+test_root_dir.mkdir()
+
+ESEARCH = """<?xml version="1.0" encoding="UTF-8" ?>
+<!DOCTYPE eSearchResult PUBLIC "-//NLM//DTD esearch 20060628//EN" "https://eutils.ncbi.nlm.nih.gov/eutils/dtd/20060628/esearch.dtd">
+<eSearchResult><Count>{count}</Count><RetMax>{count}</RetMax><RetStart>0</RetStart><QueryKey>1</QueryKey><WebEnv>{webenv}</WebEnv><IdList></IdList><TranslationSet/><QueryTranslation></QueryTranslation>
+<ErrorList>{errors}</ErrorList></eSearchResult>
+"""
+
+ESUMMARY = """<?xml version="1.0" encoding="UTF-8" ?>
+<!DOCTYPE eSummaryResult PUBLIC "-//NLM//DTD esummary v1 20041029//EN" "https://eutils.ncbi.nlm.nih.gov/eutils/dtd/20041029/esummary-v1.dtd">
+<eSummaryResult>
+{docsums}
+</eSummaryResult>
+"""
+
+DOCSUM = """<DocSum><Id>{id}</Id><Item Name="Caption" Type="String">{accession}</Item><Item Name="UpdateDate" Type="Date">{update_date}</Item></DocSum>"""
+
+RECORD = """LOCUS       {accession}                 100 bp    DNA     linear   PHG {date}
+DEFINITION  Mycobacterium phage {name}, complete genome.
+ACCESSION   {accession}
+VERSION     {accession}.1
+//
+"""
+
+
+class StandInHandler(http.server.BaseHTTPRequestHandler):
+    """Serves the responses of a stand-in E-utilities server."""
+
+    def do_POST(self):
+        length = int(self.headers["Content-Length"])
+        params = urllib.parse.parse_qs(self.rfile.read(length).decode())
+        params = {key: value[0] for key, value in params.items()}
+        utility = self.path.split("/")[-1].split(".")[0]
+        self.server.requests.append((time.monotonic(), utility, params))
+
+        if self.server.failures.get(utility, 0) > 0:
+            self.server.failures[utility] -= 1
+            self.send_error(503)
+            return
+        if utility == "esearch":
+            terms = params["term"].split(" | ")
+            found = [term[:-6] for term in terms
+                     if term[:-6] in self.server.records.keys()]
+            errors = "".join([f"<PhraseNotFound>{term}</PhraseNotFound>"
+                              for term in terms
+                              if term[:-6] not in self.server.records.keys()])
+            data = ESEARCH.format(count=len(found), webenv=",".join(found),
+                                  errors=errors)
+        elif utility == "esummary":
+            accessions = params["webenv"].split(",")
+            docsums = [DOCSUM.format(id=index, accession=accession,
+                           update_date=self.server.records[accession][0])
+                       for index, accession in enumerate(accessions)]
+            data = ESUMMARY.format(docsums="\n".join(docsums))
+        elif utility == "efetch":
+            accessions = params["id"].split(",")
+            data = "\n".join([self.server.records[accession][1]
+                              for accession in accessions])
+        else:
+            self.send_error(400)
+            return
+
+        data = data.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def create_record(accession, name, date):
+    """Create the update date and GenBank text of a stand-in record."""
+    update_date = datetime.strptime(date, "%d-%b-%Y").strftime("%Y/%m/%d")
+    text = RECORD.format(accession=accession, name=name, date=date.upper())
+    return (update_date, text)
+
+
+class StandInClient:
+    """Client that writes stand-in records without a server."""
+
+    def __init__(self, records, error=None):
+        self.records = records
+        self.error = error
+        self.requests = []
+
+    def efetch(self, accession_list, handle, db="nucleotide", rettype="gb",
+               retmode="text"):
+        self.requests.append((list(accession_list), db, rettype, retmode))
+        if self.error is not None:
+            raise self.error
+        start = handle.tell()
+        # Records are separated by blank lines, as in NCBI responses.
+        for accession in accession_list:
+            handle.write(self.records[accession] + "\n")
+        handle.seek(start)
+
+
+class TestNcbiFunctions(unittest.TestCase):
+
+    def test_split_genbank_records_1(self):
+        """Verify the text of each record is split from a handle."""
+        record1 = create_record("AB000001", "Alice", "02-Jan-2020")[1]
+        record2 = create_record("AB000002", "Bob", "03-Feb-2020")[1]
+        handle = io.StringIO("\n" + record1 + "\n" + record2 + "\n")
+        records = list(ncbi.split_genbank_records(handle))
+        with self.subTest():
+            self.assertEqual(records, [record1, record2])
+
+    def test_parse_locus_1(self):
+        """Verify the name and date are parsed from the LOCUS line."""
+        record = create_record("AB000001", "Alice", "02-Jan-2020")[1]
+        name, date = ncbi.parse_locus(record)
+        with self.subTest():
+            self.assertEqual(name, "AB000001")
+        with self.subTest():
+            self.assertEqual(date, "02-JAN-2020")
+
+    def test_parse_locus_2(self):
+        """Verify an error is raised if there is no LOCUS line."""
+        with self.assertRaises(ValueError):
+            ncbi.parse_locus("DEFINITION  Mycobacterium phage Alice.\n//\n")
+
+    def test_rate_limiter_1(self):
+        """Verify requests from several threads are spaced by the rate."""
+        limiter = ncbi.RateLimiter(20)
+        times = []
+        lock = threading.Lock()
+        def request():
+            limiter.wait()
+            with lock:
+                times.append(time.monotonic())
+        threads = [threading.Thread(target=request) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        times.sort()
+        intervals = [times[i + 1] - times[i] for i in range(len(times) - 1)]
+        with self.subTest():
+            self.assertGreater(min(intervals), 0.04)
+        with self.subTest():
+            self.assertGreater(times[-1] - times[0], 0.24)
+
+    def test_prefetch_1(self):
+        """Verify items are retrieved in order."""
+        items = list(ncbi.prefetch(iter(range(10)), size=2))
+        self.assertEqual(items, list(range(10)))
+
+    def test_prefetch_2(self):
+        """Verify errors raised during iteration are raised."""
+        def generate():
+            yield 1
+            raise ValueError("Stand-in error.")
+        items = ncbi.prefetch(generate())
+        with self.subTest():
+            self.assertEqual(next(items), 1)
+        with self.subTest():
+            with self.assertRaises(ValueError):
+                next(items)
+
+    def test_prefetch_3(self):
+        """Verify the next item is retrieved while an item is processed."""
+        started = []
+        def generate():
+            for item in range(3):
+                started.append(item)
+                yield item
+        items = ncbi.prefetch(generate(), size=1)
+        next(items)
+        time.sleep(0.1)
+        with self.subTest():
+            self.assertEqual(started, [0, 1, 2])
+        items.close()
+
+
+class TestEntrezClient(unittest.TestCase):
+
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0),
+                                                      StandInHandler)
+        self.server.requests = []
+        self.server.failures = {}
+        self.server.records = {
+            "AB000001": create_record("AB000001", "Alice", "02-Jan-2020"),
+            "AB000002": create_record("AB000002", "Bob", "03-Feb-2020"),
+            "AB000003": create_record("AB000003", "Cara", "04-Mar-2020")}
+        host, port = self.server.server_address
+        self.base_url = f"http://{host}:{port}/entrez/eutils/"
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.client = ncbi.EntrezClient(tool="pdm_utils_test", rate=100,
+                                        base_url=self.base_url,
+                                        retry_delay=0)
+        self.output_folder = pathlib.Path(test_root_dir, "output")
+        self.output_folder.mkdir()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        shutil.rmtree(self.output_folder)
+
+    def test_esearch_1(self):
+        """Verify accessions are searched and summarized."""
+        search = self.client.esearch(db="nucleotide",
+                                     term="AB000001[ACCN] | XY000001[ACCN]",
+                                     usehistory="y")
+        summaries = self.client.esummary(db="nucleotide",
+                                         query_key=search["QueryKey"],
+                                         webenv=search["WebEnv"])
+        with self.subTest():
+            self.assertEqual(search["Count"], "1")
+        with self.subTest():
+            self.assertEqual(search["ErrorList"]["PhraseNotFound"],
+                             ["XY000001[ACCN]"])
+        with self.subTest():
+            self.assertEqual(summaries[0]["Caption"], "AB000001")
+        with self.subTest():
+            self.assertEqual(summaries[0]["UpdateDate"], "2020/01/02")
+        with self.subTest():
+            self.assertEqual(self.server.requests[0][2]["tool"],
+                             "pdm_utils_test")
+
+    def test_efetch_1(self):
+        """Verify records are written to the handle, and a failed
+        request is retried without keeping partial data."""
+        self.server.failures["efetch"] = 2
+        handle = io.StringIO()
+        self.client.efetch(["AB000001", "AB000002"], handle)
+        records = list(ncbi.split_genbank_records(handle))
+        with self.subTest():
+            self.assertEqual(len(self.server.requests), 3)
+        with self.subTest():
+            self.assertEqual(records, [self.server.records["AB000001"][1],
+                                       self.server.records["AB000002"][1]])
+
+    def test_efetch_2(self):
+        """Verify an error is raised once all attempts fail."""
+        self.server.failures["efetch"] = 3
+        handle = io.StringIO()
+        with self.subTest():
+            with self.assertRaises(urllib.error.HTTPError):
+                self.client.efetch(["AB000001"], handle)
+        with self.subTest():
+            self.assertEqual(len(self.server.requests), 3)
+
+    def test_rate_1(self):
+        """Verify requests are limited to the rate."""
+        client = ncbi.EntrezClient(base_url=self.base_url, rate=20)
+        for _ in range(4):
+            client.esearch(db="nucleotide", term="AB000001[ACCN]")
+        times = [request[0] for request in self.server.requests]
+        intervals = [times[i + 1] - times[i] for i in range(len(times) - 1)]
+        self.assertGreater(min(intervals), 0.04)
+
+    def test_rate_2(self):
+        """Verify the default rate depends on the API key."""
+        client1 = ncbi.EntrezClient()
+        client2 = ncbi.EntrezClient(api_key="abc")
+        with self.subTest():
+            self.assertAlmostEqual(client1.limiter.interval, 1 / 3)
+        with self.subTest():
+            self.assertAlmostEqual(client2.limiter.interval, 1 / 10)
+
+    def test_search_batches_1(self):
+        """Verify each batch is searched and summarized in order."""
+        accessions = ["AB000001", "XY000001", "AB000002", "AB000003"]
+        batches = list(ncbi.search_batches(self.client, accessions,
+                                           batch_size=2))
+        with self.subTest():
+            self.assertEqual([(batch["start"], batch["stop"])
+                              for batch in batches], [(0, 2), (2, 4)])
+        with self.subTest():
+            self.assertEqual([[summary["Caption"]
+                               for summary in batch["summaries"]]
+                              for batch in batches],
+                             [["AB000001"], ["AB000002", "AB000003"]])
+
+    def test_search_batches_2(self):
+        """Verify a batch that cannot be searched records the error."""
+        self.server.failures["esearch"] = 3
+        batches = list(ncbi.search_batches(self.client, ["AB000001"]))
+        with self.subTest():
+            self.assertIsNone(batches[0]["search"])
+        with self.subTest():
+            self.assertIsInstance(batches[0]["error"], urllib.error.HTTPError)
+
+    def test_get_gb_records_1(self):
+        """Verify get_gb_records saves each retrieved record to a file."""
+        accessions = {"AB000001", "AB000002", "AB000003", "XY000001"}
+        with contextlib.redirect_stdout(io.StringIO()):
+            get_gb_records.get_genbank_data(self.output_folder, accessions,
+                                            client=self.client)
+        files = sorted(path.name for path in self.output_folder.iterdir())
+        with self.subTest():
+            self.assertEqual(files, ["AB000001.gb", "AB000002.gb",
+                                     "AB000003.gb"])
+        with self.subTest():
+            self.assertEqual(
+                pathlib.Path(self.output_folder, "AB000002.gb").read_text(),
+                self.server.records["AB000002"][1])
+
+    def test_retrieve_records_1(self):
+        """Verify get_data only retrieves records with newer summaries,
+        and records accessions that cannot be found."""
+        accession_dict = {}
+        for accession, name, date in [("AB000001", "Alice", "2020-01-01"),
+                                      ("AB000002", "Bob", "2020-12-31"),
+                                      ("XY000001", "Dave", "2020-01-01")]:
+            gnm = genome.Genome()
+            gnm.id = name
+            gnm.name = name
+            gnm.accession = accession
+            gnm.annotation_status = "final"
+            gnm.date = datetime.strptime(date, "%Y-%m-%d")
+            accession_dict[accession] = gnm
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = get_data.retrieve_records(accession_dict,
+                                                self.output_folder,
+                                                self.client, batch_size=2)
+        tally_not_new, records, errors, summary_results = results
+        with self.subTest():
+            self.assertEqual(tally_not_new, 1)
+        with self.subTest():
+            self.assertEqual(errors, ["XY000001"])
+        with self.subTest():
+            self.assertEqual([record["name"] for record in records],
+                             ["AB000001"])
+        with self.subTest():
+            self.assertEqual(records[0]["date"], "02-JAN-2020")
+        with self.subTest():
+            self.assertEqual(records[0]["filepath"].read_text(),
+                             self.server.records["AB000001"][1])
+        with self.subTest():
+            self.assertEqual(summary_results[0]["result"], "record not new")
+
+
+
+class TestSaveRecords(unittest.TestCase):
+
+    def setUp(self):
+        self.output_folder = pathlib.Path(test_root_dir, "save_records")
+        self.output_folder.mkdir()
+        self.records = {
+            "AB000001": create_record("AB000001", "Alice", "02-Jan-2020")[1],
+            "AB000002": create_record("AB000002", "Bob", "03-Feb-2020")[1]}
+        self.accession_dict = {}
+        for accession, name in [("AB000001", "Alice"), ("AB000002", "Bob")]:
+            gnm = genome.Genome()
+            gnm.name = name
+            gnm.accession = accession
+            self.accession_dict[accession] = gnm
+
+    def tearDown(self):
+        shutil.rmtree(self.output_folder)
+
+    def test_save_records_1(self):
+        """Verify each record is saved to its own file, and its name, date
+        and filepath are returned."""
+        client = StandInClient(self.records)
+        records = get_data.save_records(client, ["AB000001", "AB000002"],
+                                         self.accession_dict,
+                                         self.output_folder)
+        path1 = pathlib.Path(self.output_folder, "alice__AB000001.gb")
+        path2 = pathlib.Path(self.output_folder, "bob__AB000002.gb")
+        with self.subTest():
+            self.assertEqual(client.requests,
+                             [(["AB000001", "AB000002"], "nucleotide",
+                               "gb", "text")])
+        with self.subTest():
+            self.assertEqual(records,
+                             [{"name": "AB000001", "date": "02-JAN-2020",
+                               "filepath": path1},
+                              {"name": "AB000002", "date": "03-FEB-2020",
+                               "filepath": path2}])
+        with self.subTest():
+            self.assertEqual(path1.read_text(), self.records["AB000001"])
+        with self.subTest():
+            self.assertEqual(path2.read_text(), self.records["AB000002"])
+
+    def test_save_records_2(self):
+        """Verify an error retrieving the records is raised and no files
+        are saved."""
+        client = StandInClient(self.records, error=urllib.error.URLError(""))
+        with self.subTest():
+            with self.assertRaises(urllib.error.URLError):
+                get_data.save_records(client, ["AB000001"],
+                                      self.accession_dict,
+                                      self.output_folder)
+        with self.subTest():
+            self.assertEqual(list(self.output_folder.iterdir()), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
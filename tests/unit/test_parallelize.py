@@ -0,0 +1,129 @@
+"""Unit tests for functions in parallelize.py"""
+
+import contextlib
+import io
+import os
+import unittest
+
+from pdm_utils.functions import parallelize
+
+
+def square(value):
+    return value * value
+
+
+def square_list(value):
+    return [value * value]
+
+
+def add(value1, value2):
+    return [value1 + value2]
+
+
+def get_pid(value):
+    return os.getpid()
+
+
+def fail(value):
+    if value == 3:
+        raise ValueError("Invalid value")
+    return value
+
+
+class TestParallelize(unittest.TestCase):
+
+    def setUp(self):
+        self.stdout = contextlib.redirect_stdout(io.StringIO())
+        self.stdout.__enter__()
+
+    def tearDown(self):
+        self.stdout.__exit__(None, None, None)
+
+    def test_parallelize_1(self):
+        """Verify results are returned for all inputs, and that
+        parallelize can be called more than once."""
+        for _ in range(2):
+            with self.subTest():
+                results = parallelize.parallelize(list(range(20)), 2,
+                                                  square_list)
+                self.assertEqual(sorted(results),
+                                 [[x * x] for x in range(20)])
+
+    def test_parallelize_2(self):
+        """Verify tuple inputs are unpacked as arguments, and inputs
+        are processed in chunks."""
+        inputs = [(x, 1) for x in range(10)]
+        results = parallelize.parallelize(inputs, 2, add, chunk_size=3)
+        self.assertEqual(sorted(results), [[x + 1] for x in range(10)])
+
+    def test_parallelize_3(self):
+        """Verify no work is done without inputs."""
+        self.assertEqual(parallelize.parallelize([], 2, square), [])
+
+    def test_parallelize_4(self):
+        """Verify results that are not lists are removed."""
+        results = parallelize.parallelize(list(range(5)), 2, square)
+        self.assertEqual(results, [])
+
+    def test_start_processes_1(self):
+        """Verify a list of (function, arguments) jobs is run, and only
+        results that are lists are returned."""
+        jobs = [(square, (2,)), (add, (1, 2)), (square_list, (3,))]
+        results = parallelize.start_processes(jobs, 2)
+        self.assertEqual(sorted(results), [[3], [9]])
+
+
+class TestExecutor(unittest.TestCase):
+
+    def setUp(self):
+        self.stdout = contextlib.redirect_stdout(io.StringIO())
+        self.stdout.__enter__()
+
+    def tearDown(self):
+        self.stdout.__exit__(None, None, None)
+
+    def test_imap_1(self):
+        """Verify the same workers are used for consecutive tasks."""
+        with parallelize.Executor(2) as executor:
+            pids1 = set(executor.imap(get_pid, range(20)))
+            pids2 = set(executor.imap(get_pid, range(20)))
+            results = executor.map(square, list(range(5)))
+        with self.subTest():
+            self.assertTrue(pids2.issubset(pids1))
+        with self.subTest():
+            self.assertNotIn(os.getpid(), pids1)
+        with self.subTest():
+            self.assertEqual(sorted(results), [0, 1, 4, 9, 16])
+
+    def test_imap_2(self):
+        """Verify tasks are only submitted as results are consumed."""
+        inputs = iter(range(100))
+        with parallelize.Executor(2, chunks_per_processor=2) as executor:
+            results = executor.imap(square, inputs, chunk_size=5)
+            next(results)
+            with self.subTest():
+                self.assertEqual(next(inputs), 20)
+            with self.subTest():
+                self.assertLessEqual(executor.pending, 4)
+
+    def test_imap_3(self):
+        """Verify exceptions raised by a task are raised by the
+        executor."""
+        executor = parallelize.Executor(2)
+        with self.assertRaises(ValueError):
+            list(executor.imap(fail, range(10)))
+        self.assertEqual(executor.worker_pool, [])
+
+    def test_close_1(self):
+        """Verify workers are stopped when results are not consumed."""
+        with parallelize.Executor(2) as executor:
+            results = executor.imap(square, range(100))
+            next(results)
+            worker_pool = executor.worker_pool
+        for worker_n in worker_pool:
+            with self.subTest():
+                self.assertFalse(worker_n.is_alive())
+
+
+if __name__ == '__main__':
+    unittest.main()
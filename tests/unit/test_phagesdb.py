@@ -3,7 +3,47 @@
 from pdm_utils.functions import phagesdb
 from pdm_utils.constants import constants
 import unittest
+from unittest.mock import patch
+import contextlib
+import http.server
+import io
+import json
 import pathlib
+import shutil
+import threading
+
+# Create the main test directory in which all files will be
+# created and managed.
+test_root_dir = pathlib.Path("/tmp", "pdm_utils_tests_phagesdb")
+if test_root_dir.exists() == True:
+    shutil.rmtree(test_root_dir)
+test_root_dir.mkdir()
+
+
+class StandInHandler(http.server.BaseHTTPRequestHandler):
+    """Serves the responses of a stand-in PhagesDB server, with ETags."""
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        if self.path not in self.server.responses.keys():
+            self.send_error(404)
+            return
+        body = self.server.responses[self.path]
+        etag = f'"{hash(body)}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.server.not_modified += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
 
 
 class TestPhagesDBFunctions(unittest.TestCase):
@@ -194,6 +234,152 @@ class TestPhagesDBFunctions(unittest.TestCase):
         self.assertEqual(url, expected_url)
 
 
+class TestPhagesDBCache(unittest.TestCase):
+
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0),
+                                                      StandInHandler)
+        self.server.requests = []
+        self.server.not_modified = 0
+        self.server.responses = {
+            "/api/phages/L5/?format=json": json.dumps(
+                {"phage_name": "L5",
+                 "pcluster": {"cluster": "A"},
+                 "psubcluster": {"subcluster": "A2"},
+                 "isolation_host": {"genus": "Mycobacterium"},
+                 "genbank_accession": "Z18946",
+                 "fasta_file": self.get_url("/media/fastas/L5.fasta")}
+                ).encode("utf-8"),
+            "/api/phages/D29/?format=json": json.dumps(
+                {"phage_name": "D29",
+                 "pcluster": {"cluster": "A"},
+                 "psubcluster": {"subcluster": "A2"},
+                 "isolation_host": {"genus": "Mycobacterium"},
+                 "genbank_accession": "AF022214",
+                 "fasta_file": ""}).encode("utf-8"),
+            "/media/fastas/L5.fasta":
+                b">Mycobacterium phage L5\nATCG\nGGCC\n",
+            "/api/clusters/": json.dumps(
+                [{"cluster": "A", "subclusters_set": ["A1", "A2"]}]
+                ).encode("utf-8")}
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.cache_dir = pathlib.Path(test_root_dir, "cache")
+        self.api_prefix = patch.object(constants, "API_PREFIX",
+                                       self.get_url("/api/phages/"))
+        self.api_prefix.start()
+
+    def tearDown(self):
+        self.api_prefix.stop()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        if self.cache_dir.exists():
+            shutil.rmtree(self.cache_dir)
+
+    def get_url(self, path):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}{path}"
+
+    def test_fetch_1(self):
+        """Verify a response is retrieved once within a run, and is
+        revalidated with its ETag by a later run."""
+        url = self.get_url("/api/clusters/")
+        cache1 = phagesdb.ResponseCache(cache_dir=self.cache_dir)
+        data1 = cache1.fetch(url)
+        data2 = cache1.fetch(url)
+        cache2 = phagesdb.ResponseCache(cache_dir=self.cache_dir)
+        data3 = cache2.fetch(url)
+        with self.subTest():
+            self.assertEqual(data1, self.server.responses["/api/clusters/"])
+        with self.subTest():
+            self.assertEqual(data2, data1)
+        with self.subTest():
+            self.assertEqual(data3, data1)
+        with self.subTest():
+            self.assertEqual(len(self.server.requests), 2)
+        with self.subTest():
+            self.assertEqual(self.server.not_modified, 1)
+
+    def test_fetch_2(self):
+        """Verify a changed response is retrieved again after
+        revalidation."""
+        url = self.get_url("/api/clusters/")
+        phagesdb.ResponseCache(cache_dir=self.cache_dir).fetch(url)
+        self.server.responses["/api/clusters/"] = b"[]"
+        data = phagesdb.ResponseCache(cache_dir=self.cache_dir).fetch(url)
+        with self.subTest():
+            self.assertEqual(data, b"[]")
+        with self.subTest():
+            self.assertEqual(self.server.not_modified, 0)
+
+    def test_fetch_3(self):
+        """Verify a response within its time-to-live is not
+        revalidated."""
+        url = self.get_url("/api/clusters/")
+        phagesdb.ResponseCache(cache_dir=self.cache_dir).fetch(url)
+        cache = phagesdb.ResponseCache(cache_dir=self.cache_dir, ttl=3600)
+        cache.fetch(url)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_fetch_4(self):
+        """Verify cached responses are replayed offline, and responses
+        that are not cached are not retrieved."""
+        url = self.get_url("/api/clusters/")
+        phagesdb.ResponseCache(cache_dir=self.cache_dir).fetch(url)
+        cache = phagesdb.ResponseCache(cache_dir=self.cache_dir,
+                                       offline=True)
+        data = cache.fetch(url)
+        with self.subTest():
+            self.assertEqual(data, self.server.responses["/api/clusters/"])
+        with self.subTest():
+            with self.assertRaises(OSError):
+                cache.fetch(self.get_url("/api/host_genera/"))
+        with self.subTest():
+            self.assertEqual(len(self.server.requests), 1)
+
+    def test_retrieve_urls_1(self):
+        """Verify data is retrieved for each URL, and an empty string
+        for URLs that cannot be retrieved."""
+        urls = [self.get_url("/media/fastas/L5.fasta"),
+                self.get_url("/media/fastas/L5_x.fasta")]
+        with contextlib.redirect_stdout(io.StringIO()):
+            data_dict = phagesdb.retrieve_urls(urls, workers=2)
+        exp = {urls[0]: ">Mycobacterium phage L5\nATCG\nGGCC\n",
+               urls[1]: ""}
+        self.assertEqual(data_dict, exp)
+
+    def test_get_genomes_1(self):
+        """Verify genomes are parsed, including sequences, and each
+        response is retrieved once."""
+        with contextlib.redirect_stdout(io.StringIO()):
+            genome_dict = phagesdb.get_genomes(["L5", "D29", "L5_x"],
+                                               gnm_type="phagesdb", seq=True,
+                                               workers=2)
+        with self.subTest():
+            self.assertEqual(genome_dict["L5"].seq, "ATCGGGCC")
+        with self.subTest():
+            self.assertEqual(genome_dict["L5"].type, "phagesdb")
+        with self.subTest():
+            self.assertEqual(genome_dict["D29"].accession, "AF022214")
+        with self.subTest():
+            self.assertIsNone(genome_dict["L5_x"])
+        with self.subTest():
+            self.assertEqual(len(self.server.requests), 4)
+
+    def test_create_cluster_subcluster_sets_1(self):
+        """Verify clusters and subclusters are parsed from a cached
+        response."""
+        url = self.get_url("/api/clusters/")
+        cache = phagesdb.ResponseCache(cache_dir=self.cache_dir)
+        phagesdb.create_cluster_subcluster_sets(url=url, cache=cache)
+        cache = phagesdb.ResponseCache(cache_dir=self.cache_dir,
+                                       offline=True)
+        results = phagesdb.create_cluster_subcluster_sets(url=url,
+                                                          cache=cache)
+        self.assertEqual(results, ({"A"}, {"A1", "A2"}))
+
+
 
 
 if __name__ == '__main__':
@@ -0,0 +1,344 @@
+"""Unit tests for functions in phameration.py"""
+
+import colorsys
+import contextlib
+import io
+import json
+from pathlib import Path
+import random
+import shutil
+import unittest
+
+from pdm_utils.functions import basic
+from pdm_utils.functions import phameration
+
+# Create the main test directory in which all files will be
+# created and managed.
+test_root_dir = Path("/tmp", "pdm_utils_tests_phameration")
+if test_root_dir.exists() == True:
+    shutil.rmtree(test_root_dir)
+test_root_dir.mkdir()
+
+
+def preserve_phams_reference(old_phams, new_phams, old_colors, new_genes):
+    """Reference implementation of preserve_phams() that compares every
+    old pham to every new pham."""
+    final_phams = dict()
+    final_colors = dict()
+    new_phams_copy = new_phams.copy()
+    for old_key in old_phams.keys():
+        old_pham = old_phams[old_key]
+        for new_key in new_phams_copy.keys():
+            new_pham = new_phams_copy[new_key]
+            if old_pham & new_pham == set():
+                continue
+            if old_pham == new_pham:
+                final_phams[old_key] = new_pham
+                final_colors[old_key] = old_colors[old_key]
+                new_phams_copy.pop(new_key)
+            elif new_pham - old_pham != set():
+                if (new_pham & new_genes != set() and
+                        (new_pham - new_genes) - old_pham == set()):
+                    final_phams[old_key] = new_pham
+                    final_colors[old_key] = old_colors[old_key]
+                    new_phams_copy.pop(new_key)
+            break
+
+    highest_pham = max([0] + list(map(int, final_phams.keys()))) + 1
+    for key in new_phams_copy.keys():
+        new_key = highest_pham
+        highest_pham += 1
+        final_phams[new_key] = new_phams_copy[key]
+        if len(new_phams_copy[key]) > 1:
+            h = s = v = 0
+            while h <= 0:
+                h = random.random()
+            while s < 0.5:
+                s = random.random()
+            while v < 0.8:
+                v = random.random()
+            rgb = colorsys.hsv_to_rgb(h, s, v)
+            rgb = (rgb[0] * 255, rgb[1] * 255, rgb[2] * 255)
+            hexrgb = "#{:02x}{:02x}{:02x}".format(int(rgb[0]), int(rgb[1]),
+                                                  int(rgb[2]))
+            final_colors[new_key] = hexrgb
+        else:
+            final_colors[new_key] = '#FFFFFF'
+    return final_phams, final_colors
+
+
+def create_random_phams(gene_count, rng):
+    """Create old and new phams that are related by randomly splitting,
+    joining, adding to and removing from the old phams.
+
+    :returns: tuple (old_phams, new_phams, old_colors, new_genes)
+    """
+    genes = [f"Phage_{x}" for x in range(gene_count)]
+    old_count = int(gene_count * 0.9)
+    old_genes = genes[:old_count]
+    new_genes = set(genes[old_count:])
+
+    # Partition the old genes into old phams of random sizes.
+    old_phams = dict()
+    old_colors = dict()
+    rng.shuffle(old_genes)
+    index = 0
+    pham_id = 1
+    while index < len(old_genes):
+        size = rng.choice([1, 1, 2, 3, 5, 10])
+        old_phams[pham_id] = set(old_genes[index:index + size])
+        old_colors[pham_id] = f"#{pham_id % 0xFFFFFF:06x}"
+        index += size
+        pham_id += rng.choice([1, 1, 2])
+
+    # Derive the new phams from the old phams.
+    new_pham_list = []
+    for old_pham in old_phams.values():
+        pham = set(old_pham)
+        if len(pham) > 1 and rng.random() < 0.05:
+            # Subtraction: genes removed from the database.
+            pham.pop()
+        action = rng.random()
+        if len(pham) > 1 and action < 0.1:
+            # Split.
+            members = sorted(pham)
+            cut = rng.randint(1, len(members) - 1)
+            new_pham_list.append(set(members[:cut]))
+            new_pham_list.append(set(members[cut:]))
+        elif len(new_pham_list) > 0 and action < 0.2:
+            # Join.
+            new_pham_list[-1] |= pham
+        else:
+            new_pham_list.append(pham)
+
+    # Add new genes to existing phams or to new phams.
+    for gene in sorted(new_genes):
+        if len(new_pham_list) > 0 and rng.random() < 0.5:
+            rng.choice(new_pham_list).add(gene)
+        else:
+            new_pham_list.append({gene})
+
+    rng.shuffle(new_pham_list)
+    new_phams = dict()
+    for key, pham in enumerate(new_pham_list, 1):
+        new_phams[key] = pham
+    return old_phams, new_phams, old_colors, new_genes
+
+
+def create_random_clusters(gene_count, rng, translation_length=300):
+    """Create MMseqs2 clusters of random sizes, with a random translation
+    for each gene.
+
+    :returns: tuple (clusters, translations)
+    """
+    clusters = []
+    index = 0
+    while index < gene_count:
+        size = rng.choice([1, 1, 2, 3, 5, 10, 40])
+        clusters.append([f"Phage_{x}" for x in
+                         range(index, min(index + size, gene_count))])
+        index += size
+    alphabet = "ACDEFGHIKLMNPQRSTVWY"
+    translations = dict()
+    for cluster in clusters:
+        for gene in cluster:
+            translations[gene] = "M" + "".join(
+                rng.choices(alphabet, k=translation_length - 1))
+    return clusters, translations
+
+
+def write_mmseqs_tsv(clusters, filename):
+    """Write clusters in the format of mmseqs createtsv."""
+    with open(filename, "w") as fh:
+        for cluster in clusters:
+            for gene in cluster:
+                fh.write(f"{cluster[0]}\t{gene}\n")
+
+
+class TestPhamerationFunctions2(unittest.TestCase):
+
+    def test_preserve_phams_1(self):
+        """Verify pham names and colors are preserved in the same way as the
+        reference implementation for randomized phams."""
+        for seed in range(20):
+            rng = random.Random(seed)
+            old_phams, new_phams, old_colors, new_genes = \
+                create_random_phams(rng.randint(10, 2000), rng)
+
+            random.seed(seed)
+            exp_phams, exp_colors = preserve_phams_reference(
+                                        old_phams, new_phams.copy(),
+                                        old_colors, new_genes)
+            random.seed(seed)
+            with contextlib.redirect_stdout(io.StringIO()):
+                final_phams, final_colors = phameration.preserve_phams(
+                                                old_phams, new_phams.copy(),
+                                                old_colors, new_genes)
+            with self.subTest(seed=seed):
+                self.assertEqual(final_phams, exp_phams)
+            with self.subTest(seed=seed):
+                self.assertEqual(final_colors, exp_colors)
+
+    def test_preserve_phams_2(self):
+        """Verify each case of pham changes."""
+        old_phams = {1: {"A", "B"}, 2: {"C", "D"}, 3: {"E", "F"},
+                     4: {"G"}, 5: {"H"}, 6: {"I", "J"}}
+        old_colors = {1: "#000001", 2: "#000002", 3: "#000003",
+                      4: "#000004", 5: "#000005", 6: "#000006"}
+        new_genes = {"K", "L"}
+        new_phams = {10: {"A", "B"},       # Case 1 - identity
+                     11: {"C", "D", "K"},  # Case 2 - addition
+                     12: {"E"},            # Case 3 - split
+                     13: {"F"},
+                     14: {"G", "H", "L"},  # Case 4 - join
+                     15: {"I"}}            # Case 5 - subtraction of J
+        with contextlib.redirect_stdout(io.StringIO()):
+            final_phams, final_colors = phameration.preserve_phams(
+                                            old_phams, new_phams,
+                                            old_colors, new_genes)
+        with self.subTest():
+            self.assertEqual(final_phams[1], {"A", "B"})
+        with self.subTest():
+            self.assertEqual(final_colors[1], "#000001")
+        with self.subTest():
+            self.assertEqual(final_phams[2], {"C", "D", "K"})
+        with self.subTest():
+            self.assertEqual(final_colors[2], "#000002")
+        with self.subTest():
+            self.assertEqual(set(final_phams.keys()), {1, 2, 3, 4, 5, 6})
+        with self.subTest():
+            self.assertEqual(set(map(frozenset, final_phams.values())),
+                             set(map(frozenset, new_phams.values())))
+
+
+class TestPhamerationFunctions1(unittest.TestCase):
+
+    def setUp(self):
+        self.base_dir = Path(test_root_dir, "test_update")
+        self.base_dir.mkdir()
+        self.wd = Path(self.base_dir, "temp_dir")
+        self.wd.mkdir()
+        self.update_dir = Path(self.base_dir, "update_dir")
+        self.params = {"--threads": "1", "-v": 3, "--min-seq-id": 0.325,
+                       "-c": 0.65}
+        self.trans_groups = {"MKL": ["L5_1", "D29_1"], "MAG": ["L5_2"]}
+
+    def tearDown(self):
+        shutil.rmtree(self.base_dir)
+
+    def create_dbs(self, folder):
+        """Create mock MMseqs2 database files."""
+        for db in phameration.UPDATE_DBS:
+            for suffix in ["", ".index", ".dbtype", "_h", "_h.index"]:
+                Path(folder, db + suffix).touch()
+
+    def test_map_hashes_to_geneids_1(self):
+        """Verify translation hashes are mapped to GeneIDs."""
+        hs_to_gs = phameration.map_hashes_to_geneids(self.trans_groups)
+        exp = {basic.get_seq_hash("MKL"): ["L5_1", "D29_1"],
+               basic.get_seq_hash("MAG"): ["L5_2"]}
+        self.assertEqual(hs_to_gs, exp)
+
+    def test_write_hashed_fasta_1(self):
+        """Verify translations are written using their hashes
+        as identifiers."""
+        phameration.write_hashed_fasta(self.trans_groups, self.wd)
+        with Path(self.wd, "input.fasta").open("r") as fh:
+            lines = fh.read().splitlines()
+        exp = [f">{basic.get_seq_hash('MKL')}", "MKL",
+               f">{basic.get_seq_hash('MAG')}", "MAG"]
+        self.assertEqual(lines, exp)
+
+    def test_reintroduce_hashed_duplicates_1(self):
+        """Verify translation hashes are replaced with all GeneIDs."""
+        hs_to_gs = phameration.map_hashes_to_geneids(self.trans_groups)
+        new_phams = {1: [basic.get_seq_hash("MKL")],
+                     2: [basic.get_seq_hash("MAG")]}
+        new_phams = phameration.reintroduce_hashed_duplicates(new_phams,
+                                                              hs_to_gs)
+        self.assertEqual(new_phams, {1: {"L5_1", "D29_1"}, 2: {"L5_2"}})
+
+    def test_mmseqs_clusterupdate_command_1(self):
+        """Verify the previous databases are updated and the new
+        databases are written to the working directory."""
+        command = phameration.mmseqs_clusterupdate_command(
+                        {"--threads": 4}, "/tmp/wd", "/tmp/update")
+        exp = ("mmseqs clusterupdate /tmp/update/sequenceDB "
+               "/tmp/wd/inputDB /tmp/update/clusterDB /tmp/wd/sequenceDB "
+               "/tmp/wd/clusterDB /tmp/wd/tmp --threads 4")
+        self.assertEqual(command, exp)
+
+    def test_check_update_dir_1(self):
+        """Verify False is returned if there are no previous databases."""
+        self.update_dir.mkdir()
+        self.assertFalse(phameration.check_update_dir(self.update_dir,
+                                                      self.params))
+
+    def test_check_update_dir_2(self):
+        """Verify True is returned if previous databases were saved
+        with the same parameters."""
+        self.create_dbs(self.wd)
+        phameration.save_update_dbs(self.wd, self.update_dir, self.params)
+        self.assertTrue(phameration.check_update_dir(self.update_dir,
+                                                     self.params))
+
+    def test_check_update_dir_3(self):
+        """Verify False is returned if previous databases were saved
+        with different parameters."""
+        self.create_dbs(self.wd)
+        phameration.save_update_dbs(self.wd, self.update_dir, self.params)
+        self.params["--min-seq-id"] = 0.5
+        self.assertFalse(phameration.check_update_dir(self.update_dir,
+                                                      self.params))
+
+    def test_check_update_dir_4(self):
+        """Verify True is returned if previous databases were saved
+        with a different number of threads and verbosity."""
+        self.create_dbs(self.wd)
+        phameration.save_update_dbs(self.wd, self.update_dir, self.params)
+        self.params["--threads"] = "8"
+        self.params["-v"] = 1
+        self.assertTrue(phameration.check_update_dir(self.update_dir,
+                                                     self.params))
+
+    def test_save_update_dbs_1(self):
+        """Verify previous databases are replaced with the new databases."""
+        self.update_dir.mkdir()
+        Path(self.update_dir, "clusterDB.1").touch()
+        self.create_dbs(self.wd)
+        Path(self.wd, "inputDB").touch()
+        phameration.save_update_dbs(self.wd, self.update_dir, self.params)
+        with Path(self.update_dir, phameration.UPDATE_PARAMS_FILE).open() as fh:
+            params = json.load(fh)
+        with self.subTest():
+            self.assertFalse(Path(self.update_dir, "clusterDB.1").exists())
+        with self.subTest():
+            self.assertTrue(Path(self.update_dir, "clusterDB.dbtype").exists())
+        with self.subTest():
+            self.assertFalse(Path(self.update_dir, "inputDB").exists())
+        with self.subTest():
+            self.assertEqual(params, {"--min-seq-id": 0.325, "-c": 0.65})
+
+    def test_parse_mmseqs_tsv_1(self):
+        """Verify createtsv output is parsed into phams numbered in
+        order of their representatives."""
+        filename = Path(self.wd, "clusterDB.tsv")
+        with filename.open("w") as fh:
+            fh.write("L5_1\tL5_1\nL5_1\tD29_1\nL5_2\tL5_2\n")
+        parsed_phams = phameration.parse_mmseqs_tsv(filename)
+        self.assertEqual(parsed_phams, {1: ["L5_1", "D29_1"], 2: ["L5_2"]})
+
+    def test_parse_mmseqs_tsv_2(self):
+        """Verify createtsv output of randomized clusters is parsed into
+        one pham for each cluster."""
+        clusters, translations = create_random_clusters(
+                                    500, random.Random(8), translation_length=20)
+        tsv_file = Path(self.wd, "clusterDB.tsv")
+        write_mmseqs_tsv(clusters, tsv_file)
+        tsv_phams = phameration.parse_mmseqs_tsv(tsv_file)
+        exp_phams = {x + 1: cluster for x, cluster in enumerate(clusters)}
+        self.assertEqual(tsv_phams, exp_phams)
+
+
+if __name__ == '__main__':
+    unittest.main()
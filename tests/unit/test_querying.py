@@ -162,6 +162,24 @@ class TestUseMetadata(unittest.TestCase):
 
         self.assertEqual(phage_gene_edge["key"], self.PhageGeneKey)
         self.assertEqual(phage_trna_edge["key"], self.PhageTrnaKey)
+
+    def test_build_graph_4(self):
+        graph = querying.build_graph(self.metadata)
+
+        paths = graph.graph["paths"]
+        self.assertEqual(paths["gene"]["trna"], ["gene", "phage", "trna"])
+        self.assertEqual(paths["phage"]["phage"], ["phage"])
+
+    @patch("pdm_utils.functions.querying.shortest_path")
+    def test_get_table_pathing_1(self, ShortestPath):
+        graph = querying.build_graph(self.metadata)
+
+        table_pathing = querying.get_table_pathing(graph,
+                                                   [self.gene, self.trna])
+
+        ShortestPath.assert_not_called()
+        self.assertEqual(table_pathing,
+                         [self.gene, [["gene", "phage", "trna"]]])
    
     @patch("pdm_utils.functions.querying.parsing.translate_table")
     def test_build_onclause_1(self, TranslateTable):
@@ -0,0 +1,234 @@
+"""Unit tests for functions to translate all CDS features of a genome."""
+
+import random
+import unittest
+
+from Bio.Alphabet import IUPAC
+from Bio.Data import CodonTable
+from Bio.Seq import Seq
+from Bio.SeqFeature import SeqFeature, FeatureLocation, CompoundLocation
+
+from pdm_utils.classes import cds
+from pdm_utils.functions import translation
+
+
+def create_random_cds(rng, gnm_seq, table=11, codon_count=30):
+    """Create a CDS feature with a random location in the genome, which is
+    often, but not always, a valid CDS sequence."""
+    codon_table = CodonTable.unambiguous_dna_by_id[table]
+    sense_codons = list(codon_table.forward_table.keys())
+    codons = [rng.choice(codon_table.start_codons)]
+    codons.extend(rng.choices(sense_codons, k=rng.randint(0, codon_count)))
+    codons.append(rng.choice(codon_table.stop_codons))
+    if rng.random() < 0.1:
+        codons.insert(rng.randint(1, len(codons) - 1),
+                      rng.choice(codon_table.stop_codons))
+    if rng.random() < 0.1:
+        codons[0] = rng.choice(sense_codons)
+    if rng.random() < 0.1:
+        codons.append(rng.choice("ACGT"))
+    cds_seq = "".join(codons)
+
+    strand = rng.choice([1, -1])
+    if strand == -1:
+        cds_seq = str(Seq(cds_seq).reverse_complement())
+    start = len(gnm_seq)
+    gnm_seq.append(cds_seq)
+
+    cds_ftr = cds.Cds()
+    cds_ftr.translation_table = table
+    if rng.random() < 0.2:
+        # Frameshifted feature with two overlapping parts.
+        split = rng.randint(1, len(cds_seq) - 1)
+        parts = [FeatureLocation(start, start + split, strand),
+                 FeatureLocation(start + split - 1, start + len(cds_seq),
+                                 strand)]
+        if strand == -1:
+            parts.reverse()
+        cds_ftr.seqfeature = SeqFeature(CompoundLocation(parts),
+                                        type="CDS")
+    else:
+        cds_ftr.seqfeature = SeqFeature(
+                                FeatureLocation(start, start + len(cds_seq),
+                                                strand),
+                                type="CDS")
+    return cds_ftr
+
+
+def create_random_genome(rng, count, table=11, codon_count=30):
+    """Create a genome sequence and random CDS features within it."""
+    gnm_seq = []
+    cds_features = []
+    for x in range(count):
+        gnm_seq.append("".join(rng.choices("ACGT", k=rng.randint(0, 20))))
+        cds_features.append(create_random_cds(rng, gnm_seq, table=table,
+                                              codon_count=codon_count))
+        gnm_seq = ["".join(gnm_seq)]
+    gnm_seq = Seq(gnm_seq[0], IUPAC.ambiguous_dna)
+    for cds_ftr in cds_features:
+        cds_ftr.set_nucleotide_sequence(parent_genome_seq=gnm_seq)
+    return gnm_seq, cds_features
+
+
+class TestTranslationFunctions(unittest.TestCase):
+
+    def setUp(self):
+        self.gnm_seq = Seq("ATGAAACCCTAATTGGGGTGATTACACCAT",
+                           IUPAC.ambiguous_dna)
+        self.cds1 = cds.Cds()
+        self.cds1.translation_table = 11
+        self.cds1.seqfeature = SeqFeature(FeatureLocation(0, 12, 1),
+                                          type="CDS")
+
+    def test_get_codon_table_1(self):
+        """Verify that codon lookup tables are created for table 11."""
+        amino_acids, start_codons, stop_codons = \
+            translation.get_codon_table(11)
+        with self.subTest():
+            self.assertEqual(chr(amino_acids[17]), "M") # ATG
+        with self.subTest():
+            self.assertEqual(start_codons.sum(), 7)
+        with self.subTest():
+            self.assertTrue(start_codons[92]) # TTG
+        with self.subTest():
+            self.assertEqual(stop_codons.sum(), 3)
+        with self.subTest():
+            self.assertTrue(stop_codons[85]) # TGA
+
+    def test_get_codon_table_2(self):
+        """Verify that codon lookup tables are created for table 4,
+        in which TGA is not a stop codon."""
+        amino_acids, start_codons, stop_codons = \
+            translation.get_codon_table(4)
+        with self.subTest():
+            self.assertEqual(chr(amino_acids[85]), "W") # TGA
+        with self.subTest():
+            self.assertEqual(start_codons.sum(), 8)
+        with self.subTest():
+            self.assertEqual(stop_codons.sum(), 2)
+
+    def test_encode_codons_1(self):
+        """Verify that the codon at each position is encoded regardless of
+        case, and that ambiguous nucleotides are encoded as 4."""
+        codons = translation.encode_codons("ATgNA")
+        self.assertEqual(list(codons), [17, 89, 70])
+
+    def test_encode_codons_2(self):
+        """Verify that no codons are encoded for a short sequence."""
+        self.assertEqual(len(translation.encode_codons("AT")), 0)
+
+    def test_reverse_codons_1(self):
+        """Verify the encoded reverse complement of encoded codons."""
+        with self.subTest():
+            self.assertEqual(translation.REVERSE_CODONS[17], 28) # ATG, CAT
+        with self.subTest():
+            self.assertEqual(translation.REVERSE_CODONS[89], 105) # TGN, NCA
+
+    def test_get_feature_parts_1(self):
+        """Verify that parts are returned in order of extraction."""
+        self.cds1.seqfeature = SeqFeature(CompoundLocation(
+                                    [FeatureLocation(10, 20, -1),
+                                     FeatureLocation(0, 5, -1)]),
+                                    type="CDS")
+        parts = translation.get_feature_parts(self.cds1, 30)
+        self.assertEqual(parts, [(10, 20, -1), (0, 5, -1)])
+
+    def test_get_feature_parts_2(self):
+        """Verify that None is returned for a feature without a SeqFeature
+        or a feature that extends beyond the genome."""
+        with self.subTest():
+            self.assertIsNone(translation.get_feature_parts(cds.Cds(), 30))
+        with self.subTest():
+            self.assertIsNone(translation.get_feature_parts(self.cds1, 10))
+
+    def test_join_feature_parts_1(self):
+        """Verify that parts on both strands are joined in order."""
+        parts = [(21, 27, -1), (0, 3, 1)]
+        seq = translation.join_feature_parts(str(self.gnm_seq), parts)
+        self.assertEqual(seq, "GTGTAAATG")
+
+    def test_translate_cds_features_1(self):
+        """Verify that forward and reverse features are translated."""
+        cds2 = cds.Cds()
+        cds2.translation_table = 11
+        cds2.seqfeature = SeqFeature(FeatureLocation(21, 30, -1),
+                                     type="CDS")
+        translations = translation.translate_cds_features(
+                            self.gnm_seq, [self.cds1, cds2])
+        with self.subTest():
+            self.assertEqual(str(translations[0]), "MKP")
+        with self.subTest():
+            self.assertEqual(str(translations[1]), "MV")
+
+    def test_translate_cds_features_2(self):
+        """Verify that an alternative start codon is translated
+        to methionine."""
+        self.cds1.seqfeature = SeqFeature(FeatureLocation(12, 21, 1),
+                                          type="CDS")
+        translations = translation.translate_cds_features(
+                            self.gnm_seq, [self.cds1])
+        self.assertEqual(str(translations[0]), "MG")
+
+    def test_translate_cds_features_3(self):
+        """Verify that an empty translation is returned for a sequence
+        that is not a valid CDS sequence."""
+        self.cds1.seqfeature = SeqFeature(FeatureLocation(0, 15, 1),
+                                          type="CDS")
+        translations = translation.translate_cds_features(
+                            self.gnm_seq, [self.cds1])
+        with self.subTest():
+            self.assertEqual(str(translations[0]), "")
+        with self.subTest():
+            self.assertEqual(translations[0].alphabet, IUPAC.protein)
+
+    def test_translate_cds_features_4(self):
+        """Verify that a feature with two parts is translated."""
+        self.cds1.seqfeature = SeqFeature(CompoundLocation(
+                                    [FeatureLocation(0, 6, 1),
+                                     FeatureLocation(9, 12, 1)]),
+                                    type="CDS")
+        self.cds1.set_nucleotide_sequence(parent_genome_seq=self.gnm_seq)
+        translations = translation.translate_cds_features(
+                            self.gnm_seq, [self.cds1])
+        with self.subTest():
+            self.assertEqual(translations, [self.cds1.translate_seq()])
+        with self.subTest():
+            self.assertEqual(str(translations[0]), "MK")
+
+    def test_translate_cds_features_5(self):
+        """Verify that features with ambiguous nucleotides or other
+        translation tables are translated by Biopython."""
+        gnm_seq = Seq("ATGNNNTAA" + str(self.gnm_seq)[9:],
+                      IUPAC.ambiguous_dna)
+        cds2 = cds.Cds()
+        cds2.translation_table = 1
+        cds2.seqfeature = SeqFeature(FeatureLocation(0, 9, 1), type="CDS")
+        for cds_ftr in [self.cds1, cds2]:
+            cds_ftr.set_nucleotide_sequence(parent_genome_seq=gnm_seq)
+        translations = translation.translate_cds_features(
+                            gnm_seq, [self.cds1, cds2])
+        with self.subTest():
+            self.assertEqual(translations, [self.cds1.translate_seq(),
+                                            cds2.translate_seq()])
+        with self.subTest():
+            self.assertEqual(str(translations[1]), "MX")
+
+    def test_translate_cds_features_6(self):
+        """Verify that translations of random features are identical to
+        those of Biopython for translation tables 4 and 11."""
+        rng = random.Random(1)
+        for table in [4, 11]:
+            gnm_seq, cds_features = create_random_genome(rng, 500,
+                                                         table=table)
+            translations = translation.translate_cds_features(gnm_seq,
+                                                              cds_features)
+            expected = [cds_ftr.translate_seq() for cds_ftr in cds_features]
+            with self.subTest(table=table):
+                self.assertEqual([(str(x), x.alphabet) for x in translations],
+                                 [(str(x), x.alphabet) for x in expected])
+            with self.subTest(table=table):
+                self.assertTrue(any(str(x) == "" for x in expected))
+
+
+if __name__ == '__main__':
+    unittest.main()